@@ -0,0 +1,92 @@
+"""Benchmark code indexing — full index_project on a synthetic Python project.
+
+Run: python benchmarks/bench_code_index.py [--files 2000] [--workers 1 4]
+
+Generates a project of --files modules (classes with methods, functions, imports
+and calls between modules) in a temp dir and indexes it from scratch into a temp
+database with init_db's schema, once per --workers setting (code.parse_workers).
+Reports wall time, files/s and the stored symbol/reference counts.
+Needs tree-sitter-language-pack.
+"""
+
+import argparse
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "mcp-server"))
+import code.parse_pool as parse_pool
+from code.indexer import index_project
+from init_db import SCHEMA, FTS_SCHEMA
+
+
+def make_module(i: int, n_files: int, rng: random.Random) -> str:
+    lines = ['"""Synthetic module %d."""' % i, "", "import os"]
+    for j in rng.sample(range(n_files), min(3, n_files)):
+        lines.append(f"from pkg.mod{j} import func{j}_0, Class{j}")
+    lines.append("")
+    for c in range(3):
+        lines += [f"class Class{i}_{c}:", f'    """Class {c} of module {i}."""', ""]
+        for m in range(4):
+            callee = rng.randrange(n_files)
+            lines += [f"    def method{m}(self, value: int) -> int:",
+                      f"        result = func{callee}_0(value)",
+                      f"        return self.method{(m + 1) % 4}(result) if value else result", ""]
+    for f in range(5):
+        callee = rng.randrange(n_files)
+        lines += [f"def func{i}_{f}(value):", f'    """Function {f}."""',
+                  f"    return func{callee}_{f}(value) + len(os.sep)", ""]
+    return "\n".join(lines) + "\n"
+
+
+def make_project(root: Path, n_files: int, seed: int) -> None:
+    rng = random.Random(seed)
+    pkg = root / "pkg"
+    pkg.mkdir(parents=True)
+    (pkg / "__init__.py").write_text("", encoding="utf-8")
+    for i in range(n_files):
+        (pkg / f"mod{i}.py").write_text(make_module(i, n_files, rng), encoding="utf-8")
+
+
+def fresh_db(path: Path) -> sqlite3.Connection:
+    path.unlink(missing_ok=True)
+    db = sqlite3.connect(str(path))
+    db.row_factory = sqlite3.Row
+    db.execute("PRAGMA journal_mode=WAL")
+    db.executescript(SCHEMA)
+    db.executescript(FTS_SCHEMA)
+    db.execute("INSERT INTO projects (name, path, created) VALUES ('bench', '/bench', 'now')")
+    db.commit()
+    return db
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, parse_pool.parse_workers()])
+    parser.add_argument("--budget", type=float, default=600.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="cognilayer_bench_") as tmp:
+        root = Path(tmp) / "project"
+        make_project(root, args.files, args.seed)
+        print(f"{args.files} modules, full index\n")
+        print(f"{'workers':>7} {'seconds':>8} {'files/s':>8} {'symbols':>8} {'refs':>8} {'partial':>7}")
+        print("-" * 52)
+        for workers in args.workers:
+            parse_pool.parse_workers = lambda w=workers: w
+            db = fresh_db(Path(tmp) / "bench.db")
+            start = time.perf_counter()
+            stats = index_project(db, "bench", str(root), time_budget=args.budget, incremental=False)
+            elapsed = time.perf_counter() - start
+            db.close()
+            print(f"{workers:>7} {elapsed:>8.2f} {stats['files_indexed'] / elapsed:>8.0f} "
+                  f"{stats['symbols']:>8} {stats['references']:>8} {str(stats['partial']):>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Benchmark hybrid rank fusion modes — recall@k and latency on a synthetic corpus.
+
+Run: python benchmarks/bench_fusion.py [--docs 2000] [--queries 300] [--k 5]
+
+Builds an in-memory facts table + FTS5 index from init_db's schema. Each fact belongs
+to a topic; its text mixes topic keywords (shared with a neighbouring topic) with
+common filler, and some facts also mention another topic's keywords twice (FTS5
+false positives that outrank true hits). Its vector is the topic centre plus noise
+(so vector search alone is noisy). A query is one topic keyword plus a noisy topic
+vector; the relevant set is every fact of the query's topic.
+
+For each fusion mode and over-fetch factor it reports recall@k and the per-query
+latency of the FTS5 candidate query + fusion (the vector top-k is precomputed, since
+it does not depend on the fusion mode).
+"""
+
+import argparse
+import math
+import random
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "mcp-server"))
+from init_db import SCHEMA, FTS_SCHEMA
+from search.fusion import FUSION_MODES, fuse
+from search.fts_search import _escape_fts5, _mark_fts_ranks
+
+DIM = 64
+TOPIC_WORDS = 8
+COMMON_WORDS = 300
+
+
+def _unit(vec: list[float]) -> list[float]:
+    norm = math.sqrt(sum(x * x for x in vec)) or 1.0
+    return [x / norm for x in vec]
+
+
+def _noisy(center: list[float], noise: float, rng: random.Random) -> list[float]:
+    # Per-dimension sigma scaled so `noise` is the expected noise/centre norm ratio
+    sigma = noise / math.sqrt(DIM)
+    return _unit([c + rng.gauss(0.0, sigma) for c in center])
+
+
+def _l2(a: list[float], b: list[float]) -> float:
+    return math.sqrt(sum((x - y) ** 2 for x, y in zip(a, b)))
+
+
+def build_corpus(n_docs: int, n_topics: int, noise: float, mention: float,
+                 rng: random.Random):
+    """Return (db, doc_topics, doc_vectors, topic_centers, topic_vocab)."""
+    db = sqlite3.connect(":memory:")
+    db.row_factory = sqlite3.Row
+    db.executescript(SCHEMA)
+    db.executescript(FTS_SCHEMA)
+    db.execute("INSERT INTO projects (name, path, created) VALUES ('bench', '/bench', 'now')")
+
+    centers = [_unit([rng.gauss(0.0, 1.0) for _ in range(DIM)]) for _ in range(n_topics)]
+    # Topic t shares half its vocabulary with topic t+1 (keyword ambiguity for FTS5)
+    own = [[f"kw{t}x{j}" for j in range(TOPIC_WORDS)] for t in range(n_topics)]
+    vocab = [own[t][:TOPIC_WORDS // 2] + own[(t + 1) % n_topics][TOPIC_WORDS // 2:]
+             for t in range(n_topics)]
+    common = [f"filler{j}" for j in range(COMMON_WORDS)]
+
+    doc_topics = {}
+    doc_vectors = {}
+    for i in range(n_docs):
+        topic = i % n_topics
+        words = rng.sample(vocab[topic], 3) + rng.sample(common, 12)
+        if rng.random() < mention:
+            # Passing mention of another topic's keywords (FTS5 false positives)
+            words += rng.sample(vocab[rng.randrange(n_topics)], 2) * 2
+        rng.shuffle(words)
+        db.execute("""
+            INSERT INTO facts (id, project, content, type, timestamp)
+            VALUES (?, 'bench', ?, 'fact', 'now')
+        """, (f"doc{i}", " ".join(words)))
+        rowid = db.execute("SELECT last_insert_rowid()").fetchone()[0]
+        doc_topics[rowid] = topic
+        doc_vectors[rowid] = _noisy(centers[topic], noise, rng)
+    db.commit()
+    return db, doc_topics, doc_vectors, centers, vocab
+
+
+def make_queries(n_queries: int, centers, vocab, doc_vectors, noise: float,
+                 rng: random.Random):
+    """Return [(keyword, topic, sorted [(rowid, distance)] over the whole corpus)]."""
+    queries = []
+    for _ in range(n_queries):
+        topic = rng.randrange(len(centers))
+        keyword = rng.choice(vocab[topic])
+        qvec = _noisy(centers[topic], noise, rng)
+        ranked = sorted(((rid, _l2(qvec, v)) for rid, v in doc_vectors.items()),
+                        key=lambda kv: kv[1])
+        queries.append((keyword, topic, ranked))
+    return queries
+
+
+_FTS_SQL = """
+    SELECT f.id, f.rowid, bm25(facts_fts) AS bm25_score
+    FROM facts f
+    JOIN facts_fts fts ON f.rowid = fts.rowid
+    WHERE facts_fts MATCH ? AND f.project = 'bench'
+    ORDER BY rank
+    LIMIT ?
+"""
+
+
+def run(db, queries, doc_topics, mode: str, overfetch: int, k: int):
+    """Return (mean recall@k, mean ms/query) for one mode/over-fetch setting."""
+    fetch = k * overfetch
+    recalls = []
+    start = time.perf_counter()
+    for keyword, topic, ranked in queries:
+        rows = db.execute(_FTS_SQL, (_escape_fts5(keyword), fetch)).fetchall()
+        results = _mark_fts_ranks([{"id": r["id"], "rowid": r["rowid"]} for r in rows], rows)
+        vec_distances = dict(ranked[:fetch])
+        seen = {r["rowid"] for r in results}
+        results += [{"rowid": rid} for rid in vec_distances if rid not in seen]
+        top = fuse(results, vec_distances, mode)[:k]
+        relevant = sum(1 for r in top if doc_topics[r["rowid"]] == topic)
+        recalls.append(relevant / k)
+    elapsed = time.perf_counter() - start
+    return sum(recalls) / len(recalls), elapsed * 1000 / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--topics", type=int, default=80)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--noise", type=float, default=1.0,
+                        help="gaussian noise on doc/query vectors (noise/centre norm ratio)")
+    parser.add_argument("--mention", type=float, default=0.5,
+                        help="share of facts that also mention another topic's keywords")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"Building corpus: {args.docs} docs, {args.topics} topics, dim={DIM}...")
+    db, doc_topics, doc_vectors, centers, vocab = build_corpus(args.docs, args.topics, args.noise,
+                                                             args.mention, rng)
+    queries = make_queries(args.queries, centers, vocab, doc_vectors, args.noise, rng)
+
+    print(f"\n{'mode':<8} {'overfetch':>9} {'recall@' + str(args.k):>10} {'ms/query':>9}")
+    print("-" * 40)
+    for mode in FUSION_MODES:
+        for overfetch in (1, 2, 3):
+            recall, ms = run(db, queries, doc_topics, mode, overfetch, args.k)
+            print(f"{mode:<8} {overfetch:>9} {recall:>10.3f} {ms:>9.3f}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
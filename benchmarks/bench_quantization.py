@@ -0,0 +1,122 @@
+"""Benchmark quantized vector modes — recall loss vs float, index size and KNN latency.
+
+Run: python benchmarks/bench_quantization.py [--vectors 20000] [--queries 200] [--k 10]
+
+Requires numpy and a sqlite3 build that can load sqlite-vec. For each mode
+("none", "int8", "binary") a temporary memory.db-style chunks_vec table is filled
+with the same clustered unit vectors (topic centres + noise, like real embedding
+neighbourhoods). Queries go through vec_store.knn_cte — the same SQL the search
+path uses — and recall@k is measured against the exact float top-k. Quantized
+modes are run at several rescore factors (candidates per neighbour rescored with float
+L2; vec_store.RESCORE_FACTORS holds the defaults).
+
+"index MB" is the quantized column the KNN scans; "DB MB" is the whole database
+file, which for quantized modes also holds the float copy used for rescoring.
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "mcp-server"))
+import vec_store
+from db import _load_sqlite_vec
+from vec_store import vec_schema, insert_sql, knn_cte
+
+DIM = 384
+
+
+def make_vectors(n: int, n_topics: int, noise: float, rng: np.random.Generator) -> np.ndarray:
+    """Unit vectors clustered around n_topics random centres."""
+    centres = rng.standard_normal((n_topics, DIM))
+    centres /= np.linalg.norm(centres, axis=1, keepdims=True)
+    vectors = centres[rng.integers(0, n_topics, n)]
+    vectors = vectors + rng.standard_normal((n, DIM)) * (noise / np.sqrt(DIM))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype("<f4")
+
+
+def build_table(path: str, mode: str, vectors: np.ndarray) -> sqlite3.Connection:
+    db = sqlite3.connect(path)
+    if not _load_sqlite_vec(db):
+        sys.exit("sqlite-vec could not be loaded by this sqlite3 build")
+    db.executescript(vec_schema(mode))
+    sql = insert_sql("chunks_vec", ["project"], mode)
+    rows = []
+    for i, v in enumerate(vectors, start=1):
+        blob = v.tobytes()
+        rows.append((i, "bench", blob) if mode == "none" else (i, "bench", blob, blob))
+    db.executemany(sql, rows)
+    db.commit()
+    return db
+
+
+def vec_size(db: sqlite3.Connection) -> int:
+    """Bytes of the KNN-scanned vector blobs (excludes the `full` rescoring column)."""
+    return db.execute(
+        "SELECT COALESCE(SUM(length(vectors)), 0) FROM chunks_vec_vector_chunks00"
+    ).fetchone()[0]
+
+
+def db_size(db: sqlite3.Connection) -> int:
+    """Bytes of the whole database file (vec0 shadow tables, `full` column included)."""
+    return db.execute(
+        "SELECT page_count * page_size FROM pragma_page_count, pragma_page_size"
+    ).fetchone()[0]
+
+
+def run(db: sqlite3.Connection, queries: np.ndarray, truth: list[set], k: int):
+    """Return (mean recall@k, mean ms/query)."""
+    recalls = []
+    start = time.perf_counter()
+    for q, expected in zip(queries, truth):
+        knn_sql, params = knn_cte(db, "chunks_vec", q.tobytes(), k, [("project", "bench")])
+        rows = db.execute(f"WITH knn AS ({knn_sql}) SELECT rowid FROM knn", params).fetchall()
+        recalls.append(len({r[0] for r in rows} & expected) / k)
+    elapsed = time.perf_counter() - start
+    return sum(recalls) / len(recalls), elapsed * 1000 / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--vectors", type=int, default=20000)
+    parser.add_argument("--topics", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--noise", type=float, default=1.0,
+                        help="noise/centre norm ratio of the clustered vectors")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"Generating {args.vectors} vectors ({args.topics} topics, dim={DIM})...")
+    vectors = make_vectors(args.vectors, args.topics, args.noise, rng)
+    queries = make_vectors(args.queries, args.topics, args.noise, rng)
+    # Exact float top-k (rowids are 1-based)
+    truth = [set((np.argsort(((vectors - q) ** 2).sum(axis=1))[:args.k] + 1).tolist())
+             for q in queries]
+
+    print(f"\n{'mode':<7} {'rescore':>7} {'recall@' + str(args.k):>10} {'ms/query':>9} {'index MB':>9} {'DB MB':>7}")
+    print("-" * 55)
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in vec_store.QUANTIZATION_MODES:
+            db = build_table(os.path.join(tmp, f"{mode}.db"), mode, vectors)
+            size_mb = vec_size(db) / 1e6
+            total_mb = db_size(db) / 1e6
+            factors = (1,) if mode == "none" else (1, 2, 4, 8, 16, 32)
+            for factor in factors:
+                vec_store.RESCORE_FACTORS[mode] = factor
+                recall, ms = run(db, queries, truth, args.k)
+                label = "-" if mode == "none" else f"x{factor}"
+                print(f"{mode:<7} {label:>7} {recall:>10.3f} {ms:>9.2f} {size_mb:>9.1f} {total_mb:>7.1f}")
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Microbenchmark embedding serialisation — struct.pack vs numpy buffers, per vector.
+
+Run: python benchmarks/bench_serialize.py [--vectors 2000] [--repeat 5]
+
+fastembed yields one float32 ndarray per text. The old path unpacked every vector
+into 384 Python floats for struct.pack; embedder.vector_to_blob / vectors_to_blobs
+copy the float32 buffer directly. Reports the best-of-N cost per vector in
+microseconds and checks all paths produce identical blobs.
+"""
+
+import argparse
+import struct
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "mcp-server"))
+from embedder import EMBEDDING_DIM, vector_to_blob, vectors_to_blobs
+
+
+def struct_pack(vectors) -> list[bytes]:
+    return [struct.pack(f"<{EMBEDDING_DIM}f", *v) for v in vectors]
+
+
+def per_vector(vectors) -> list[bytes]:
+    return [vector_to_blob(v) for v in vectors]
+
+
+def batch(vectors) -> list[bytes]:
+    return vectors_to_blobs(vectors)
+
+
+def best_us(fn, vectors, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(vectors)
+        best = min(best, time.perf_counter() - start)
+    return best * 1e6 / len(vectors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--vectors", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    # Same shape as fastembed output: a list of float32 rows
+    vectors = list(rng.standard_normal((args.vectors, EMBEDDING_DIM)).astype(np.float32))
+
+    reference = struct_pack(vectors)
+    assert per_vector(vectors) == reference and batch(vectors) == reference
+
+    print(f"{args.vectors} x {EMBEDDING_DIM}-dim float32 vectors, best of {args.repeat}\n")
+    print(f"{'path':<28} {'us/vector':>10}")
+    print("-" * 39)
+    for name, fn in (("struct.pack (old)", struct_pack),
+                     ("vector_to_blob", per_vector),
+                     ("vectors_to_blobs (batch)", batch)):
+        print(f"{name:<28} {best_us(fn, vectors, args.repeat):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
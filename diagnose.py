@@ -87,6 +87,17 @@ def check_database():
         tables = [r[0] for r in db.execute(
             "SELECT name FROM sqlite_master WHERE type='table'"
         ).fetchall()]
+        cache_rows = []
+        if "query_embeddings" in tables:
+            cache_rows = db.execute("""
+                SELECT model, COUNT(*), COALESCE(SUM(hits), 0)
+                FROM query_embeddings GROUP BY model
+            """).fetchall()
+        model_rows = []
+        if "embedding_models" in tables:
+            model_rows = db.execute("""
+                SELECT model_id, state, heartbeat FROM embedding_models ORDER BY state DESC
+            """).fetchall()
         db.close()
         has_core = all(t in tables for t in ["facts", "projects", "sessions"])
         has_code = "code_symbols" in tables
@@ -103,12 +114,70 @@ def check_database():
         )
         if has_core and not has_code:
             warn("Code Intelligence tables missing", "Run: python install.py to upgrade schema")
+        if "query_embeddings" in tables:
+            check_query_cache(cache_rows)
+        if model_rows:
+            check_embedding_models(model_rows)
         return has_core
     except Exception as e:
         check("Database readable", False, str(e))
         return False
 
 
+def check_query_cache(rows: list):
+    """Report query-embedding cache entries and hits (rows: model, entries, hits)."""
+    if not rows:
+        check("Query embedding cache", True, "empty (fills on first vector searches)")
+        return
+    for model, entries, hits in rows:
+        # Every cached entry was one miss; hits are repeats served without ONNX inference
+        rate = hits / (hits + entries) if hits + entries else 0.0
+        check(
+            "Query embedding cache",
+            True,
+            f"{model}: {entries} queries cached, {hits} hits, {entries} misses ({rate:.0%} hit rate)",
+        )
+
+
+def check_embedding_models(rows: list):
+    """Report the serving embedding model and any background re-embedding (rows: model, state, heartbeat)."""
+    for model, state, heartbeat in rows:
+        if state == "ready":
+            check("Embedding model", True, f"{model} (ready)")
+        else:
+            warn(f"Embedding model {model} is still being built",
+                 f"last progress {heartbeat or 'never'} — runs in the MCP server, "
+                 "or finish it with: python mcp-server/backfill_embeddings.py")
+
+
+def check_startup_timings():
+    """Report MCP server startup phases (written by mcp-server/startup.py)."""
+    path = COGNILAYER_HOME / "logs" / "startup.jsonl"
+    if not path.exists():
+        return
+    runs = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            runs.append(json.loads(line))
+        except ValueError:
+            continue
+    if not runs:
+        return
+    last = runs[-1]
+    phases = ", ".join(f"{name} {secs:.2f}s" for name, secs in last.get("phases", {}).items())
+    notes = ", ".join(f"{k}: {v}" for k, v in last.get("notes", {}).items())
+    totals = sorted(r.get("total", 0.0) for r in runs)
+    median = totals[len(totals) // 2]
+    check(
+        "Server startup",
+        True,
+        f"last {last.get('total', 0.0):.2f}s ({phases}){f' [{notes}]' if notes else ''}; "
+        f"median {median:.2f}s over {len(runs)} starts",
+    )
+    if last.get("notes", {}).get("schema") == "failed":
+        warn("Schema migration failed at last server start", "See ~/.cognilayer/logs/cognilayer.log")
+
+
 def check_mcp_package():
     """Check mcp package is importable."""
     try:
@@ -464,6 +533,7 @@ def main():
     print("\n[3/7] CogniLayer home")
     if check_cognilayer_home():
         check_database()
+        check_startup_timings()
 
     print("\n[4/7] Claude Code registration")
     registered, python_cmd, server_path = check_settings_json()
@@ -252,6 +252,13 @@ def main():
         cleanup_old_sessions(db)
 
         db.commit()
+
+        # Decay heat for the project (throttled, set-based; kept off the search path)
+        try:
+            from heat import maybe_decay
+            maybe_decay(db, project_name)
+        except Exception:
+            pass
     except Exception as e:
         sys.stderr.write(f"CogniLayer SessionEnd error: {e}\n")
     finally:
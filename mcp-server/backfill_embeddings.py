@@ -1,7 +1,14 @@
 """Backfill embeddings for existing facts and file_chunks.
 
 Run: python backfill_embeddings.py
-Processes all facts/chunks that don't have embeddings yet.
+Processes all facts/chunks that don't have embeddings yet in the serving model's
+vec tables, then finishes a pending model migration (see embedding_models.py) in
+the foreground. Text already in the content-addressed embedding store is reused
+instead of re-embedded.
+
+backfill_facts/backfill_chunks are also the re-embed loops of background model
+migrations, which pass their own spec/table, a logger instead of print, and an
+on_batch callback (lease heartbeat, returns False to stop).
 """
 
 import sys
@@ -10,85 +17,104 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
 from db import open_db
-from embedder import embed_texts, is_available, EMBEDDING_DIM
-
-
-def backfill_facts(db, batch_size: int = 50):
-    """Backfill embeddings for facts missing from facts_vec."""
+from embedder import is_available, embedding_batch_size, model_id
+from embedding_store import (embed_texts_cached, fact_text, chunk_text,
+                             stats as store_stats, prune as prune_store)
+from vec_store import write_fact_vec, write_chunk_vec
+
+_IN_CHUNK = 500  # Bound parameters per IN (...) list
+
+
+def _drop_stale(db, table: str, select: str, batch: list, texts: list[str], text_of) -> None:
+    """Delete the vectors just written for rows edited or deleted while the batch embedded.
+
+    Runs after the batch's writes, so this connection holds the write lock and
+    nothing can change between the check and the commit. Edits committed later
+    invalidate the vector themselves (memory_write drops it from other models' tables).
+    """
+    expected = {row[0]: text for row, text in zip(batch, texts)}
+    rowids = list(expected)
+    current = {}
+    for i in range(0, len(rowids), _IN_CHUNK):
+        chunk = rowids[i:i + _IN_CHUNK]
+        placeholders = ",".join("?" * len(chunk))
+        for row in db.execute(f"{select} WHERE rowid IN ({placeholders})", chunk):
+            current[row[0]] = text_of(row)
+    for rid, text in expected.items():
+        if current.get(rid) != text:
+            db.execute(f"DELETE FROM {table} WHERE rowid = ?", (rid,))
+
+
+def backfill_facts(db, batch_size: int | None = None, spec: dict | None = None,
+                   table: str = "facts_vec", log=print, on_batch=None):
+    """Backfill embeddings for facts missing from a facts vec table."""
     # Find facts without embeddings
-    rows = db.execute("""
-        SELECT f.rowid, f.content, f.tags, f.domain
+    rows = db.execute(f"""
+        SELECT f.rowid, f.content, f.tags, f.domain, f.project, f.type
         FROM facts f
-        WHERE f.rowid NOT IN (SELECT rowid FROM facts_vec)
+        WHERE f.rowid NOT IN (SELECT rowid FROM {table})
     """).fetchall()
 
     if not rows:
-        print("  All facts already have embeddings.")
+        log("  All facts already have embeddings.")
         return 0
+    batch_size = batch_size or embedding_batch_size()
 
     total = len(rows)
     processed = 0
-    print(f"  Backfilling {total} facts...")
+    log(f"  Backfilling {total} facts...")
 
     for i in range(0, total, batch_size):
         batch = rows[i:i + batch_size]
-        texts = []
-        for row in batch:
-            text = row[1]  # content
-            if row[2]:  # tags
-                text += f" [{row[2]}]"
-            if row[3]:  # domain
-                text += f" [{row[3]}]"
-            texts.append(text)
-
-        embeddings = embed_texts(texts)
+        texts = [fact_text(row[1], row[3]) for row in batch]
+
+        embeddings = embed_texts_cached(db, texts, spec)
         for j, emb in enumerate(embeddings):
-            db.execute(
-                "INSERT OR REPLACE INTO facts_vec(rowid, embedding) VALUES (?, ?)",
-                (batch[j][0], emb)
-            )
+            write_fact_vec(db, batch[j][0], emb, batch[j][4], batch[j][5], table)
+        _drop_stale(db, table, "SELECT rowid, content, domain FROM facts", batch, texts,
+                    lambda r: fact_text(r[1], r[2]))
+        db.commit()  # One transaction per batch
         processed += len(batch)
-        print(f"  [{processed}/{total}] facts embedded")
+        log(f"  [{processed}/{total}] facts embedded")
+        if on_batch is not None and not on_batch():
+            break
 
-    db.commit()
     return processed
 
 
-def backfill_chunks(db, batch_size: int = 50):
-    """Backfill embeddings for chunks missing from chunks_vec."""
-    rows = db.execute("""
-        SELECT fc.rowid, fc.content, fc.section_title
+def backfill_chunks(db, batch_size: int | None = None, spec: dict | None = None,
+                    table: str = "chunks_vec", log=print, on_batch=None):
+    """Backfill embeddings for chunks missing from a chunks vec table."""
+    rows = db.execute(f"""
+        SELECT fc.rowid, fc.content, fc.section_title, fc.project
         FROM file_chunks fc
-        WHERE fc.rowid NOT IN (SELECT rowid FROM chunks_vec)
+        WHERE fc.rowid NOT IN (SELECT rowid FROM {table})
     """).fetchall()
 
     if not rows:
-        print("  All chunks already have embeddings.")
+        log("  All chunks already have embeddings.")
         return 0
+    batch_size = batch_size or embedding_batch_size()
 
     total = len(rows)
     processed = 0
-    print(f"  Backfilling {total} chunks...")
+    log(f"  Backfilling {total} chunks...")
 
     for i in range(0, total, batch_size):
         batch = rows[i:i + batch_size]
-        texts = []
-        for row in batch:
-            text = row[1]  # content
-            if row[2]:  # section_title
-                text = f"{row[2]}: {text}"
-            texts.append(text)
-
-        embeddings = embed_texts(texts)
+        texts = [chunk_text(row[2], row[1]) for row in batch]
+
+        embeddings = embed_texts_cached(db, texts, spec)
         for j, emb in enumerate(embeddings):
-            db.execute(
-                "INSERT OR REPLACE INTO chunks_vec(rowid, embedding) VALUES (?, ?)",
-                (batch[j][0], emb)
-            )
+            write_chunk_vec(db, batch[j][0], emb, batch[j][3], table)
+        _drop_stale(db, table, "SELECT rowid, content, section_title FROM file_chunks", batch, texts,
+                    lambda r: chunk_text(r[2], r[1]))
+        db.commit()  # One transaction per batch
         processed += len(batch)
-        print(f"  [{processed}/{total}] chunks embedded")
+        log(f"  [{processed}/{total}] chunks embedded")
+        if on_batch is not None and not on_batch():
+            break
 
-    db.commit()
     return processed
 
 
@@ -100,25 +126,47 @@ def main():
     print("CogniLayer — Backfill Embeddings")
     print("=" * 40)
 
+    from embedding_models import serving_model, vec_table_names, ensure_configured_model, migrate_model
+
     db = open_db(with_vec=True)
     try:
+        spec = serving_model(db)
+        facts_table, chunks_table = vec_table_names(spec)
+
         # Check if vec tables exist
         try:
-            db.execute("SELECT COUNT(*) FROM facts_vec")
+            db.execute(f"SELECT COUNT(*) FROM {facts_table}")
         except Exception:
             print("ERROR: Vector tables not found. Run init_db.py first.")
             sys.exit(1)
 
+        # Pre-partition vec tables must be rebuilt before project-scoped writes
+        from init_db import upgrade_vec_schema
+        upgrade_vec_schema(db)
+
         start = time.time()
 
-        print("\n[1/2] Facts:")
-        facts_count = backfill_facts(db)
+        print(f"\n[1/3] Facts ({model_id(spec)}):")
+        facts_count = backfill_facts(db, spec=spec, table=facts_table)
+
+        print(f"\n[2/3] File chunks ({model_id(spec)}):")
+        chunks_count = backfill_chunks(db, spec=spec, table=chunks_table)
+
+        print("\n[3/3] Model migration:")
+        target = ensure_configured_model(db)
+        if target is None:
+            print("  Configured model is already serving.")
+        elif not migrate_model(target, log=print):
+            print("  Migration not finished (another process holds it, or it was interrupted).")
 
-        print("\n[2/2] File chunks:")
-        chunks_count = backfill_chunks(db)
+        pruned = prune_store(db)
+        db.commit()
 
         elapsed = time.time() - start
-        print(f"\nDone in {elapsed:.1f}s: {facts_count} facts + {chunks_count} chunks embedded.")
+        counts = store_stats()
+        print(f"\nDone in {elapsed:.1f}s: {facts_count} facts + {chunks_count} chunks embedded "
+              f"({counts['embedded']} computed, {counts['reused']} reused from store, "
+              f"{pruned} stale store entries pruned).")
     finally:
         db.close()
 
@@ -1,6 +1,10 @@
 """Code indexer — 3-phase pipeline: scan → parse → store + resolve.
 
-Handles full and incremental indexing with time budget enforcement.
+Handles full and incremental indexing with time budget enforcement. A cancelled
+or timed-out MCP call (dispatch.cancel_requested) stops like an exhausted budget.
+index_project parses on a worker process pool (code.parse_pool) while the
+calling thread, the only writer, stores results in one transaction per
+STORE_BATCH_FILES files (_store_batch: bulk executemany loads).
 """
 
 from __future__ import annotations
@@ -8,10 +12,13 @@ from __future__ import annotations
 import logging
 import os
 import sqlite3
+import stat
 import time
 from datetime import datetime
 from pathlib import Path
 
+from dispatch import cancel_requested
+
 _log = logging.getLogger("cognilayer.code.indexer")
 
 # Directories to always skip
@@ -26,6 +33,15 @@ DEFAULT_IGNORE_DIRS = {
 # Max file size to parse (500KB)
 MAX_FILE_SIZE = 512_000
 
+# Files stored per transaction
+STORE_BATCH_FILES = 50
+
+# Symbols per batch from which code_symbols_fts is synced in bulk instead of by triggers
+FTS_BULK_MIN_SYMBOLS = 500
+_FTS_TRIGGERS = ("code_symbols_ai", "code_symbols_ad", "code_symbols_au")
+
+_IN_CHUNK = 500  # Bound parameters per IN (...) list
+
 
 def _db_execute_with_retry(db, sql, params=(), max_retries=3, delay=0.5):
     """Execute SQL with retry on OperationalError (locked/busy)."""
@@ -39,10 +55,27 @@ def _db_execute_with_retry(db, sql, params=(), max_retries=3, delay=0.5):
             raise
 
 
+def _db_executemany_with_retry(db, sql, rows, max_retries=3, delay=0.5):
+    """executemany with retry on OperationalError (locked/busy)."""
+    if not rows:
+        return None
+    for attempt in range(max_retries):
+        try:
+            return db.executemany(sql, rows)
+        except sqlite3.OperationalError as e:
+            if attempt < max_retries - 1 and ("locked" in str(e) or "busy" in str(e)):
+                time.sleep(delay * (attempt + 1))
+                continue
+            raise
+
+
 def scan_files(project_path: str, ignore_dirs: set[str] | None = None,
-               extensions: set[str] | None = None) -> list[dict]:
+               extensions: set[str] | None = None, rel_paths: list[str] | None = None) -> list[dict]:
     """Scan project directory for source files.
 
+    rel_paths: consider only these paths (relative to project_path, e.g. from
+    git_scan) instead of walking the tree. Missing files are left out.
+
     Returns list of dicts with: path, extension, mtime, size.
     """
     from code.parsers.registry import SUPPORTED_EXTENSIONS
@@ -58,41 +91,64 @@ def scan_files(project_path: str, ignore_dirs: set[str] | None = None,
     if not root.is_dir():
         return results
 
+    if rel_paths is not None:
+        for rel in rel_paths:
+            if _is_source_path(rel, ignore_dirs, extensions):
+                finfo = _file_info(root, root / rel)
+                if finfo is not None:
+                    results.append(finfo)
+        return results
+
     for dirpath, dirnames, filenames in os.walk(root):
         # Filter out ignored directories (modifies in-place to skip recursion)
         dirnames[:] = [d for d in dirnames if d not in ignore_dirs and not d.startswith(".")]
 
         for fname in filenames:
-            ext = Path(fname).suffix
-            if ext not in extensions:
-                continue
-
-            fpath = Path(dirpath) / fname
-            try:
-                stat = fpath.stat()
-                if stat.st_size > MAX_FILE_SIZE:
-                    continue
-                results.append({
-                    "path": str(fpath),
-                    "rel_path": str(fpath.relative_to(root)).replace("\\", "/"),
-                    "extension": ext,
-                    "mtime": stat.st_mtime,
-                    "size": stat.st_size,
-                })
-            except OSError:
+            if Path(fname).suffix not in extensions:
                 continue
+            finfo = _file_info(root, Path(dirpath) / fname)
+            if finfo is not None:
+                results.append(finfo)
 
     return results
 
 
+def _is_source_path(rel_path: str, ignore_dirs: set[str], extensions: set[str]) -> bool:
+    """The walk's filters (extension, ignored and hidden directories) for a relative path."""
+    parts = rel_path.split("/")
+    if any(d in ignore_dirs or d.startswith(".") for d in parts[:-1]):
+        return False
+    return Path(parts[-1]).suffix in extensions
+
+
+def _file_info(root: Path, fpath: Path) -> dict | None:
+    try:
+        st = fpath.stat()
+    except OSError:
+        return None
+    if not stat.S_ISREG(st.st_mode) or st.st_size > MAX_FILE_SIZE:
+        return None
+    return {
+        "path": str(fpath),
+        "rel_path": str(fpath.relative_to(root)).replace("\\", "/"),
+        "extension": fpath.suffix,
+        "mtime": st.st_mtime,
+        "size": st.st_size,
+    }
+
+
 def index_project(db: sqlite3.Connection, project: str, project_path: str,
                   time_budget: float = 30.0, incremental: bool = True) -> dict:
     """Index a project's source code.
 
     3-phase pipeline:
-    1. Scan — find source files
-    2. Parse — extract symbols + references via tree-sitter
-    3. Store — write to DB + resolve references
+    1. Scan — find source files (incremental runs in a git repo: only those
+       git reports as changed since the last complete run, see git_scan)
+    2. Parse — extract symbols + references via tree-sitter (worker processes)
+    3. Store — write to DB in batches of files + resolve references
+
+    Files still queued on the pool when the budget runs out are dropped; the
+    next incremental run picks them up again (their mtime isn't recorded).
 
     Args:
         db: Database connection
@@ -104,7 +160,7 @@ def index_project(db: sqlite3.Connection, project: str, project_path: str,
     Returns:
         dict with stats: files_total, files_indexed, symbols, references, errors, elapsed
     """
-    from code.parsers.registry import get_parser, get_language
+    from code.parsers.registry import get_language
     from code.resolver import resolve_references
 
     start_time = time.time()
@@ -120,13 +176,36 @@ def index_project(db: sqlite3.Connection, project: str, project_path: str,
         "partial": False,
     }
 
-    # Phase 1: Scan
-    files = scan_files(project_path)
-    stats["files_total"] = len(files)
+    # Phase 1: Scan. In a git repo the file list comes from git (honouring
+    # .gitignore), and incremental runs with a recorded state only look at the
+    # files changed since the last complete run (git_scan). Otherwise: walk the tree.
+    import git_scan
+    from code.parsers.registry import SUPPORTED_EXTENSIONS
 
-    if not files:
-        stats["elapsed"] = time.time() - start_time
-        return stats
+    snapshot = git_scan.begin(db, project, project_path, "code")
+    listed = []
+    if snapshot is not None:
+        listed = [rel for rel in snapshot.files
+                  if _is_source_path(rel, DEFAULT_IGNORE_DIRS, SUPPORTED_EXTENSIONS)]
+        if not listed:
+            snapshot = None  # Nothing tracked here (e.g. an ignored directory): walk instead
+    gone: list[str] = []  # Indexed files no longer on disk (or no longer listed by git)
+    if snapshot is None:
+        files = scan_files(project_path)
+        stats["files_total"] = len(files)
+    elif incremental and snapshot.changed is not None and _has_files(db, project):
+        files = scan_files(project_path, rel_paths=snapshot.changed)
+        found = {finfo["rel_path"] for finfo in files}
+        gone = [rel for rel in snapshot.changed if rel not in found]
+        missing = set(gone)  # `git ls-files` still lists deleted tracked files
+        stats["files_total"] = sum(1 for rel in listed if rel not in missing)
+        _log.info("git scan: %d changed paths since %s", len(snapshot.changed), snapshot.head[:12])
+    else:
+        files = scan_files(project_path, rel_paths=listed)
+        stats["files_total"] = len(files)
+        found = {finfo["rel_path"] for finfo in files}
+        gone = [row[0] for row in db.execute("SELECT file_path FROM code_files WHERE project = ?", (project,))
+                if row[0] not in found]
 
     # Determine which files need indexing
     if incremental:
@@ -135,33 +214,68 @@ def index_project(db: sqlite3.Connection, project: str, project_path: str,
         files_to_index = files
 
     stats["files_skipped"] = len(files) - len(files_to_index)
+    retry: list[str] = []  # Files to look at again next run although git may not list them
+
+    def record_git_state() -> None:
+        if snapshot is None or stats["partial"]:
+            return
+        snapshot.dirty.extend(retry)
+        git_scan.record(db, project, "code", snapshot)
+        try:
+            db.commit()
+        except sqlite3.OperationalError as e:
+            _log.debug("Could not commit git state: %s", e)
+
+    if gone and not _delete_gone_files(db, project, gone):
+        retry.extend(gone)
 
     if not files_to_index:
+        record_git_state()
         stats["elapsed"] = time.time() - start_time
         return stats
 
-    # Phase 2 + 3: Parse and store
-    for finfo in files_to_index:
+    # Phase 2 + 3: Parse on the pool, store here (single writer), one transaction per batch
+    from code.parse_pool import parse_files
+
+    batch: list[tuple] = []  # (finfo, language, result) parsed but not stored yet
+
+    def store_batch() -> None:
+        try:
+            _store_batch(db, project, batch)
+            db.commit()
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e) and "busy" not in str(e):
+                raise
+            _log.warning("DB locked during store, dropping a batch of %d files", len(batch))
+            for finfo, _, _ in batch:
+                stats["errors"].append(f"{finfo['rel_path']}: DB locked")
+                retry.append(finfo["rel_path"])
+            try:
+                db.rollback()
+            except sqlite3.OperationalError:
+                _log.debug("Rollback also failed after DB lock")
+        else:
+            for _, _, result in batch:
+                stats["files_indexed"] += 1
+                stats["symbols"] += len(result.symbols)
+                stats["references"] += len(result.references)
+        batch.clear()
+
+    for finfo, result, error in parse_files(files_to_index):
         # Time budget check
         elapsed = time.time() - start_time
-        if elapsed >= time_budget:
+        if elapsed >= time_budget or cancel_requested():
             stats["partial"] = True
-            _log.warning("Time budget exhausted after %.1fs, indexed %d/%d files",
-                         elapsed, stats["files_indexed"], len(files_to_index))
+            _log.warning("Time budget exhausted (or call cancelled) after %.1fs, indexed %d/%d files",
+                         elapsed, stats["files_indexed"] + len(batch), len(files_to_index))
             break
 
-        ext = finfo["extension"]
-        parser = get_parser(ext)
-        if not parser:
+        if error is not None:
+            stats["errors"].append(f"{finfo['rel_path']}: {error}")
+            _log.warning("Parse failed for %s: %s", finfo["rel_path"], error)
+            retry.append(finfo["rel_path"])
             continue
-
-        language = get_language(ext) or "unknown"
-
-        try:
-            result = parser.parse_file(finfo["path"])
-        except Exception as e:
-            stats["errors"].append(f"{finfo['rel_path']}: {e}")
-            _log.warning("Parse failed for %s: %s", finfo["rel_path"], e)
+        if result is None:
             continue
 
         if result.errors:
@@ -170,25 +284,13 @@ def index_project(db: sqlite3.Connection, project: str, project_path: str,
             if not result.symbols and not result.references:
                 continue
 
-        # Store to DB
-        try:
-            file_id = _store_file(db, project, finfo, language, len(result.symbols))
-            _store_symbols(db, project, file_id, result.symbols)
-            _store_references(db, project, file_id, result.references)
-            db.commit()
-            stats["files_indexed"] += 1
-            stats["symbols"] += len(result.symbols)
-            stats["references"] += len(result.references)
-        except sqlite3.OperationalError as e:
-            if "locked" in str(e) or "busy" in str(e):
-                _log.warning("DB locked during store for %s, skipping", finfo["rel_path"])
-                stats["errors"].append(f"{finfo['rel_path']}: DB locked")
-                try:
-                    db.rollback()
-                except sqlite3.OperationalError:
-                    _log.debug("Rollback also failed after DB lock")
-            else:
-                raise
+        batch.append((finfo, get_language(finfo["extension"]) or "unknown", result))
+        if len(batch) >= STORE_BATCH_FILES:
+            store_batch()
+
+    if batch:
+        store_batch()
+    record_git_state()
 
     # Phase 3b: Resolve references (always run if there are unresolved refs, not just new files)
     try:
@@ -244,22 +346,40 @@ def reindex_dirty(db: sqlite3.Connection, project: str, project_path: str,
 
     stats["files_total"] = len(dirty)
 
+    batch: list[tuple] = []  # (finfo, language, result)
+    deleted: list[int] = []  # code_files ids of files gone from disk
+
+    def store_batch() -> None:
+        try:
+            _store_batch(db, project, batch, deleted)
+            db.commit()
+            stats["files_indexed"] += len(batch) + len(deleted)
+            for _, _, result in batch:
+                stats["symbols"] += len(result.symbols)
+                stats["references"] += len(result.references)
+        except sqlite3.OperationalError as e:
+            stats["errors"].extend(f"{finfo['rel_path']}: DB error: {e}" for finfo, _, _ in batch)
+            try:
+                db.rollback()
+            except sqlite3.OperationalError:
+                _log.debug("Rollback also failed after a DB error in reindex_dirty")
+        batch.clear()
+        deleted.clear()
+
     for row in dirty:
         elapsed = time.time() - start_time
-        if elapsed >= time_budget:
+        if elapsed >= time_budget or cancel_requested():
             stats["partial"] = True
             break
 
         row_dict = dict(row)
         file_path = row_dict["file_path"]
-        file_id = row_dict["id"]
 
         # Reconstruct absolute path
         abs_path = Path(project_path) / file_path
         if not abs_path.exists():
             # File was deleted — remove from index
-            _delete_file(db, file_id)
-            stats["files_indexed"] += 1
+            deleted.append(row_dict["id"])
             continue
 
         ext = abs_path.suffix
@@ -270,35 +390,24 @@ def reindex_dirty(db: sqlite3.Connection, project: str, project_path: str,
         language = get_language(ext) or row_dict["language"]
 
         try:
+            _stat = abs_path.stat()  # Before reading: a later write leaves the mtime stale, not the hash
             result = parser.parse_file(str(abs_path))
         except Exception as e:
             stats["errors"].append(f"{file_path}: {e}")
             continue
 
-        try:
-            _stat = abs_path.stat()
-            finfo = {
-                "path": str(abs_path),
-                "rel_path": file_path,
-                "extension": ext,
-                "mtime": _stat.st_mtime,
-                "size": _stat.st_size,
-            }
-            # Delete old data and re-store
-            _delete_file_data(db, file_id)
-            _update_file(db, file_id, finfo, language, len(result.symbols))
-            _store_symbols(db, project, file_id, result.symbols)
-            _store_references(db, project, file_id, result.references)
-            db.commit()
-            stats["files_indexed"] += 1
-            stats["symbols"] += len(result.symbols)
-            stats["references"] += len(result.references)
-        except sqlite3.OperationalError as e:
-            stats["errors"].append(f"{file_path}: DB error: {e}")
-            try:
-                db.rollback()
-            except sqlite3.OperationalError:
-                _log.debug("Rollback also failed for %s", file_path)
+        batch.append(({
+            "path": str(abs_path),
+            "rel_path": file_path,
+            "extension": ext,
+            "mtime": _stat.st_mtime,
+            "size": _stat.st_size,
+        }, language, result))
+        if len(batch) + len(deleted) >= STORE_BATCH_FILES:
+            store_batch()
+
+    if batch or deleted:
+        store_batch()
 
     if stats["files_indexed"] > 0:
         try:
@@ -312,133 +421,230 @@ def reindex_dirty(db: sqlite3.Connection, project: str, project_path: str,
 
 def _filter_changed_files(db: sqlite3.Connection, project: str,
                           files: list[dict]) -> list[dict]:
-    """Filter files to only those that changed since last index."""
+    """Filter files to only those whose contents changed since last index.
+
+    Same size and mtime as stored: unchanged, without reading the file. Same
+    size but a new mtime (git checkout, formatter run, copied tree): the file
+    is hashed and compared with the stored content_hash. When they match, only
+    the stored mtime is refreshed, so the next run takes the cheap path again.
+    """
+    from utils import file_content_hash
+
     indexed = {}
     try:
         rows = db.execute("""
-            SELECT file_path, file_mtime FROM code_files WHERE project = ?
+            SELECT file_path, file_mtime, file_size, content_hash FROM code_files WHERE project = ?
         """, (project,)).fetchall()
         for row in rows:
-            indexed[row["file_path"]] = row["file_mtime"]
+            indexed[row["file_path"]] = (row["file_mtime"], row["file_size"], row["content_hash"])
     except sqlite3.OperationalError:
         return files  # Table might not exist yet
 
     changed = []
+    touched = []  # (mtime, project, rel_path) of files with unchanged contents
     for finfo in files:
         rel = finfo["rel_path"]
-        if rel not in indexed or abs(finfo["mtime"] - indexed[rel]) > 0.01:
+        if rel not in indexed:
+            changed.append(finfo)
+            continue
+        mtime, size, digest = indexed[rel]
+        if size != finfo["size"]:
+            changed.append(finfo)
+        elif abs(finfo["mtime"] - mtime) <= 0.01:
+            continue
+        elif digest and file_content_hash(finfo["path"]) == digest:
+            touched.append((finfo["mtime"], project, rel))
+        else:
             changed.append(finfo)
 
-    return changed
-
+    if touched:
+        try:
+            db.executemany("UPDATE code_files SET file_mtime = ? WHERE project = ? AND file_path = ?", touched)
+            db.commit()
+        except sqlite3.OperationalError as e:
+            _log.debug("Could not refresh mtimes of %d unchanged files: %s", len(touched), e)
+            try:
+                db.rollback()
+            except sqlite3.OperationalError:
+                pass
 
-def _store_file(db: sqlite3.Connection, project: str, finfo: dict,
-                language: str, symbol_count: int) -> int:
-    """Insert or update code_files entry. Returns file_id."""
-    now = datetime.now().isoformat()
+    return changed
 
-    # Try to get existing file
-    existing = db.execute("""
-        SELECT id FROM code_files WHERE project = ? AND file_path = ?
-    """, (project, finfo["rel_path"])).fetchone()
 
-    if existing:
-        file_id = existing["id"]
-        # Clear old data for this file
-        _delete_file_data(db, file_id)
-        # Update file record
-        _db_execute_with_retry(db, """
-            UPDATE code_files SET
-                language = ?, file_mtime = ?, file_size = ?,
-                symbol_count = ?, is_dirty = 0, indexed_at = ?
-            WHERE id = ?
-        """, (language, finfo["mtime"], finfo["size"], symbol_count, now, file_id))
-    else:
-        cursor = _db_execute_with_retry(db, """
-            INSERT INTO code_files (project, file_path, language, file_mtime,
-                                    file_size, symbol_count, is_dirty, indexed_at)
-            VALUES (?, ?, ?, ?, ?, ?, 0, ?)
-        """, (project, finfo["rel_path"], language, finfo["mtime"],
-              finfo["size"], symbol_count, now))
-        file_id = cursor.lastrowid
+def _has_files(db: sqlite3.Connection, project: str) -> bool:
+    try:
+        return db.execute("SELECT 1 FROM code_files WHERE project = ? LIMIT 1", (project,)).fetchone() is not None
+    except sqlite3.OperationalError:
+        return False
 
-    return file_id
 
+def _delete_gone_files(db: sqlite3.Connection, project: str, rel_paths: list[str]) -> bool:
+    """Remove files that no longer exist from the index. False if the DB was busy."""
+    try:
+        file_ids = list(_file_ids(db, project, rel_paths).values())
+        if file_ids:
+            _store_batch(db, project, [], file_ids)
+            db.commit()
+            _log.info("Removed %d deleted files from the code index", len(file_ids))
+        return True
+    except sqlite3.OperationalError as e:
+        _log.warning("Could not remove deleted files from the code index: %s", e)
+        try:
+            db.rollback()
+        except sqlite3.OperationalError:
+            pass
+        return False
+
+
+def _file_ids(db: sqlite3.Connection, project: str, paths: list[str]) -> dict[str, int]:
+    """Existing code_files ids by relative path."""
+    found: dict[str, int] = {}
+    for i in range(0, len(paths), _IN_CHUNK):
+        chunk = paths[i:i + _IN_CHUNK]
+        rows = db.execute(f"""
+            SELECT file_path, id FROM code_files
+            WHERE project = ? AND file_path IN ({",".join("?" * len(chunk))})
+        """, (project, *chunk)).fetchall()
+        found.update((row[0], row[1]) for row in rows)
+    return found
+
+
+def _next_symbol_id(db: sqlite3.Connection) -> int:
+    """First code_symbols id never handed out (AUTOINCREMENT semantics)."""
+    row = db.execute("""
+        SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'code_symbols'), 0),
+                   COALESCE((SELECT MAX(id) FROM code_symbols), 0))
+    """).fetchone()
+    return row[0] + 1
+
+
+def _store_batch(db: sqlite3.Connection, project: str, items: list[tuple],
+                 deleted_file_ids: list[int] | None = None) -> None:
+    """Replace the stored data of a batch of parsed files. The caller commits.
+
+    items: (finfo, language, ParseResult) per file. The whole batch costs a
+    handful of statements: symbol ids are allocated up front, so parent_id and
+    from_symbol_id are resolved in memory and rows go in with executemany.
+    Batches of FTS_BULK_MIN_SYMBOLS+ symbols also stand the per-row FTS triggers
+    down for one bulk statement each way (see _begin_bulk_fts).
+    deleted_file_ids: code_files rows to remove with all their data.
+    """
+    deleted_file_ids = deleted_file_ids or []
+    if not db.in_transaction:
+        db.execute("BEGIN")
+    # Children may reference a parent inserted later in the same executemany
+    db.execute("PRAGMA defer_foreign_keys = ON")
+    n_symbols = sum(len(result.symbols) for _, _, result in items)
+    bulk_fts = n_symbols >= FTS_BULK_MIN_SYMBOLS and _begin_bulk_fts(db)
+    try:
+        _store_rows(db, project, items, deleted_file_ids, bulk_fts)
+    finally:
+        if bulk_fts:
+            db.execute("DELETE FROM code_symbols_fts_bulk")
+
+
+def _store_rows(db: sqlite3.Connection, project: str, items: list[tuple],
+                deleted_file_ids: list[int], bulk_fts: bool) -> None:
+    """Body of _store_batch; bulk_fts: sync code_symbols_fts here, not by trigger."""
+    file_ids = _file_ids(db, project, [finfo["rel_path"] for finfo, _, _ in items])
+    old_ids = list(file_ids.values()) + deleted_file_ids
+    if old_ids:
+        _delete_file_data(db, old_ids, sync_fts=bulk_fts)
+    if deleted_file_ids:
+        _db_executemany_with_retry(db, "DELETE FROM code_files WHERE id = ?",
+                                   [(file_id,) for file_id in deleted_file_ids])
 
-def _update_file(db: sqlite3.Connection, file_id: int, finfo: dict,
-                 language: str, symbol_count: int) -> None:
-    """Update existing code_files entry after re-index."""
     now = datetime.now().isoformat()
-    _db_execute_with_retry(db, """
+    _db_executemany_with_retry(db, """
         UPDATE code_files SET
-            language = ?, file_mtime = ?, file_size = ?,
+            language = ?, file_mtime = ?, file_size = ?, content_hash = ?,
             symbol_count = ?, is_dirty = 0, indexed_at = ?
         WHERE id = ?
-    """, (language, finfo["mtime"], finfo["size"], symbol_count, now, file_id))
-
-
-def _store_symbols(db: sqlite3.Connection, project: str, file_id: int,
-                   symbols: list) -> None:
-    """Store symbols in DB. Resolves parent_id references."""
-    # First pass: insert all symbols and collect id mapping
-    id_map: dict[str, int] = {}  # qualified_name → DB id
-
-    for sym in symbols:
-        cursor = _db_execute_with_retry(db, """
-            INSERT INTO code_symbols (project, file_id, name, qualified_name, kind,
-                                      line_start, line_end, signature, docstring, exported)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (project, file_id, sym.name, sym.qualified_name, sym.kind,
-              sym.line_start, sym.line_end, sym.signature, sym.docstring,
-              1 if sym.exported else 0))
-        sym_id = cursor.lastrowid
-        id_map[sym.qualified_name] = sym_id
-
-    # Second pass: set parent_id
-    for sym in symbols:
-        if sym.parent_name and sym.parent_name in id_map:
-            sym_id = id_map.get(sym.qualified_name)
-            parent_id = id_map.get(sym.parent_name)
-            if sym_id and parent_id:
-                _db_execute_with_retry(db, """
-                    UPDATE code_symbols SET parent_id = ? WHERE id = ?
-                """, (parent_id, sym_id))
-
-
-def _store_references(db: sqlite3.Connection, project: str, file_id: int,
-                      references: list) -> None:
-    """Store references in DB."""
-    for ref in references:
-        cursor = _db_execute_with_retry(db, """
-            INSERT INTO code_references (project, file_id, from_symbol_id,
-                                         to_name, kind, line, confidence)
-            VALUES (?, ?, NULL, ?, ?, ?, ?)
-        """, (project, file_id, ref.to_name, ref.kind, ref.line, ref.confidence))
-
-        # Try to set from_symbol_id if we know the source
-        if ref.from_symbol:
-            from_sym = db.execute("""
-                SELECT id FROM code_symbols
-                WHERE project = ? AND qualified_name = ? AND file_id = ?
-            """, (project, ref.from_symbol, file_id)).fetchone()
-            if from_sym:
-                ref_id = cursor.lastrowid
-                db.execute("""
-                    UPDATE code_references SET from_symbol_id = ? WHERE id = ?
-                """, (from_sym["id"], ref_id))
-
-
-def _delete_file_data(db: sqlite3.Connection, file_id: int) -> None:
-    """Delete symbols and references for a file (before re-indexing)."""
-    _db_execute_with_retry(db, "DELETE FROM code_references WHERE file_id = ?", (file_id,))
-    _db_execute_with_retry(db, "DELETE FROM code_symbols WHERE file_id = ?", (file_id,))
-
-
-def _delete_file(db: sqlite3.Connection, file_id: int) -> None:
-    """Delete a file and all its data."""
-    _delete_file_data(db, file_id)
-    _db_execute_with_retry(db, "DELETE FROM code_files WHERE id = ?", (file_id,))
-    try:
-        db.commit()
-    except sqlite3.OperationalError as e:
-        _log.warning("Commit failed in _delete_file for file_id=%d: %s", file_id, e)
+    """, [(language, finfo["mtime"], finfo["size"], result.content_hash, len(result.symbols), now,
+           file_ids[finfo["rel_path"]])
+          for finfo, language, result in items if finfo["rel_path"] in file_ids])
+    for finfo, language, result in items:
+        if finfo["rel_path"] not in file_ids:
+            cursor = _db_execute_with_retry(db, """
+                INSERT INTO code_files (project, file_path, language, file_mtime,
+                                        file_size, content_hash, symbol_count, is_dirty, indexed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, 0, ?)
+            """, (project, finfo["rel_path"], language, finfo["mtime"],
+                  finfo["size"], result.content_hash, len(result.symbols), now))
+            file_ids[finfo["rel_path"]] = cursor.lastrowid
+
+    first_id = next_id = _next_symbol_id(db)
+    symbol_rows, reference_rows = [], []
+    for finfo, _, result in items:
+        file_id = file_ids[finfo["rel_path"]]
+        numbered = list(zip(range(next_id, next_id + len(result.symbols)), result.symbols))
+        next_id += len(result.symbols)
+        # Duplicate qualified names: parents resolve to the last one, reference
+        # sources to the first one (as the old UPDATE pass / SELECT did)
+        last_id = {sym.qualified_name: sym_id for sym_id, sym in numbered}
+        first_id_by_name = {sym.qualified_name: sym_id for sym_id, sym in reversed(numbered)}
+        for sym_id, sym in numbered:
+            symbol_rows.append((sym_id, project, file_id, sym.name, sym.qualified_name, sym.kind,
+                                sym.line_start, sym.line_end,
+                                last_id.get(sym.parent_name) if sym.parent_name else None,
+                                sym.signature, sym.docstring, 1 if sym.exported else 0))
+        for ref in result.references:
+            reference_rows.append((project, file_id,
+                                   first_id_by_name.get(ref.from_symbol) if ref.from_symbol else None,
+                                   ref.to_name, ref.kind, ref.line, ref.confidence))
+
+    _db_executemany_with_retry(db, """
+        INSERT INTO code_symbols (id, project, file_id, name, qualified_name, kind,
+                                  line_start, line_end, parent_id, signature, docstring, exported)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, symbol_rows)
+    _db_executemany_with_retry(db, """
+        INSERT INTO code_references (project, file_id, from_symbol_id,
+                                     to_name, kind, line, confidence)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, reference_rows)
+
+    if bulk_fts:
+        _db_execute_with_retry(db, """
+            INSERT INTO code_symbols_fts(rowid, name, qualified_name, signature, docstring)
+            SELECT id, name, qualified_name, signature, docstring FROM code_symbols
+            WHERE id >= ? AND id < ?
+        """, (first_id, next_id))
+
+
+def _begin_bulk_fts(db: sqlite3.Connection) -> bool:
+    """Stand the code_symbols FTS triggers down for the current transaction.
+
+    Inserts the code_symbols_fts_bulk row their WHEN clause checks; the caller
+    syncs code_symbols_fts itself and deletes the row before committing. Unlike
+    dropping the triggers this is no schema change, so other connections keep
+    their prepared statements. False (triggers stay active) when FTS isn't set
+    up or the triggers predate the gate (init_db.upgrade_code_fts_triggers).
+    """
+    gated = db.execute(f"""
+        SELECT COUNT(*) FROM sqlite_master
+        WHERE type = 'trigger' AND name IN ({",".join("?" * len(_FTS_TRIGGERS))})
+          AND sql LIKE '%code_symbols_fts_bulk%'
+    """, _FTS_TRIGGERS).fetchone()[0]
+    if gated != len(_FTS_TRIGGERS):
+        return False
+    db.execute("INSERT INTO code_symbols_fts_bulk (active) VALUES (1)")
+    return True
+
+
+def _delete_file_data(db: sqlite3.Connection, file_ids: list[int], sync_fts: bool = False) -> None:
+    """Delete symbols and references of files (before re-indexing).
+
+    sync_fts: remove the symbols from code_symbols_fts here (FTS triggers suspended).
+    """
+    for i in range(0, len(file_ids), _IN_CHUNK):
+        chunk = file_ids[i:i + _IN_CHUNK]
+        marks = ",".join("?" * len(chunk))
+        if sync_fts:
+            _db_execute_with_retry(db, f"""
+                INSERT INTO code_symbols_fts(code_symbols_fts, rowid, name, qualified_name, signature, docstring)
+                SELECT 'delete', id, name, qualified_name, signature, docstring FROM code_symbols
+                WHERE file_id IN ({marks})
+            """, chunk)
+        _db_execute_with_retry(db, f"DELETE FROM code_references WHERE file_id IN ({marks})", chunk)
+        _db_execute_with_retry(db, f"DELETE FROM code_symbols WHERE file_id IN ({marks})", chunk)
@@ -0,0 +1,145 @@
+"""Parallel parse stage for the code indexer.
+
+Parsing is CPU-bound (tree-sitter plus the extractors' Python AST walks), so
+threads don't help. parse_files() fans files out over a process pool and yields
+the results in completion order. Workers send back compact tuples instead of
+Symbol/Reference objects, and the caller expands them. The caller stays the single
+writer: its sqlite connection never leaves its thread.
+
+Workers start with the "spawn" method on every platform: forking the MCP server
+would copy its threads' locks mid-flight. Their stdout is redirected to stderr,
+because the server's stdout is the MCP JSON-RPC pipe. Starting a worker costs
+a few hundred ms, so runs under PARALLEL_MIN_FILES files (and single-worker
+setups) parse inline instead. Workers: `code.parse_workers` in config.yaml
+(0 = CPU count - 1, at most DEFAULT_MAX_WORKERS).
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterator
+
+from code.parsers.base import ParseResult, Reference, Symbol
+
+_log = logging.getLogger("cognilayer.code.parse_pool")
+
+DEFAULT_MAX_WORKERS = 8
+PARALLEL_MIN_FILES = 100
+IN_FLIGHT_PER_WORKER = 4  # Queued files per worker; bounds the work dropped when the caller stops
+
+
+def parse_workers() -> int:
+    """Worker processes for a parse run (`code.parse_workers`, 0 = auto)."""
+    try:
+        from utils import get_config_section
+        configured = int(get_config_section("code").get("parse_workers", 0))
+    except Exception:
+        configured = 0
+    if configured > 0:
+        return configured
+    return max(1, min((os.cpu_count() or 1) - 1, DEFAULT_MAX_WORKERS))
+
+
+def _init_worker() -> None:
+    sys.stdout = sys.stderr
+    from code.parsers import base
+    base.TREE_CACHE_FILES = 0  # Workers parse each file once: no use for incremental re-parses
+
+
+def _parse(path: str, extension: str) -> tuple:
+    """Parse one file. Returns ("ok", compact result) or ("error", message)."""
+    from code.parsers.registry import get_parser
+    parser = get_parser(extension)
+    if parser is None:
+        return "ok", None
+    try:
+        result = parser.parse_file(path)
+    except Exception as e:
+        return "error", str(e)
+    return "ok", (
+        result.language,
+        [(s.name, s.qualified_name, s.kind, s.line_start, s.line_end, s.parent_name,
+          s.signature, s.docstring, s.exported) for s in result.symbols],
+        [(r.from_symbol, r.to_name, r.kind, r.line, r.confidence) for r in result.references],
+        result.errors,
+        result.content_hash,
+    )
+
+
+def _expand(path: str, compact: tuple | None) -> ParseResult | None:
+    if compact is None:
+        return None
+    language, symbols, references, errors, digest = compact
+    return ParseResult(file_path=path, language=language,
+                       symbols=[Symbol(*s) for s in symbols],
+                       references=[Reference(*r) for r in references],
+                       errors=errors, content_hash=digest)
+
+
+def parse_files(files: list[dict], workers: int | None = None) -> Iterator[tuple]:
+    """Yield (finfo, ParseResult or None, error or None) for each scanned file.
+
+    The result is None for extensions without a parser. Stop early by breaking
+    out of the loop: queued files are dropped and the pool shuts down.
+    """
+    workers = parse_workers() if workers is None else workers
+    if workers <= 1 or len(files) < PARALLEL_MIN_FILES:
+        yield from _parse_inline(files)
+        return
+
+    import multiprocessing
+    from concurrent.futures import BrokenExecutor
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                               initializer=_init_worker)
+    _log.info("Parsing %d files on %d worker processes", len(files), workers)
+    pending: dict = {}
+    queue = iter(files)
+    inline: list[dict] = []  # Files left over when the pool breaks (parsed here instead)
+
+    def submit(finfo: dict) -> None:
+        if inline:
+            inline.append(finfo)
+            return
+        try:
+            pending[pool.submit(_parse, finfo["path"], finfo["extension"])] = finfo
+        except BrokenExecutor as e:
+            _log.warning("Parse pool broke (%s), parsing the remaining files inline", e)
+            inline.append(finfo)
+
+    try:
+        for finfo in queue:
+            submit(finfo)
+            if len(pending) >= workers * IN_FLIGHT_PER_WORKER:
+                break
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                finfo = pending.pop(future)
+                try:
+                    status, value = future.result()
+                except BrokenExecutor as e:  # A worker died or could not start
+                    if not inline:
+                        _log.warning("Parse pool broke (%s), parsing the remaining files inline", e)
+                    inline.append(finfo)
+                    continue
+                yield (finfo, *_unpack(finfo, status, value))
+                nxt = next(queue, None)
+                if nxt is not None:
+                    submit(nxt)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    yield from _parse_inline(inline + list(queue))
+
+
+def _unpack(finfo: dict, status: str, value) -> tuple:
+    if status == "error":
+        return None, value
+    return _expand(finfo["path"], value), None
+
+
+def _parse_inline(files: list[dict]) -> Iterator[tuple]:
+    for finfo in files:
+        yield (finfo, *_unpack(finfo, *_parse(finfo["path"], finfo["extension"])))
@@ -1,11 +1,24 @@
-"""Base parser ABC and data classes for code intelligence."""
+"""Base parser ABC and data classes for code intelligence.
+
+Parsers keep the syntax trees of recently parsed files (a small LRU per
+parser). When a cached file is parsed again, as reindex_dirty does after an
+edit, the old tree is edited and re-parsed incrementally, and only the
+top-level definitions touching the changed bytes are extracted again. The
+symbols and references of the others are reused, with their lines shifted.
+"""
 
 from __future__ import annotations
 
+import threading
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
 from pathlib import Path
 
+# Syntax trees kept per parser for incremental re-parses (0 disables the cache)
+TREE_CACHE_FILES = 16
+TREE_CACHE_BYTES = 4_000_000  # Source bytes across the cached files
+
 
 @dataclass
 class Symbol:
@@ -39,6 +52,25 @@ class ParseResult:
     symbols: list[Symbol] = field(default_factory=list)
     references: list[Reference] = field(default_factory=list)
     errors: list[str] = field(default_factory=list)
+    content_hash: str | None = None  # utils.content_hash of the parsed bytes
+
+
+@dataclass
+class _Definition:
+    """What one top-level node of a file yielded."""
+    start_byte: int
+    end_byte: int
+    type: str
+    row: int
+    symbols: list[Symbol]
+    references: list[Reference]
+
+
+@dataclass
+class _CachedTree:
+    source: bytes
+    tree: object
+    definitions: list[_Definition]
 
 
 class BaseParser(ABC):
@@ -52,6 +84,9 @@ class BaseParser(ABC):
     def __init__(self):
         self._parser = None
         self._ts_lang = None
+        self._lock = threading.Lock()  # tree-sitter parsers aren't thread-safe
+        self._trees: OrderedDict[str, _CachedTree] = OrderedDict()
+        self._cached_bytes = 0
 
     def _ensure_parser(self):
         """Lazy-init tree-sitter parser."""
@@ -86,6 +121,9 @@ class BaseParser(ABC):
             result.errors.append(f"Cannot read file: {e}")
             return result
 
+        from utils import content_hash
+        result.content_hash = content_hash(source)
+
         # Skip very large files (>500KB)
         if len(source) > 512_000:
             result.errors.append(f"File too large ({len(source)} bytes), skipping")
@@ -93,8 +131,11 @@ class BaseParser(ABC):
 
         try:
             self._ensure_parser()
-            tree = self._parser.parse(source)
-            self._extract(tree.root_node, source, result)
+            with self._lock:
+                definitions = self._parse_definitions(str(file_path), source)
+            for definition in definitions:
+                result.symbols.extend(definition.symbols)
+                result.references.extend(definition.references)
         except ImportError as e:
             result.errors.append(str(e))
         except Exception as e:
@@ -102,15 +143,121 @@ class BaseParser(ABC):
 
         return result
 
+    def _parse_definitions(self, path: str, source: bytes) -> list[_Definition]:
+        """Parse source into per-top-level-node results, reusing the cached tree of path."""
+        cached = self._trees.pop(path, None)
+        if cached is not None:
+            self._cached_bytes -= len(cached.source)
+            if cached.source == source:
+                self._remember(path, cached)
+                return cached.definitions
+
+        tree, reusable, windows = None, {}, []
+        if cached is not None:
+            try:
+                start, old_end, new_end = _edit_span(cached.source, source)
+                cached.tree.edit(start, old_end, new_end, _point(cached.source, start),
+                                 _point(cached.source, old_end), _point(source, new_end))
+                tree = self._parser.parse(source, cached.tree)
+                if tree.root_node.has_error:
+                    tree = None  # Error recovery depends on the old tree: parse from scratch
+                else:
+                    windows = [(start, new_end)] + [(r.start_byte, r.end_byte)
+                                                    for r in cached.tree.changed_ranges(tree)]
+                    reusable = _reusable(cached.definitions, start, old_end, new_end)
+            except Exception:
+                tree, reusable, windows = None, {}, []
+        if tree is None:
+            tree = self._parser.parse(source)
+
+        definitions = []
+        changed_before = False  # Previous node changed (JSDoc is read from the previous sibling)
+        edit_end = windows[0][1] if windows else -1
+        for node in tree.root_node.children:
+            changed = any(node.start_byte <= end and node.end_byte >= begin for begin, end in windows)
+            if not changed and edit_end >= 0 and node.start_byte >= edit_end:
+                changed, edit_end = True, -1  # First node after the edit: its leading comment may be gone
+            old = None if changed or changed_before else reusable.get((node.start_byte, node.end_byte, node.type))
+            changed_before = changed
+            if old is not None:
+                definitions.append(_shifted(old, node))
+                continue
+            part = ParseResult(file_path=path, language=self.language)
+            self._extract(node, source, part)
+            definitions.append(_Definition(node.start_byte, node.end_byte, node.type, node.start_point[0],
+                                           part.symbols, part.references))
+
+        self._remember(path, _CachedTree(source, tree, definitions))
+        return definitions
+
+    def _remember(self, path: str, entry: _CachedTree) -> None:
+        if TREE_CACHE_FILES <= 0 or len(entry.source) > TREE_CACHE_BYTES:
+            return
+        self._trees[path] = entry
+        self._cached_bytes += len(entry.source)
+        while len(self._trees) > TREE_CACHE_FILES or self._cached_bytes > TREE_CACHE_BYTES:
+            _, evicted = self._trees.popitem(last=False)
+            self._cached_bytes -= len(evicted.source)
+
     @abstractmethod
     def _extract(self, root_node, source: bytes, result: ParseResult) -> None:
         """Extract symbols and references from tree-sitter AST.
 
         Subclasses implement this to walk the AST and populate result.symbols
-        and result.references.
+        and result.references. It is called once per top-level node (a child
+        of the root), so extraction must not rely on getting the root itself.
         """
         ...
 
     def _node_text(self, node, source: bytes) -> str:
         """Get text content of a tree-sitter node."""
         return source[node.start_byte:node.end_byte].decode("utf-8", errors="replace")
+
+
+def _edit_span(old: bytes, new: bytes) -> tuple[int, int, int]:
+    """(start, old_end, new_end) of the single byte range in which old and new differ."""
+    limit = min(len(old), len(new))
+    lo, hi = 0, limit  # Longest common prefix (binary search over slice compares)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if old[:mid] == new[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    start = lo
+    lo, hi = 0, limit - start  # Longest common suffix not overlapping the prefix
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if old[len(old) - mid:] == new[len(new) - mid:]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return start, len(old) - lo, len(new) - lo
+
+
+def _point(source: bytes, offset: int) -> tuple[int, int]:
+    """tree-sitter (row, column) of a byte offset."""
+    return source.count(b"\n", 0, offset), offset - (source.rfind(b"\n", 0, offset) + 1)
+
+
+def _reusable(definitions: list[_Definition], start: int, old_end: int,
+              new_end: int) -> dict[tuple, _Definition]:
+    """Old definitions outside the edit, keyed by (start, end, type) in the new source."""
+    delta = new_end - old_end
+    reusable = {}
+    for d in definitions:
+        if d.end_byte < start:
+            reusable[(d.start_byte, d.end_byte, d.type)] = d
+        elif d.start_byte > old_end:
+            reusable[(d.start_byte + delta, d.end_byte + delta, d.type)] = d
+    return reusable
+
+
+def _shifted(d: _Definition, node) -> _Definition:
+    """An old definition moved to node's position (lines shift when lines were added or removed above)."""
+    shift = node.start_point[0] - d.row
+    symbols, references = d.symbols, d.references
+    if shift:
+        symbols = [replace(s, line_start=s.line_start + shift, line_end=s.line_end + shift) for s in symbols]
+        references = [replace(r, line=r.line + shift) for r in references]
+    return _Definition(node.start_byte, node.end_byte, node.type, node.start_point[0], symbols, references)
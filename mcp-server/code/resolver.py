@@ -40,19 +40,23 @@ def resolve_references(db: sqlite3.Connection, project: str,
     # Index by name and qualified_name
     by_name: dict[str, list[dict]] = {}
     by_qname: dict[str, dict] = {}
+    by_name_file: dict[tuple[str, int], dict] = {}  # First symbol of a name per file
     for sym in symbols:
         s = dict(sym)
         name = s["name"]
         qname = s["qualified_name"]
         by_name.setdefault(name, []).append(s)
         by_qname[qname] = s
+        by_name_file.setdefault((name, s["file_id"]), s)
+
+    updates: list[tuple] = []  # (to_symbol_id, confidence, reference id)
 
     start = time.monotonic()
 
     for ref in unresolved:
         if time.monotonic() - start > time_budget:
             _log.info("Resolver time budget exhausted (%ss), resolved %d/%d",
-                      time_budget, resolved, len(unresolved))
+                      time_budget, len(updates), len(unresolved))
             break
 
         ref_dict = dict(ref)
@@ -74,9 +78,9 @@ def resolve_references(db: sqlite3.Connection, project: str,
             if short_name in by_name:
                 candidates = by_name[short_name]
                 # Prefer symbol in same file
-                same_file = [c for c in candidates if c["file_id"] == ref_dict["file_id"]]
+                same_file = by_name_file.get((short_name, ref_dict["file_id"]))
                 if same_file:
-                    match = same_file[0]
+                    match = same_file
                     confidence = 0.85
                 elif len(candidates) == 1:
                     match = candidates[0]
@@ -90,9 +94,9 @@ def resolve_references(db: sqlite3.Connection, project: str,
         if not match and to_name in by_name:
             candidates = by_name[to_name]
             # Prefer symbol in same file
-            same_file = [c for c in candidates if c["file_id"] == ref_dict["file_id"]]
+            same_file = by_name_file.get((to_name, ref_dict["file_id"]))
             if same_file:
-                match = same_file[0]
+                match = same_file
                 confidence = 0.85
             elif len(candidates) == 1:
                 match = candidates[0]
@@ -102,20 +106,22 @@ def resolve_references(db: sqlite3.Connection, project: str,
                 confidence = 0.7
 
         if match:
-            try:
-                db.execute("""
-                    UPDATE code_references SET to_symbol_id = ?, confidence = ?
-                    WHERE id = ?
-                """, (match["id"], confidence, ref_dict["id"]))
-                resolved += 1
-            except sqlite3.OperationalError:
-                pass  # Skip on lock
+            updates.append((match["id"], confidence, ref_dict["id"]))
 
-    if resolved:
+    if updates:
         try:
+            db.executemany("""
+                UPDATE code_references SET to_symbol_id = ?, confidence = ?
+                WHERE id = ?
+            """, updates)
             db.commit()
+            resolved = len(updates)
         except sqlite3.OperationalError:
             _log.warning("Failed to commit reference resolution")
+            try:
+                db.rollback()
+            except sqlite3.OperationalError:
+                pass
 
     return resolved
 
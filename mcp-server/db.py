@@ -1,8 +1,26 @@
-"""Shared DB helper for CogniLayer. Used by MCP server, hooks, and scripts."""
+"""Shared DB helper for CogniLayer. Used by MCP server, hooks, and scripts.
 
+Hooks and scripts open a connection per call (open_db / open_db_fast). The MCP
+server calls enable_pool() at startup and tools borrow long-lived connections
+instead (borrow_db / release_db): one writer shared by all write tools and the
+write-behind flusher, plus a few query_only readers. Pooled connections keep a
+larger prepared-statement cache, mmap/cache_size tuning and sqlite-vec loaded
+once. Without a pool (or when DB_PATH changed since enable_pool) borrow_db falls
+back to open_db and release_db closes the connection.
+"""
+
+import logging
+import os
+import queue
 import sqlite3
+import threading
 from pathlib import Path
 
+import sys
+sys.path.insert(0, str(Path(__file__).parent))
+import metrics
+import tracing
+
 COGNILAYER_HOME = Path.home() / ".cognilayer"
 DB_PATH = COGNILAYER_HOME / "memory.db"
 
@@ -50,17 +68,6 @@ def open_db(with_vec: bool = False) -> sqlite3.Connection:
     return db
 
 
-def _trace_db(msg):
-    """Unbuffered trace to file for debugging."""
-    from datetime import datetime
-    try:
-        trace_file = COGNILAYER_HOME / "logs" / "trace.log"
-        with open(trace_file, "a", encoding="utf-8") as f:
-            f.write(f"{datetime.now().isoformat()} [db] {msg}\n")
-    except Exception:
-        pass
-
-
 def ensure_vec(db: sqlite3.Connection) -> bool:
     """Ensure sqlite-vec is loaded on this connection. Returns True if available.
 
@@ -69,25 +76,18 @@ def ensure_vec(db: sqlite3.Connection) -> bool:
     """
     global _vec_system_available
 
-    _trace_db(f"ensure_vec: _vec_system_available={_vec_system_available}")
-
     # Fast path: already know it's not available on this system
     if _vec_system_available is False:
-        _trace_db("ensure_vec: fast path False")
         return False
 
     # Check if already loaded on this connection
-    _trace_db("ensure_vec: trying SELECT vec_version()")
     try:
         db.execute("SELECT vec_version()")
         _vec_system_available = True
-        _trace_db("ensure_vec: vec already loaded, True")
         return True
-    except Exception as e:
-        _trace_db(f"ensure_vec: vec_version failed: {e}")
+    except Exception:
+        pass
 
-    # Try loading
-    _trace_db("ensure_vec: calling _load_sqlite_vec")
     return _load_sqlite_vec(db)
 
 
@@ -95,34 +95,235 @@ def _load_sqlite_vec(db: sqlite3.Connection) -> bool:
     """Load sqlite-vec extension if available. Returns True on success."""
     global _vec_system_available
 
-    _trace_db("_load_sqlite_vec: attempting load")
-    try:
-        # Load vec0 extension directly by path instead of `import sqlite_vec`
-        # which can hang in MCP server context on Windows (numpy import in
-        # sqlite_vec.__init__.py blocks when stdin/stdout are MCP pipes).
-        vec_dir = Path(__file__).parent.parent
-        # Check common install locations for vec0.dll
-        import importlib.util
-        spec = importlib.util.find_spec("sqlite_vec")
-        if spec is None:
+    with tracing.span("db.load_vec") as sp:
+        try:
+            # Load vec0 extension directly by path instead of `import sqlite_vec`
+            # which can hang in MCP server context on Windows (numpy import in
+            # sqlite_vec.__init__.py blocks when stdin/stdout are MCP pipes).
+            import importlib.util
+            spec = importlib.util.find_spec("sqlite_vec")
+            if spec is None:
+                _vec_system_available = False
+                sp.set(result="not installed")
+                return False
+
+            # Load the DLL directly without importing the Python wrapper
+            vec0_path = Path(spec.origin).parent / "vec0"
+            db.enable_load_extension(True)
+            db.load_extension(str(vec0_path))
+            db.enable_load_extension(False)
+            _vec_system_available = True
+            sp.set(result="ok", path=str(vec0_path))
+            return True
+        except ImportError:
             _vec_system_available = False
-            _trace_db("_load_sqlite_vec: find_spec=None, not installed")
+            sp.set(result="not installed")
+            return False
+        except Exception as e:
+            _vec_system_available = False
+            sp.set(result="error", error=str(e))
             return False
 
-        # Load the DLL directly without importing the Python wrapper
-        vec0_path = Path(spec.origin).parent / "vec0"
-        _trace_db(f"_load_sqlite_vec: loading extension from {vec0_path}")
-        db.enable_load_extension(True)
-        db.load_extension(str(vec0_path))
-        db.enable_load_extension(False)
-        _vec_system_available = True
-        _trace_db("_load_sqlite_vec: loaded OK via direct path")
+
+# --- Connection pool (MCP server) ---
+
+DEFAULT_READERS = 3
+CACHED_STATEMENTS = 256  # sqlite3 default is 128
+MMAP_SIZE = 256 * 1024 * 1024
+CACHE_SIZE_KIB = 32 * 1024
+READER_WAIT = 1.0  # Seconds to wait for a free reader before opening an overflow connection
+
+_pool_log = logging.getLogger("cognilayer.db.pool")
+
+
+class _Pool:
+    def __init__(self, path: Path, readers: int):
+        self.path = path
+        self.inode = _inode(path)
+        self.writer_lock = threading.RLock()
+        self.writer_depth = 0
+        self.writer = _open_pooled(path, read_only=False)
+        self.reader_ids: set[int] = set()
+        self.readers: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(readers):
+            conn = _open_pooled(path, read_only=True)
+            self.reader_ids.add(id(conn))
+            self.readers.put(conn)
+
+
+_pool: _Pool | None = None
+_pool_lock = threading.Lock()
+
+
+def _inode(path: Path) -> int | None:
+    try:
+        return os.stat(path).st_ino
+    except OSError:
+        return None
+
+
+def _open_pooled(path: Path, read_only: bool) -> sqlite3.Connection:
+    """Long-lived connection: same PRAGMAs as open_db plus cache tuning and vec."""
+    db = sqlite3.connect(str(path), check_same_thread=False, cached_statements=CACHED_STATEMENTS)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.execute("PRAGMA busy_timeout=30000")
+    db.execute("PRAGMA wal_autocheckpoint=1000")
+    db.execute("PRAGMA foreign_keys=ON")
+    db.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+    db.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KIB}")
+    if read_only:
+        db.execute("PRAGMA query_only=ON")
+    db.row_factory = sqlite3.Row
+    if _vec_system_available is not False:
+        _load_sqlite_vec(db)
+    if metrics.enabled():
+        db.set_trace_callback(metrics.count_sql)  # SQL count of the current tool call
+    return db
+
+
+def _healthy(db: sqlite3.Connection) -> bool:
+    try:
+        db.execute("SELECT 1").fetchone()
         return True
-    except ImportError:
-        _vec_system_available = False
-        _trace_db("_load_sqlite_vec: ImportError, not installed")
-        return False
-    except Exception as e:
-        _vec_system_available = False
-        _trace_db(f"_load_sqlite_vec: error: {e}")
+    except sqlite3.Error:
         return False
+
+
+def _reset(db: sqlite3.Connection) -> None:
+    """Roll back a transaction a borrower left open, so it can't hold the lock."""
+    if db.in_transaction:
+        _pool_log.warning("Pooled connection returned inside a transaction, rolling back")
+        try:
+            db.rollback()
+        except sqlite3.Error:
+            pass
+
+
+def _close_quietly(db: sqlite3.Connection) -> None:
+    try:
+        db.close()
+    except sqlite3.Error:
+        pass
+
+
+def enable_pool(readers: int = DEFAULT_READERS) -> None:
+    """Open the per-process writer + reader connections for the current DB_PATH."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool.path == DB_PATH:
+            return
+        old, _pool = _pool, _Pool(DB_PATH, max(readers, 0))
+    if old is not None:
+        _close_pool(old)
+    _pool_log.info("Connection pool ready: 1 writer + %d readers on %s", readers, DB_PATH)
+
+
+def close_pool() -> None:
+    """Close all pooled connections; later borrows open per-call connections."""
+    global _pool
+    with _pool_lock:
+        old, _pool = _pool, None
+    if old is not None:
+        _close_pool(old)
+
+
+def _close_pool(pool: _Pool) -> None:
+    with pool.writer_lock:
+        _close_quietly(pool.writer)
+    while True:
+        try:
+            _close_quietly(pool.readers.get_nowait())
+        except queue.Empty:
+            break
+
+
+def pool_enabled() -> bool:
+    """Whether borrow_db hands out pooled connections (False in hooks, scripts, tests)."""
+    return _pool is not None and _pool.path == DB_PATH
+
+
+def _check_pool(pool: _Pool) -> None:
+    """Reopen everything if the database file was replaced (restore, re-init)."""
+    inode = _inode(pool.path)
+    if inode == pool.inode:
+        return
+    _pool_log.warning("Database file changed on disk, reopening pooled connections")
+    pool.inode = inode
+    _close_quietly(pool.writer)
+    pool.writer = _open_pooled(pool.path, read_only=False)
+    drained = []
+    while True:
+        try:
+            drained.append(pool.readers.get_nowait())
+        except queue.Empty:
+            break
+    for conn in drained:
+        pool.reader_ids.discard(id(conn))
+        _close_quietly(conn)
+        fresh = _open_pooled(pool.path, read_only=True)
+        pool.reader_ids.add(id(fresh))
+        pool.readers.put(fresh)
+
+
+def borrow_db(write: bool = False, with_vec: bool = False) -> sqlite3.Connection:
+    """Borrow a connection for one tool call. Always pair with release_db().
+
+    write=True returns the shared writer; nested borrows on the same thread get
+    the same connection. Readers are query_only. Pooled connections already
+    have sqlite-vec loaded, so with_vec only matters for per-call connections.
+    """
+    pool = _pool
+    if pool is None or pool.path != DB_PATH:
+        return open_db(with_vec=with_vec)
+
+    if write:
+        if not pool.writer_lock.acquire(blocking=False):
+            with metrics.timed("lock_ms"):
+                pool.writer_lock.acquire()
+        try:
+            if pool.writer_depth == 0:
+                _check_pool(pool)
+                if not _healthy(pool.writer):
+                    _pool_log.warning("Writer connection unhealthy, reopening")
+                    _close_quietly(pool.writer)
+                    pool.writer = _open_pooled(pool.path, read_only=False)
+            pool.writer_depth += 1
+            return pool.writer
+        except BaseException:
+            pool.writer_lock.release()
+            raise
+
+    try:
+        try:
+            conn = pool.readers.get_nowait()
+        except queue.Empty:
+            with metrics.timed("lock_ms"):
+                conn = pool.readers.get(timeout=READER_WAIT)
+    except queue.Empty:
+        _pool_log.info("All pooled readers busy, opening an overflow connection")
+        return _open_pooled(pool.path, read_only=True)
+    if not _healthy(conn):
+        _pool_log.warning("Reader connection unhealthy, reopening")
+        pool.reader_ids.discard(id(conn))
+        _close_quietly(conn)
+        conn = _open_pooled(pool.path, read_only=True)
+        pool.reader_ids.add(id(conn))
+    return conn
+
+
+def release_db(db: sqlite3.Connection | None) -> None:
+    """Return a borrowed connection to the pool (or close a per-call one)."""
+    if db is None:
+        return
+    pool = _pool
+    if pool is not None and db is pool.writer:
+        pool.writer_depth -= 1
+        if pool.writer_depth == 0:
+            _reset(db)
+        pool.writer_lock.release()
+    elif pool is not None and id(db) in pool.reader_ids:
+        _reset(db)
+        pool.readers.put(db)
+    else:
+        _close_quietly(db)
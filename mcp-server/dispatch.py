@@ -0,0 +1,137 @@
+"""CogniLayer tool dispatcher — runs synchronous tool handlers off the asyncio loop.
+
+The MCP session handles each request in its own task, but the tools are plain
+blocking functions (code_index can take its full 30s budget). Running them inside
+call_tool stalled the stdio loop: no progress, no cancellation, no concurrent
+requests. run() hands each call to an executor instead:
+
+- read tools (READ_TOOLS, session_bridge load) run in parallel on a thread pool
+  sized like the db connection pool's readers
+- everything else is serialised on one writer thread, matching the single
+  pooled writer connection
+- each call has a timeout (TOOL_TIMEOUTS, `server.tool_timeout_seconds`;
+  indexers get their time_budget plus a margin)
+
+Threads cannot be killed, so cancellation is cooperative: on timeout or MCP
+cancellation a queued call is dropped, and a running one sees
+cancel_requested() turn True. The indexers check it next to their time budget
+and stop with partial (resumable) progress, like an exhausted budget.
+"""
+
+import asyncio
+import contextvars
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+_log = logging.getLogger("cognilayer.dispatch")
+
+READ_TOOLS = frozenset({
+    "memory_search", "file_search", "decision_log", "verify_identity", "recommend_tech",
+    "trace_dump",
+})
+DEFAULT_TIMEOUT = 60.0
+TOOL_TIMEOUTS = {
+    "memory_search": 30.0,
+    "file_search": 30.0,
+    "session_init": 120.0,
+}
+BUDGET_TOOLS = {"file_index", "code_index"}  # Timeout = time_budget + BUDGET_MARGIN
+BUDGET_MARGIN = 30.0
+
+
+class ToolTimeout(Exception):
+    """A tool call exceeded its timeout (it is asked to stop at its next checkpoint)."""
+
+
+_cancel_event: contextvars.ContextVar[threading.Event | None] = \
+    contextvars.ContextVar("cognilayer_cancel", default=None)
+
+_executors_lock = threading.Lock()
+_read_executor: ThreadPoolExecutor | None = None
+_write_executor: ThreadPoolExecutor | None = None
+
+
+def cancel_requested() -> bool:
+    """True when the current tool call timed out or was cancelled by the client."""
+    event = _cancel_event.get()
+    return event is not None and event.is_set()
+
+
+def is_read(name: str, arguments: dict) -> bool:
+    """Whether a call only reads (may run in parallel with other calls)."""
+    if name == "session_bridge":
+        return arguments.get("action") == "load"
+    return name in READ_TOOLS
+
+
+def tool_timeout(name: str, arguments: dict) -> float:
+    """Seconds a call may run before it is asked to stop."""
+    if name in BUDGET_TOOLS:
+        try:
+            return float(arguments.get("time_budget", 30.0)) + BUDGET_MARGIN
+        except (TypeError, ValueError):
+            pass
+    if name in TOOL_TIMEOUTS:
+        return TOOL_TIMEOUTS[name]
+    try:
+        from utils import get_config_section
+        return float(get_config_section("server").get("tool_timeout_seconds", DEFAULT_TIMEOUT))
+    except Exception:
+        return DEFAULT_TIMEOUT
+
+
+def _read_workers() -> int:
+    try:
+        from db import DEFAULT_READERS
+        from utils import get_config_section
+        return max(int(get_config_section("database").get("pool_readers", DEFAULT_READERS)), 1)
+    except Exception:
+        return 3
+
+
+def _executor(read: bool) -> ThreadPoolExecutor:
+    global _read_executor, _write_executor
+    with _executors_lock:
+        if read:
+            if _read_executor is None:
+                _read_executor = ThreadPoolExecutor(_read_workers(), thread_name_prefix="tool-read")
+            return _read_executor
+        if _write_executor is None:
+            _write_executor = ThreadPoolExecutor(1, thread_name_prefix="tool-write")
+        return _write_executor
+
+
+async def run(name: str, arguments: dict, fn: Callable[[], str]) -> str:
+    """Run fn() for tool `name` on the read pool or the writer thread.
+
+    Raises ToolTimeout when the timeout expires; re-raises CancelledError when
+    the request is cancelled. Either way the call is told to stop.
+    """
+    event = threading.Event()
+    ctx = contextvars.copy_context()
+    ctx.run(_cancel_event.set, event)
+    future = _executor(is_read(name, arguments)).submit(ctx.run, fn)
+    timeout = tool_timeout(name, arguments)
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+    except asyncio.TimeoutError:
+        event.set()
+        _log.warning("Tool %s timed out after %.0fs, asked to stop", name, timeout)
+        raise ToolTimeout(timeout) from None
+    except asyncio.CancelledError:
+        event.set()
+        future.cancel()
+        _log.info("Tool %s cancelled by client", name)
+        raise
+
+
+def shutdown() -> None:
+    """Drop queued calls and release the executors (running calls are asked to stop by timeout)."""
+    global _read_executor, _write_executor
+    with _executors_lock:
+        executors = [e for e in (_read_executor, _write_executor) if e is not None]
+        _read_executor = _write_executor = None
+    for executor in executors:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,370 @@
+"""CogniLayer embedding daemon — one shared ONNX model for all MCP server instances.
+
+Every agent window starts its own server.py; without the daemon each one loads
+fastembed/ONNX (~50MB plus runtime threads). With `embedding.daemon: true` the
+embedder sends texts to this process over a Unix socket instead
+(~/.cognilayer/embedd.sock). The daemon is started in the background by the first
+client that finds no socket (that client, and any until the daemon listens, embed
+in-process), loads the configured model before it starts listening,
+collects requests arriving within BATCH_WINDOW from all connected servers into
+one inference call per model, and exits after `embedding.daemon_idle_minutes`
+without requests. Before exiting it removes the socket and stops accepting, then
+finishes the connections it already accepted.
+
+Protocol (both directions): 4-byte big-endian length + JSON header. Requests
+are {"texts": [...], "spec": {...}}; responses are {"ok": true, "sizes": [...]}
+followed by the concatenated float32 blobs, or {"ok": false, "error": "..."}.
+
+Clients never fail or wait because of the daemon: request_embeddings() returns
+None when it is unavailable (no AF_UNIX, still starting, exiting, broken
+connection) and the embedder falls back to in-process embedding. A daemon that
+does not come up within START_TIMEOUT, times out or reports an error is not
+retried for RETRY_SECONDS.
+
+Run directly: python embed_daemon.py
+"""
+
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import struct
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+COGNILAYER_HOME = Path.home() / ".cognilayer"
+SOCKET_PATH = COGNILAYER_HOME / "embedd.sock"
+LOCK_PATH = COGNILAYER_HOME / "embedd.lock"
+
+BATCH_WINDOW = 0.005  # Seconds to wait for requests from other servers
+MAX_BATCH_TEXTS = 256
+START_TIMEOUT = 30.0  # A spawned daemon has this long to load its model and listen
+REQUEST_TIMEOUT = 30.0
+RETRY_SECONDS = 60.0
+DEFAULT_IDLE_MINUTES = 10
+
+_log = logging.getLogger("cognilayer.embed_daemon")
+_HEADER = struct.Struct(">I")
+
+_unavailable_until = 0.0
+_starting_until = 0.0  # Set while a daemon we spawned is starting (no second spawn)
+
+
+# --- Wire format ---
+
+def _recv_exact(sock: socket.socket, n: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < n:
+        part = sock.recv(n - len(buf))
+        if not part:
+            raise ConnectionError("connection closed")
+        buf.extend(part)
+    return bytes(buf)
+
+
+def _send_msg(sock: socket.socket, header: dict, payload: bytes = b"") -> None:
+    data = json.dumps(header).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(data)) + data + payload)
+
+
+def _recv_header(sock: socket.socket) -> dict:
+    (length,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    return json.loads(_recv_exact(sock, length).decode("utf-8"))
+
+
+# --- Client ---
+
+def is_supported() -> bool:
+    """Unix sockets and fcntl (the daemon's lock) are required; Windows has no fcntl."""
+    if not hasattr(socket, "AF_UNIX"):
+        return False
+    try:
+        import fcntl  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _connect(timeout: float) -> socket.socket | None:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(str(SOCKET_PATH))
+        return sock
+    except OSError:
+        sock.close()
+        return None
+
+
+def _spawn() -> None:
+    """Start a detached daemon; it exits at once if another one holds the lock."""
+    subprocess.Popen(
+        [sys.executable, str(Path(__file__).resolve())],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True, close_fds=True,
+    )
+
+
+def _connect_or_start(wait: float = 0.0) -> socket.socket | None:
+    """Connect to the daemon, or start one in the background.
+
+    Returns None at once unless wait > 0 (server startup, before stdio is served):
+    then it waits up to that long for the starting daemon to listen.
+    """
+    global _starting_until, _unavailable_until
+    sock = _connect(REQUEST_TIMEOUT)
+    if sock is not None:
+        _starting_until = 0.0
+        return sock
+    now = time.time()
+    if not _starting_until:
+        try:
+            _spawn()
+        except OSError as e:
+            _log.warning("Could not start the embedding daemon: %s", e)
+            _unavailable_until = now + RETRY_SECONDS
+            return None
+        _starting_until = now + START_TIMEOUT
+    elif now >= _starting_until:
+        _starting_until = 0.0
+        _unavailable_until = now + RETRY_SECONDS  # The spawned daemon never came up
+        return None
+    deadline = now + wait
+    while time.time() < min(deadline, _starting_until):
+        time.sleep(0.1)
+        sock = _connect(REQUEST_TIMEOUT)
+        if sock is not None:
+            _starting_until = 0.0
+            return sock
+    return None
+
+
+def request_embeddings(texts: list[str], spec: dict, wait: float = 0.0) -> list[bytes] | None:
+    """Embed texts in the daemon (starting it if needed). None = use in-process.
+
+    wait: seconds to wait for a daemon that is still starting (default: don't).
+    """
+    global _unavailable_until
+    if not is_supported() or time.time() < _unavailable_until:
+        return None
+    sock = _connect_or_start(wait)
+    if sock is None:
+        return None
+    try:
+        with sock:
+            _send_msg(sock, {"texts": texts, "spec": spec})
+            header = _recv_header(sock)
+            if not header.get("ok"):
+                raise RuntimeError(header.get("error", "daemon error"))
+            sizes = header["sizes"]
+            payload = _recv_exact(sock, sum(sizes))
+    except ConnectionError as e:
+        # Daemon exiting (idle) or gone: the next call connects again or starts a new one
+        _log.info("Embedding daemon closed the connection, embedding in-process: %s", e)
+        return None
+    except Exception as e:
+        _log.warning("Embedding daemon request failed, embedding in-process: %s", e)
+        _unavailable_until = time.time() + RETRY_SECONDS
+        return None
+    blobs, offset = [], 0
+    for size in sizes:
+        blobs.append(payload[offset:offset + size])
+        offset += size
+    return blobs
+
+
+# --- Daemon ---
+
+class _Request:
+    __slots__ = ("texts", "spec", "done", "blobs", "error")
+
+    def __init__(self, texts: list[str], spec: dict):
+        self.texts = texts
+        self.spec = spec
+        self.done = threading.Event()
+        self.blobs = None
+        self.error = None
+
+
+_requests: "queue.Queue[_Request]" = queue.Queue()
+_last_request = time.time()
+_active = 0  # Connections being handled
+_active_lock = threading.Lock()
+
+
+def _next_batch() -> list[_Request]:
+    """Block for one request, then gather whatever else arrives within BATCH_WINDOW."""
+    batch = [_requests.get()]
+    n_texts = len(batch[0].texts)
+    deadline = time.time() + BATCH_WINDOW
+    while n_texts < MAX_BATCH_TEXTS:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            break
+        try:
+            req = _requests.get(timeout=remaining)
+        except queue.Empty:
+            break
+        batch.append(req)
+        n_texts += len(req.texts)
+    return batch
+
+
+def _run_batch(batch: list[_Request]) -> None:
+    """One inference call per model name over all texts of the batch."""
+    import embedder
+    by_model: dict[str, list[_Request]] = {}
+    for req in batch:
+        by_model.setdefault(req.spec["name"], []).append(req)
+    for name, reqs in by_model.items():
+        try:
+            texts = [t for req in reqs for t in req.texts]
+            model = embedder._get_model(name)
+            vectors = list(model.embed(texts, batch_size=embedder.embedding_batch_size()))
+            offset = 0
+            for req in reqs:
+                rows = vectors[offset:offset + len(req.texts)]
+                offset += len(req.texts)
+                req.blobs = embedder.vectors_to_blobs(rows, req.spec.get("truncate"))
+        except Exception as e:
+            for req in reqs:
+                req.error = str(e)
+        for req in reqs:
+            req.done.set()
+
+
+def _inference_loop() -> None:
+    while True:
+        _run_batch(_next_batch())
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        global _active
+        with _active_lock:
+            _active += 1
+        try:
+            self._handle()
+        finally:
+            with _active_lock:
+                _active -= 1
+
+    def _handle(self):
+        global _last_request
+        _last_request = time.time()
+        try:
+            msg = _recv_header(self.request)
+            req = _Request(list(msg["texts"]), dict(msg["spec"]))
+        except Exception as e:
+            _send_msg(self.request, {"ok": False, "error": f"bad request: {e}"})
+            return
+        if req.texts:
+            _requests.put(req)
+            req.done.wait()
+        else:
+            req.blobs = []
+        if req.error is not None:
+            _send_msg(self.request, {"ok": False, "error": req.error})
+        else:
+            _send_msg(self.request, {"ok": True, "sizes": [len(b) for b in req.blobs]},
+                      b"".join(req.blobs))
+        _last_request = time.time()
+
+
+def _idle_seconds() -> float:
+    try:
+        from utils import get_config_section
+        minutes = float(get_config_section("embedding").get("daemon_idle_minutes", DEFAULT_IDLE_MINUTES))
+    except Exception:
+        minutes = DEFAULT_IDLE_MINUTES
+    return max(minutes, 0.5) * 60
+
+
+def _lock_daemon(lock) -> bool:
+    """Take the daemon lock. A holder without a socket is starting or exiting: wait for it."""
+    import fcntl
+    deadline = time.time() + START_TIMEOUT
+    while True:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            if SOCKET_PATH.exists() or time.time() >= deadline:
+                return False  # Another daemon owns the socket
+            time.sleep(0.1)
+
+
+def _warm_model() -> None:
+    """Load the configured model before listening, so no client waits for it."""
+    try:
+        import embedder
+        embedder._get_model(embedder.model_spec()["name"])
+    except Exception as e:
+        _log.warning("Could not preload the embedding model: %s", e)
+
+
+def _busy() -> bool:
+    with _active_lock:
+        return _active > 0 or not _requests.empty()
+
+
+def serve() -> None:
+    """Run the daemon until idle. Exits at once if another daemon is running."""
+    COGNILAYER_HOME.mkdir(parents=True, exist_ok=True)
+    lock = open(LOCK_PATH, "w")
+    if not _lock_daemon(lock):
+        lock.close()
+        return
+    _warm_model()
+    try:
+        SOCKET_PATH.unlink()  # Stale socket of a crashed daemon
+    except FileNotFoundError:
+        pass
+
+    old_umask = os.umask(0o177)  # Socket is created 0600, never briefly world-accessible
+    try:
+        server = socketserver.ThreadingUnixStreamServer(str(SOCKET_PATH), _Handler)
+    finally:
+        os.umask(old_umask)
+    server.daemon_threads = True
+    threading.Thread(target=_inference_loop, name="embed-inference", daemon=True).start()
+    threading.Thread(target=server.serve_forever, name="embed-server", daemon=True).start()
+    _log.info("Embedding daemon listening on %s", SOCKET_PATH)
+
+    idle = _idle_seconds()
+    try:
+        while time.time() - _last_request < idle or _busy():
+            time.sleep(1.0)
+    finally:
+        # Stop listening first: new clients no longer find the socket (they embed
+        # in-process or start a fresh daemon, which waits for our lock)
+        try:
+            SOCKET_PATH.unlink()
+        except FileNotFoundError:
+            pass
+        server.shutdown()
+        server.server_close()
+        deadline = time.time() + REQUEST_TIMEOUT
+        while _busy() and time.time() < deadline:  # Connections accepted before the close
+            time.sleep(0.05)
+        lock.close()
+    _log.info("Embedding daemon idle for %.0fs, exiting", idle)
+
+
+if __name__ == "__main__":
+    log_dir = COGNILAYER_HOME / "logs"
+    log_dir.mkdir(parents=True, exist_ok=True)
+    logging.basicConfig(
+        filename=str(log_dir / "cognilayer.log"),
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] [embed_daemon] %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+    serve()
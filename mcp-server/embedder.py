@@ -1,15 +1,33 @@
 """CogniLayer embedder — generates vector embeddings using fastembed.
 
-Lazy-loads the model on first use. Caches the singleton instance.
-Uses BAAI/bge-small-en-v1.5 (384 dimensions, ~50MB, CPU-only via ONNX).
+Lazy-loads models on first use and caches one instance per model name.
+Default: BAAI/bge-small-en-v1.5 (384 dimensions, ~50MB, CPU-only via ONNX).
+
+Other models come from the registry in config.yaml (`embedding.models`, selected
+by `embedding.model`). A model spec is {"key", "name", "dim", "truncate", "uncased"};
+with `truncate` (Matryoshka models) vectors keep their first N dimensions and are
+re-normalised. `uncased` marks models whose tokenizer lowercases input (bge-small
+does), which lets the query cache fold case. Which model actually serves a database is decided by
+embedding_models.serving_model().
+
+With `embedding.daemon: true`, inference runs in the shared embedding daemon
+(embed_daemon.py, started on demand) instead of this process; when the daemon is
+unavailable the model is loaded in-process as before, and released again once the
+daemon answers. Server startup (warm) waits for a starting daemon instead of
+loading the model locally.
+
+Vectors are serialised for sqlite-vec as little-endian float32 straight from the
+numpy buffers fastembed returns (no per-float Python objects).
 """
 
-import struct
 import os
-import time as _time
+import sys
 from pathlib import Path
 from typing import Optional
-from datetime import datetime as _dt
+
+sys.path.insert(0, str(Path(__file__).parent))
+import metrics
+import tracing
 
 # Suppress symlink warning on Windows
 os.environ.setdefault("HF_HUB_DISABLE_SYMLINKS_WARNING", "1")
@@ -18,57 +36,200 @@ EMBEDDING_MODEL = "BAAI/bge-small-en-v1.5"
 EMBEDDING_DIM = 384
 CACHE_DIR = str(Path.home() / ".cognilayer" / "cache" / "embeddings")
 
-_model = None
-_TRACE_FILE = Path.home() / ".cognilayer" / "logs" / "trace.log"
+DEFAULT_MODEL_KEY = "bge-small"
+DEFAULT_BATCH_SIZE = 64
+
+_models = {}  # model name -> TextEmbedding
 
 
-def _trace(msg):
-    """Unbuffered trace logging for debugging hangs."""
+def _embedding_config() -> dict:
+    """config.yaml `embedding` section ({} if unavailable)."""
     try:
-        with open(_TRACE_FILE, "a", encoding="utf-8") as f:
-            f.write(f"{_dt.now().isoformat()} [embedder] {msg}\n")
+        from utils import get_config_section
+        return get_config_section("embedding")
     except Exception:
-        pass
+        return {}
+
+
+def embedding_batch_size() -> int:
+    """Texts per embedding batch (config `embedding.batch_size`)."""
+    try:
+        return max(int(_embedding_config().get("batch_size", DEFAULT_BATCH_SIZE)), 1)
+    except (TypeError, ValueError):
+        return DEFAULT_BATCH_SIZE
+
+
+def _onnx_threads() -> Optional[int]:
+    """ONNX Runtime thread count (config `embedding.threads`, 0/absent = runtime default)."""
+    try:
+        threads = int(_embedding_config().get("threads") or 0)
+    except (TypeError, ValueError):
+        return None
+    return threads if threads > 0 else None
+
+
+def daemon_enabled() -> bool:
+    """Whether to embed through the shared daemon (config `embedding.daemon`)."""
+    return bool(_embedding_config().get("daemon", False))
+
+
+def _embed_via_daemon(texts: list[str], spec: dict) -> Optional[list[bytes]]:
+    """Embeddings from the daemon, or None to embed in-process."""
+    if not daemon_enabled():
+        return None
+    try:
+        from embed_daemon import request_embeddings
+        remote = request_embeddings(texts, spec)
+    except Exception as e:
+        tracing.event("embed.daemon_unavailable", error=str(e))
+        return None
+    if remote is not None and _models:
+        _models.clear()  # Daemon is back: drop the fallback model(s) loaded meanwhile
+    return remote
+
+
+def warm(spec: Optional[dict] = None) -> None:
+    """Load a model before the server serves requests.
+
+    With the daemon enabled this waits (up to embed_daemon.START_TIMEOUT) for the
+    daemon to start and load it there; only if that fails is it loaded in-process.
+    """
+    spec = spec or DEFAULT_SPEC
+    if daemon_enabled():
+        try:
+            from embed_daemon import request_embeddings, START_TIMEOUT
+            if request_embeddings(["warmup"], spec, wait=START_TIMEOUT) is not None:
+                return
+        except Exception as e:
+            tracing.event("embed.daemon_unavailable", error=str(e))
+    list(_get_model(spec["name"]).embed(["warmup"]))
+
+
+def _spec(key: str, name: str, dim: int, truncate: Optional[int] = None,
+          uncased: bool = False) -> dict:
+    return {"key": key, "name": name, "dim": dim, "truncate": truncate, "uncased": uncased}
+
 
+DEFAULT_SPEC = _spec(DEFAULT_MODEL_KEY, EMBEDDING_MODEL, EMBEDDING_DIM, uncased=True)
 
-def _get_model():
-    """Lazy-load the embedding model (singleton)."""
-    global _model
-    if _model is not None:
-        return _model
-    _trace("_get_model: loading (first call)")
-    t0 = _time.time()
-    _trace("_get_model: importing fastembed.TextEmbedding...")
-    from fastembed import TextEmbedding
-    _trace(f"_get_model: import done in {_time.time()-t0:.2f}s, creating model...")
-    _model = TextEmbedding(EMBEDDING_MODEL, cache_dir=CACHE_DIR)
-    _trace(f"_get_model: model created in {_time.time()-t0:.2f}s total")
-    return _model
 
+def model_registry() -> dict[str, dict]:
+    """Embedding models by key: the built-in default plus config `embedding.models`.
 
-def embed_text(text: str) -> bytes:
+    Invalid entries (no name, non-integer dim, truncate >= dim) are skipped.
+    """
+    registry = {DEFAULT_MODEL_KEY: DEFAULT_SPEC}
+    for key, entry in (_embedding_config().get("models") or {}).items():
+        try:
+            name = str(entry["name"])
+            dim = int(entry["dim"])
+            truncate = int(entry["truncate"]) if entry.get("truncate") else None
+        except (KeyError, TypeError, ValueError):
+            continue
+        if truncate is not None and not 0 < truncate < dim:
+            continue
+        registry[str(key)] = _spec(str(key), name, dim, truncate, bool(entry.get("uncased", False)))
+    return registry
+
+
+def model_spec(key: Optional[str] = None) -> dict:
+    """Spec for a registry key (default: config `embedding.model`, else bge-small)."""
+    registry = model_registry()
+    key = key or _embedding_config().get("model") or DEFAULT_MODEL_KEY
+    return registry.get(key, DEFAULT_SPEC)
+
+
+def model_id(spec: dict) -> str:
+    """Identity of a model's vector space: name, plus @N when truncated."""
+    if spec.get("truncate"):
+        return f"{spec['name']}@{spec['truncate']}"
+    return spec["name"]
+
+
+def is_uncased(spec: dict) -> bool:
+    """Whether a model ignores letter case (its registry entry says `uncased`).
+
+    Specs read back from embedding_models carry no flag and are looked up by
+    name; unknown models count as cased.
+    """
+    if "uncased" in spec:
+        return bool(spec["uncased"])
+    return any(s["name"] == spec["name"] and s["uncased"] for s in model_registry().values())
+
+
+def output_dim(spec: dict) -> int:
+    """Dimension of the stored vectors (after Matryoshka truncation)."""
+    return spec.get("truncate") or spec["dim"]
+
+
+def _get_model(name: str = EMBEDDING_MODEL):
+    """Lazy-load an embedding model (one instance per model name)."""
+    model = _models.get(name)
+    if model is not None:
+        return model
+    with tracing.span("embed.model_load", model=name):
+        with tracing.span("embed.import_fastembed"):
+            from fastembed import TextEmbedding
+        model = TextEmbedding(name, cache_dir=CACHE_DIR, threads=_onnx_threads())
+    _models[name] = model
+    return model
+
+
+def vector_to_blob(vector) -> bytes:
+    """One vector as the sqlite-vec float32 blob (a single buffer copy)."""
+    import numpy as np
+    return np.asarray(vector, dtype="<f4").tobytes()
+
+
+def vectors_to_blobs(vectors, truncate: Optional[int] = None) -> list[bytes]:
+    """A batch of vectors (list of rows or (n, dim) matrix) as float32 blobs.
+
+    fastembed rows are already float32 views of its batch output, so each blob is
+    one buffer copy; stacking them into a new matrix first would only add a copy.
+    With truncate, each vector keeps its first `truncate` dims, re-normalised.
+    """
+    import numpy as np
+    if not truncate:
+        return [np.asarray(v, dtype="<f4").tobytes() for v in vectors]
+    blobs = []
+    for v in vectors:
+        head = np.asarray(v, dtype="<f4")[:truncate]
+        norm = float(np.linalg.norm(head)) or 1.0
+        blobs.append((head / norm).astype("<f4").tobytes())
+    return blobs
+
+
+def embed_text(text: str, spec: Optional[dict] = None) -> bytes:
     """Generate embedding for a single text string. Returns raw bytes for sqlite-vec."""
-    t0 = _time.time()
-    _trace(f"embed_text: start (text={text[:30]!r})")
-    model = _get_model()
-    _trace(f"embed_text: model ready in {_time.time()-t0:.3f}s, embedding...")
-    embeddings = list(model.embed([text]))
-    vector = embeddings[0]
-    result = struct.pack(f"<{EMBEDDING_DIM}f", *vector)
-    _trace(f"embed_text: done in {_time.time()-t0:.3f}s")
-    return result
-
-
-def embed_texts(texts: list[str]) -> list[bytes]:
-    """Generate embeddings for multiple texts. Returns list of raw bytes."""
+    spec = spec or DEFAULT_SPEC
+    with tracing.span("embed.text") as sp, metrics.timed("embed_ms"):
+        remote = _embed_via_daemon([text], spec)
+        if remote is not None:
+            sp.set(via="daemon")
+            return remote[0]
+        model = _get_model(spec["name"])
+        embeddings = list(model.embed([text]))
+        return vectors_to_blobs(embeddings, spec.get("truncate"))[0]
+
+
+def embed_texts(texts: list[str], batch_size: Optional[int] = None,
+                spec: Optional[dict] = None) -> list[bytes]:
+    """Generate embeddings for multiple texts. Returns list of raw bytes.
+
+    texts are run through ONNX in batches of batch_size (default: config
+    `embedding.batch_size`).
+    """
     if not texts:
         return []
-    model = _get_model()
-    embeddings = list(model.embed(texts))
-    results = []
-    for vector in embeddings:
-        results.append(struct.pack(f"<{EMBEDDING_DIM}f", *vector))
-    return results
+    spec = spec or DEFAULT_SPEC
+    with tracing.span("embed.texts", n=len(texts)) as sp, metrics.timed("embed_ms"):
+        remote = _embed_via_daemon(texts, spec)
+        if remote is not None:
+            sp.set(via="daemon")
+            return remote
+        model = _get_model(spec["name"])
+        embeddings = list(model.embed(texts, batch_size=batch_size or embedding_batch_size()))
+        return vectors_to_blobs(embeddings, spec.get("truncate"))
 
 
 def is_available() -> bool:
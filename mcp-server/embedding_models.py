@@ -0,0 +1,226 @@
+"""CogniLayer embedding models — versioned vector tables and background re-embedding.
+
+Every embedding model (embedder.model_registry) gets its own pair of vec tables:
+the built-in bge-small keeps facts_vec/chunks_vec, any other model uses
+facts_vec_<slug>/chunks_vec_<slug> sized to its (truncated) dimension. The
+embedding_models table records each model's tables and state:
+
+- ready:    fully embedded; the most recently completed ready model serves searches
+            unless the configured model itself is ready.
+- building: the configured model's tables are being filled in the background
+            (migrate_model) while the previous ready model keeps serving.
+
+When a migration finishes it flips the new model to ready and drops the tables of
+the models it replaces, in one transaction, so no search ever sees a half-built
+table. A lease (owner + heartbeat) keeps concurrent MCP servers from running the
+same migration twice.
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent))
+from embedder import DEFAULT_SPEC, model_spec, model_id, output_dim
+
+_log = logging.getLogger("cognilayer.embedding_models")
+
+LEASE_SECONDS = 120
+MAX_FINAL_PASSES = 5
+
+_stop = threading.Event()
+_thread = None
+
+
+def vec_table_names(spec: dict) -> tuple[str, str]:
+    """(facts table, chunks table) of a model."""
+    if model_id(spec) == model_id(DEFAULT_SPEC):
+        return "facts_vec", "chunks_vec"
+    slug = re.sub(r"[^a-z0-9]+", "_", model_id(spec).lower()).strip("_")
+    return f"facts_vec_{slug}", f"chunks_vec_{slug}"
+
+
+def serving_model(db: sqlite3.Connection) -> dict:
+    """Model whose vec tables answer searches and receive new writes.
+
+    The configured model once it is ready, otherwise the most recently completed
+    ready model. Before any model is registered (fresh or pre-registry DB) the
+    configured model is used.
+    """
+    configured = model_spec()
+    try:
+        rows = db.execute("""
+            SELECT model_id, name, dim, truncate FROM embedding_models
+            WHERE state = 'ready' ORDER BY completed DESC
+        """).fetchall()
+    except sqlite3.OperationalError:
+        return configured  # Table missing (schema not upgraded yet)
+    if not rows or any(r[0] == model_id(configured) for r in rows):
+        return configured
+    row = rows[0]
+    return {"key": row[0], "name": row[1], "dim": row[2], "truncate": row[3]}
+
+
+def serving_tables(db: sqlite3.Connection) -> tuple[dict, str, str]:
+    """(spec, facts table, chunks table) of the serving model."""
+    spec = serving_model(db)
+    return (spec,) + vec_table_names(spec)
+
+
+def ensure_configured_model(db: sqlite3.Connection) -> dict | None:
+    """Register the configured model and create its vec tables.
+
+    The first model registered is ready at once (nothing to migrate from; the
+    pre-registry bge-small tables are adopted as-is). A later model starts as
+    building. Returns its spec when a background migration is needed, else None.
+    Requires sqlite-vec to be loaded on db.
+    """
+    from vec_store import vec_schema, configured_quantization
+
+    configured = model_spec()
+    mid = model_id(configured)
+    facts_table, chunks_table = vec_table_names(configured)
+    now = datetime.now().isoformat()
+
+    existing = db.execute("SELECT COUNT(*) FROM embedding_models").fetchone()[0]
+    if existing == 0 and mid != model_id(DEFAULT_SPEC):
+        legacy = db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'facts_vec'"
+        ).fetchone()
+        if legacy:
+            _register(db, DEFAULT_SPEC, "ready", now)
+            existing = 1
+
+    row = db.execute(
+        "SELECT state FROM embedding_models WHERE model_id = ?", (mid,)
+    ).fetchone()
+    db.executescript(vec_schema(configured_quantization(), output_dim(configured),
+                                facts_table, chunks_table))
+    if row is None:
+        state = "building" if existing else "ready"
+        _register(db, configured, state, now)
+    else:
+        state = row[0]
+    db.commit()
+    return configured if state == "building" else None
+
+
+def _register(db: sqlite3.Connection, spec: dict, state: str, now: str) -> None:
+    facts_table, chunks_table = vec_table_names(spec)
+    db.execute("""
+        INSERT OR IGNORE INTO embedding_models
+            (model_id, name, dim, truncate, facts_table, chunks_table, state, created, completed)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (model_id(spec), spec["name"], output_dim(spec), spec.get("truncate"),
+          facts_table, chunks_table, state, now, now if state == "ready" else None))
+
+
+def _claim(db: sqlite3.Connection, mid: str, owner: str) -> bool:
+    """Take (or renew) the migration lease for a building model."""
+    now = datetime.now()
+    expired = (now - timedelta(seconds=LEASE_SECONDS)).isoformat()
+    cursor = db.execute("""
+        UPDATE embedding_models SET owner = ?, heartbeat = ?
+        WHERE model_id = ? AND state = 'building'
+          AND (owner IS NULL OR owner = ? OR heartbeat IS NULL OR heartbeat < ?)
+    """, (owner, now.isoformat(), mid, owner, expired))
+    db.commit()
+    return cursor.rowcount == 1
+
+
+def _missing_count(db: sqlite3.Connection, facts_table: str, chunks_table: str) -> int:
+    return db.execute(f"""
+        SELECT (SELECT COUNT(*) FROM facts WHERE rowid NOT IN (SELECT rowid FROM {facts_table}))
+             + (SELECT COUNT(*) FROM file_chunks WHERE rowid NOT IN (SELECT rowid FROM {chunks_table}))
+    """).fetchone()[0]
+
+
+def migrate_model(spec: dict, batch_size: int | None = None,
+                  stop: threading.Event | None = None, log=None) -> bool:
+    """Re-embed all facts and chunks into a building model's tables, then flip it to ready.
+
+    Runs on its own connection. Each batch is one transaction, so the serving
+    model's tables stay fully usable. Returns True when the model became ready.
+    """
+    from db import open_db
+    from backfill_embeddings import backfill_facts, backfill_chunks
+
+    log = log or _log.info
+    stop = stop or threading.Event()
+    mid = model_id(spec)
+    owner = f"{os.getpid()}:{threading.get_ident()}"
+    facts_table, chunks_table = vec_table_names(spec)
+
+    db = open_db(with_vec=True)
+    try:
+        if not _claim(db, mid, owner):
+            return False
+        log(f"Re-embedding into {facts_table}/{chunks_table} ({mid})...")
+
+        def on_batch() -> bool:
+            return not stop.is_set() and _claim(db, mid, owner)
+
+        for _ in range(MAX_FINAL_PASSES):
+            backfill_facts(db, batch_size, spec=spec, table=facts_table, log=log, on_batch=on_batch)
+            backfill_chunks(db, batch_size, spec=spec, table=chunks_table, log=log, on_batch=on_batch)
+            if not on_batch():
+                return False  # Stopped, or another process took over the lease
+
+            # Flip atomically: nothing may be written between the last check and the switch
+            db.execute("BEGIN IMMEDIATE")
+            if _missing_count(db, facts_table, chunks_table):
+                db.rollback()
+                continue  # Rows written meanwhile — embed them and retry
+            _retire_others(db, mid)
+            db.execute("""
+                UPDATE embedding_models SET state = 'ready', completed = ?, owner = NULL
+                WHERE model_id = ?
+            """, (datetime.now().isoformat(), mid))
+            db.commit()
+            log(f"Embedding model {mid} is now serving.")
+            return True
+        return False
+    except Exception as e:
+        _log.warning("Embedding migration to %s failed: %s", mid, e)
+        try:
+            db.rollback()
+        except Exception:
+            pass
+        return False
+    finally:
+        db.close()
+
+
+def _retire_others(db: sqlite3.Connection, mid: str) -> None:
+    """Drop the vec tables and registry rows of every model except mid."""
+    for row in db.execute(
+        "SELECT model_id, facts_table, chunks_table FROM embedding_models WHERE model_id != ?",
+        (mid,)
+    ).fetchall():
+        db.execute(f"DROP TABLE IF EXISTS {row[1]}")
+        db.execute(f"DROP TABLE IF EXISTS {row[2]}")
+        db.execute("DELETE FROM embedding_models WHERE model_id = ?", (row[0],))
+
+
+def start_background_migration(spec: dict) -> None:
+    """Run migrate_model in a daemon thread (no-op if one is already running)."""
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return
+    _stop.clear()
+    _thread = threading.Thread(target=migrate_model, args=(spec,),
+                               kwargs={"stop": _stop}, name="embedding-migration",
+                               daemon=True)
+    _thread.start()
+
+
+def stop_background_migration(timeout: float = 5.0) -> None:
+    """Ask a running migration to stop after its current batch."""
+    _stop.set()
+    if _thread is not None:
+        _thread.join(timeout)
@@ -0,0 +1,145 @@
+"""CogniLayer embedding store — content-addressed cache of document embeddings.
+
+Embeddings are keyed by sha256(model + NUL + input text) in the embedding_store
+table, so identical text is embedded once no matter which fact, chunk, file or
+project it belongs to. Re-indexing a touched file, updating a fact back to an
+earlier wording or re-running backfill_embeddings.py only pays ONNX inference for
+text that was never embedded with the current model.
+
+The model is part of the address: during an embedding model migration
+(embedding_models.py) the serving and the building model keep separate entries.
+
+Unlike the query cache (search/query_cache.py) the text is used verbatim — document
+inputs are never normalised. Rows unused for a long time are dropped by prune(),
+which the MCP server's write-behind thread runs periodically.
+"""
+
+import hashlib
+import sqlite3
+from datetime import datetime, timedelta
+
+# SQLite's default host-parameter limit is 999 on older builds
+_LOOKUP_BATCH = 500
+
+_stats = {"reused": 0, "embedded": 0}
+
+
+def content_hash(text: str, model: str) -> str:
+    """Content address of an embedding input for a given model."""
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+def fact_text(content: str, domain: str | None = None) -> str:
+    """Text that gets embedded for a fact (content + [domain]).
+
+    Tags are left out: they are matched by FTS5 and filter vector search
+    (fts_search), so a fact that only gained or lost tags keeps its embedding.
+    """
+    text = content
+    if domain:
+        text += f" [{domain}]"
+    return text
+
+
+def chunk_text(section_title: str | None, content: str) -> str:
+    """Text that gets embedded for a file chunk (section title + content)."""
+    if section_title:
+        return f"{section_title}: {content}"
+    return content
+
+
+def _lookup(db: sqlite3.Connection, hashes: list[str]) -> dict[str, bytes]:
+    found = {}
+    for i in range(0, len(hashes), _LOOKUP_BATCH):
+        batch = hashes[i:i + _LOOKUP_BATCH]
+        placeholders = ",".join("?" * len(batch))
+        for row in db.execute(
+            f"SELECT content_hash, embedding FROM embedding_store WHERE content_hash IN ({placeholders})",
+            batch
+        ).fetchall():
+            found[row[0]] = row[1]
+    return found
+
+
+def embed_texts_cached(db: sqlite3.Connection, texts: list[str],
+                       spec: dict | None = None) -> list[bytes]:
+    """Embeddings for texts in order; only texts missing from the store are embedded.
+
+    spec is the embedding model (default: the model serving db). New embeddings
+    are written to the store on the caller's transaction (no commit).
+    """
+    if not texts:
+        return []
+    import embedder
+    if spec is None:
+        from embedding_models import serving_model
+        spec = serving_model(db)
+    model = embedder.model_id(spec)
+    hashes = [content_hash(text, model) for text in texts]
+    now = datetime.now().isoformat()
+
+    try:
+        found = _lookup(db, list(dict.fromkeys(hashes)))
+    except sqlite3.OperationalError:
+        # Store table missing (schema not upgraded yet) — plain embedding
+        return embedder.embed_texts(texts, spec=spec)
+
+    # Embed each missing text once, even if it repeats within the batch
+    missing = {}
+    for h, text in zip(hashes, texts):
+        if h not in found and h not in missing:
+            missing[h] = text
+    if missing:
+        vectors = embedder.embed_texts(list(missing.values()), spec=spec)
+        new_rows = []
+        for h, vector in zip(missing, vectors):
+            found[h] = vector
+            new_rows.append((h, model, vector, now, now))
+        db.executemany("""
+            INSERT OR REPLACE INTO embedding_store (content_hash, model, embedding, created, last_used)
+            VALUES (?, ?, ?, ?, ?)
+        """, new_rows)
+
+    reused = [h for h in dict.fromkeys(hashes) if h not in missing]
+    if reused:
+        db.executemany(
+            "UPDATE embedding_store SET last_used = ? WHERE content_hash = ?",
+            [(now, h) for h in reused]
+        )
+    _stats["embedded"] += len(missing)
+    _stats["reused"] += len(texts) - len(missing)
+    return [found[h] for h in hashes]
+
+
+def embed_text_cached(db: sqlite3.Connection, text: str, spec: dict | None = None) -> bytes:
+    """Single-text variant of embed_texts_cached."""
+    return embed_texts_cached(db, [text], spec)[0]
+
+
+def stats() -> dict:
+    """Counts of inputs served from the store vs embedded, for this process."""
+    return dict(_stats)
+
+
+def prune(db: sqlite3.Connection, max_age_days: int = 90) -> int:
+    """Drop embeddings unused for max_age_days or stored for an unregistered model.
+
+    Models registered in embedding_models (serving or still building) keep their
+    entries. Returns rows deleted.
+    """
+    import embedder
+    cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat()
+    try:
+        models = [r[0] for r in db.execute("SELECT model_id FROM embedding_models").fetchall()]
+    except sqlite3.OperationalError:
+        models = []
+    models = models or [embedder.model_id(embedder.model_spec())]
+    placeholders = ",".join("?" * len(models))
+    try:
+        cursor = db.execute(
+            f"DELETE FROM embedding_store WHERE last_used < ? OR model NOT IN ({placeholders})",
+            [cutoff] + models
+        )
+    except sqlite3.OperationalError:
+        return 0  # Table missing (schema not upgraded yet)
+    return cursor.rowcount
@@ -0,0 +1,118 @@
+"""Git-aware change detection for the code and doc indexers.
+
+A full scan walks and stats the whole tree on every run. In a git repository
+the index already knows the files (`git ls-files`, which also honours
+.gitignore), and `git diff` against the commit of the last complete run
+names the files that may have changed since, so only those need a stat.
+
+Per project and indexer ("code", "docs") the git_index_state table keeps the
+HEAD commit of the last complete run plus the paths that differed from it at
+the time (uncommitted edits and untracked files). Those are candidates again
+on the next run, because reverting an edit makes it disappear from the diff.
+A run that cannot use git (not a repo, no git binary, unknown commit after a
+rebase or gc, no recorded state) falls back to the directory walk.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import subprocess
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+_log = logging.getLogger("cognilayer.git_scan")
+
+GIT_TIMEOUT = 10.0
+MAX_DIRTY_PATHS = 5000  # More uncommitted paths than this: don't record, walk next time
+
+
+@dataclass
+class Snapshot:
+    """Repository state at the start of an index run (paths relative to the project dir)."""
+    head: str
+    files: list[str]  # Tracked and untracked, non-ignored
+    dirty: list[str]  # Differ from head: edited, staged or untracked
+    changed: list[str] | None  # Changed since the last recorded run; None = walk instead
+
+
+def _git(project_path: str | Path, *args: str) -> str | None:
+    """Run git in project_path; stdout, or None on any failure."""
+    try:
+        proc = subprocess.run(
+            ["git", *args], cwd=str(project_path), stdin=subprocess.DEVNULL,
+            capture_output=True, timeout=GIT_TIMEOUT,
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        _log.debug("git %s failed: %s", args[0], e)
+        return None
+    if proc.returncode != 0:
+        return None
+    return proc.stdout.decode("utf-8", errors="surrogateescape")
+
+
+def _paths(output: str) -> list[str]:
+    return [p for p in output.split("\0") if p]
+
+
+def list_files(project_path: str | Path) -> list[str] | None:
+    """Files git would show under project_path (tracked plus untracked, minus ignored)."""
+    out = _git(project_path, "ls-files", "-z", "--cached", "--others", "--exclude-standard")
+    return None if out is None else list(dict.fromkeys(_paths(out)))
+
+
+def _diff(project_path: str | Path, commit: str) -> list[str] | None:
+    out = _git(project_path, "diff", "--name-only", "-z", "--relative", "--no-renames", commit, "--")
+    return None if out is None else _paths(out)
+
+
+def begin(db, project: str, project_path: str | Path, indexer: str) -> Snapshot | None:
+    """Snapshot the repository before indexing. None when project_path isn't in a git work tree."""
+    head = _git(project_path, "rev-parse", "--verify", "-q", "HEAD")
+    if head is None:
+        return None
+    head = head.strip()
+    tracked = _git(project_path, "ls-files", "-z", "--cached")
+    untracked = _git(project_path, "ls-files", "-z", "--others", "--exclude-standard")
+    dirty = _diff(project_path, head)
+    if tracked is None or untracked is None or dirty is None:
+        return None
+    untracked = _paths(untracked)
+    files = list(dict.fromkeys(_paths(tracked) + untracked))
+    dirty = list(dict.fromkeys(dirty + untracked))
+
+    changed = None
+    state = _load_state(db, project, indexer)
+    if state is not None:
+        commit, previous_dirty = state
+        since = dirty if commit == head else _diff(project_path, commit)
+        if since is not None:
+            changed = list(dict.fromkeys(since + dirty + previous_dirty))
+    return Snapshot(head=head, files=files, dirty=dirty, changed=changed)
+
+
+def record(db, project: str, indexer: str, snapshot: Snapshot) -> None:
+    """Remember a snapshot after a complete run (the caller commits)."""
+    try:
+        if len(snapshot.dirty) > MAX_DIRTY_PATHS:
+            db.execute("DELETE FROM git_index_state WHERE project = ? AND indexer = ?", (project, indexer))
+            return
+        db.execute("""
+            INSERT OR REPLACE INTO git_index_state (project, indexer, commit_sha, dirty_paths, updated)
+            VALUES (?, ?, ?, ?, ?)
+        """, (project, indexer, snapshot.head, json.dumps(snapshot.dirty), datetime.now().isoformat()))
+    except Exception as e:
+        _log.debug("Could not record git state for %s/%s: %s", project, indexer, e)
+
+
+def _load_state(db, project: str, indexer: str) -> tuple[str, list[str]] | None:
+    try:
+        row = db.execute("""
+            SELECT commit_sha, dirty_paths FROM git_index_state WHERE project = ? AND indexer = ?
+        """, (project, indexer)).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+    except Exception:
+        return None  # Table missing (older schema) or unreadable state
@@ -0,0 +1,102 @@
+"""CogniLayer heat decay — type-based exponential decay of fact heat scores.
+
+Formula: heat = max(0.05, 0.5 ^ (age_days / half_life_days)), age measured from
+last_accessed (or creation). Each fact type has its own half-life — decisions
+persist longer, tasks fade faster. Facts touched within the last day keep their heat.
+
+The formula is registered as the SQL function heat_decay(type, ref_time, now),
+so a project is decayed by one set-based UPDATE instead of a Python loop with an
+UPDATE per fact. Decay runs outside the search path (project_context, SessionEnd
+hook), at most once per DECAY_INTERVAL per project, coordinated across all CLI
+instances through projects.last_decay.
+"""
+
+import sqlite3
+from datetime import datetime, timedelta
+
+# Type-based half-lives in days — longer = decays slower
+DECAY_HALF_LIVES = {
+    "decision":     180,  # 6 months — decisions are long-lived
+    "pattern":      120,  # 4 months
+    "api_contract": 120,
+    "procedure":    90,   # 3 months
+    "client_rule":  90,
+    "skill":        90,
+    "fact":         60,   # 2 months — general knowledge
+    "dependency":   60,
+    "gotcha":       45,
+    "error_fix":    45,
+    "performance":  30,   # 1 month — can change fast
+    "command":      30,
+    "issue":        21,   # 3 weeks — should resolve quickly
+    "task":         14,   # 2 weeks — most ephemeral
+}
+DEFAULT_HALF_LIFE = 60
+MIN_HEAT = 0.05
+DECAY_INTERVAL = timedelta(hours=1)
+
+
+def _parse(value: str) -> datetime | None:
+    try:
+        dt = datetime.fromisoformat(value)
+    except (ValueError, TypeError):
+        return None
+    return dt.replace(tzinfo=None) if dt.tzinfo else dt
+
+
+def decayed_heat(fact_type: str, ref_time: str, now: str) -> float | None:
+    """Heat of a fact last accessed at ref_time, as of now (ISO strings).
+
+    None when ref_time is unparseable or less than a day old (heat unchanged).
+    """
+    ref, current = _parse(ref_time), _parse(now)
+    if ref is None or current is None:
+        return None
+    age_days = (current - ref).total_seconds() / 86400
+    if age_days < 1:
+        return None
+    half_life = DECAY_HALF_LIVES.get(fact_type, DEFAULT_HALF_LIFE)
+    return max(MIN_HEAT, 0.5 ** (age_days / half_life))
+
+
+def register_heat_functions(db: sqlite3.Connection) -> None:
+    """Register heat_decay(type, ref_time, now) on a connection."""
+    db.create_function("heat_decay", 3, decayed_heat, deterministic=True)
+
+
+def decay_project(db: sqlite3.Connection, project: str, now: datetime | None = None) -> int:
+    """Decay all facts of a project in one UPDATE (no commit). Returns rows changed."""
+    register_heat_functions(db)
+    cursor = db.execute("""
+        UPDATE facts
+        SET heat_score = heat_decay(type, COALESCE(last_accessed, timestamp), :now)
+        WHERE project = :project AND heat_score > :min_heat
+          AND ABS(heat_decay(type, COALESCE(last_accessed, timestamp), :now) - heat_score) > 0.001
+    """, {"now": (now or datetime.now()).isoformat(), "project": project, "min_heat": MIN_HEAT})
+    return cursor.rowcount
+
+
+def maybe_decay(db: sqlite3.Connection, project: str) -> bool:
+    """Decay a project's facts unless another instance did within DECAY_INTERVAL.
+
+    The interval is claimed atomically on projects.last_decay, so concurrent CLIs
+    never decay the same project twice. Non-critical: returns False (and rolls
+    back) when the database is locked or the column is missing.
+    """
+    now = datetime.now()
+    try:
+        claimed = db.execute("""
+            UPDATE projects SET last_decay = ?
+            WHERE name = ? AND (last_decay IS NULL OR last_decay < ?)
+        """, (now.isoformat(), project, (now - DECAY_INTERVAL).isoformat())).rowcount
+        if not claimed:
+            return False
+        decay_project(db, project, now)
+        db.commit()
+        return True
+    except sqlite3.OperationalError:
+        try:
+            db.rollback()
+        except Exception:
+            pass
+        return False
@@ -1,6 +1,7 @@
 """CogniLayer file indexer — indexes project docs into file_chunks table."""
 
 import os
+import stat
 import time
 from pathlib import Path
 
@@ -8,6 +9,10 @@ import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from indexer.chunker import chunk_file
 from db import ensure_vec
+from vec_store import write_chunk_vec, delete_chunk_vecs
+from embedder import embedding_batch_size
+from embedding_store import embed_texts_cached, chunk_text
+from dispatch import cancel_requested
 
 # Extensions to index
 DOC_EXTENSIONS = {".md", ".txt", ".json", ".yaml", ".yml", ".toml"}
@@ -17,13 +22,37 @@ IGNORE_FILES = {"package-lock.json", "yarn.lock", "pnpm-lock.yaml"}
 NEVER_INDEX = {".env", ".env.local", ".env.production", ".env.development",
                "credentials.json"}
 MAX_FILE_SIZE = 200_000  # 200KB
+EMBED_SECONDS_PER_CHUNK = 0.03  # Initial embed+write estimate for budgeting batches; measured per run after
 
 
-def scan_project_files(project_path: Path, scan_depth: int = 3) -> list[Path]:
-    """Scan project directory for indexable files."""
+def scan_project_files(project_path: Path, scan_depth: int = 3,
+                       rel_paths: list[str] | None = None) -> list[Path]:
+    """Scan project directory for indexable files.
+
+    In a git repo the candidates come from `git ls-files` (honouring
+    .gitignore) instead of a directory walk; rel_paths overrides them.
+    """
     files = []
     project_path = Path(project_path)
 
+    if rel_paths is None:
+        import git_scan
+        listed = git_scan.list_files(project_path)
+        if listed is not None:
+            rel_paths = [rel for rel in listed if _is_doc_path(rel, scan_depth)] or None
+    if rel_paths is not None:
+        for rel in rel_paths:
+            if not _is_doc_path(rel, scan_depth):
+                continue
+            path = project_path / rel
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            if stat.S_ISREG(st.st_mode) and st.st_size <= MAX_FILE_SIZE:
+                files.append(path)
+        return files
+
     def _scan(directory: Path, depth: int):
         if depth > scan_depth:
             return
@@ -47,123 +76,218 @@ def scan_project_files(project_path: Path, scan_depth: int = 3) -> list[Path]:
     return files
 
 
+def _is_doc_path(rel_path: str, scan_depth: int = 3) -> bool:
+    """The walk's filters (depth, ignored directories and files, extension) for a relative path."""
+    *dirs, name = rel_path.split("/")
+    if len(dirs) > scan_depth or any(d in IGNORE_DIRS for d in dirs):
+        return False
+    if name in NEVER_INDEX or name in IGNORE_FILES:
+        return False
+    return Path(name).suffix.lower() in DOC_EXTENSIONS
+
+
+def _embed_input(chunk: dict) -> str:
+    """Text that gets embedded for a chunk (section title + content)."""
+    return chunk_text(chunk["section_title"], chunk["content"])
+
+
+def _changed_files(project_files: list[Path], project_path: Path, indexed: dict, touched: list):
+    """Scan stage: yield (rel_path, mtime, path) for new or modified files.
+
+    indexed maps rel_path to the stored (mtime, size, content_hash). A file
+    whose mtime moved but whose size and hash didn't (git checkout, formatter,
+    copied tree) isn't yielded; its (mtime, rel_path) goes to touched instead.
+    """
+    from utils import file_content_hash
+
+    for file_path in project_files:
+        rel_path = str(file_path.relative_to(project_path)).replace("\\", "/")
+        stat = file_path.stat()
+        if rel_path in indexed:
+            mtime, size, digest = indexed[rel_path]
+            if size is None or size == stat.st_size:
+                if abs(mtime - stat.st_mtime) < 1:
+                    continue
+                if digest and file_content_hash(file_path) == digest:
+                    touched.append((stat.st_mtime, rel_path))
+                    continue
+        yield rel_path, stat.st_mtime, file_path
+
+
+def _chunked_files(changed, start: float, time_budget: float):
+    """Chunk stage: yield (rel_path, mtime, chunks, size, content_hash) until the time budget
+    runs out (or the call is cancelled)."""
+    from utils import content_hash
+
+    for rel_path, mtime, file_path in changed:
+        if time.time() - start > time_budget or cancel_requested():
+            return
+        try:
+            raw = file_path.read_bytes()
+            content = raw.decode("utf-8")
+        except (UnicodeDecodeError, PermissionError):
+            continue
+        chunks = chunk_file(content, rel_path)
+        if chunks:
+            yield rel_path, mtime, chunks, len(raw), content_hash(raw)
+
+
+def _file_batches(chunked, batch_size: int, max_chunks=None):
+    """Group whole files into batches of at least batch_size chunks (last may be smaller).
+
+    max_chunks() lowers the target when the time budget only fits a smaller batch.
+    """
+    batch, n_chunks = [], 0
+    for item in chunked:
+        batch.append(item)
+        n_chunks += len(item[2])
+        target = batch_size if max_chunks is None else min(batch_size, max_chunks())
+        if n_chunks >= target:
+            yield batch
+            batch, n_chunks = [], 0
+    if batch:
+        yield batch
+
+
+def _write_batch(db, project: str, batch: list, vec_ready: bool):
+    """Embed + write stage: one embedding call and one transaction for a batch of files.
+
+    Embeddings are computed before any row is touched, so the write lock is only
+    held for the inserts.
+    """
+    texts = [_embed_input(chunk) for _, _, chunks, _, _ in batch for chunk in chunks]
+    embeddings = None
+    chunks_table = "chunks_vec"
+    if vec_ready:
+        try:
+            from embedding_models import serving_tables
+            spec, _, chunks_table = serving_tables(db)
+            embeddings = embed_texts_cached(db, texts, spec)
+        except Exception:
+            embeddings = None  # Embedding not available, FTS5 still works
+
+    rel_paths = [rel_path for rel_path, _, _, _, _ in batch]
+    placeholders = ",".join("?" * len(rel_paths))
+    # Old rowids before deleting (for chunks_vec cleanup)
+    old_rowids = [r[0] for r in db.execute(
+        f"SELECT rowid FROM file_chunks WHERE project = ? AND file_path IN ({placeholders})",
+        [project] + rel_paths
+    ).fetchall()]
+    db.execute(
+        f"DELETE FROM file_chunks WHERE project = ? AND file_path IN ({placeholders})",
+        [project] + rel_paths
+    )
+    if old_rowids and vec_ready:
+        delete_chunk_vecs(db, old_rowids)
+
+    i = 0
+    for rel_path, mtime, chunks, size, digest in batch:
+        for chunk in chunks:
+            cursor = db.execute("""
+                INSERT INTO file_chunks (project, file_path, file_mtime, file_size, content_hash,
+                                        section_title, chunk_index, content)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                project, rel_path, mtime, size, digest,
+                chunk["section_title"], chunk["chunk_index"], chunk["content"]
+            ))
+            if embeddings is not None:
+                write_chunk_vec(db, cursor.lastrowid, embeddings[i], project, chunks_table)
+            i += 1
+    db.commit()
+
+
 def reindex_project(db, project: str, project_path: Path,
-                    time_budget: float = 1.5):
-    """Re-index changed/new files for a project. Respects time budget."""
+                    time_budget: float = 1.5, batch_size: int | None = None):
+    """Re-index changed/new files for a project. Respects time budget.
+
+    Pipeline: scan (size/mtime check, content hash when only the mtime moved)
+    -> chunk -> embed -> write. Chunks from many files
+    are embedded together in batches of ~batch_size (config `embedding.batch_size`),
+    each batch written in a single transaction. Files are never split across
+    batches, so an interrupted run leaves every file either fully old or fully new.
+    The budget and cancellation are checked before each batch is embedded, and
+    batches shrink to what the remaining time fits (at the measured seconds per
+    chunk), so a run overshoots its budget by at most about one file.
+    """
     start = time.time()
     project_path = Path(project_path)
+    if batch_size is None:
+        batch_size = embedding_batch_size()
 
     # Get currently indexed files from DB
     indexed = {}
     for row in db.execute(
-        "SELECT DISTINCT file_path, file_mtime FROM file_chunks WHERE project = ?",
+        "SELECT DISTINCT file_path, file_mtime, file_size, content_hash FROM file_chunks WHERE project = ?",
         (project,)
     ).fetchall():
-        indexed[row[0]] = row[1]
+        indexed[row[0]] = (row[1], row[2], row[3])
 
-    # Scan project files
-    project_files = scan_project_files(project_path)
+    # Scan project files: in a git repo with a recorded state, only those changed
+    # since the last complete run (git_scan); otherwise all of them
+    import git_scan
+    snapshot = git_scan.begin(db, project, project_path, "docs")
+    listed = None
+    if snapshot is not None:
+        listed = [rel for rel in snapshot.files if _is_doc_path(rel)]
+        if not listed:
+            snapshot, listed = None, None  # Nothing tracked here: walk instead
+    if snapshot is not None and snapshot.changed is not None and indexed:
+        project_files = scan_project_files(project_path, rel_paths=snapshot.changed)
+        present = {str(f.relative_to(project_path)).replace("\\", "/") for f in project_files}
+        gone = [rel for rel in snapshot.changed if rel in indexed and rel not in present]
+    else:
+        project_files = scan_project_files(project_path, rel_paths=listed)
+        current_files = {
+            str(f.relative_to(project_path)).replace("\\", "/")
+            for f in project_files
+        }
+        gone = [rel for rel in indexed if rel not in current_files]
+    vec_ready = ensure_vec(db)
 
     indexed_count = 0
-    for file_path in project_files:
-        if time.time() - start > time_budget:
-            break
-
-        rel_path = str(file_path.relative_to(project_path)).replace("\\", "/")
-        current_mtime = file_path.stat().st_mtime
+    touched: list[tuple] = []  # (mtime, rel_path) of files with unchanged contents
+    changed = _changed_files(project_files, project_path, indexed, touched)
+    per_chunk = EMBED_SECONDS_PER_CHUNK
 
-        # Skip if unchanged
-        if rel_path in indexed and abs(indexed[rel_path] - current_mtime) < 1:
-            continue
+    def max_chunks() -> int:
+        return max(1, int((time_budget - (time.time() - start)) / per_chunk))
 
-        # Read and chunk file
-        try:
-            content = file_path.read_text(encoding="utf-8")
-        except (UnicodeDecodeError, PermissionError):
-            continue
+    for batch in _file_batches(_chunked_files(changed, start, time_budget), batch_size, max_chunks):
+        if time.time() - start > time_budget or cancel_requested():
+            break  # Not embedded: these files are picked up by the next run
+        n_chunks = sum(len(chunks) for _, _, chunks, _, _ in batch)
+        batch_start = time.time()
+        _write_batch(db, project, batch, vec_ready)
+        per_chunk = max((time.time() - batch_start) / n_chunks, 1e-4)
+        indexed_count += len(batch)
+    complete = time.time() - start <= time_budget and not cancel_requested()
 
-        chunks = chunk_file(content, rel_path)
-        if not chunks:
-            continue
+    if touched:
+        db.executemany(
+            "UPDATE file_chunks SET file_mtime = ? WHERE project = ? AND file_path = ?",
+            [(mtime, project, rel_path) for mtime, rel_path in touched]
+        )
+        db.commit()
 
-        # Get old rowids before deleting (for chunks_vec cleanup)
-        old_rowids = [r[0] for r in db.execute(
+    # Clean up deleted files
+    for indexed_path in gone:
+        # Get rowids before deleting (for chunks_vec cleanup)
+        orphan_rowids = [r[0] for r in db.execute(
             "SELECT rowid FROM file_chunks WHERE project = ? AND file_path = ?",
-            (project, rel_path)
+            (project, indexed_path)
         ).fetchall()]
 
-        # Delete old chunks for this file
         db.execute(
             "DELETE FROM file_chunks WHERE project = ? AND file_path = ?",
-            (project, rel_path)
+            (project, indexed_path)
         )
 
         # Clean orphaned chunks_vec entries
-        if old_rowids and ensure_vec(db):
-            for rid in old_rowids:
-                try:
-                    db.execute("DELETE FROM chunks_vec WHERE rowid = ?", (rid,))
-                except Exception:
-                    pass
-
-        # Insert new chunks + embeddings
-        new_rowids = []
-        chunk_texts = []
-        for chunk in chunks:
-            cursor = db.execute("""
-                INSERT INTO file_chunks (project, file_path, file_mtime,
-                                        section_title, chunk_index, content)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (
-                project, rel_path, current_mtime,
-                chunk["section_title"], chunk["chunk_index"], chunk["content"]
-            ))
-            rowid = cursor.lastrowid
-            new_rowids.append(rowid)
-            text = chunk["content"]
-            if chunk["section_title"]:
-                text = f"{chunk['section_title']}: {text}"
-            chunk_texts.append(text)
-
-        # Generate embeddings for new chunks
-        try:
-            if ensure_vec(db):
-                from embedder import embed_texts
-                embeddings = embed_texts(chunk_texts)
-                for rowid, emb in zip(new_rowids, embeddings):
-                    db.execute(
-                        "INSERT OR REPLACE INTO chunks_vec(rowid, embedding) VALUES (?, ?)",
-                        (rowid, emb)
-                    )
-        except Exception:
-            pass  # Embedding not available, FTS5 still works
-
-        indexed_count += 1
+        if orphan_rowids and vec_ready:
+            delete_chunk_vecs(db, orphan_rowids)
 
-    # Clean up deleted files
-    current_files = {
-        str(f.relative_to(project_path)).replace("\\", "/")
-        for f in project_files
-    }
-    for indexed_path in list(indexed.keys()):
-        if indexed_path not in current_files:
-            # Get rowids before deleting (for chunks_vec cleanup)
-            orphan_rowids = [r[0] for r in db.execute(
-                "SELECT rowid FROM file_chunks WHERE project = ? AND file_path = ?",
-                (project, indexed_path)
-            ).fetchall()]
-
-            db.execute(
-                "DELETE FROM file_chunks WHERE project = ? AND file_path = ?",
-                (project, indexed_path)
-            )
-
-            # Clean orphaned chunks_vec entries
-            if orphan_rowids and ensure_vec(db):
-                for rid in orphan_rowids:
-                    try:
-                        db.execute("DELETE FROM chunks_vec WHERE rowid = ?", (rid,))
-                    except Exception:
-                        pass
+    if snapshot is not None and complete:
+        git_scan.record(db, project, "docs", snapshot)
 
     return indexed_count
@@ -17,6 +17,12 @@ try:
 except ImportError:
     sys.path.insert(0, str(Path(__file__).parent))
     from db import open_db, get_db_path
+from vec_store import vec_schema, configured_quantization
+
+# Bump whenever upgrade_schema() changes: servers skip the migration when the
+# database already records this version (schema_current)
+SCHEMA_VERSION = 10
+SCHEMA_DESCRIPTION = "code_symbols FTS triggers gated for bulk sync"
 
 
 SCHEMA = """
@@ -76,6 +82,8 @@ CREATE TABLE IF NOT EXISTS file_chunks (
     project TEXT NOT NULL,
     file_path TEXT NOT NULL,
     file_mtime REAL NOT NULL,
+    file_size INTEGER,
+    content_hash TEXT,
     section_title TEXT,
     chunk_index INTEGER DEFAULT 0,
     content TEXT NOT NULL,
@@ -225,6 +233,67 @@ CREATE TABLE IF NOT EXISTS knowledge_gaps (
     FOREIGN KEY (project) REFERENCES projects(name)
 );
 
+-- Query-embedding cache (normalised query hash -> vector, per model)
+CREATE TABLE IF NOT EXISTS query_embeddings (
+    query_hash TEXT NOT NULL,
+    model TEXT NOT NULL,
+    embedding BLOB NOT NULL,
+    created TEXT NOT NULL,
+    last_used TEXT NOT NULL,
+    hits INTEGER DEFAULT 0,
+    PRIMARY KEY (query_hash, model)
+);
+
+-- Content-addressed embedding store (sha256(model, text) -> vector)
+CREATE TABLE IF NOT EXISTS embedding_store (
+    content_hash TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    embedding BLOB NOT NULL,
+    created TEXT NOT NULL,
+    last_used TEXT NOT NULL
+);
+
+-- Embedding models and their vec tables (serving / background re-embedding)
+CREATE TABLE IF NOT EXISTS embedding_models (
+    model_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    dim INTEGER NOT NULL,
+    truncate INTEGER,
+    facts_table TEXT NOT NULL,
+    chunks_table TEXT NOT NULL,
+    state TEXT NOT NULL CHECK(state IN ('building', 'ready')),
+    created TEXT NOT NULL,
+    completed TEXT,
+    owner TEXT,
+    heartbeat TEXT
+);
+
+-- Per-call MCP tool metrics (ring buffer of the last metrics.keep_rows calls)
+CREATE TABLE IF NOT EXISTS tool_metrics (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    tool TEXT NOT NULL,
+    project TEXT,
+    session_id TEXT,
+    pid INTEGER,
+    duration_ms REAL NOT NULL,
+    sql_count INTEGER DEFAULT 0,
+    embed_ms REAL DEFAULT 0,
+    lock_wait_ms REAL DEFAULT 0,
+    ok INTEGER DEFAULT 1,
+    db_mb REAL
+);
+
+-- Git state of the last complete code/doc index run (git_scan.py)
+CREATE TABLE IF NOT EXISTS git_index_state (
+    project TEXT NOT NULL,
+    indexer TEXT NOT NULL,
+    commit_sha TEXT NOT NULL,
+    dirty_paths TEXT NOT NULL DEFAULT '[]',
+    updated TEXT NOT NULL,
+    PRIMARY KEY (project, indexer)
+);
+
 -- Fact clusters (consolidation output)
 CREATE TABLE IF NOT EXISTS fact_clusters (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -274,6 +343,7 @@ CREATE TABLE IF NOT EXISTS code_files (
     language TEXT NOT NULL,
     file_mtime REAL NOT NULL,
     file_size INTEGER DEFAULT 0,
+    content_hash TEXT,
     symbol_count INTEGER DEFAULT 0,
     is_dirty INTEGER DEFAULT 0,
     indexed_at TEXT NOT NULL,
@@ -338,6 +408,8 @@ CREATE INDEX IF NOT EXISTS idx_fact_links_source ON fact_links(source_id);
 CREATE INDEX IF NOT EXISTS idx_fact_links_target ON fact_links(target_id);
 CREATE INDEX IF NOT EXISTS idx_gaps_project ON knowledge_gaps(project);
 CREATE INDEX IF NOT EXISTS idx_gaps_resolved ON knowledge_gaps(resolved);
+CREATE INDEX IF NOT EXISTS idx_query_embeddings_used ON query_embeddings(last_used);
+CREATE INDEX IF NOT EXISTS idx_tool_metrics_project ON tool_metrics(project, tool);
 CREATE INDEX IF NOT EXISTS idx_code_files_project ON code_files(project);
 CREATE INDEX IF NOT EXISTS idx_code_files_dirty ON code_files(project, is_dirty);
 CREATE INDEX IF NOT EXISTS idx_code_symbols_project ON code_symbols(project);
@@ -384,17 +456,24 @@ CREATE VIRTUAL TABLE IF NOT EXISTS code_symbols_fts USING fts5(
     content=code_symbols, content_rowid=rowid
 );
 
-CREATE TRIGGER IF NOT EXISTS code_symbols_ai AFTER INSERT ON code_symbols BEGIN
+-- While the code indexer holds a row here (only inside its own write transaction)
+-- it syncs code_symbols_fts in bulk and the triggers below stand down
+CREATE TABLE IF NOT EXISTS code_symbols_fts_bulk (active INTEGER);
+
+CREATE TRIGGER IF NOT EXISTS code_symbols_ai AFTER INSERT ON code_symbols
+WHEN NOT EXISTS (SELECT 1 FROM code_symbols_fts_bulk) BEGIN
     INSERT INTO code_symbols_fts(rowid, name, qualified_name, signature, docstring)
     VALUES (new.rowid, new.name, new.qualified_name, new.signature, new.docstring);
 END;
 
-CREATE TRIGGER IF NOT EXISTS code_symbols_ad AFTER DELETE ON code_symbols BEGIN
+CREATE TRIGGER IF NOT EXISTS code_symbols_ad AFTER DELETE ON code_symbols
+WHEN NOT EXISTS (SELECT 1 FROM code_symbols_fts_bulk) BEGIN
     INSERT INTO code_symbols_fts(code_symbols_fts, rowid, name, qualified_name, signature, docstring)
     VALUES ('delete', old.rowid, old.name, old.qualified_name, old.signature, old.docstring);
 END;
 
-CREATE TRIGGER IF NOT EXISTS code_symbols_au AFTER UPDATE ON code_symbols BEGIN
+CREATE TRIGGER IF NOT EXISTS code_symbols_au AFTER UPDATE ON code_symbols
+WHEN NOT EXISTS (SELECT 1 FROM code_symbols_fts_bulk) BEGIN
     INSERT INTO code_symbols_fts(code_symbols_fts, rowid, name, qualified_name, signature, docstring)
     VALUES ('delete', old.rowid, old.name, old.qualified_name, old.signature, old.docstring);
     INSERT INTO code_symbols_fts(rowid, name, qualified_name, signature, docstring)
@@ -427,15 +506,9 @@ END;
 """
 
 # Phase 2: Vector tables (require sqlite-vec extension)
-VEC_SCHEMA = """
-CREATE VIRTUAL TABLE IF NOT EXISTS facts_vec USING vec0(
-    embedding float[384]
-);
-
-CREATE VIRTUAL TABLE IF NOT EXISTS chunks_vec USING vec0(
-    embedding float[384]
-);
-"""
+# Partitioned by project (+ fact type metadata) so scoped KNN filters inside vec0.
+# Float layout; int8/binary layouts come from vec_store.vec_schema(quantization).
+VEC_SCHEMA = vec_schema("none")
 
 
 def upgrade_schema(db):
@@ -546,6 +619,7 @@ def upgrade_schema(db):
             language TEXT NOT NULL,
             file_mtime REAL NOT NULL,
             file_size INTEGER DEFAULT 0,
+            content_hash TEXT,
             symbol_count INTEGER DEFAULT 0,
             is_dirty INTEGER DEFAULT 0,
             indexed_at TEXT NOT NULL,
@@ -634,8 +708,82 @@ def upgrade_schema(db):
             session_id TEXT
         );
         CREATE INDEX IF NOT EXISTS idx_facts_history_fact ON facts_history(fact_id);
+
+        -- Query-embedding cache (normalised query hash -> vector, per model)
+        CREATE TABLE IF NOT EXISTS query_embeddings (
+            query_hash TEXT NOT NULL,
+            model TEXT NOT NULL,
+            embedding BLOB NOT NULL,
+            created TEXT NOT NULL,
+            last_used TEXT NOT NULL,
+            hits INTEGER DEFAULT 0,
+            PRIMARY KEY (query_hash, model)
+        );
+        CREATE INDEX IF NOT EXISTS idx_query_embeddings_used ON query_embeddings(last_used);
+
+        -- Content-addressed embedding store (sha256(model, text) -> vector)
+        CREATE TABLE IF NOT EXISTS embedding_store (
+            content_hash TEXT PRIMARY KEY,
+            model TEXT NOT NULL,
+            embedding BLOB NOT NULL,
+            created TEXT NOT NULL,
+            last_used TEXT NOT NULL
+        );
+
+        -- Embedding models and their vec tables (serving / background re-embedding)
+        CREATE TABLE IF NOT EXISTS embedding_models (
+            model_id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            dim INTEGER NOT NULL,
+            truncate INTEGER,
+            facts_table TEXT NOT NULL,
+            chunks_table TEXT NOT NULL,
+            state TEXT NOT NULL CHECK(state IN ('building', 'ready')),
+            created TEXT NOT NULL,
+            completed TEXT,
+            owner TEXT,
+            heartbeat TEXT
+        );
+
+        -- Per-call MCP tool metrics (ring buffer of the last metrics.keep_rows calls)
+        CREATE TABLE IF NOT EXISTS tool_metrics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT NOT NULL,
+            tool TEXT NOT NULL,
+            project TEXT,
+            session_id TEXT,
+            pid INTEGER,
+            duration_ms REAL NOT NULL,
+            sql_count INTEGER DEFAULT 0,
+            embed_ms REAL DEFAULT 0,
+            lock_wait_ms REAL DEFAULT 0,
+            ok INTEGER DEFAULT 1,
+            db_mb REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_tool_metrics_project ON tool_metrics(project, tool);
+
+        -- Git state of the last complete code/doc index run (git_scan.py)
+        CREATE TABLE IF NOT EXISTS git_index_state (
+            project TEXT NOT NULL,
+            indexer TEXT NOT NULL,
+            commit_sha TEXT NOT NULL,
+            dirty_paths TEXT NOT NULL DEFAULT '[]',
+            updated TEXT NOT NULL,
+            PRIMARY KEY (project, indexer)
+        );
     """)
 
+    # Content hashes for change detection (skip re-indexing files whose bytes are unchanged)
+    for table, col, typedef in [
+        ("file_chunks", "file_size", "INTEGER"),
+        ("file_chunks", "content_hash", "TEXT"),
+        ("code_files", "content_hash", "TEXT"),
+    ]:
+        try:
+            db.execute(f"ALTER TABLE {table} ADD COLUMN {col} {typedef}")
+        except sqlite3.OperationalError:
+            pass  # Column already exists
+
     # New columns on projects table (cross-instance coordination)
     for col, typedef in [
         ("last_decay", "TEXT"),
@@ -646,6 +794,8 @@ def upgrade_schema(db):
         except sqlite3.OperationalError:
             pass  # Column already exists
 
+    upgrade_code_fts_triggers(db)
+
     # Record current schema version
     try:
         existing = db.execute("SELECT MAX(version) FROM schema_version").fetchone()
@@ -655,11 +805,141 @@ def upgrade_schema(db):
                 INSERT OR IGNORE INTO schema_version (version, applied, description)
                 VALUES (5, ?, 'QA fixes: schema_version, retrieval_log, last_decay, last_consolidated')
             """, (datetime.now().isoformat(),))
+        if current_version < SCHEMA_VERSION:
+            db.execute("""
+                INSERT OR IGNORE INTO schema_version (version, applied, description)
+                VALUES (?, ?, ?)
+            """, (SCHEMA_VERSION, datetime.now().isoformat(), SCHEMA_DESCRIPTION))
     except Exception:
         pass  # Table may not exist yet (first migration)
 
     db.commit()
 
+    upgrade_vec_schema(db)
+
+
+def upgrade_code_fts_triggers(db):
+    """Recreate pre-v10 code_symbols FTS triggers with the bulk-sync gate.
+
+    Drop and create run in one transaction, so no symbol write sees them missing.
+    No-op when the triggers are current or FTS5 was never set up.
+    """
+    names = ("code_symbols_ai", "code_symbols_ad", "code_symbols_au")
+    rows = db.execute(f"""
+        SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name IN ({",".join("?" * len(names))})
+    """, names).fetchall()
+    if not rows or all("code_symbols_fts_bulk" in r[0] for r in rows):
+        return
+    drops = "".join(f"DROP TRIGGER IF EXISTS {name};\n" for name in names)
+    try:
+        db.executescript("BEGIN IMMEDIATE;\n" + drops + FTS_SCHEMA + "\nCOMMIT;")
+    except BaseException:
+        if db.in_transaction:
+            db.rollback()
+        raise
+
+
+def schema_current(db) -> bool:
+    """True when upgrade_schema() already ran at SCHEMA_VERSION (vec layout not included)."""
+    try:
+        row = db.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    except sqlite3.OperationalError:
+        return False
+    return bool(row and row[0] and row[0] >= SCHEMA_VERSION)
+
+
+def _vec_table_pairs(db) -> list[tuple[str, str, int]]:
+    """(facts table, chunks table, dim) of every registered embedding model.
+
+    Includes the legacy facts_vec/chunks_vec pair when no model is registered yet.
+    """
+    try:
+        pairs = [tuple(r) for r in db.execute(
+            "SELECT facts_table, chunks_table, COALESCE(truncate, dim) FROM embedding_models"
+        ).fetchall()]
+    except sqlite3.OperationalError:
+        pairs = []
+    return pairs or [("facts_vec", "chunks_vec", 384)]
+
+
+def _stale_vec_tables(db, tables: tuple[str, ...], target: str) -> dict[str, str]:
+    """{table: float column to read} for existing tables not in the target layout."""
+    from vec_store import is_partitioned, table_quantization
+
+    stale = {}
+    for table in tables:
+        exists = db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        ).fetchone()
+        if not exists:
+            continue
+        current = table_quantization(db, table)
+        if not is_partitioned(db, table) or current != target:
+            stale[table] = "v.embedding" if current == "none" else "v.full"
+    return stale
+
+
+def upgrade_vec_schema(db):
+    """Rebuild vector tables whose layout differs from the configured one.
+
+    Covers pre-partition tables (embedding only) and a changed
+    `embedding.quantization` mode, for every embedding model's table pair. vec0
+    has no ALTER TABLE, so the float vectors are read out (from `full` on
+    quantized tables), the tables dropped, recreated from vec_schema() and
+    refilled — all in one BEGIN IMMEDIATE transaction per table pair, so a crash
+    or kill midway leaves the old tables intact. The layout is checked again
+    under the lock, so concurrently starting servers rebuild only once.
+    Embeddings of facts/chunks that no longer exist are dropped.
+    No-op when sqlite-vec is unavailable or nothing changed.
+    """
+    from db import ensure_vec
+    from vec_store import insert_sql
+
+    if not ensure_vec(db):
+        return
+
+    target = configured_quantization()
+    for facts_table, chunks_table, dim in _vec_table_pairs(db):
+        if not _stale_vec_tables(db, (facts_table, chunks_table), target):
+            continue
+        if db.in_transaction:
+            db.commit()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            stale = _stale_vec_tables(db, (facts_table, chunks_table), target)
+            if not stale:
+                db.rollback()  # Another server rebuilt them meanwhile
+                continue
+
+            fact_rows = chunk_rows = []
+            if facts_table in stale:
+                fact_rows = db.execute(f"""
+                    SELECT v.rowid, f.project, f.type, {stale[facts_table]}
+                    FROM {facts_table} v JOIN facts f ON f.rowid = v.rowid
+                """).fetchall()
+            if chunks_table in stale:
+                chunk_rows = db.execute(f"""
+                    SELECT v.rowid, fc.project, {stale[chunks_table]}
+                    FROM {chunks_table} v JOIN file_chunks fc ON fc.rowid = v.rowid
+                """).fetchall()
+
+            for table in stale:
+                db.execute(f"DROP TABLE {table}")
+            # One statement at a time: executescript() would commit mid-rebuild
+            for statement in vec_schema(target, dim, facts_table, chunks_table).split(";"):
+                if statement.strip():
+                    db.execute(statement)
+
+            full = (lambda r: tuple(r)) if target == "none" else (lambda r: tuple(r) + (r[-1],))
+            db.executemany(insert_sql(facts_table, ["project", "type"], target),
+                           [full(r) for r in fact_rows])
+            db.executemany(insert_sql(chunks_table, ["project"], target),
+                           [full(r) for r in chunk_rows])
+            db.commit()
+        except BaseException:
+            db.rollback()
+            raise
+
 
 def rebuild_fts(db):
     """Rebuild FTS5 indexes from source tables."""
@@ -694,8 +974,10 @@ def init_db():
     # Phase 2: Create vector tables if sqlite-vec is available
     try:
         db.execute("SELECT vec_version()")
-        db.executescript(VEC_SCHEMA)
-        db.commit()
+        # Registers the configured embedding model and creates its tables; a model
+        # change is re-embedded by the MCP server or backfill_embeddings.py
+        from embedding_models import ensure_configured_model
+        ensure_configured_model(db)
     except Exception:
         pass  # sqlite-vec not loaded, skip vector tables
 
@@ -0,0 +1,555 @@
+"""CogniLayer i18n catalog — English. Loaded by i18n.t() when the language is active."""
+
+MESSAGES: dict[str, str] = {
+    # ======================================================================
+    # server.py — tool descriptions
+    # ======================================================================
+    "tool.memory_search.desc": (
+        "Search CogniLayer memory. Finds relevant information "
+        "from past sessions, decisions, patterns and facts. "
+        "Automatically detects STALE facts (source_file changed)."
+    ),
+    "tool.memory_search.param.query": "What to search for. Natural language.",
+    "tool.memory_search.param.scope": "project (default) | all | {project_name}",
+    "tool.memory_search.param.type": (
+        "Fact type: decision|fact|pattern|issue|task|skill|gotcha|"
+        "procedure|error_fix|command|performance|api_contract|dependency|client_rule"
+    ),
+    "tool.memory_search.param.tags": "Filter by tags (e.g. 'subagent' or 'subagent,auth-review'). All specified tags must match.",
+    "tool.memory_search.param.limit": "Max results (default 5, max 10)",
+    "tool.memory_search.param.fusion": "Hybrid ranking: rrf (default) | linear | legacy",
+
+    "tool.memory_write.desc": (
+        "Save important information to CogniLayer memory. "
+        "Use PROACTIVELY — save as you learn, not just during /harvest. "
+        "Updates are versioned — previous content is saved to facts_history."
+    ),
+    "tool.memory_write.param.content": "What to remember. Must be self-contained.",
+    "tool.memory_write.param.type": (
+        "Type: fact|decision|pattern|issue|task|skill|gotcha|"
+        "procedure|error_fix|command|performance|api_contract|dependency|client_rule"
+    ),
+    "tool.memory_write.param.tags": "Tags separated by comma.",
+    "tool.memory_write.param.domain": "Domain: auth, ui, deploy, seo...",
+    "tool.memory_write.param.source_file": "Relative path to the file where the fact was observed.",
+
+    "tool.memory_delete.desc": "Delete facts from CogniLayer memory by ID. Previous content is saved to facts_history for undo.",
+    "tool.memory_delete.param.ids": "UUIDs of facts to delete.",
+
+    "tool.file_search.desc": (
+        "Search indexed project files (PRD, handoff, docs). "
+        "Returns relevant sections/chunks INSTEAD of whole files — saves context."
+    ),
+    "tool.file_search.param.query": "What to search for in project files.",
+    "tool.file_search.param.scope": "project (default) | {project_name}",
+    "tool.file_search.param.file_filter": "Glob pattern, e.g. *.md or PRD*",
+    "tool.file_search.param.limit": "Max chunks (default 5, max 10)",
+    "tool.file_search.param.fusion": "Hybrid ranking: rrf (default) | linear | legacy",
+
+    "tool.project_context.desc": "Return Project DNA and current context for the detected project.",
+
+    "tool.session_bridge.desc": "Load or save session bridge (session summary for continuity).",
+    "tool.session_bridge.param.action": "load | save",
+    "tool.session_bridge.param.content": "Bridge content (for save only).",
+
+    "tool.decision_log.desc": "Search decision log for current or specified project.",
+    "tool.decision_log.param.query": "Filter. Empty = latest decisions.",
+    "tool.decision_log.param.project": "Specific project. Default: current.",
+    "tool.decision_log.param.limit": "Number of results (default 5).",
+
+    "tool.verify_identity.desc": (
+        "MANDATORY before any deploy, SSH, push, PM2, DB migration. "
+        "Verifies Identity Card and returns VERIFIED/BLOCKED/WARNING."
+    ),
+    "tool.verify_identity.param.action_type": (
+        "deploy|ssh|push|pm2|db-migrate|docker-remote|proxy-reload|service-mgmt"
+    ),
+
+    "tool.identity_set.desc": "Set Project Identity Card fields.",
+    "tool.identity_set.param.fields": (
+        'Keys and values to set. E.g.: {{"deploy_ssh_alias": "my-server", "deploy_app_port": 3000}}'
+    ),
+    "tool.identity_set.param.lock_safety": "Lock safety fields?",
+
+    "tool.recommend_tech.desc": "Recommend tech stack based on similar projects.",
+    "tool.recommend_tech.param.description": "Project description (simple website, SaaS...)",
+    "tool.recommend_tech.param.similar_to": "Name of existing project for inspiration.",
+    "tool.recommend_tech.param.category": "saas-app|agency-site|simple-website|ecommerce|api|cli-tool",
+
+    # ======================================================================
+    # server.py — error messages
+    # ======================================================================
+    "tool.trace_dump.desc": (
+        "Tracing diagnostics: per-span latency percentiles (p50/p95/p99) and the slowest "
+        "recent spans of this MCP server. Requires tracing.enabled in config.yaml."
+    ),
+    "tool.trace_dump.param.prefix": "Only spans whose name starts with this, e.g. 'tool.' or 'fts.'",
+    "tool.trace_dump.param.slowest": "How many of the slowest recent spans to list (default 10, max 50).",
+    "trace_dump.disabled": "Tracing is off. Set `tracing.enabled: true` in ~/.cognilayer/config.yaml and restart the MCP server.",
+    "trace_dump.empty": "No spans recorded yet.",
+    "trace_dump.header": "## Latency by span (this server process)",
+    "trace_dump.slowest": "### Slowest recent spans",
+    "server.unknown_tool": "Unknown tool: {name}",
+    "server.tool_error": "Error in {name}: {error}",
+    "server.tool_timeout": "{name} did not finish within {seconds:.0f}s and was asked to stop. Partial work is kept; run it again to continue.",
+
+    # ======================================================================
+    # memory_search.py
+    # ======================================================================
+    "memory_search.no_results": (
+        "No results for '{query}'. Memory is empty or query does not match any facts."
+    ),
+    "memory_search.header": "## Found {count} results for '{query}'\n",
+    "memory_search.stale": "STALE — source file {source_file} changed since this fact was recorded!",
+    "memory_search.stale_hint": "-> VERIFY before using: Read {source_file}",
+    "memory_search.deleted": "DELETED — source file {source_file} was deleted!",
+    "memory_search.cross_project": "CROSS-PROJECT — from project {project}",
+    "memory_search.linked_fact": "[{id}] {preview}",
+
+    # ======================================================================
+    # memory_write.py
+    # ======================================================================
+    "memory_write.exists_unchanged": "Fact already exists (unchanged): {preview}...",
+    "memory_write.updated": "Updated in memory: {preview}... [project: {project}, type: {type}]",
+    "memory_write.saved": "Saved to memory: {preview}... [project: {project}, type: {type}]",
+    "memory_write.failed_locked": "FAILED to save — database locked/busy, data was NOT persisted: {preview}... Include this content in your return text as fallback.",
+    "memory_write.blocked_secret": (
+        "BLOCKED — Content appears to contain a secret ({secret_type}). "
+        "Secrets must NEVER be saved to memory. Remove the sensitive data and try again."
+    ),
+
+    # ======================================================================
+    # memory_delete.py
+    # ======================================================================
+    "memory_delete.no_ids": "No IDs to delete.",
+    "memory_delete.deleted": "Deleted {deleted} facts from memory.",
+
+    # ======================================================================
+    # memory_link.py
+    # ======================================================================
+    "tool.memory_link.desc": "Manually link two facts in CogniLayer memory.",
+    "tool.memory_link.param.source_id": "UUID of the source fact.",
+    "tool.memory_link.param.target_id": "UUID of the target fact.",
+    "memory_link.not_found": "Fact not found: {id}",
+    "memory_link.already_linked": "Already linked: '{source}' <-> '{target}'",
+    "memory_link.linked": "Linked: '{source}' <-> '{target}'",
+    "memory_link.self_link": "Cannot link a fact to itself.",
+
+    # ======================================================================
+    # file_search.py
+    # ======================================================================
+    "file_search.no_results": "No results found for '{query}'.",
+    "file_search.not_indexed": "No results found for '{query}'.\nNote: No documents indexed for this project yet. Run file_index() to index project docs (PRD, README, configs).",
+    "file_search.header": "## Found {count} chunks for '{query}'\n",
+    "file_search.no_title": "(no heading)",
+    "file_search.section_label": "section",
+
+    # ======================================================================
+    # project_context.py
+    # ======================================================================
+    "project_context.no_project": "No active project. Run claude in a project directory.",
+    "project_context.not_registered": "Project '{project}' is not registered in CogniLayer.",
+    "project_context.dna_placeholder": "## Project DNA: {project}\n[DNA not yet generated]",
+    "project_context.stats": (
+        "\n## Statistics\n"
+        "- Facts in memory: {facts_count} (hot: {hot_count})\n"
+        "- Indexed chunks: {chunks_count}\n"
+        "- Sessions: {sessions_count}\n"
+        "- Recorded changes: {changes_count}"
+    ),
+    "project_context.health_header": "\n## Memory Health\n",
+    "project_context.health_stats": "- Total: {total} | Hot: {hot} | Warm: {warm} | Cold: {cold}",
+    "project_context.most_retrieved": "- Most retrieved: \"{content}\" ({count}x)",
+    "project_context.never_retrieved": "- Never retrieved: {count} facts",
+    "project_context.gaps_header": "## Knowledge Gaps (unresolved)",
+    "project_context.gaps_item": "- \"{query}\" (asked {times}x)",
+    "project_context.no_gaps": "## Knowledge Gaps\nNo unresolved gaps.",
+    "project_context.avg_retrievals": "- Avg retrievals/fact: {avg:.1f}",
+
+    # ======================================================================
+    # session_bridge.py
+    # ======================================================================
+    "session_bridge.no_bridge": "No session bridge available.",
+    "session_bridge.missing_content": "Missing bridge content to save.",
+    "session_bridge.no_session": "No active session.",
+    "session_bridge.saved": "Session bridge saved.",
+    "session_bridge.unknown_action": "Unknown action: {action}. Use 'load' or 'save'.",
+
+    # ======================================================================
+    # decision_log.py
+    # ======================================================================
+    "decision_log.no_decisions": "No decisions{search_info} in project {project}.",
+    "decision_log.search_info": " for '{query}'",
+    "decision_log.header": "## Decisions for {project}\n",
+    "decision_log.reason_label": "Reason: ",
+    "decision_log.alternatives_label": "Alternatives: ",
+
+    # ======================================================================
+    # verify_identity.py
+    # ======================================================================
+    "verify_identity.blocked_no_project": "BLOCKED — No active project.",
+    "verify_identity.blocked_unknown_action": (
+        "BLOCKED — Unknown action_type: {action_type}. Allowed: {allowed}"
+    ),
+    "verify_identity.not_set": "[NOT SET]",
+    "verify_identity.blocked_no_identity": (
+        "BLOCKED — Project '{project}' has no Identity Card.\n"
+        "Missing safety fields for '{action_type}':\n{missing}\n\n"
+        "ASK the user for these values.\n"
+        "Use /identity set to configure."
+    ),
+    "verify_identity.blocked_missing_fields": (
+        "BLOCKED — Missing safety fields for '{action_type}':\n{missing}\n\n"
+        "ASK the user for these values.\n"
+        "Use /identity set to configure."
+    ),
+    "verify_identity.warning_unlocked": (
+        "WARNING — Identity fields exist but are NOT LOCKED.\n\n"
+        "Current values:\n{fields}\n\n"
+        "Present values to the user and request explicit confirmation.\n"
+        "To lock: /identity lock"
+    ),
+    "verify_identity.blocked_tampered": (
+        "BLOCKED — Safety fields were changed outside /identity update!\n"
+        "Hash mismatch: expected {expected}, got {actual}\n"
+        "Use /identity lock to re-lock."
+    ),
+    "verify_identity.verified": (
+        "VERIFIED — Project: {project}\n"
+        "Server: {ssh_alias} ({ssh_host})\n"
+        "App Port: {app_port}\n"
+        "Deploy Path: {deploy_path}\n"
+        "PM2: {pm2_name} (id={pm2_id})\n"
+        "Domain: {domain}\n"
+        "Method: {method}\n"
+        "Git Branch: {branch}\n\n"
+        "CONFIRM with user: 'Will {action_type} on {ssh_alias} for {domain}.'"
+    ),
+
+    # ======================================================================
+    # identity_set.py
+    # ======================================================================
+    "identity_set.no_project": "No active project.",
+    "identity_set.unknown_fields": "Unknown fields: {invalid}. Allowed: {allowed}",
+    "identity_set.blocked_locked": (
+        "BLOCKED — Safety fields are locked.\n"
+        "Attempted change: {changes}\n"
+        "Use /identity update to change locked fields."
+    ),
+    "identity_set.updated": "Identity Card updated for {project}:",
+    "identity_set.safety_locked": "locked",
+    "identity_set.safety_unlocked": "unlocked",
+    "identity_set.safety_status": "Safety fields: {status}",
+
+    # ======================================================================
+    # recommend_tech.py
+    # ======================================================================
+    "recommend_tech.header": "## Tech recommendation\n",
+    "recommend_tech.based_on_project": "Based on project: {project}\n",
+    "recommend_tech.recommended_stack": "Recommended stack:",
+    "recommend_tech.apply_hint": "To apply: /identity tech-from {project}",
+    "recommend_tech.no_identity": "Project '{project}' has no Identity Card.",
+    "recommend_tech.no_projects": (
+        "No projects with Identity Card in database. Use /onboard to register projects."
+    ),
+    "recommend_tech.based_on_desc": "Based on description: {description}\n",
+    "recommend_tech.similar_projects": "Similar projects in portfolio:",
+    "recommend_tech.apply_stack_hint": "To apply stack: /identity tech-from <project-name>",
+    "recommend_tech.edit_hint": "To edit: /identity set framework=... css_approach=...",
+
+    # ======================================================================
+    # hooks/on_session_start.py
+    # ======================================================================
+    "claude_md.template": (
+        "## CogniLayer v4 Active\n"
+        "Persistent memory + code intelligence is ON.\n"
+        "ON FIRST USER MESSAGE in this session, briefly tell the user:\n"
+        "  'CogniLayer v4 active — persistent memory is on. Type /cognihelp for available commands.'\n"
+        "Say it ONCE, keep it short, then continue with their request.\n"
+        "\n"
+        "## Tools — HOW TO WORK\n"
+        "\n"
+        "FIRST RUN ON A PROJECT:\n"
+        'When DNA shows "[new session]" or "[first session]":\n'
+        "1. Run /onboard — indexes project docs (PRD, README), builds initial memory\n"
+        "2. Run code_index() — builds AST index for code intelligence\n"
+        "Both are one-time. After that, updates are incremental.\n"
+        "If file_search or code_search return empty → these haven't been run yet.\n"
+        "\n"
+        "UNDERSTAND FIRST (before making changes):\n"
+        "- memory_search(query) → what do we know? Past bugs, decisions, gotchas\n"
+        "- code_context(symbol) → how does the code work? Callers, callees, dependencies\n"
+        "- file_search(query) → search project docs (PRD, README) without reading full files\n"
+        "- code_search(query) → find where a function/class is defined\n"
+        "Use BOTH memory + code tools for complete picture. They are fast — call in parallel.\n"
+        "\n"
+        "BEFORE RISKY CHANGES (mandatory):\n"
+        "- Renaming, deleting, or moving a function/class → code_impact(symbol) FIRST\n"
+        "- Changing a function's signature or return value → code_impact(symbol) FIRST\n"
+        "- Modifying shared utilities used across multiple files → code_impact(symbol) FIRST\n"
+        "- ALSO: memory_search(symbol) → check for related decisions or known gotchas\n"
+        "Both required. Structure tells you what breaks, memory tells you WHY it was built that way.\n"
+        "\n"
+        "AFTER COMPLETING WORK:\n"
+        "- memory_write(content) → save important discoveries immediately\n"
+        "  (error_fix, gotcha, pattern, api_contract, procedure, decision)\n"
+        '- session_bridge(action="save", content="Progress: ...; Open: ...")\n'
+        "DO NOT wait for /harvest — session may crash.\n"
+        "\n"
+        "SUBAGENT MEMORY PROTOCOL:\n"
+        "When spawning Agent tool for research or exploration:\n"
+        "- Include in prompt: synthesize findings into consolidated memory_write(content, type, tags=\"subagent,<task-topic>\") facts\n"
+        "  Assign a descriptive topic tag per subagent (e.g. tags=\"subagent,auth-review\", tags=\"subagent,perf-analysis\")\n"
+        "- Do NOT write each discovery separately — group related findings into cohesive facts\n"
+        "- Write to memory as the LAST step before return, not incrementally — saves turns and tokens\n"
+        "- Each fact must be self-contained with specific details (file paths, values, code snippets)\n"
+        "- When findings relate to specific files, include domain and source_file for better search and staleness detection\n"
+        "- End each fact with 'Search: keyword1, keyword2' — keywords INSIDE the fact survive context compaction\n"
+        "- Record significant negative findings too (e.g. 'no rate limiting exists in src/api/' — prevents repeat searches)\n"
+        "- Return: actionable summary (file paths, function names, specific values) + what was saved + keywords for memory_search\n"
+        "- If MCP tools unavailable or fail → include key findings directly in return text as fallback\n"
+        "- Launch subagents as foreground (default) for reliable MCP access — user can Ctrl+B to background later\n"
+        "Why: without this protocol, subagent returns dump all text into parent context (40K+ tokens).\n"
+        "With protocol, findings go to DB and parent gets ~500 token summary + on-demand memory_search.\n"
+        "\n"
+        "BEFORE DEPLOY/PUSH:\n"
+        '- verify_identity(action_type="...") → mandatory safety gate\n'
+        "- If BLOCKED → STOP and ask the user\n"
+        "- If VERIFIED → READ the target server to the user and request confirmation\n"
+        "\n"
+        "## VERIFY-BEFORE-ACT\n"
+        "When memory_search returns a fact marked ⚠ STALE:\n"
+        "1. Read the source file and verify the fact still holds\n"
+        "2. If changed → update via memory_write\n"
+        "3. NEVER act on STALE facts without verification\n"
+        "\n"
+        "## Process Management (Windows)\n"
+        "- NEVER use `taskkill //F //IM node.exe` — kills ALL Node.js INCLUDING Claude Code CLI!\n"
+        "- Use: `npx kill-port PORT` or find PID via `netstat -ano | findstr :PORT` then `taskkill //F //PID XXXX`\n"
+        "\n"
+        "## Git Rules\n"
+        '- Commit often, small atomic changes. Format: "[type] what and why"\n'
+        "- commit = Tier 1 (do it yourself). push = Tier 3 (verify_identity)."
+    ),
+
+    "claude_md.do_not_delete": "auto-generated, do not delete",
+
+    "crash.session_summary": "[CRASH] Session was not properly closed",
+    "crash.recovery": (
+        "## Crash Recovery\n"
+        "Last session ({start_time}) was not properly closed (crash/kill).\n"
+        "Recorded {changes} file changes before crash.\n"
+        "Last changed files: {last_files}\n"
+        "Bridge from previous session is valid (above).\n"
+        'For details use: memory_search("changes last session")'
+    ),
+    "crash.no_files": "none",
+
+    "dna.unknown_stack": "unknown",
+    "dna.unknown_style": "[unknown]",
+    "dna.deploy_not_set": "[NOT SET]",
+    "dna.new_session": "[new session]",
+    "dna.first_session": "[first session]",
+    "dna.not_generated": "[DNA not yet generated]",
+
+    # ======================================================================
+    # memory_chain.py
+    # ======================================================================
+    "tool.memory_chain.desc": (
+        "Create a causal chain link between two facts. "
+        "Tracks cause->effect relationships (caused, led_to, blocked, fixed, broke)."
+    ),
+    "tool.memory_chain.param.cause_id": "UUID of the cause fact.",
+    "tool.memory_chain.param.effect_id": "UUID of the effect fact.",
+    "tool.memory_chain.param.relationship": (
+        "Relationship type: caused|led_to|blocked|fixed|broke (default: caused)"
+    ),
+    "memory_chain.self_chain": "Cannot create a causal chain from a fact to itself.",
+    "memory_chain.invalid_relationship": (
+        "Invalid relationship '{relationship}'. Valid: {valid}"
+    ),
+    "memory_chain.not_found": "Fact not found: {id}",
+    "memory_chain.cross_project": (
+        "Cannot link facts across projects: {cause_project} != {effect_project}"
+    ),
+    "memory_chain.already_exists": (
+        "Causal chain already exists: '{cause}' -> '{effect}'"
+    ),
+    "memory_chain.created": (
+        "Causal chain created: '{cause}' --[{relationship}]--> '{effect}'"
+    ),
+
+    # ======================================================================
+    # memory_search.py — causal chain display
+    # ======================================================================
+    "memory_search.chain_caused": "{relationship}: [{id}] {preview}",
+    "memory_search.chain_caused_by": "{relationship} by: [{id}] {preview}",
+
+    # ======================================================================
+    # project_context.py — episodes + organization
+    # ======================================================================
+    "project_context.episodes_header": "## Recent Episodes",
+    "project_context.episodes_item": "- [{outcome}] \"{title}\" ({date})",
+    "project_context.org_header": "## Memory Organization",
+    "project_context.org_stats": (
+        "- Clusters: {clusters} | Active: {active} | Reference: {reference} | Archive: {archive}"
+    ),
+    "project_context.org_contradictions": "- Contradictions: {count} unresolved",
+
+    # ======================================================================
+    # consolidate.py
+    # ======================================================================
+    "consolidate.no_project": "No active project. Specify project name or run in a project directory.",
+    "consolidate.report": (
+        "## Consolidation Report for {project}\n"
+        "- Clusters found: {clusters} ({labeled} labeled)\n"
+        "- Tiers: Active={active} | Reference={reference} | Archive={archive}\n"
+        "- New contradictions detected: {contradictions}"
+    ),
+    "consolidate.stale_contradiction": (
+        "Same file '{file}' has multiple {type} facts with different mtimes (one may be stale)"
+    ),
+    "consolidate.age_contradiction": (
+        "Same domain '{domain}' has {type} facts >30 days apart (may be outdated)"
+    ),
+
+    # ======================================================================
+    # hooks/on_session_end.py
+    # ======================================================================
+    "session_end.emergency_header": "[Emergency bridge — running bridge was not updated]",
+    "session_end.and_more": "  ... and {count} more",
+    "session_end.no_changes": "No changes or facts in this session.",
+
+    # ======================================================================
+    # session_init.py (Codex MCP tool)
+    # ======================================================================
+    "tool.session_init.desc": (
+        "Initialize CogniLayer session (for Codex CLI ONLY — Claude Code uses hooks instead, "
+        "do NOT call this if you already have CogniLayer context in CLAUDE.md). "
+        "Returns DNA + bridge + crash recovery."
+    ),
+    "tool.session_init.param.project_path": (
+        "Path to the project directory. Auto-detects from CWD if not provided."
+    ),
+    "session_init.no_db": "CogniLayer DB not found. Run install first.",
+    "session_init.invalid_path": "Invalid project path: {path}",
+    "session_init.error": "Session init error: {error}",
+    "session_init.header": "## Session initialized for {project}\nSession ID: {session_id}",
+    "session_init.instructions": (
+        "## Reminders\n"
+        "- Use memory_write proactively to save findings\n"
+        "- At session end: session_bridge(action=\"save\", content=\"Progress: ...; Open: ...\")\n"
+        "- Before deploy/push: verify_identity(action_type=\"...\")"
+    ),
+
+    # ======================================================================
+    # File indexing (file_index)
+    # ======================================================================
+    "tool.file_index.desc": (
+        "Index project documentation files (README, configs, PRD, YAML, JSON, TOML) "
+        "into file_chunks so that file_search() returns results. "
+        "Run once per project. Incremental — only re-indexes changed files."
+    ),
+    "tool.file_index.param.project_path": "Override project path. Default: detected from session.",
+    "tool.file_index.param.full": "Force full re-index (clear all chunks first). Default: false (incremental).",
+    "tool.file_index.param.time_budget": "Max seconds for indexing (default 30). Partial results returned on timeout.",
+    "file_index.no_path": "Cannot determine project path. Provide project_path or run session_init first.",
+    "file_index.invalid_path": "Invalid project path: {path}",
+    "file_index.error": "File indexing failed: {error}",
+    "file_index.success": (
+        "File indexing complete for '{project}'.\n"
+        "  Files indexed this run: {indexed}\n"
+        "  Total indexed files: {total_files}\n"
+        "  Total chunks: {total_chunks}\n"
+        "  Indexable files found: {available}\n"
+        "file_search() is now ready."
+    ),
+
+    # ======================================================================
+    # Code Intelligence tools (code_index, code_search, code_context, code_impact)
+    # ======================================================================
+    "tool.code_index.desc": (
+        "Index project source code (tree-sitter AST → symbols + references into SQLite). "
+        "Enables code_context, code_impact, and code_search. Incremental by default."
+    ),
+    "tool.code_index.param.project_path": "Override project path. Default: detected from session.",
+    "tool.code_index.param.full": "Force full re-index (ignore cache). Default: false (incremental).",
+    "tool.code_index.param.time_budget": "Max seconds for indexing (default 30). Partial results returned on timeout.",
+
+    "tool.code_search.desc": (
+        "Search code symbols (functions, classes, methods, interfaces) by name or signature. "
+        "Uses FTS5 fulltext. Requires code_index to be run first."
+    ),
+    "tool.code_search.param.query": "Search query — symbol name, partial name, or keyword.",
+    "tool.code_search.param.kind": "Filter by kind: function|class|method|interface|variable|type_alias|enum",
+    "tool.code_search.param.limit": "Max results (default 20, max 50).",
+
+    "tool.code_context.desc": (
+        "360° view of a code symbol: definition, who calls it (incoming), "
+        "what it calls (outgoing), children (methods). Requires code_index."
+    ),
+    "tool.code_context.param.symbol": "Symbol name or qualified name (e.g. 'open_db' or 'MyClass.method').",
+    "tool.code_context.param.project_name": "Override project. Default: current.",
+
+    "tool.code_impact.desc": (
+        "Blast radius analysis — BFS traversal of incoming references to find "
+        "everything affected by changing a symbol. Requires code_index."
+    ),
+    "tool.code_impact.param.symbol": "Symbol to analyze impact for.",
+    "tool.code_impact.param.max_depth": "Max BFS depth (1-5, default 3).",
+    "tool.code_impact.param.project_name": "Override project. Default: current.",
+
+    # Code Intelligence result messages
+    "code.no_treesitter": (
+        "tree-sitter-language-pack is not installed. "
+        "Run: pip install tree-sitter-language-pack"
+    ),
+    "code.no_project": "No active project. Run Claude in a project directory.",
+    "code.not_indexed": (
+        "Project '{project}' has no code index yet. "
+        "Run code_index first to build the symbol database."
+    ),
+    "code.db_busy": "Database is busy (another process holds the lock). Try again in a moment.",
+    "code.db_error": "Database error: {error}",
+    "code.generic_error": "Code intelligence error: {error}",
+
+    # code_index results
+    "code.index_header": "## Code Index: {project}",
+    "code.index_partial": (
+        "Indexing interrupted after {elapsed}s — partial result. "
+        "Run code_index again to continue."
+    ),
+    "code.index_complete": "Indexing completed in {elapsed}s.",
+    "code.index_stats": (
+        "- Files scanned: {files_total}\n"
+        "- Files indexed: {files_indexed} (skipped: {files_skipped})\n"
+        "- Symbols extracted: {symbols}\n"
+        "- References found: {references}\n"
+        "- References resolved: {resolved}"
+    ),
+    "code.index_errors": "Errors ({count}):",
+    "code.index_db_totals": "- **Total in index**: {symbols} symbols, {references} references",
+
+    # code_search results
+    "code.search_header": "## Found {count} symbols for '{query}'",
+    "code.search_no_results": "No symbols found for '{query}'.",
+
+    # code_context results
+    "code.context_header": "## Symbol: {symbol}",
+    "code.context_incoming": "### Incoming references ({count}):",
+    "code.context_no_incoming": "### Incoming references: none",
+    "code.context_outgoing": "### Outgoing references ({count}):",
+    "code.context_no_outgoing": "### Outgoing references: none",
+    "code.context_children": "### Children ({count}):",
+    "code.symbol_not_found": "Symbol '{symbol}' not found in code index.",
+
+    # code_impact results
+    "code.impact_header": (
+        "## Impact Analysis: {symbol}\n"
+        "**Affected:** {total} symbols in {files} files"
+    ),
+    "code.impact_no_refs": "No incoming references found — this symbol is not referenced by other code.",
+    "code.impact_depth": "### Depth {depth} ({count} symbols):",
+    "code.impact_files": "### Affected files:",
+    "code.impact_timeout": "Analysis timed out after {elapsed}s — results may be incomplete.",
+}
@@ -0,0 +1,128 @@
+"""CogniLayer tool metrics — per-call latency, SQL, embedding and lock-wait counters.
+
+The MCP server wraps every tool call in measure(name). The call's counters live
+in a contextvar, so code running in the dispatched tool thread adds to them:
+
+- sql       statements executed on the call's db connections (pooled
+            connections count through a sqlite3 trace callback, count_sql)
+- embed_ms  time spent in embedder.embed_text / embed_texts (timed("embed_ms"))
+- lock_ms   time spent waiting for the pooled writer or a free reader
+
+When the call ends, one row (tool, project, session, server pid, duration,
+counters, memory.db size) is queued on write_behind and lands in the
+tool_metrics table with the next flush. The table is a ring buffer of the last
+`metrics.keep_rows` calls across all CLI instances; the TUI Performance tab
+computes p50/p95/p99 from it. `metrics.enabled: false` turns it all off.
+"""
+
+import contextvars
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+DEFAULT_KEEP_ROWS = 20000
+
+_enabled = True
+_keep_rows = DEFAULT_KEEP_ROWS
+
+
+class _Call:
+    __slots__ = ("tool", "sql", "embed_ms", "lock_ms", "ok")
+
+    def __init__(self, tool: str):
+        self.tool = tool
+        self.sql = 0
+        self.embed_ms = 0.0
+        self.lock_ms = 0.0
+        self.ok = True
+
+
+_current: contextvars.ContextVar[_Call | None] = contextvars.ContextVar("cognilayer_metrics", default=None)
+
+
+def configure() -> bool:
+    """Read `metrics.enabled` / `metrics.keep_rows` from config.yaml. Returns the state."""
+    global _enabled, _keep_rows
+    try:
+        from utils import get_config_section
+        cfg = get_config_section("metrics")
+        _enabled = bool(cfg.get("enabled", True))
+        _keep_rows = max(int(cfg.get("keep_rows", DEFAULT_KEEP_ROWS)), 100)
+    except Exception:
+        pass
+    return _enabled
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def keep_rows() -> int:
+    return _keep_rows
+
+
+def count_sql(statement: str) -> None:
+    """sqlite3 trace callback: count a statement for the current call (trigger bodies excluded)."""
+    call = _current.get()
+    if call is not None and not statement.startswith("--"):
+        call.sql += 1
+
+
+def add(field: str, ms: float) -> None:
+    """Add milliseconds to a counter (embed_ms, lock_ms) of the current call."""
+    call = _current.get()
+    if call is not None:
+        setattr(call, field, getattr(call, field) + ms)
+
+
+@contextmanager
+def timed(field: str):
+    """Time a block into a counter of the current call."""
+    if _current.get() is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        add(field, (time.perf_counter() - t0) * 1000)
+
+
+@contextmanager
+def measure(tool: str):
+    """Collect one tool call's metrics and queue them for the tool_metrics table."""
+    if not _enabled:
+        yield None
+        return
+    call = _Call(tool)
+    token = _current.set(call)
+    t0 = time.perf_counter()
+    try:
+        yield call
+    except BaseException:
+        call.ok = False
+        raise
+    finally:
+        ms = (time.perf_counter() - t0) * 1000
+        _current.reset(token)
+        _record(call, ms)
+
+
+def _record(call: _Call, ms: float) -> None:
+    try:
+        from utils import get_active_session
+        from db import get_db_path
+        import write_behind
+        session = get_active_session()
+        try:
+            db_mb = os.path.getsize(get_db_path()) / (1024 * 1024)
+        except OSError:
+            db_mb = None
+        write_behind.record_tool_metric((
+            datetime.now().isoformat(), call.tool, session.get("project"), session.get("session_id"),
+            os.getpid(), round(ms, 3), call.sql, round(call.embed_ms, 3), round(call.lock_ms, 3),
+            int(call.ok), round(db_mb, 2) if db_mb is not None else None,
+        ))
+    except Exception:
+        pass  # Metrics are best-effort
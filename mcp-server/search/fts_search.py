@@ -8,6 +8,11 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from db import ensure_vec
+from vec_store import knn_cte
+from search.fusion import resolve_mode, candidate_limit, fuse, OVERFETCH
+from search import query_cache
+from embedding_models import serving_tables
+import tracing
 
 _log = logging.getLogger("cognilayer.search.fts_search")
 
@@ -22,14 +27,36 @@ _embed_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
 # --- Helpers ---
 
 def _vec_tables_exist(db: sqlite3.Connection) -> bool:
-    """Check if vector tables exist in the database."""
+    """Check if the serving model's vector tables exist in the database."""
     try:
-        db.execute("SELECT COUNT(*) FROM facts_vec")
+        db.execute(f"SELECT COUNT(*) FROM {serving_tables(db)[1]}")
         return True
     except Exception:
         return False
 
 
+def _embed_query(db: sqlite3.Connection, query: str, spec: dict | None = None) -> bytes | None:
+    """Query embedding from the query cache, else embed_text (10s timeout).
+
+    spec is the embedding model (default: the serving model). Returns None on
+    timeout so callers fall back to FTS5 only.
+    """
+    from embedder import embed_text, is_uncased, model_id
+    spec = spec or serving_tables(db)[0]
+    model, uncased = model_id(spec), is_uncased(spec)
+    cached = query_cache.get(db, query, model, uncased)
+    if cached is not None:
+        return cached
+    future = _embed_executor.submit(embed_text, query, spec)
+    try:
+        embedding = future.result(timeout=10)
+    except concurrent.futures.TimeoutError:
+        _log.warning("embed_text timeout (10s) for query '%s' — falling back to FTS5 only", query[:50])
+        return None
+    query_cache.put(db, query, model, embedding, uncased)
+    return embedding
+
+
 def _is_trivial_query(query: str) -> bool:
     """Check if query is too short/generic to benefit from vector search."""
     stripped = query.strip().strip('"').strip("'").strip("*")
@@ -90,101 +117,94 @@ def _chunk_row_to_dict(row) -> dict:
 def _vec_search_facts(db: sqlite3.Connection, query_embedding: bytes,
                       project: str = None, fact_type: str = None,
                       scope: str = "project", limit: int = 20,
-                      tags: str = None) -> dict[int, float]:
-    """Vector similarity search on facts. Returns {rowid: distance}."""
-    rows = db.execute("""
-        SELECT rowid, distance
-        FROM facts_vec
-        WHERE embedding MATCH ? AND k = ?
-    """, (query_embedding, limit * 3)).fetchall()
-
-    results = {}
-    for row in rows:
-        rowid, distance = row[0], row[1]
-        fact = db.execute("SELECT project, type, tags FROM facts WHERE rowid = ?", (rowid,)).fetchone()
-        if not fact:
-            continue
-        if scope == "project" and project and fact["project"] != project:
-            continue
-        if scope != "all" and scope != "project" and fact["project"] != scope:
-            continue
-        if fact_type and fact["type"] != fact_type:
-            continue
-        if tags and fact["tags"]:
-            fact_tags_str = fact["tags"]
-            if not all(t.strip() in fact_tags_str for t in tags.split(",")):
-                continue
-        elif tags and not fact["tags"]:
-            continue
-        results[rowid] = distance
+                      tags: str = None, overfetch: int = 3,
+                      table: str = "facts_vec") -> dict[int, float]:
+    """Vector similarity search on facts. Returns {rowid: distance}.
 
-    return results
+    Project and type are vec0 partition/metadata constraints and facts matching
+    every tag (the same `tags LIKE` predicate as the FTS5 side) are passed as a
+    candidate rowid set, so the KNN only ranks in-scope facts.
+    """
+    filters = []
+    if scope == "project" and project:
+        filters.append(("project", project))
+    elif scope != "all" and scope != "project":
+        filters.append(("project", scope))
+    if fact_type:
+        filters.append(("type", fact_type))
+
+    tag_list = [tag.strip() for tag in (tags or "").split(",") if tag.strip()]
+    rowids = None
+    if tag_list:
+        rowids = ("SELECT rowid FROM facts WHERE " + " AND ".join(["tags LIKE ?"] * len(tag_list)),
+                  [f"%{tag}%" for tag in tag_list])
+    knn_sql, knn_params = knn_cte(db, table, query_embedding, limit * overfetch, filters, rowids)
+
+    rows = db.execute(f"""
+        WITH knn AS ({knn_sql})
+        SELECT rowid, distance FROM knn ORDER BY distance
+    """, knn_params).fetchall()
+
+    return {row[0]: row[1] for row in rows}
 
 
 def _vec_search_chunks(db: sqlite3.Connection, query_embedding: bytes,
                        project: str = None, file_filter: str = None,
-                       limit: int = 20) -> dict[int, float]:
-    """Vector similarity search on chunks. Returns {rowid: distance}."""
-    rows = db.execute("""
-        SELECT rowid, distance
-        FROM chunks_vec
-        WHERE embedding MATCH ? AND k = ?
-    """, (query_embedding, limit * 3)).fetchall()
-
-    results = {}
-    for row in rows:
-        rowid, distance = row[0], row[1]
-        chunk = db.execute(
-            "SELECT project, file_path FROM file_chunks WHERE rowid = ?", (rowid,)
-        ).fetchone()
-        if not chunk:
-            continue
-        if project and chunk["project"] != project:
-            continue
-        if file_filter:
-            pattern = file_filter.replace("*", "")
-            if pattern not in chunk["file_path"]:
-                continue
-        results[rowid] = distance
+                       limit: int = 20, overfetch: int = 3,
+                       table: str = "chunks_vec") -> dict[int, float]:
+    """Vector similarity search on chunks. Returns {rowid: distance}.
 
-    return results
+    Project is the vec0 partition key; chunks whose path contains file_filter
+    (with `*` removed) are passed to the KNN as a candidate rowid set.
+    """
+    filters = [("project", project)] if project else []
+    rowids = None
+    if file_filter:
+        rowids = ("SELECT rowid FROM file_chunks WHERE instr(file_path, ?) > 0",
+                  [file_filter.replace("*", "")])
+    knn_sql, knn_params = knn_cte(db, table, query_embedding, limit * overfetch, filters, rowids)
 
+    rows = db.execute(f"""
+        WITH knn AS ({knn_sql})
+        SELECT rowid, distance FROM knn ORDER BY distance
+    """, knn_params).fetchall()
 
-# --- Hybrid ranking ---
+    return {row[0]: row[1] for row in rows}
 
-def _hybrid_rank(fts_results: list[dict], vec_distances: dict[int, float],
-                 fts_weight: float = 0.4, vec_weight: float = 0.6) -> list[dict]:
-    """Combine FTS5 and vector results with weighted ranking.
 
-    FTS5 rank: position-based (1st result = 1.0, last = 0.0)
-    Vector distance: converted to similarity (lower distance = higher score)
+def _mark_fts_ranks(results: list[dict], rows) -> list[dict]:
+    """Record FTS5 position and bm25 score on each result (input for rank fusion)."""
+    for i, (result, row) in enumerate(zip(results, rows)):
+        result["_fts_rank"] = i
+        result["_bm25"] = row["bm25_score"] if "bm25_score" in row.keys() else None
+    return results
 
-    Note: vec-only results must be pre-fetched and added to fts_results
-    before calling this function.
-    """
-    fts_scores = {}
-    vec_scores = {}
 
-    # FTS5 scores: position-based
-    for i, result in enumerate(fts_results):
-        rowid = result["rowid"]
-        fts_scores[rowid] = 1.0 - (i / max(len(fts_results), 1))
+# --- Batched hydration ---
 
-    # Vector scores: distance -> similarity (0-1)
-    if vec_distances:
-        max_dist = max(vec_distances.values()) if vec_distances else 1.0
-        for rowid, distance in vec_distances.items():
-            vec_scores[rowid] = 1.0 - (distance / max(max_dist * 1.2, 0.001))
+def _hydrate_rows(db: sqlite3.Connection, table: str, columns: str,
+                  rowids: list[int], row_to_dict) -> list[dict]:
+    """Fetch full rows for many rowids in one query. Preserves the order of rowids."""
+    if not rowids:
+        return []
+    placeholders = ",".join("?" * len(rowids))
+    rows = db.execute(f"""
+        SELECT {columns} FROM {table} WHERE rowid IN ({placeholders})
+    """, rowids).fetchall()
+    by_rowid = {}
+    for row in rows:
+        d = row_to_dict(row)
+        by_rowid[d["rowid"]] = d
+    return [by_rowid[rid] for rid in rowids if rid in by_rowid]
 
-    # Score all results (both FTS and vec-only are already in fts_results)
-    for result in fts_results:
-        rowid = result["rowid"]
-        fts_s = fts_scores.get(rowid, 0.0)
-        vec_s = vec_scores.get(rowid, 0.0)
-        result["_hybrid_score"] = (fts_weight * fts_s) + (vec_weight * vec_s)
 
-    fts_results.sort(key=lambda x: x["_hybrid_score"], reverse=True)
-    return fts_results
+def _merge_vec_hits(db: sqlite3.Connection, fts_results: list[dict],
+                    vec_distances: dict[int, float], table: str, columns: str,
+                    row_to_dict) -> list[dict]:
+    """Append vec-only hits (not already found by FTS5) to fts_results, hydrated in bulk."""
+    fts_rowids = {r["rowid"] for r in fts_results}
+    missing = [rowid for rowid in vec_distances if rowid not in fts_rowids]
+    return fts_results + _hydrate_rows(db, table, columns, missing, row_to_dict)
 
 
 # --- Facts search ---
@@ -194,24 +214,11 @@ _FACTS_COLUMNS = "id, project, content, type, domain, tags, timestamp, heat_scor
 
 def fts_search_facts(db: sqlite3.Connection, query: str, project: str = None,
                      fact_type: str = None, tags: str = None, limit: int = 5,
-                     scope: str = "project") -> list[dict]:
-    """Search facts using FTS5 + optional vector hybrid search."""
-    import logging, time as _t
-    from pathlib import Path as _Path
-    from datetime import datetime as _dt
-    _log = logging.getLogger("cognilayer.fts_search")
-    _t0 = _t.time()
-    _tf = _Path(__file__).parent.parent.parent / "logs" / "trace.log"
-    def _tr(step):
-        msg = f"[{_t.time() - _t0:.3f}s] fts_search: {step}"
-        _log.info("TRACE %s", msg)
-        try:
-            with open(_tf, "a", encoding="utf-8") as f:
-                f.write(f"{_dt.now().isoformat()} {msg}\n")
-        except Exception:
-            pass
+                     scope: str = "project", fusion: str = None) -> list[dict]:
+    """Search facts using FTS5 + optional vector hybrid search.
 
-    _tr(f"START query='{query[:30]}' project={project}")
+    fusion: rank fusion mode (rrf | linear | legacy), default from config.yaml.
+    """
     conditions = []
     params = []
 
@@ -250,14 +257,14 @@ def fts_search_facts(db: sqlite3.Connection, query: str, project: str = None,
     fts_query = _escape_fts5(query)
     fts_where = f"AND {' AND '.join(['f.' + c for c in conditions])}" if conditions else ""
 
-    _tr("START ensure_vec")
-    vec_ready = ensure_vec(db) and _vec_tables_exist(db)
-    _tr(f"ensure_vec done, vec_ready={vec_ready}")
-    fetch_limit = limit * 3 if vec_ready else limit
+    with tracing.span("fts.ensure_vec") as sp:
+        vec_ready = ensure_vec(db) and _vec_tables_exist(db)
+        sp.set(vec_ready=vec_ready)
+    mode = resolve_mode(fusion)
+    fetch_limit = candidate_limit(limit, mode) if vec_ready else limit
 
-    _tr("START FTS5 query")
     sql = f"""
-        SELECT f.{_FACTS_COLUMNS.replace(', ', ', f.')}
+        SELECT f.{_FACTS_COLUMNS.replace(', ', ', f.')}, bm25(facts_fts) AS bm25_score
         FROM facts f
         JOIN facts_fts fts ON f.rowid = fts.rowid
         WHERE facts_fts MATCH ? {fts_where}
@@ -266,55 +273,49 @@ def fts_search_facts(db: sqlite3.Connection, query: str, project: str = None,
     """
     fts_params = [fts_query] + params + [fetch_limit]
 
-    try:
-        rows = db.execute(sql, fts_params).fetchall()
-        _tr(f"FTS5 query done, {len(rows)} rows")
-    except sqlite3.OperationalError:
-        # Fallback: LIKE search if FTS5 query syntax fails
-        where_parts = list(conditions) + ["content LIKE ?"]
-        where = "WHERE " + " AND ".join(where_parts)
-        sql = f"""
-            SELECT {_FACTS_COLUMNS}
-            FROM facts
-            {where}
-            ORDER BY heat_score DESC
-            LIMIT ?
-        """
-        fts_params = params + [f"%{query}%"] + [fetch_limit]
-        rows = db.execute(sql, fts_params).fetchall()
-
-    fts_results = [_fact_row_to_dict(row) for row in rows]
+    with tracing.span("fts.query") as sp:
+        try:
+            rows = db.execute(sql, fts_params).fetchall()
+        except sqlite3.OperationalError:
+            # Fallback: LIKE search if FTS5 query syntax fails
+            sp.set(fallback="like")
+            where_parts = list(conditions) + ["content LIKE ?"]
+            where = "WHERE " + " AND ".join(where_parts)
+            sql = f"""
+                SELECT {_FACTS_COLUMNS}
+                FROM facts
+                {where}
+                ORDER BY heat_score DESC
+                LIMIT ?
+            """
+            fts_params = params + [f"%{query}%"] + [fetch_limit]
+            rows = db.execute(sql, fts_params).fetchall()
+        sp.set(rows=len(rows))
+
+    fts_results = _mark_fts_ranks([_fact_row_to_dict(row) for row in rows], rows)
 
     # Hybrid search: combine with vector results if available
     # Note: embed model is pre-loaded at MCP server startup (before stdio pipes)
     if vec_ready:
-        _tr("START hybrid/vector search (vec_ready=True)")
-        try:
-            from embedder import embed_text
-            future = _embed_executor.submit(embed_text, query)
+        with tracing.span("fts.vector") as sp:
             try:
-                query_embedding = future.result(timeout=10)
-            except concurrent.futures.TimeoutError:
-                _log.warning("embed_text timeout (10s) for query '%s' — falling back to FTS5 only", query[:50])
-                _tr("embed_text TIMEOUT (10s), falling back to FTS5 only")
-                return fts_results[:limit]
-            _tr("embed_text done")
-            vec_distances = _vec_search_facts(db, query_embedding, project, fact_type, scope, limit, tags=tags)
-            if vec_distances:
-                fts_rowids = {r["rowid"] for r in fts_results}
-                for rowid in vec_distances:
-                    if rowid not in fts_rowids:
-                        row = db.execute(f"""
-                            SELECT {_FACTS_COLUMNS} FROM facts WHERE rowid = ?
-                        """, (rowid,)).fetchone()
-                        if row:
-                            fts_results.append(_fact_row_to_dict(row))
-                fts_results = _hybrid_rank(fts_results, vec_distances)
-            _tr(f"hybrid search done, {len(fts_results)} total results")
-        except Exception as e:
-            _tr(f"vector search failed: {e}")
-            import sys
-            print(f"[CogniLayer] Vector search failed, using FTS5 only: {e}", file=sys.stderr)
+                spec, facts_table, _ = serving_tables(db)
+                query_embedding = _embed_query(db, query, spec)
+                if query_embedding is None:
+                    sp.set(embed_timeout=True)  # Falling back to FTS5 only
+                    return fts_results[:limit]
+                vec_distances = _vec_search_facts(db, query_embedding, project, fact_type, scope, limit,
+                                                  tags=tags, overfetch=OVERFETCH[mode],
+                                                  table=facts_table)
+                if vec_distances:
+                    fts_results = _merge_vec_hits(db, fts_results, vec_distances,
+                                                  "facts", _FACTS_COLUMNS, _fact_row_to_dict)
+                    fts_results = fuse(fts_results, vec_distances, mode)
+                sp.set(vec_hits=len(vec_distances), results=len(fts_results))
+            except Exception as e:
+                sp.set(error=str(e))
+                import sys
+                print(f"[CogniLayer] Vector search failed, using FTS5 only: {e}", file=sys.stderr)
 
     return fts_results[:limit]
 
@@ -325,8 +326,12 @@ _CHUNKS_COLUMNS = "id, project, file_path, section_title, chunk_index, content,
 
 
 def fts_search_chunks(db: sqlite3.Connection, query: str, project: str = None,
-                      file_filter: str = None, limit: int = 5) -> list[dict]:
-    """Search file chunks using FTS5 + optional vector hybrid search."""
+                      file_filter: str = None, limit: int = 5,
+                      fusion: str = None) -> list[dict]:
+    """Search file chunks using FTS5 + optional vector hybrid search.
+
+    fusion: rank fusion mode (rrf | linear | legacy), default from config.yaml.
+    """
     conditions = []
     params = []
 
@@ -356,10 +361,11 @@ def fts_search_chunks(db: sqlite3.Connection, query: str, project: str = None,
     fts_where = f"AND {' AND '.join(['fc.' + c for c in conditions])}" if conditions else ""
 
     vec_ready = ensure_vec(db) and _vec_tables_exist(db)
-    fetch_limit = limit * 3 if vec_ready else limit
+    mode = resolve_mode(fusion)
+    fetch_limit = candidate_limit(limit, mode) if vec_ready else limit
 
     sql = f"""
-        SELECT fc.{_CHUNKS_COLUMNS.replace(', ', ', fc.')}
+        SELECT fc.{_CHUNKS_COLUMNS.replace(', ', ', fc.')}, bm25(chunks_fts) AS bm25_score
         FROM file_chunks fc
         JOIN chunks_fts cfts ON fc.rowid = cfts.rowid
         WHERE chunks_fts MATCH ? {fts_where}
@@ -384,29 +390,22 @@ def fts_search_chunks(db: sqlite3.Connection, query: str, project: str = None,
         fts_params = params + [f"%{query}%"] + [fetch_limit]
         rows = db.execute(sql, fts_params).fetchall()
 
-    fts_results = [_chunk_row_to_dict(row) for row in rows]
+    fts_results = _mark_fts_ranks([_chunk_row_to_dict(row) for row in rows], rows)
 
     # Hybrid search
     if vec_ready:
         try:
-            from embedder import embed_text
-            future = _embed_executor.submit(embed_text, query)
-            try:
-                query_embedding = future.result(timeout=10)
-            except concurrent.futures.TimeoutError:
-                _log.warning("embed_text timeout (10s) for chunk query '%s' — falling back to FTS5 only", query[:50])
+            spec, _, chunks_table = serving_tables(db)
+            query_embedding = _embed_query(db, query, spec)
+            if query_embedding is None:
                 return fts_results[:limit]
-            vec_distances = _vec_search_chunks(db, query_embedding, project, file_filter, limit)
+            vec_distances = _vec_search_chunks(db, query_embedding, project, file_filter, limit,
+                                               overfetch=OVERFETCH[mode],
+                                               table=chunks_table)
             if vec_distances:
-                fts_rowids = {r["rowid"] for r in fts_results}
-                for rowid in vec_distances:
-                    if rowid not in fts_rowids:
-                        row = db.execute(f"""
-                            SELECT {_CHUNKS_COLUMNS} FROM file_chunks WHERE rowid = ?
-                        """, (rowid,)).fetchone()
-                        if row:
-                            fts_results.append(_chunk_row_to_dict(row))
-                fts_results = _hybrid_rank(fts_results, vec_distances)
+                fts_results = _merge_vec_hits(db, fts_results, vec_distances,
+                                              "file_chunks", _CHUNKS_COLUMNS, _chunk_row_to_dict)
+                fts_results = fuse(fts_results, vec_distances, mode)
         except Exception as e:
             import sys
             print(f"[CogniLayer] Vector search failed, using FTS5 only: {e}", file=sys.stderr)
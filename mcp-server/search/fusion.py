@@ -0,0 +1,141 @@
+"""Hybrid rank fusion for CogniLayer search — combines FTS5 and vector candidates.
+
+Modes (config.yaml `search.fusion`, or per call):
+- rrf:    Reciprocal Rank Fusion over the FTS5 bm25 ranking and the vector ranking.
+- linear: Weighted sum of calibrated scores. bm25 is mapped to x/(1+x) and the L2
+          distance of unit vectors to cosine similarity, so a score does not depend
+          on which other candidates were fetched.
+- legacy: The original ranker — position-based FTS score plus distance normalised
+          by max_dist * 1.2 over the candidate set.
+
+Every mode writes `_hybrid_score` in the 0-1 range (1.0 = top of both rankings) and
+returns results sorted by it. `_hybrid_score` orders results; how well a result
+actually matches is `_relevance`: the calibrated linear score (the legacy score in
+legacy mode). RRF scores are relative to the top rank, so the best hit always
+scores high however weak it is — knowledge-gap detection uses `_relevance`. FTS5 results must carry `_fts_rank` (0-based position)
+and `_bm25` (None for the LIKE fallback); vec-only results carry neither.
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from utils import get_config_section
+
+FUSION_MODES = ("rrf", "linear", "legacy")
+DEFAULT_MODE = "rrf"
+
+# Candidates fetched per side = limit * OVERFETCH[mode] (see benchmarks/bench_fusion.py)
+OVERFETCH = {"rrf": 2, "linear": 3, "legacy": 3}
+
+FTS_WEIGHT = 0.4
+VEC_WEIGHT = 0.6
+RRF_K = 60
+
+
+def resolve_mode(mode: str | None = None) -> str:
+    """Pick the fusion mode: explicit argument, then config.yaml, then DEFAULT_MODE."""
+    if mode is None:
+        mode = get_config_section("search").get("fusion")
+    return mode if mode in FUSION_MODES else DEFAULT_MODE
+
+
+def candidate_limit(limit: int, mode: str) -> int:
+    """Number of candidates to fetch from each side for a final top-`limit`."""
+    return limit * OVERFETCH.get(mode, 3)
+
+
+def fuse(results: list[dict], vec_distances: dict[int, float],
+         mode: str = DEFAULT_MODE) -> list[dict]:
+    """Score and sort FTS5 + vec-only results with the given fusion mode."""
+    if mode == "legacy":
+        results = _fuse_legacy(results, vec_distances)
+        for r in results:
+            r["_relevance"] = r["_hybrid_score"]
+        return results
+    _set_relevance(results, vec_distances)
+    if mode == "linear":
+        return _fuse_linear(results, vec_distances)
+    return _fuse_rrf(results, vec_distances)
+
+
+def _vec_ranks(vec_distances: dict[int, float]) -> dict[int, int]:
+    ordered = sorted(vec_distances.items(), key=lambda kv: kv[1])
+    return {rowid: i for i, (rowid, _) in enumerate(ordered)}
+
+
+def _fuse_rrf(results: list[dict], vec_distances: dict[int, float]) -> list[dict]:
+    """Weighted RRF, normalised so rank 1 on both sides scores 1.0."""
+    vec_rank = _vec_ranks(vec_distances)
+    top = 1.0 / (RRF_K + 1)
+    for r in results:
+        score = 0.0
+        if r.get("_fts_rank") is not None:
+            score += FTS_WEIGHT / (RRF_K + r["_fts_rank"] + 1)
+        if r["rowid"] in vec_rank:
+            score += VEC_WEIGHT / (RRF_K + vec_rank[r["rowid"]] + 1)
+        r["_hybrid_score"] = score / top
+
+    results.sort(key=lambda x: x["_hybrid_score"], reverse=True)
+    return results
+
+
+def _fts_calibrated(result: dict, fts_count: int) -> float:
+    """bm25 (negative, lower = better) mapped to 0-1; position-based for LIKE fallback."""
+    if result.get("_fts_rank") is None:
+        return 0.0
+    bm25 = result.get("_bm25")
+    if bm25 is None:
+        return 1.0 - (result["_fts_rank"] / max(fts_count, 1))
+    relevance = max(-bm25, 0.0)
+    return relevance / (1.0 + relevance)
+
+
+def _set_relevance(results: list[dict], vec_distances: dict[int, float]) -> None:
+    """`_relevance`: weighted calibrated bm25 + cosine similarity (L2 on unit vectors)."""
+    fts_count = sum(1 for r in results if r.get("_fts_rank") is not None)
+    for r in results:
+        fts_s = _fts_calibrated(r, fts_count)
+        vec_s = 0.0
+        distance = vec_distances.get(r["rowid"])
+        if distance is not None:
+            vec_s = max(0.0, 1.0 - (distance * distance) / 2.0)
+        r["_relevance"] = (FTS_WEIGHT * fts_s) + (VEC_WEIGHT * vec_s)
+
+
+def _fuse_linear(results: list[dict], vec_distances: dict[int, float]) -> list[dict]:
+    """Linear fusion: the calibrated relevance is the score."""
+    for r in results:
+        r["_hybrid_score"] = r["_relevance"]
+
+    results.sort(key=lambda x: x["_hybrid_score"], reverse=True)
+    return results
+
+
+def _fuse_legacy(results: list[dict], vec_distances: dict[int, float]) -> list[dict]:
+    """Original ranker: FTS position score + distance normalised by max_dist * 1.2.
+
+    FTS5 rank: position-based (1st result = 1.0, last = 0.0)
+    Vector distance: converted to similarity (lower distance = higher score)
+    """
+    fts_scores = {}
+    vec_scores = {}
+
+    # FTS5 scores: position-based
+    for i, result in enumerate(results):
+        rowid = result["rowid"]
+        fts_scores[rowid] = 1.0 - (i / max(len(results), 1))
+
+    # Vector scores: distance -> similarity (0-1)
+    if vec_distances:
+        max_dist = max(vec_distances.values()) if vec_distances else 1.0
+        for rowid, distance in vec_distances.items():
+            vec_scores[rowid] = 1.0 - (distance / max(max_dist * 1.2, 0.001))
+
+    for result in results:
+        rowid = result["rowid"]
+        fts_s = fts_scores.get(rowid, 0.0)
+        vec_s = vec_scores.get(rowid, 0.0)
+        result["_hybrid_score"] = (FTS_WEIGHT * fts_s) + (VEC_WEIGHT * vec_s)
+
+    results.sort(key=lambda x: x["_hybrid_score"], reverse=True)
+    return results
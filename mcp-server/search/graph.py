@@ -0,0 +1,104 @@
+"""Batched knowledge-graph expansion — linked facts and causal chains for many facts at once.
+
+Each helper runs ONE query for the whole id list: both edge directions are read as
+separate UNION ALL branches (so each uses its own index instead of an OR join),
+joined to facts, then ROW_NUMBER() OVER (PARTITION BY fact) keeps the top N per
+fact. Used by memory_search for result display and by the TUI (clusters, timeline).
+Long id lists (whole clusters) run in batches of ID_BATCH ids, since every id is
+bound twice and older SQLite builds allow only 999 parameters; the per-fact window
+makes the batches independent. Missing tables (pre-V3 databases) yield empty maps.
+"""
+
+import sqlite3
+
+LINKS_PER_FACT = 3
+CHAINS_PER_FACT = 2
+ID_BATCH = 400  # Ids per query: bound twice, plus per_fact, stays under 999 parameters
+
+
+def _placeholders(ids: list[str]) -> str:
+    return ",".join("?" * len(ids))
+
+
+def _batches(fact_ids: list[str]):
+    ids = list(dict.fromkeys(fact_ids))
+    for i in range(0, len(ids), ID_BATCH):
+        yield ids[i:i + ID_BATCH]
+
+
+def linked_facts(db: sqlite3.Connection, fact_ids: list[str],
+                 per_fact: int = LINKS_PER_FACT) -> dict[str, list[dict]]:
+    """Top linked facts per fact, strongest link first. {fact_id: [{id, content, score}]}."""
+    result: dict[str, list[dict]] = {}
+    for ids in _batches(fact_ids):
+        ph = _placeholders(ids)
+        try:
+            rows = db.execute(f"""
+                WITH edges AS (
+                    SELECT source_id AS fact_id, target_id AS other_id, score
+                    FROM fact_links WHERE source_id IN ({ph})
+                    UNION ALL
+                    SELECT target_id, source_id, score
+                    FROM fact_links WHERE target_id IN ({ph})
+                ),
+                best AS (
+                    SELECT e.fact_id, f.id, f.content, MAX(e.score) AS score
+                    FROM edges e JOIN facts f ON f.id = e.other_id
+                    WHERE e.other_id != e.fact_id
+                    GROUP BY e.fact_id, f.id
+                ),
+                ranked AS (
+                    SELECT *, ROW_NUMBER() OVER (PARTITION BY fact_id ORDER BY score DESC) AS rn
+                    FROM best
+                )
+                SELECT fact_id, id, content, score FROM ranked
+                WHERE rn <= ? ORDER BY fact_id, rn
+            """, ids + ids + [per_fact]).fetchall()
+        except sqlite3.OperationalError:
+            return {}  # fact_links table might not exist
+        for row in rows:
+            result.setdefault(row[0], []).append({"id": row[1], "content": row[2], "score": row[3]})
+    return result
+
+
+def causal_chains(db: sqlite3.Connection, fact_ids: list[str],
+                  per_fact: int = CHAINS_PER_FACT) -> dict[str, list[dict]]:
+    """Causal chains per fact: effects it caused first, then its causes, newest first.
+
+    {fact_id: [{id, content, relationship, direction}]} where direction is "cause"
+    (the fact caused `id`) or "effect" (the fact was caused by `id`).
+    """
+    result: dict[str, list[dict]] = {}
+    for ids in _batches(fact_ids):
+        ph = _placeholders(ids)
+        try:
+            rows = db.execute(f"""
+                WITH edges AS (
+                    SELECT cause_id AS fact_id, effect_id AS other_id, relationship,
+                           'cause' AS direction, 0 AS dir_rank, created
+                    FROM causal_chains WHERE cause_id IN ({ph})
+                    UNION ALL
+                    SELECT effect_id, cause_id, relationship, 'effect', 1, created
+                    FROM causal_chains WHERE effect_id IN ({ph})
+                ),
+                ranked AS (
+                    SELECT e.fact_id, f.id, f.content, e.relationship, e.direction,
+                           ROW_NUMBER() OVER (PARTITION BY e.fact_id
+                                              ORDER BY e.dir_rank, e.created DESC) AS rn
+                    FROM edges e JOIN facts f ON f.id = e.other_id
+                )
+                SELECT fact_id, id, content, relationship, direction FROM ranked
+                WHERE rn <= ? ORDER BY fact_id, rn
+            """, ids + ids + [per_fact]).fetchall()
+        except sqlite3.OperationalError:
+            return {}  # causal_chains table might not exist
+        for row in rows:
+            result.setdefault(row[0], []).append({
+                "id": row[1], "content": row[2], "relationship": row[3], "direction": row[4],
+            })
+    return result
+
+
+def expand(db: sqlite3.Connection, fact_ids: list[str]) -> tuple[dict, dict]:
+    """(linked_facts, causal_chains) maps for a list of fact ids — two queries total."""
+    return linked_facts(db, fact_ids), causal_chains(db, fact_ids)
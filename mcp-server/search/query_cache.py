@@ -0,0 +1,177 @@
+"""Query-embedding cache for CogniLayer search — skips ONNX inference for repeated queries.
+
+Two levels, both keyed by the embedding model and the normalised query text (NFKC,
+collapsed whitespace, and lowercase for models marked `uncased` in the registry,
+e.g. bge-small — for those case does not change the embedding):
+- an in-process LRU (`search.query_cache_size` entries, default 256)
+- the `query_embeddings` table in memory.db, shared across sessions and CLIs
+
+Rows are tagged with the embedding model, so switching models never returns a
+stale vector. Disk hits bump `hits` on the row; diagnose.py reports those totals.
+In-process counters are available via stats(). While the MCP server's
+write-behind flusher runs, disk writes are queued there (the search connection
+is a query_only reader); otherwise they go straight to the given connection on
+a short busy timeout and are skipped when another connection holds the lock.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from utils import get_config_section
+
+_log = logging.getLogger("cognilayer.search.query_cache")
+
+DEFAULT_LRU_SIZE = 256
+MAX_DISK_ROWS = 5000
+INLINE_BUSY_MS = 50  # Lock wait for inline writes; the search must not stall on another CLI
+
+_lru: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+_lock = threading.Lock()
+_stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+
+def normalize_query(query: str, uncased: bool = False) -> str:
+    """Canonical form of a query for cache lookups (case folded for uncased models)."""
+    query = unicodedata.normalize("NFKC", query)
+    return " ".join((query.lower() if uncased else query).split())
+
+
+def query_hash(query: str, uncased: bool = False) -> str:
+    """SHA-256 of the normalised query text."""
+    return hashlib.sha256(normalize_query(query, uncased).encode("utf-8")).hexdigest()
+
+
+def _lru_size() -> int:
+    try:
+        return int(get_config_section("search").get("query_cache_size", DEFAULT_LRU_SIZE))
+    except (TypeError, ValueError):
+        return DEFAULT_LRU_SIZE
+
+
+def _remember(key: tuple[str, str], embedding: bytes) -> None:
+    with _lock:
+        _lru[key] = embedding
+        _lru.move_to_end(key)
+        while len(_lru) > max(_lru_size(), 0):
+            _lru.popitem(last=False)
+
+
+def _queue_write(key: tuple[str, str], embedding: bytes | None) -> bool:
+    """Hand a row (or a hit) to the write-behind buffer if its flusher is running."""
+    import write_behind
+    if not write_behind.is_running():
+        return False
+    write_behind.record_query_embedding(key[1], key[0], embedding)
+    return True
+
+
+@contextmanager
+def _short_busy(db: sqlite3.Connection):
+    """Lower the connection's busy_timeout for a best-effort write, then restore it.
+
+    A write that fails rolls back the transaction it opened (not a caller's).
+    """
+    previous = db.execute("PRAGMA busy_timeout").fetchone()[0]
+    owned = not db.in_transaction
+    db.execute(f"PRAGMA busy_timeout={INLINE_BUSY_MS}")
+    try:
+        yield
+    except sqlite3.OperationalError:
+        if owned and db.in_transaction:
+            db.rollback()
+        raise
+    finally:
+        db.execute(f"PRAGMA busy_timeout={int(previous)}")
+
+
+def get(db: sqlite3.Connection, query: str, model: str, uncased: bool = False) -> bytes | None:
+    """Return the cached embedding for a query, or None (counted as a miss).
+
+    model is the embedding model id; uncased folds case (see normalize_query).
+    """
+    key = (model, query_hash(query, uncased))
+    with _lock:
+        embedding = _lru.get(key)
+        if embedding is not None:
+            _lru.move_to_end(key)
+            _stats["memory_hits"] += 1
+            return embedding
+
+    try:
+        row = db.execute(
+            "SELECT embedding FROM query_embeddings WHERE query_hash = ? AND model = ?",
+            (key[1], model)
+        ).fetchone()
+    except sqlite3.OperationalError:
+        row = None  # Table missing (schema not upgraded yet)
+
+    if row is None:
+        with _lock:
+            _stats["misses"] += 1
+        return None
+
+    embedding = row[0]
+    _remember(key, embedding)
+    with _lock:
+        _stats["disk_hits"] += 1
+    if _queue_write(key, None):
+        return embedding
+    try:
+        with _short_busy(db):
+            db.execute("""
+                UPDATE query_embeddings SET hits = hits + 1, last_used = ?
+                WHERE query_hash = ? AND model = ?
+            """, (datetime.now().isoformat(), key[1], model))
+            db.commit()
+    except sqlite3.OperationalError:
+        pass  # Locked past INLINE_BUSY_MS (or read-only) — the counter is best-effort
+    return embedding
+
+
+def put(db: sqlite3.Connection, query: str, model: str, embedding: bytes,
+        uncased: bool = False) -> None:
+    """Store a freshly computed query embedding in both cache levels."""
+    key = (model, query_hash(query, uncased))
+    _remember(key, embedding)
+    if _queue_write(key, embedding):
+        return
+    now = datetime.now().isoformat()
+    try:
+        with _short_busy(db):
+            db.execute("""
+                INSERT OR REPLACE INTO query_embeddings
+                    (query_hash, model, embedding, created, last_used, hits)
+                VALUES (?, ?, ?, ?, ?, 0)
+            """, (key[1], model, embedding, now, now))
+            db.execute("""
+                DELETE FROM query_embeddings WHERE rowid IN (
+                    SELECT rowid FROM query_embeddings
+                    ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )
+            """, (MAX_DISK_ROWS,))
+            db.commit()
+    except sqlite3.OperationalError as e:
+        _log.debug("query_embeddings write skipped: %s", e)
+
+
+def stats() -> dict:
+    """In-process hit/miss counters plus the current LRU size."""
+    with _lock:
+        return {**_stats, "lru_entries": len(_lru)}
+
+
+def clear_memory() -> None:
+    """Drop the in-process LRU and reset counters (tests, model switch)."""
+    with _lock:
+        _lru.clear()
+        for k in _stats:
+            _stats[k] = 0
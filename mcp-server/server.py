@@ -1,7 +1,7 @@
 """CogniLayer MCP Server — V4 (knowledge layer + code intelligence + safety for AI coding agents).
 
 Entry point for the MCP server registered in ~/.claude/settings.json or ~/.codex/config.toml.
-Provides 18 tools for Claude Code / Codex CLI to interact with CogniLayer memory and code intelligence.
+Provides 19 tools for Claude Code / Codex CLI to interact with CogniLayer memory and code intelligence.
 """
 
 import logging
@@ -26,409 +26,18 @@ from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent
 
-from tools.memory_search import memory_search
-from tools.memory_write import memory_write
-from tools.memory_delete import memory_delete
-from tools.file_search import file_search
-from tools.file_index import file_index
-from tools.project_context import project_context
-from tools.session_bridge import session_bridge
-from tools.decision_log import decision_log
-from tools.verify_identity import verify_identity
-from tools.identity_set import identity_set
-from tools.recommend_tech import recommend_tech
-from tools.memory_link import memory_link
-from tools.memory_chain import memory_chain
-from tools.session_init import session_init
-from tools.code_index import code_index
-from tools.code_search import code_search
-from tools.code_context import code_context
-from tools.code_impact import code_impact
-from i18n import t
+# Tool modules, i18n and PyYAML are imported on first use (see tool_registry)
+import dispatch
+import metrics
+import tool_registry
+import tracing
 
 server = Server("cognilayer")
 
 
 @server.list_tools()
 async def list_tools() -> list[Tool]:
-    return [
-        Tool(
-            name="memory_search",
-            description=t("tool.memory_search.desc"),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": t("tool.memory_search.param.query")
-                    },
-                    "scope": {
-                        "type": "string",
-                        "description": t("tool.memory_search.param.scope"),
-                        "default": "project"
-                    },
-                    "type": {
-                        "type": "string",
-                        "description": t("tool.memory_search.param.type")
-                    },
-                    "tags": {
-                        "type": "string",
-                        "description": t("tool.memory_search.param.tags")
-                    },
-                    "limit": {
-                        "type": "integer",
-                        "description": t("tool.memory_search.param.limit"),
-                        "default": 5
-                    }
-                },
-                "required": ["query"]
-            }
-        ),
-        Tool(
-            name="memory_write",
-            description=t("tool.memory_write.desc"),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "content": {
-                        "type": "string",
-                        "description": t("tool.memory_write.param.content")
-                    },
-                    "type": {
-                        "type": "string",
-                        "description": t("tool.memory_write.param.type"),
-                        "default": "fact"
-                    },
-                    "tags": {
-                        "type": "string",
-                        "description": t("tool.memory_write.param.tags")
-                    },
-                    "domain": {
-                        "type": "string",
-                        "description": t("tool.memory_write.param.domain")
-                    },
-                    "source_file": {
-                        "type": "string",
-                        "description": t("tool.memory_write.param.source_file")
-                    }
-                },
-                "required": ["content"]
-            }
-        ),
-        Tool(
-            name="memory_delete",
-            description=t("tool.memory_delete.desc"),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "ids": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": t("tool.memory_delete.param.ids")
-                    }
-                },
-                "required": ["ids"]
-            }
-        ),
-        Tool(
-            name="file_search",
-            description=t("tool.file_search.desc"),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": t("tool.file_search.param.query")
-                    },
-                    "scope": {
-                        "type": "string",
-                        "description": t("tool.file_search.param.scope"),
-                        "default": "project"
-                    },
-                    "file_filter": {
-                        "type": "string",
-                        "description": t("tool.file_search.param.file_filter")
-                    },
-                    "limit": {
-                        "type": "integer",
-                        "description": t("tool.file_search.param.limit"),
-                        "default": 5
-                    }
-                },
-                "required": ["query"]
-            }
-        ),
-        Tool(
-            name="file_index",
-            description=t("tool.file_index.desc"),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "project_path": {
-                        "type": "string",
-                        "description": t("tool.file_index.param.project_path")
-                    },
-                    "full": {
-                        "type": "boolean",
-                        "description": t("tool.file_index.param.full"),
-                        "default": False
-                    },
-                    "time_budget": {
-                        "type": "number",
-                        "description": t("tool.file_index.param.time_budget"),
-                        "default": 30.0
-                    }
-                }
-            }
-        ),
-        Tool(
-            name="project_context",
-            description=t("tool.project_context.desc"),
-            inputSchema={
-                "type": "object",
-                "properties": {}
-            }
-        ),
-        Tool(
-            name="session_bridge",
-            description=t("tool.session_bridge.desc"),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "action": {
-                        "type": "string",
-                        "description": t("tool.session_bridge.param.action"),
-                        "enum": ["load", "save"]
-                    },
-                    "content": {
-                        "type": "string",
-                        "description": t("tool.session_bridge.param.content")
-                    }
-                },
-                "required": ["action"]
-            }
-        ),
-        Tool(
-            name="decision_log",
-            description=t("tool.decision_log.desc"),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": t("tool.decision_log.param.query")
-                    },
-                    "project": {
-                        "type": "string",
-                        "description": t("tool.decision_log.param.project")
-                    },
-                    "limit": {
-                        "type": "integer",
-                        "description": t("tool.decision_log.param.limit"),
-                        "default": 5
-                    }
-                }
-            }
-        ),
-        Tool(
-            name="verify_identity",
-            description=t("tool.verify_identity.desc"),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "action_type": {
-                        "type": "string",
-                        "description": t("tool.verify_identity.param.action_type"),
-                        "enum": ["deploy", "ssh", "push", "pm2", "db-migrate",
-                                 "docker-remote", "proxy-reload", "service-mgmt"]
-                    }
-                },
-                "required": ["action_type"]
-            }
-        ),
-        Tool(
-            name="identity_set",
-            description=t("tool.identity_set.desc"),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "fields": {
-                        "type": "object",
-                        "description": t("tool.identity_set.param.fields")
-                    },
-                    "lock_safety": {
-                        "type": "boolean",
-                        "description": t("tool.identity_set.param.lock_safety"),
-                        "default": False
-                    }
-                },
-                "required": ["fields"]
-            }
-        ),
-        Tool(
-            name="recommend_tech",
-            description=t("tool.recommend_tech.desc"),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "description": {
-                        "type": "string",
-                        "description": t("tool.recommend_tech.param.description")
-                    },
-                    "similar_to": {
-                        "type": "string",
-                        "description": t("tool.recommend_tech.param.similar_to")
-                    },
-                    "category": {
-                        "type": "string",
-                        "description": t("tool.recommend_tech.param.category")
-                    }
-                }
-            }
-        ),
-        Tool(
-            name="memory_link",
-            description=t("tool.memory_link.desc"),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "source_id": {
-                        "type": "string",
-                        "description": t("tool.memory_link.param.source_id")
-                    },
-                    "target_id": {
-                        "type": "string",
-                        "description": t("tool.memory_link.param.target_id")
-                    }
-                },
-                "required": ["source_id", "target_id"]
-            }
-        ),
-        Tool(
-            name="memory_chain",
-            description=t("tool.memory_chain.desc"),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "cause_id": {
-                        "type": "string",
-                        "description": t("tool.memory_chain.param.cause_id")
-                    },
-                    "effect_id": {
-                        "type": "string",
-                        "description": t("tool.memory_chain.param.effect_id")
-                    },
-                    "relationship": {
-                        "type": "string",
-                        "description": t("tool.memory_chain.param.relationship"),
-                        "default": "caused",
-                        "enum": ["caused", "led_to", "blocked", "fixed", "broke"]
-                    }
-                },
-                "required": ["cause_id", "effect_id"]
-            }
-        ),
-        Tool(
-            name="session_init",
-            description=t("tool.session_init.desc"),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "project_path": {
-                        "type": "string",
-                        "description": t("tool.session_init.param.project_path")
-                    }
-                }
-            }
-        ),
-        Tool(
-            name="code_index",
-            description=t("tool.code_index.desc"),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "project_path": {
-                        "type": "string",
-                        "description": t("tool.code_index.param.project_path")
-                    },
-                    "full": {
-                        "type": "boolean",
-                        "description": t("tool.code_index.param.full"),
-                        "default": False
-                    },
-                    "time_budget": {
-                        "type": "number",
-                        "description": t("tool.code_index.param.time_budget"),
-                        "default": 30.0
-                    }
-                }
-            }
-        ),
-        Tool(
-            name="code_search",
-            description=t("tool.code_search.desc"),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": t("tool.code_search.param.query")
-                    },
-                    "kind": {
-                        "type": "string",
-                        "description": t("tool.code_search.param.kind")
-                    },
-                    "limit": {
-                        "type": "integer",
-                        "description": t("tool.code_search.param.limit"),
-                        "default": 20
-                    }
-                },
-                "required": ["query"]
-            }
-        ),
-        Tool(
-            name="code_context",
-            description=t("tool.code_context.desc"),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "symbol": {
-                        "type": "string",
-                        "description": t("tool.code_context.param.symbol")
-                    },
-                    "project_name": {
-                        "type": "string",
-                        "description": t("tool.code_context.param.project_name")
-                    }
-                },
-                "required": ["symbol"]
-            }
-        ),
-        Tool(
-            name="code_impact",
-            description=t("tool.code_impact.desc"),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "symbol": {
-                        "type": "string",
-                        "description": t("tool.code_impact.param.symbol")
-                    },
-                    "max_depth": {
-                        "type": "integer",
-                        "description": t("tool.code_impact.param.max_depth"),
-                        "default": 3
-                    },
-                    "project_name": {
-                        "type": "string",
-                        "description": t("tool.code_impact.param.project_name")
-                    }
-                },
-                "required": ["symbol"]
-            }
-        ),
-    ]
+    return tool_registry.list_tools()
 
 
 @server.call_tool()
@@ -436,107 +45,23 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
     import time as _t
     _start = _t.time()
     logging.info("Tool call: %s args=%s", name, {k: str(v)[:50] for k, v in arguments.items()})
-    try:
-        if name == "memory_search":
-            result = memory_search(
-                query=arguments["query"],
-                scope=arguments.get("scope", "project"),
-                type=arguments.get("type"),
-                tags=arguments.get("tags"),
-                limit=arguments.get("limit", 5)
-            )
-        elif name == "memory_write":
-            result = memory_write(
-                content=arguments["content"],
-                type=arguments.get("type", "fact"),
-                tags=arguments.get("tags"),
-                domain=arguments.get("domain"),
-                source_file=arguments.get("source_file")
-            )
-        elif name == "memory_delete":
-            result = memory_delete(ids=arguments["ids"])
-        elif name == "file_search":
-            result = file_search(
-                query=arguments["query"],
-                scope=arguments.get("scope", "project"),
-                file_filter=arguments.get("file_filter"),
-                limit=arguments.get("limit", 5)
-            )
-        elif name == "file_index":
-            result = file_index(
-                project_path=arguments.get("project_path"),
-                full=arguments.get("full", False),
-                time_budget=arguments.get("time_budget", 30.0)
-            )
-        elif name == "project_context":
-            result = project_context()
-        elif name == "session_bridge":
-            result = session_bridge(
-                action=arguments["action"],
-                content=arguments.get("content")
-            )
-        elif name == "decision_log":
-            result = decision_log(
-                query=arguments.get("query"),
-                project=arguments.get("project"),
-                limit=arguments.get("limit", 5)
-            )
-        elif name == "verify_identity":
-            result = verify_identity(action_type=arguments["action_type"])
-        elif name == "identity_set":
-            result = identity_set(
-                fields=arguments["fields"],
-                lock_safety=arguments.get("lock_safety", False)
-            )
-        elif name == "recommend_tech":
-            result = recommend_tech(
-                description=arguments.get("description"),
-                similar_to=arguments.get("similar_to"),
-                category=arguments.get("category")
-            )
-        elif name == "memory_link":
-            result = memory_link(
-                source_id=arguments["source_id"],
-                target_id=arguments["target_id"]
-            )
-        elif name == "memory_chain":
-            result = memory_chain(
-                cause_id=arguments["cause_id"],
-                effect_id=arguments["effect_id"],
-                relationship=arguments.get("relationship", "caused")
-            )
-        elif name == "session_init":
-            result = session_init(
-                project_path=arguments.get("project_path")
-            )
-        elif name == "code_index":
-            result = code_index(
-                project_path=arguments.get("project_path"),
-                full=arguments.get("full", False),
-                time_budget=arguments.get("time_budget", 30.0)
-            )
-        elif name == "code_search":
-            result = code_search(
-                query=arguments["query"],
-                kind=arguments.get("kind"),
-                limit=arguments.get("limit", 20)
-            )
-        elif name == "code_context":
-            result = code_context(
-                symbol=arguments["symbol"],
-                project_name=arguments.get("project_name")
-            )
-        elif name == "code_impact":
-            result = code_impact(
-                symbol=arguments["symbol"],
-                max_depth=arguments.get("max_depth", 3),
-                project_name=arguments.get("project_name")
-            )
-        else:
-            result = t("server.unknown_tool", name=name)
-    except Exception as e:
-        logging.error("Tool %s failed in %.3fs: %s", name, _t.time() - _start, e, exc_info=True)
-        result = t("server.tool_error", name=name, error=str(e))
+    # Latency, SQL count, embedding and lock-wait time go to tool_metrics (TUI Performance tab)
+    with metrics.measure(name) as call:
+        try:
+            # Off the event loop: reads in parallel, writes serialised, with a timeout
+            with tracing.span(f"tool.{name}"):
+                result = await dispatch.run(name, arguments, lambda: tool_registry.call(name, arguments))
+        except dispatch.ToolTimeout as e:
+            from i18n import t
+            result = t("server.tool_timeout", name=name, seconds=e.args[0])
+            if call is not None:
+                call.ok = False
+        except Exception as e:
+            from i18n import t
+            logging.error("Tool %s failed in %.3fs: %s", name, _t.time() - _start, e, exc_info=True)
+            result = t("server.tool_error", name=name, error=str(e))
+            if call is not None:
+                call.ok = False
 
     _elapsed = _t.time() - _start
     logging.info("Tool %s completed in %.3fs (%d chars)", name, _elapsed, len(result))
@@ -546,49 +71,42 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
 async def main():
     logging.info("CogniLayer MCP server starting (v%s)", get_version())
 
-    # Auto-migrate schema on startup with retry (handles concurrent MCP server starts)
-    import time as _time
-    for attempt in range(3):
-        try:
-            from db import open_db
-            from init_db import upgrade_schema
-            db = open_db()
-            upgrade_schema(db)
-            db.close()
-            logging.info("Schema migration OK")
-            break
-        except Exception as e:
-            if attempt < 2:
-                logging.warning("Schema migration attempt %d failed: %s, retrying...", attempt + 1, e)
-                _time.sleep(0.5 * (attempt + 1))
-            else:
-                logging.warning("Schema migration failed after 3 attempts (non-fatal): %s", e)
-
-    # Pre-load heavy native libraries BEFORE stdio_server takes over stdin/stdout.
-    # ONNX Runtime (used by fastembed) and sqlite-vec hang when loaded after
-    # stdin/stdout become MCP JSON-RPC pipes (likely due to OMP/BLAS thread init
-    # conflicting with pipe I/O on Windows).
-    try:
-        from embedder import embed_text
-        logging.info("Pre-loading embedding model...")
-        embed_text("warmup")  # Forces model load while stdout is still free
-        logging.info("Embedding model loaded OK")
-    except Exception as e:
-        logging.warning("Embedding model pre-load failed (non-fatal): %s", e)
-
-    try:
-        from db import open_db, ensure_vec
-        _db = open_db()
-        ensure_vec(_db)
-        _db.close()
-        logging.info("sqlite-vec pre-loaded OK")
-    except Exception as e:
-        logging.warning("sqlite-vec pre-load failed (non-fatal): %s", e)
+    # Schema fast path + parallel sqlite-vec / embedding / connection-pool warmups.
+    # Everything is loaded BEFORE stdio_server takes over stdin/stdout: ONNX Runtime
+    # (used by fastembed) and sqlite-vec hang when loaded after stdin/stdout become
+    # MCP JSON-RPC pipes (likely OMP/BLAS thread init conflicting with pipe I/O on Windows).
+    # Per-phase timings go to ~/.cognilayer/logs/startup.jsonl (see diagnose.py).
+    # Spans + latency histograms when `tracing.enabled` (trace_dump tool, trace.jsonl)
+    tracing.configure()
+    metrics.configure()
+
+    import startup
+    migration = startup.prepare()["migration"]
+
+    if migration is not None:
+        from embedder import model_id
+        from embedding_models import start_background_migration, stop_background_migration
+        logging.info("Re-embedding into %s in the background", model_id(migration))
+        start_background_migration(migration)
+
+    # Search side effects (heat boosts, retrieval log, knowledge gaps) are flushed
+    # in the background instead of inside each memory_search request
+    import write_behind
+    write_behind.start()
 
     logging.info("Starting stdio transport...")
-    async with stdio_server() as (read_stream, write_stream):
-        logging.info("MCP server ready, waiting for requests")
-        await server.run(read_stream, write_stream, server.create_initialization_options())
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            logging.info("MCP server ready, waiting for requests")
+            await server.run(read_stream, write_stream, server.create_initialization_options())
+    finally:
+        write_behind.stop()  # Final flush
+        if migration is not None:
+            stop_background_migration()
+        dispatch.shutdown()
+        from db import close_pool
+        close_pool()
+        tracing.shutdown()
 
 
 def get_version() -> str:
@@ -621,10 +139,10 @@ def test_tools():
 if __name__ == "__main__":
     if "--test" in sys.argv:
         count = test_tools()
-        if count == 18:
+        if count == 19:
             print(f"\nOK: All {count} tools registered.")
         else:
-            print(f"\nERROR: Expected 18 tools, got {count}.")
+            print(f"\nERROR: Expected 19 tools, got {count}.")
             sys.exit(1)
     else:
         import asyncio
@@ -0,0 +1,198 @@
+"""CogniLayer MCP server startup — schema fast path, parallel warmups, phase timings.
+
+Every agent window spawns a server, so startup runs on each launch:
+
+1. schema   — skipped when schema_version already records init_db.SCHEMA_VERSION,
+              otherwise upgrade_schema() (3 attempts, concurrent starts race here)
+2. in parallel, on background threads:
+   - vec       sqlite-vec load, vec layout check (quantization change), model registry
+               (plus the warmup of a model being re-embedded into)
+   - embedding warmup of the serving embedding model (ONNX load, or in the embedding
+               daemon when `embedding.daemon` is on)
+   - pool      the long-lived db connections (db.enable_pool)
+
+prepare() joins all threads before returning: ONNX Runtime and sqlite-vec must
+be loaded before stdio_server() turns stdin/stdout into MCP pipes (they hang
+when loaded afterwards on Windows). Per-phase wall times of the last KEEP_RUNS
+starts are appended to ~/.cognilayer/logs/startup.jsonl; diagnose.py reports them.
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+COGNILAYER_HOME = Path.home() / ".cognilayer"
+TIMINGS_PATH = COGNILAYER_HOME / "logs" / "startup.jsonl"
+KEEP_RUNS = 50
+
+_log = logging.getLogger("cognilayer.startup")
+
+
+class _Timings:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases: dict[str, float] = {}
+        self.notes: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.phases[name] = round(time.perf_counter() - t0, 4)
+
+    def note(self, name: str, value: str) -> None:
+        with self._lock:
+            self.notes[name] = value
+
+
+def _schema(timings: _Timings) -> bool:
+    """Migrate unless the schema is current. Returns True when the migration was skipped."""
+    from db import open_db
+    from init_db import upgrade_schema, schema_current
+    for attempt in range(3):
+        try:
+            db = open_db()
+            try:
+                if schema_current(db):
+                    timings.note("schema", "current")
+                    return True
+                upgrade_schema(db)
+            finally:
+                db.close()
+            timings.note("schema", "migrated")
+            _log.info("Schema migration OK")
+            return False
+        except Exception as e:
+            if attempt < 2:
+                _log.warning("Schema migration attempt %d failed: %s, retrying...", attempt + 1, e)
+                time.sleep(0.5 * (attempt + 1))
+            else:
+                _log.warning("Schema migration failed after 3 attempts (non-fatal): %s", e)
+    timings.note("schema", "failed")
+    return False
+
+
+def _vec(timings: _Timings, check_layout: bool, result: dict) -> None:
+    from db import open_db, ensure_vec
+    from embedding_models import ensure_configured_model
+    with timings.phase("vec"):
+        try:
+            db = open_db()
+            try:
+                if not ensure_vec(db):
+                    timings.note("vec", "unavailable")
+                    return
+                _log.info("sqlite-vec pre-loaded OK")
+                if check_layout:
+                    # upgrade_schema (skipped) normally covers a quantization change
+                    from init_db import upgrade_vec_schema
+                    upgrade_vec_schema(db)
+                result["migration"] = ensure_configured_model(db)  # Spec to re-embed into, if any
+            finally:
+                db.close()
+        except Exception as e:
+            _log.warning("sqlite-vec pre-load failed (non-fatal): %s", e)
+            return
+    if result.get("migration") is not None:
+        with timings.phase("embedding_migration"):
+            result["migration"] = _warm(result["migration"])
+
+
+def _warm(spec: dict) -> dict | None:
+    """Load an embedding model (forces the ONNX load while stdout is still free).
+
+    With `embedding.daemon` on, the model is loaded in the daemon instead.
+    """
+    from embedder import warm, model_id
+    try:
+        _log.info("Pre-loading embedding model %s...", model_id(spec))
+        warm(spec)
+        return spec
+    except Exception as e:
+        _log.warning("Embedding model pre-load failed (non-fatal): %s", e)
+        return None
+
+
+def _embedding(timings: _Timings) -> None:
+    from db import open_db
+    from embedding_models import serving_model
+    with timings.phase("embedding"):
+        try:
+            db = open_db()
+            try:
+                spec = serving_model(db)
+            finally:
+                db.close()
+        except Exception:
+            from embedder import DEFAULT_SPEC
+            spec = DEFAULT_SPEC
+        if _warm(spec) is not None:
+            _log.info("Embedding model loaded OK")
+        else:
+            timings.note("embedding", "unavailable")
+
+
+def _pool(timings: _Timings) -> None:
+    with timings.phase("pool"):
+        try:
+            from db import enable_pool, DEFAULT_READERS
+            from utils import get_config_section
+            enable_pool(int(get_config_section("database").get("pool_readers", DEFAULT_READERS)))
+        except Exception as e:
+            _log.warning("Connection pool unavailable, using per-call connections: %s", e)
+
+
+def prepare() -> dict:
+    """Run all startup phases; returns {"migration": spec or None}."""
+    timings = _Timings()
+    with timings.phase("schema"):
+        skipped = _schema(timings)
+
+    result: dict = {"migration": None}
+    threads = [
+        threading.Thread(target=_vec, args=(timings, skipped, result), name="startup-vec"),
+        threading.Thread(target=_embedding, args=(timings,), name="startup-embedding"),
+        threading.Thread(target=_pool, args=(timings,), name="startup-pool"),
+    ]
+    with timings.phase("warmups"):
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    total = time.perf_counter() - timings.start
+    _log.info("Startup phases: %s (total %.3fs)", timings.phases, total)
+    record_timings(timings.phases, timings.notes, total)
+    return result
+
+
+def record_timings(phases: dict, notes: dict, total: float) -> None:
+    """Append one startup record, keeping the last KEEP_RUNS. Best-effort."""
+    entry = {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "pid": os.getpid(),
+        "total": round(total, 4),
+        "phases": phases,
+        "notes": notes,
+    }
+    try:
+        TIMINGS_PATH.parent.mkdir(parents=True, exist_ok=True)
+        lines = []
+        if TIMINGS_PATH.exists():
+            lines = TIMINGS_PATH.read_text(encoding="utf-8").splitlines()[-(KEEP_RUNS - 1):]
+        lines.append(json.dumps(entry))
+        TIMINGS_PATH.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    except OSError as e:
+        _log.debug("Startup timings not written: %s", e)
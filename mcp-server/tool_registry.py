@@ -0,0 +1,234 @@
+"""CogniLayer tool registry — one declarative table for all MCP tools.
+
+Each entry maps a tool name to its module (the handler is the function of the
+same name), its parameters and their call defaults. list_tools() builds the MCP
+Tool schemas from the table once per language; descriptions come from i18n keys
+tool.<name>.desc and tool.<name>.param.<param>. Tool modules are imported on
+their first call, so server startup doesn't load them (or what they import).
+
+Parameter spec keys: type, required, default (also the call default), enum, items.
+"""
+
+import importlib
+import threading
+
+FUSION_MODES = ["rrf", "linear", "legacy"]
+
+TOOLS: dict[str, dict] = {
+    "memory_search": {
+        "module": "tools.memory_search",
+        "params": {
+            "query": {"type": "string", "required": True},
+            "scope": {"type": "string", "default": "project"},
+            "type": {"type": "string"},
+            "tags": {"type": "string"},
+            "limit": {"type": "integer", "default": 5},
+            "fusion": {"type": "string", "enum": FUSION_MODES},
+        },
+    },
+    "memory_write": {
+        "module": "tools.memory_write",
+        "params": {
+            "content": {"type": "string", "required": True},
+            "type": {"type": "string", "default": "fact"},
+            "tags": {"type": "string"},
+            "domain": {"type": "string"},
+            "source_file": {"type": "string"},
+        },
+    },
+    "memory_delete": {
+        "module": "tools.memory_delete",
+        "params": {
+            "ids": {"type": "array", "items": {"type": "string"}, "required": True},
+        },
+    },
+    "file_search": {
+        "module": "tools.file_search",
+        "params": {
+            "query": {"type": "string", "required": True},
+            "scope": {"type": "string", "default": "project"},
+            "file_filter": {"type": "string"},
+            "limit": {"type": "integer", "default": 5},
+            "fusion": {"type": "string", "enum": FUSION_MODES},
+        },
+    },
+    "file_index": {
+        "module": "tools.file_index",
+        "params": {
+            "project_path": {"type": "string"},
+            "full": {"type": "boolean", "default": False},
+            "time_budget": {"type": "number", "default": 30.0},
+        },
+    },
+    "project_context": {
+        "module": "tools.project_context",
+        "params": {},
+    },
+    "session_bridge": {
+        "module": "tools.session_bridge",
+        "params": {
+            "action": {"type": "string", "enum": ["load", "save"], "required": True},
+            "content": {"type": "string"},
+        },
+    },
+    "decision_log": {
+        "module": "tools.decision_log",
+        "params": {
+            "query": {"type": "string"},
+            "project": {"type": "string"},
+            "limit": {"type": "integer", "default": 5},
+        },
+    },
+    "verify_identity": {
+        "module": "tools.verify_identity",
+        "params": {
+            "action_type": {
+                "type": "string", "required": True,
+                "enum": ["deploy", "ssh", "push", "pm2", "db-migrate",
+                         "docker-remote", "proxy-reload", "service-mgmt"],
+            },
+        },
+    },
+    "identity_set": {
+        "module": "tools.identity_set",
+        "params": {
+            "fields": {"type": "object", "required": True},
+            "lock_safety": {"type": "boolean", "default": False},
+        },
+    },
+    "recommend_tech": {
+        "module": "tools.recommend_tech",
+        "params": {
+            "description": {"type": "string"},
+            "similar_to": {"type": "string"},
+            "category": {"type": "string"},
+        },
+    },
+    "memory_link": {
+        "module": "tools.memory_link",
+        "params": {
+            "source_id": {"type": "string", "required": True},
+            "target_id": {"type": "string", "required": True},
+        },
+    },
+    "memory_chain": {
+        "module": "tools.memory_chain",
+        "params": {
+            "cause_id": {"type": "string", "required": True},
+            "effect_id": {"type": "string", "required": True},
+            "relationship": {"type": "string", "default": "caused",
+                             "enum": ["caused", "led_to", "blocked", "fixed", "broke"]},
+        },
+    },
+    "session_init": {
+        "module": "tools.session_init",
+        "params": {
+            "project_path": {"type": "string"},
+        },
+    },
+    "code_index": {
+        "module": "tools.code_index",
+        "params": {
+            "project_path": {"type": "string"},
+            "full": {"type": "boolean", "default": False},
+            "time_budget": {"type": "number", "default": 30.0},
+        },
+    },
+    "code_search": {
+        "module": "tools.code_search",
+        "params": {
+            "query": {"type": "string", "required": True},
+            "kind": {"type": "string"},
+            "limit": {"type": "integer", "default": 20},
+        },
+    },
+    "code_context": {
+        "module": "tools.code_context",
+        "params": {
+            "symbol": {"type": "string", "required": True},
+            "project_name": {"type": "string"},
+        },
+    },
+    "code_impact": {
+        "module": "tools.code_impact",
+        "params": {
+            "symbol": {"type": "string", "required": True},
+            "max_depth": {"type": "integer", "default": 3},
+            "project_name": {"type": "string"},
+        },
+    },
+    "trace_dump": {
+        "module": "tools.trace_dump",
+        "params": {
+            "prefix": {"type": "string"},
+            "slowest": {"type": "integer", "default": 10},
+        },
+    },
+}
+
+_lock = threading.Lock()
+_schemas: dict[str, list] = {}  # language -> [Tool]
+_handlers: dict[str, object] = {}
+
+
+def input_schema(name: str) -> dict:
+    """JSON schema of a tool's arguments, with descriptions in the current language."""
+    from i18n import t
+    properties, required = {}, []
+    for param, spec in TOOLS[name]["params"].items():
+        prop = {"type": spec["type"]}
+        if "items" in spec:
+            prop["items"] = spec["items"]
+        prop["description"] = t(f"tool.{name}.param.{param}")
+        if "default" in spec:
+            prop["default"] = spec["default"]
+        if "enum" in spec:
+            prop["enum"] = spec["enum"]
+        properties[param] = prop
+        if spec.get("required"):
+            required.append(param)
+    schema = {"type": "object", "properties": properties}
+    if required:
+        schema["required"] = required
+    return schema
+
+
+def list_tools() -> list:
+    """MCP Tool definitions for all registered tools (built once per language)."""
+    from i18n import t, get_language
+    language = get_language()
+    with _lock:
+        cached = _schemas.get(language)
+    if cached is not None:
+        return cached
+    from mcp.types import Tool
+    tools = [Tool(name=name, description=t(f"tool.{name}.desc"), inputSchema=input_schema(name))
+             for name in TOOLS]
+    with _lock:
+        _schemas[language] = tools
+    return tools
+
+
+def get_handler(name: str):
+    """The tool's function, importing its module on first use."""
+    with _lock:
+        handler = _handlers.get(name)
+    if handler is None:
+        handler = getattr(importlib.import_module(TOOLS[name]["module"]), name)
+        with _lock:
+            _handlers[name] = handler
+    return handler
+
+
+def call(name: str, arguments: dict) -> str:
+    """Run a tool with its arguments mapped onto the handler's keywords."""
+    if name not in TOOLS:
+        from i18n import t
+        return t("server.unknown_tool", name=name)
+    kwargs = {}
+    for param, spec in TOOLS[name]["params"].items():
+        if spec.get("required"):
+            kwargs[param] = arguments[param]
+        else:
+            kwargs[param] = arguments.get(param, spec.get("default"))
+    return get_handler(name)(**kwargs)
@@ -3,7 +3,7 @@
 import logging
 import sqlite3
 
-from db import open_db
+from db import borrow_db, release_db
 from i18n import t
 from utils import get_active_session
 from tools.code_helpers import has_index, reindex_dirty, find_symbol
@@ -27,7 +27,7 @@ def code_context(symbol: str, project_name: str | None = None) -> str:
         if not project:
             return t("code.no_project")
 
-        db = open_db()
+        db = borrow_db(write=True)
 
         # Auto-index check
         if not has_index(db, project):
@@ -141,7 +141,7 @@ def code_context(symbol: str, project_name: str | None = None) -> str:
     finally:
         if db:
             try:
-                db.close()
+                release_db(db)
             except Exception:
                 pass
 
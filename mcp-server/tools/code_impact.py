@@ -4,7 +4,7 @@ import logging
 import sqlite3
 from collections import deque
 
-from db import open_db
+from db import borrow_db, release_db
 from i18n import t
 from utils import get_active_session
 from tools.code_helpers import has_index, reindex_dirty, find_symbol
@@ -32,7 +32,7 @@ def code_impact(symbol: str, max_depth: int = 3,
         if not project:
             return t("code.no_project")
 
-        db = open_db()
+        db = borrow_db(write=True)
 
         if not has_index(db, project):
             try:
@@ -143,7 +143,7 @@ def code_impact(symbol: str, max_depth: int = 3,
     finally:
         if db:
             try:
-                db.close()
+                release_db(db)
             except Exception:
                 pass
 
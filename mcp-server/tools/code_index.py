@@ -4,7 +4,7 @@ import logging
 import sqlite3
 import time
 
-from db import open_db
+from db import borrow_db, release_db
 from i18n import t
 from utils import get_active_session
 
@@ -34,7 +34,7 @@ def code_index(project_path: str | None = None,
         if not project or not path:
             return t("code.no_project")
 
-        db = open_db()
+        db = borrow_db(write=True)
 
         # Ensure code tables exist
         _ensure_tables(db)
@@ -103,7 +103,7 @@ def code_index(project_path: str | None = None,
     finally:
         if db:
             try:
-                db.close()
+                release_db(db)
             except Exception:
                 pass
 
@@ -3,7 +3,7 @@
 import logging
 import sqlite3
 
-from db import open_db
+from db import borrow_db, release_db
 from i18n import t
 from utils import get_active_session
 from tools.code_helpers import has_index, reindex_dirty
@@ -27,7 +27,7 @@ def code_search(query: str, kind: str | None = None,
         if not project:
             return t("code.no_project")
 
-        db = open_db()
+        db = borrow_db(write=True)
 
         # Auto-index check + dirty reindex
         if not has_index(db, project):
@@ -76,7 +76,7 @@ def code_search(query: str, kind: str | None = None,
     finally:
         if db:
             try:
-                db.close()
+                release_db(db)
             except Exception:
                 pass
 
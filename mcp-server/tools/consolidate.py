@@ -13,7 +13,7 @@ from datetime import datetime
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from db import open_db
+from db import borrow_db, release_db
 from utils import get_active_session
 from i18n import t
 
@@ -325,7 +325,7 @@ def consolidate(project: str = None) -> str:
     if not project:
         return t("consolidate.no_project")
 
-    db = open_db()
+    db = borrow_db(write=True)
     try:
         cluster_count = _find_clusters(db, project)
         tier_counts = _compute_tiers(db, project)
@@ -340,7 +340,7 @@ def consolidate(project: str = None) -> str:
         except Exception:
             pass  # Column may not exist
     finally:
-        db.close()
+        release_db(db)
 
     return t("consolidate.report",
              project=project,
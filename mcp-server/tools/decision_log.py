@@ -4,7 +4,7 @@ import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from db import open_db
+from db import borrow_db, release_db
 from utils import get_active_session
 from i18n import t
 
@@ -15,7 +15,7 @@ def decision_log(query: str = None, project: str = None, limit: int = 5) -> str:
     if not project:
         project = session.get("project", "")
 
-    db = open_db()
+    db = borrow_db()
     try:
         if query:
             rows = db.execute("""
@@ -32,7 +32,7 @@ def decision_log(query: str = None, project: str = None, limit: int = 5) -> str:
                 ORDER BY timestamp DESC LIMIT ?
             """, (project, limit)).fetchall()
     finally:
-        db.close()
+        release_db(db)
 
     if not rows:
         search_info = t("decision_log.search_info", query=query) if query else ""
@@ -13,7 +13,7 @@ import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from db import open_db
+from db import borrow_db, release_db
 from utils import get_active_session
 from indexer.file_indexer import reindex_project, scan_project_files
 from i18n import t
@@ -41,7 +41,7 @@ def file_index(project_path: str | None = None, full: bool = False,
     logger.info("file_index: project=%s path=%s full=%s budget=%.1f",
                 project, path, full, time_budget)
 
-    db = open_db()
+    db = borrow_db(write=True)
     try:
         # If full reindex, clear existing chunks first
         if full:
@@ -64,7 +64,7 @@ def file_index(project_path: str | None = None, full: bool = False,
         logger.error("file_index failed: %s", e, exc_info=True)
         return t("file_index.error", error=str(e))
     finally:
-        db.close()
+        release_db(db)
 
     # Scan to report what's available
     available = len(scan_project_files(path))
@@ -4,15 +4,19 @@ import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from db import open_db
+from db import borrow_db, release_db
 from utils import get_active_session
 from search.fts_search import fts_search_chunks
 from i18n import t
 
 
 def file_search(query: str, scope: str = "project",
-                file_filter: str = None, limit: int = 5) -> str:
-    """Search indexed project files (PRD, docs, configs) via FTS5."""
+                file_filter: str = None, limit: int = 5,
+                fusion: str = None) -> str:
+    """Search indexed project files (PRD, docs, configs) via FTS5.
+
+    fusion: rank fusion mode (rrf | linear | legacy), default from config.yaml.
+    """
     session = get_active_session()
     project = session.get("project", "")
 
@@ -25,28 +29,26 @@ def file_search(query: str, scope: str = "project",
 
     limit = min(limit, 10)
 
-    db = open_db()
+    db = borrow_db()
     try:
         results = fts_search_chunks(
             db, query, project=search_project,
-            file_filter=file_filter, limit=limit
+            file_filter=file_filter, limit=limit, fusion=fusion
         )
+        chunk_count = None
+        if not results:
+            # Check if project has ANY chunks indexed (same connection)
+            try:
+                chunk_count = db.execute(
+                    "SELECT COUNT(*) FROM file_chunks WHERE project = ?",
+                    (search_project or project,)
+                ).fetchone()[0]
+            except Exception:
+                chunk_count = -1
     finally:
-        db.close()
+        release_db(db)
 
     if not results:
-        # Check if project has ANY chunks indexed
-        db2 = open_db()
-        try:
-            chunk_count = db2.execute(
-                "SELECT COUNT(*) FROM file_chunks WHERE project = ?",
-                (search_project or project,)
-            ).fetchone()[0]
-        except Exception:
-            chunk_count = -1
-        finally:
-            db2.close()
-
         if chunk_count == 0:
             return t("file_search.not_indexed", query=query)
         return t("file_search.no_results", query=query)
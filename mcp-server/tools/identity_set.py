@@ -6,7 +6,7 @@ from datetime import datetime
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from db import open_db
+from db import borrow_db, release_db
 from utils import get_active_session
 from i18n import t
 
@@ -56,7 +56,7 @@ def identity_set(fields: dict, lock_safety: bool = False) -> str:
 
     now = datetime.now().isoformat()
 
-    db = open_db()
+    db = borrow_db(write=True)
     try:
         existing = db.execute(
             "SELECT * FROM project_identity WHERE project = ?", (project,)
@@ -137,7 +137,7 @@ def identity_set(fields: dict, lock_safety: bool = False) -> str:
 
         db.commit()
     finally:
-        db.close()
+        release_db(db)
 
     # Format response
     lines = [t("identity_set.updated", project=project)]
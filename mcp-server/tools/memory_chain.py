@@ -5,7 +5,7 @@ from datetime import datetime
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from db import open_db
+from db import borrow_db, release_db
 from utils import get_active_session
 from i18n import t
 
@@ -27,7 +27,7 @@ def memory_chain(cause_id: str, effect_id: str,
     project = session.get("project", "")
     session_id = session.get("session_id")
 
-    db = open_db()
+    db = borrow_db(write=True)
     try:
         # Validate both facts exist and belong to same project
         cause = db.execute(
@@ -65,7 +65,7 @@ def memory_chain(cause_id: str, effect_id: str,
 
         db.commit()
     finally:
-        db.close()
+        release_db(db)
 
     return t("memory_chain.created",
              cause=cause[1][:50], effect=effect[1][:50],
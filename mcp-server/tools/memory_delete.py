@@ -7,7 +7,8 @@ from datetime import datetime
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from db import open_db, ensure_vec
+from db import borrow_db, release_db, ensure_vec
+from vec_store import delete_fact_vecs
 from utils import get_active_session
 from i18n import t
 
@@ -22,7 +23,7 @@ def memory_delete(ids: list[str]) -> str:
     session = get_active_session()
     session_id = session.get("session_id")
 
-    db = open_db()
+    db = borrow_db(write=True)
     try:
         # Check if vec tables exist for cleanup
         has_vec = ensure_vec(db)
@@ -86,14 +87,12 @@ def memory_delete(ids: list[str]) -> str:
             # Clean up vector embedding if vec is available
             if has_vec:
                 try:
-                    db.execute("DELETE FROM facts_vec WHERE rowid = ?", (rowid,))
-                except sqlite3.OperationalError:
-                    pass  # Vec table might not have this rowid
+                    delete_fact_vecs(db, [rowid])  # Every embedding model's table
                 except Exception as e:
                     _log.warning("Failed to clean facts_vec for rowid %s: %s", rowid, e)
 
         db.commit()
     finally:
-        db.close()
+        release_db(db)
 
     return t("memory_delete.deleted", deleted=deleted)
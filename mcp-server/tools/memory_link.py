@@ -5,7 +5,7 @@ from datetime import datetime
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from db import open_db
+from db import borrow_db, release_db
 from i18n import t
 
 
@@ -14,7 +14,7 @@ def memory_link(source_id: str, target_id: str) -> str:
     if source_id == target_id:
         return t("memory_link.self_link")
 
-    db = open_db()
+    db = borrow_db(write=True)
     try:
         # Validate both facts exist
         source = db.execute("SELECT id, content FROM facts WHERE id = ?", (source_id,)).fetchone()
@@ -46,7 +46,7 @@ def memory_link(source_id: str, target_id: str) -> str:
 
         db.commit()
     finally:
-        db.close()
+        release_db(db)
 
     return t("memory_link.linked",
              source=source[1][:50], target=target[1][:50])
@@ -8,27 +8,26 @@ from pathlib import Path
 
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from db import open_db, ensure_vec
+from db import borrow_db, release_db, ensure_vec
+from vec_store import write_fact_vec, delete_fact_vecs, knn_cte
 from utils import get_active_session
 from i18n import t
 
 
-def _embed_fact(db, rowid: int, content: str, tags: str = None, domain: str = None) -> bytes | None:
+def _embed_fact(db, rowid: int, content: str, domain: str = None,
+                project: str = None, fact_type: str = None) -> bytes | None:
     """Generate and store embedding for a fact. Returns embedding bytes or None."""
     try:
         if not ensure_vec(db):
             return None
-        from embedder import embed_text
-        embed_input = content
-        if tags:
-            embed_input += f" [{tags}]"
-        if domain:
-            embed_input += f" [{domain}]"
-        embedding = embed_text(embed_input)
-        db.execute(
-            "INSERT OR REPLACE INTO facts_vec(rowid, embedding) VALUES (?, ?)",
-            (rowid, embedding)
-        )
+        from embedding_store import embed_text_cached, fact_text
+        from embedding_models import serving_tables
+        spec, facts_table, _ = serving_tables(db)
+        # An edit keeps the rowid: drop the old vector from a model still being built,
+        # so its migration re-embeds the fact before it can take over
+        delete_fact_vecs(db, [rowid], keep=facts_table)
+        embedding = embed_text_cached(db, fact_text(content, domain), spec)
+        write_fact_vec(db, rowid, embedding, project, fact_type, facts_table)
         return embedding
     except Exception:
         return None
@@ -39,25 +38,23 @@ def _auto_link_fact(db, fact_id: str, rowid: int, embedding: bytes, project: str
     if embedding is None:
         return
     try:
-        rows = db.execute("""
-            SELECT rowid, distance FROM facts_vec
-            WHERE embedding MATCH ? AND k = 6
-        """, (embedding,)).fetchall()
+        # KNN restricted to the project partition, joined to facts for the target IDs
+        from embedding_models import serving_tables
+        _, facts_table, _ = serving_tables(db)
+        knn_sql, knn_params = knn_cte(db, facts_table, embedding, 6, [("project", project)])
+        rows = db.execute(f"""
+            WITH knn AS ({knn_sql})
+            SELECT knn.rowid, knn.distance, f.id
+            FROM knn JOIN facts f ON f.rowid = knn.rowid
+        """, knn_params).fetchall()
 
         now = datetime.now().isoformat()
         for row in rows:
-            vec_rowid, distance = row[0], row[1]
+            vec_rowid, distance, target_id = row[0], row[1], row[2]
             if vec_rowid == rowid:
                 continue  # Skip self
             if distance > 0.65:
                 continue  # Too dissimilar (threshold based on P20 of actual distance distribution)
-            # Get target fact ID and verify same project
-            target = db.execute(
-                "SELECT id, project FROM facts WHERE rowid = ?", (vec_rowid,)
-            ).fetchone()
-            if not target or target[1] != project:
-                continue
-            target_id = target[0]
             score = 1.0 - distance  # Convert distance to similarity
             # Insert bidirectional links (ignore duplicates)
             db.execute("""
@@ -208,7 +205,7 @@ def memory_write(content: str, type: str = "fact", tags: str = None,
     session_id = session.get("session_id", None)
     project_path = session.get("project_path", "")
 
-    db = open_db()
+    db = borrow_db(write=True)
     try:
         # Use BEGIN IMMEDIATE for atomic read-modify-write (prevents race conditions
         # when multiple CLIs write simultaneously with same source_file+type)
@@ -240,7 +237,7 @@ def memory_write(content: str, type: str = "fact", tags: str = None,
                     existing[0]
                 ))
                 # Update embedding + auto-link
-                emb = _embed_fact(db, existing[2], content, tags, domain)
+                emb = _embed_fact(db, existing[2], content, domain, project, type)
                 _auto_link_fact(db, existing[0], existing[2], emb, project)
                 _resolve_gaps(db, project, content)
                 db.commit()
@@ -272,7 +269,7 @@ def memory_write(content: str, type: str = "fact", tags: str = None,
 
         # Get rowid for vector table and embed + auto-link
         rowid = db.execute("SELECT rowid FROM facts WHERE id = ?", (fact_id,)).fetchone()[0]
-        emb = _embed_fact(db, rowid, content, tags, domain)
+        emb = _embed_fact(db, rowid, content, domain, project, type)
         _auto_link_fact(db, fact_id, rowid, emb, project)
         _resolve_gaps(db, project, content)
 
@@ -286,7 +283,7 @@ def memory_write(content: str, type: str = "fact", tags: str = None,
             return t("memory_write.failed_locked", preview=content[:60])
         raise
     finally:
-        db.close()
+        release_db(db)
 
     return t("memory_write.saved", preview=content[:60], project=project, type=type)
 
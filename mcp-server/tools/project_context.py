@@ -13,7 +13,7 @@ from pathlib import Path
 _log = logging.getLogger("cognilayer.tools.project_context")
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from db import open_db
+from db import borrow_db, release_db
 from utils import get_active_session
 from i18n import t
 from tools.identity_set import ALL_FIELDS as _IDENTITY_COLUMNS
@@ -217,7 +217,7 @@ def project_context() -> str:
     if not project:
         return t("project_context.no_project")
 
-    db = open_db()
+    db = borrow_db(write=True)
     try:
         # Lazy crash recovery (moved from session_start for faster startup)
         crash_info = _check_crash_recovery(db, project)
@@ -323,6 +323,13 @@ def project_context() -> str:
         except Exception:
             pass  # episode columns might not exist yet
 
+        # Heat decay: one set-based UPDATE, at most hourly across all instances
+        try:
+            from heat import maybe_decay
+            maybe_decay(db, project)
+        except Exception:
+            pass  # Decay failure must not break project_context
+
         # Auto-consolidation: run if >24h since last run and project has enough facts
         try:
             from tools.consolidate import should_auto_consolidate, consolidate as _consolidate
@@ -353,7 +360,7 @@ def project_context() -> str:
         except Exception:
             pass  # Tier 2 tables might not exist yet
     finally:
-        db.close()
+        release_db(db)
 
     stats = t("project_context.stats",
               facts_count=facts_count, hot_count=hot_count,
@@ -4,14 +4,14 @@ import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from db import open_db
+from db import borrow_db, release_db
 from i18n import t
 
 
 def recommend_tech(description: str = None, similar_to: str = None,
                    category: str = None) -> str:
     """Recommend tech stack for a project based on existing projects."""
-    db = open_db()
+    db = borrow_db()
     try:
         results = []
 
@@ -72,4 +72,4 @@ def recommend_tech(description: str = None, similar_to: str = None,
 
         return "\n".join(lines)
     finally:
-        db.close()
+        release_db(db)
@@ -5,7 +5,7 @@ from datetime import datetime
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from db import open_db
+from db import borrow_db, release_db
 from utils import get_active_session
 from i18n import t
 
@@ -17,7 +17,7 @@ def session_bridge(action: str, content: str = None) -> str:
     session_id = session.get("session_id", "")
 
     if action == "load":
-        db = open_db()
+        db = borrow_db()
         try:
             row = db.execute("""
                 SELECT bridge_content, start_time, end_time FROM sessions
@@ -25,7 +25,7 @@ def session_bridge(action: str, content: str = None) -> str:
                 ORDER BY start_time DESC LIMIT 1
             """, (project,)).fetchone()
         finally:
-            db.close()
+            release_db(db)
 
         if row and row[0]:
             return f"## Session Bridge\n{row[0]}"
@@ -37,7 +37,7 @@ def session_bridge(action: str, content: str = None) -> str:
         if not session_id:
             return t("session_bridge.no_session")
 
-        db = open_db()
+        db = borrow_db(write=True)
         try:
             cursor = db.execute("""
                 UPDATE sessions SET bridge_content = ? WHERE id = ?
@@ -46,7 +46,7 @@ def session_bridge(action: str, content: str = None) -> str:
                 return "Warning: Session not found in DB. Bridge not saved."
             db.commit()
         finally:
-            db.close()
+            release_db(db)
 
         return t("session_bridge.saved")
 
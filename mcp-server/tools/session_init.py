@@ -42,7 +42,7 @@ def session_init(project_path: str | None = None) -> str:
     from on_session_start import (
         detect_project, register_project_if_new,
         get_or_generate_dna, get_latest_bridge,
-        create_session, write_session_file, open_db
+        create_session, write_session_file
     )
     from tools.project_context import _check_crash_recovery, _auto_detect_identity
 
@@ -64,7 +64,8 @@ def session_init(project_path: str | None = None) -> str:
     # Generate claude_session_id for Codex CLI (it doesn't provide one)
     claude_session_id = str(uuid.uuid4())
 
-    db = open_db()
+    from db import borrow_db, release_db
+    db = borrow_db(write=True)
     try:
         register_project_if_new(db, project_name, path)
         crash_info = _check_crash_recovery(db, project_name)
@@ -84,10 +85,7 @@ def session_init(project_path: str | None = None) -> str:
         logger.error("session_init failed: %s", e, exc_info=True)
         return t("session_init.error", error=str(e))
     finally:
-        try:
-            db.close()
-        except Exception:
-            pass
+        release_db(db)
 
     # Build response
     parts = [t("session_init.header", project=project_name, session_id=session_id)]
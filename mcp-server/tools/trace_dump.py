@@ -0,0 +1,33 @@
+"""trace_dump — Latency histograms and slowest recent spans of this MCP server."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import tracing
+from i18n import t
+
+
+def trace_dump(prefix: str = None, slowest: int = 10) -> str:
+    """Show per-span latency percentiles and the slowest recent spans."""
+    if not tracing.enabled():
+        return t("trace_dump.disabled")
+
+    data = tracing.dump(prefix, min(max(slowest, 0), 50))
+    if not data["histograms"]:
+        return t("trace_dump.empty")
+
+    lines = [t("trace_dump.header"), "",
+             "| span | count | p50 ms | p95 ms | p99 ms | max ms |",
+             "|------|------:|-------:|-------:|-------:|-------:|"]
+    for name, h in data["histograms"].items():
+        lines.append(f"| {name} | {h['count']} | {h['p50_ms']:.1f} | {h['p95_ms']:.1f} "
+                     f"| {h['p99_ms']:.1f} | {h['max_ms']:.1f} |")
+
+    if data["slowest"]:
+        lines.append("")
+        lines.append(t("trace_dump.slowest"))
+        for s in data["slowest"]:
+            attrs = ", ".join(f"{k}={v}" for k, v in s.get("attrs", {}).items())
+            lines.append(f"- {s['name']} {s['ms']:.1f}ms [{s['thread']}]{f' ({attrs})' if attrs else ''}")
+    return "\n".join(lines)
@@ -5,7 +5,7 @@ import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from db import open_db
+from db import borrow_db, release_db
 from utils import get_active_session
 from i18n import t
 
@@ -56,13 +56,13 @@ def verify_identity(action_type: str) -> str:
         return t("verify_identity.blocked_unknown_action",
                  action_type=action_type, allowed=', '.join(REQUIRED_FIELDS.keys()))
 
-    db = open_db()
+    db = borrow_db()
     try:
         row = db.execute(
             "SELECT * FROM project_identity WHERE project = ?", (project,)
         ).fetchone()
     finally:
-        db.close()
+        release_db(db)
 
     if not row:
         not_set = t("verify_identity.not_set")
@@ -0,0 +1,276 @@
+"""CogniLayer tracing — buffered spans and latency histograms, off by default.
+
+Replaces the old trace.log appends (an open + write per step of every call).
+When tracing is off, span() returns a shared no-op object, so instrumented code
+pays one flag check. When on:
+
+- span(name, **attrs) times a block; nesting follows contextvars, so spans
+  started in a tool thread (dispatch copies the context) get the tool's span
+  as parent. event(name, **attrs) records a zero-length span.
+- finished spans go to an in-memory buffer, which a background thread appends
+  to ~/.cognilayer/logs/trace.jsonl every `tracing.flush_seconds` (rotated at
+  MAX_FILE_BYTES). The request path never touches the file.
+- every span name feeds a log-bucketed latency histogram (p50/p95/p99 within
+  one bucket, ~12%). dump() returns them plus the slowest recent spans; the
+  trace_dump MCP tool shows them on demand.
+
+The MCP server enables tracing from config.yaml (`tracing.enabled`) in
+configure(). Hooks and scripts never read the config for it; set
+COGNILAYER_TRACE=1 to trace them.
+"""
+
+import atexit
+import contextvars
+import itertools
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+COGNILAYER_HOME = Path.home() / ".cognilayer"
+TRACE_PATH = COGNILAYER_HOME / "logs" / "trace.jsonl"
+MAX_FILE_BYTES = 10 * 1024 * 1024
+BUFFER_MAX = 20000  # Spans waiting for the flusher; oldest dropped beyond this
+RECENT_MAX = 2000  # Spans kept in memory for dump()
+DEFAULT_FLUSH_SECONDS = 2.0
+
+# Histogram buckets: upper bounds from 0.05ms growing 25% per bucket (~49s at the top)
+_BUCKET_BASE_MS = 0.05
+_BUCKET_GROWTH = 1.25
+_BUCKETS = 63
+
+_log = logging.getLogger("cognilayer.tracing")
+
+_enabled = os.environ.get("COGNILAYER_TRACE", "") not in ("", "0")
+_current: contextvars.ContextVar["_Span | None"] = contextvars.ContextVar("cognilayer_span", default=None)
+_ids = itertools.count(1)
+
+_lock = threading.Lock()
+_buffer: deque = deque(maxlen=BUFFER_MAX)
+_recent: deque = deque(maxlen=RECENT_MAX)
+_histograms: dict[str, "_Histogram"] = {}
+_dropped = 0
+
+_stop = threading.Event()
+_thread = None
+
+
+class _Histogram:
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (_BUCKETS + 1)  # Last slot: beyond the top bucket
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms: float) -> None:
+        if ms <= _BUCKET_BASE_MS:
+            idx = 0
+        else:
+            idx = min(math.ceil(math.log(ms / _BUCKET_BASE_MS, _BUCKET_GROWTH)), _BUCKETS)
+        self.counts[idx] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th percentile (ms)."""
+        rank = q * self.count
+        seen = 0
+        for idx, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= rank:
+                if idx == _BUCKETS:
+                    return self.max
+                return min(_BUCKET_BASE_MS * _BUCKET_GROWTH ** idx, self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.50), 3),
+            "p95_ms": round(self.percentile(0.95), 3),
+            "p99_ms": round(self.percentile(0.99), 3),
+            "max_ms": round(self.max, 3),
+        }
+
+
+class _Span:
+    __slots__ = ("name", "attrs", "id", "parent", "start", "wall", "_token")
+
+    def __init__(self, name: str, attrs: dict):
+        self.name = name
+        self.attrs = attrs
+        self.id = next(_ids)
+        parent = _current.get()
+        self.parent = parent.id if parent is not None else None
+
+    def set(self, **attrs) -> None:
+        """Attach attributes (result sizes, flags) to the span."""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self.wall = time.time()
+        self.start = time.perf_counter()
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        ms = (time.perf_counter() - self.start) * 1000
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        _record(self.name, self.id, self.parent, self.wall, ms, self.attrs)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set(self, **attrs) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def span(name: str, **attrs):
+    """Context manager timing a block (a no-op when tracing is off)."""
+    if not _enabled:
+        return _NOOP
+    return _Span(name, attrs)
+
+
+def event(name: str, **attrs) -> None:
+    """Record a point-in-time event under the current span."""
+    if not _enabled:
+        return
+    parent = _current.get()
+    _record(name, next(_ids), parent.id if parent is not None else None, time.time(), 0.0, attrs)
+
+
+def _record(name: str, span_id: int, parent: int | None, wall: float, ms: float, attrs: dict) -> None:
+    global _dropped
+    entry = (name, span_id, parent, wall, ms, threading.current_thread().name, attrs)
+    with _lock:
+        if len(_buffer) == BUFFER_MAX:
+            _dropped += 1
+        _buffer.append(entry)
+        _recent.append(entry)
+        if ms:
+            hist = _histograms.get(name)
+            if hist is None:
+                hist = _histograms[name] = _Histogram()
+            hist.add(ms)
+
+
+def _as_dict(entry: tuple) -> dict:
+    name, span_id, parent, wall, ms, thread, attrs = entry
+    return {"ts": round(wall, 6), "name": name, "id": span_id, "parent": parent,
+            "ms": round(ms, 3), "thread": thread, "pid": os.getpid(), **({"attrs": attrs} if attrs else {})}
+
+
+def flush() -> int:
+    """Append buffered spans to TRACE_PATH. Returns the number written."""
+    global _dropped
+    with _lock:
+        entries = list(_buffer)
+        _buffer.clear()
+        dropped, _dropped = _dropped, 0
+    if not entries:
+        return 0
+    try:
+        TRACE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        if TRACE_PATH.exists() and TRACE_PATH.stat().st_size > MAX_FILE_BYTES:
+            os.replace(TRACE_PATH, TRACE_PATH.with_name(TRACE_PATH.name + ".1"))
+        with open(TRACE_PATH, "a", encoding="utf-8") as f:
+            if dropped:
+                f.write(json.dumps({"ts": time.time(), "name": "tracing.dropped", "count": dropped}) + "\n")
+            f.write("".join(json.dumps(_as_dict(e), default=str) + "\n" for e in entries))
+    except OSError as e:
+        _log.debug("Trace flush failed: %s", e)
+    return len(entries)
+
+
+def histograms() -> dict[str, dict]:
+    """Latency summary per span name (spans with a duration only)."""
+    with _lock:
+        return {name: h.summary() for name, h in sorted(_histograms.items()) if h.max > 0}
+
+
+def dump(prefix: str | None = None, slowest: int = 10) -> dict:
+    """Histograms and the slowest recent spans, optionally for names starting with prefix."""
+    hists = histograms()
+    with _lock:
+        recent = list(_recent)
+    if prefix:
+        hists = {k: v for k, v in hists.items() if k.startswith(prefix)}
+        recent = [e for e in recent if e[0].startswith(prefix)]
+    recent.sort(key=lambda e: e[4], reverse=True)
+    return {"enabled": _enabled, "histograms": hists,
+            "slowest": [_as_dict(e) for e in recent[:max(slowest, 0)]]}
+
+
+def reset() -> None:
+    """Forget buffered spans and histograms (tests)."""
+    global _dropped
+    with _lock:
+        _buffer.clear()
+        _recent.clear()
+        _histograms.clear()
+        _dropped = 0
+
+
+def _run(interval: float) -> None:
+    while not _stop.wait(interval):
+        flush()
+
+
+def configure(enable: bool | None = None) -> bool:
+    """Enable tracing per config.yaml (or `enable`) and start the flusher. Returns the state."""
+    global _enabled, _thread
+    if enable is None:
+        enable = _enabled
+        try:
+            from utils import get_config_section
+            cfg = get_config_section("tracing")
+            enable = enable or bool(cfg.get("enabled", False))
+            interval = float(cfg.get("flush_seconds", DEFAULT_FLUSH_SECONDS))
+        except Exception:
+            interval = DEFAULT_FLUSH_SECONDS
+    else:
+        interval = DEFAULT_FLUSH_SECONDS
+    _enabled = bool(enable)
+    if _enabled and (_thread is None or not _thread.is_alive()):
+        _stop.clear()
+        _thread = threading.Thread(target=_run, args=(max(interval, 0.1),),
+                                   name="trace-flush", daemon=True)
+        _thread.start()
+        atexit.register(shutdown)
+    return _enabled
+
+
+def shutdown() -> None:
+    """Stop the flusher and write what is still buffered."""
+    global _thread
+    _stop.set()
+    if _thread is not None:
+        _thread.join(2.0)
+        _thread = None
+    flush()
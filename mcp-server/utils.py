@@ -83,3 +83,46 @@ def _scan_sessions() -> dict:
         except (json.JSONDecodeError, ValueError):
             return {}
     return {}
+
+
+# Cache for get_config (config.yaml is read at most once per process)
+_config_cache = None
+
+
+def get_config() -> dict:
+    """Load ~/.cognilayer/config.yaml (cached). Returns {} if missing or unreadable."""
+    global _config_cache
+    if _config_cache is not None:
+        return _config_cache
+
+    cfg = {}
+    config_path = COGNILAYER_HOME / "config.yaml"
+    if config_path.exists():
+        try:
+            import yaml
+            with open(config_path, "r", encoding="utf-8") as f:
+                cfg = yaml.safe_load(f) or {}
+        except Exception:
+            cfg = {}
+    _config_cache = cfg if isinstance(cfg, dict) else {}
+    return _config_cache
+
+
+def get_config_section(name: str) -> dict:
+    """Return one top-level config.yaml section as a dict ({} if absent)."""
+    section = get_config().get(name)
+    return section if isinstance(section, dict) else {}
+
+
+def content_hash(data: bytes) -> str:
+    """Digest of file contents for change detection (blake2b, 128-bit hex)."""
+    import hashlib
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def file_content_hash(path) -> str | None:
+    """content_hash() of a file, or None when it can't be read."""
+    try:
+        return content_hash(Path(path).read_bytes())
+    except OSError:
+        return None
@@ -0,0 +1,177 @@
+"""CogniLayer vector store — write/delete/KNN helpers for the sqlite-vec tables.
+
+facts_vec is partitioned by project (vec0 partition key) with the fact type as a
+metadata column; chunks_vec is partitioned by project. Scoped KNN queries can
+therefore filter inside vec0 instead of post-filtering a global top-k.
+
+Quantization (config `embedding.quantization`): "none" stores float[384]; "int8"
+and "binary" store int8[384] / bit[384] in the indexed column (4x / 32x smaller
+KNN scan) plus the float vector in the `+full` auxiliary column. Quantized KNN
+over-fetches RESCORE_FACTORS[mode] x k candidates and rescores them with the exact
+float L2 distance, so callers always get float distances. The float copy means
+quantized tables take more disk than "none", not less; binary trades recall for
+scan speed (see benchmarks/bench_quantization.py).
+
+vec0 rejects INSERT OR REPLACE on an existing rowid, so writes delete first.
+All helpers assume sqlite-vec is already loaded on the connection (ensure_vec).
+"""
+
+import re
+import sqlite3
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+from utils import get_config_section
+
+QUANTIZATION_MODES = ("none", "int8", "binary")
+# Quantized candidates per requested neighbour before float rescoring
+RESCORE_FACTORS = {"int8": 4, "binary": 16}
+
+_COLUMN_TYPES = {"none": "float", "int8": "int8", "binary": "bit"}
+_QUANTIZE_SQL = {
+    "none": "?",
+    "int8": "vec_quantize_int8(?, 'unit')",
+    "binary": "vec_quantize_binary(?)",
+}
+
+
+def configured_quantization() -> str:
+    """Quantization mode requested in config.yaml ("none" if unset/invalid)."""
+    mode = get_config_section("embedding").get("quantization", "none")
+    return mode if mode in QUANTIZATION_MODES else "none"
+
+
+def vec_schema(quantization: str = "none", dim: int = 384,
+               facts_table: str = "facts_vec", chunks_table: str = "chunks_vec") -> str:
+    """DDL for a model's facts/chunks vec tables in the given quantization mode."""
+    column = f"embedding {_COLUMN_TYPES[quantization]}[{dim}]"
+    full = "" if quantization == "none" else ",\n    +full blob"
+    return f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {facts_table} USING vec0(
+    project text partition key,
+    type text,
+    {column}{full}
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS {chunks_table} USING vec0(
+    project text partition key,
+    {column}{full}
+);
+"""
+
+
+def vec_tables(db: sqlite3.Connection, kind: str) -> list[str]:
+    """All vec0 tables of one kind ("facts" or "chunks"), one per embedding model."""
+    rows = db.execute("""
+        SELECT name FROM sqlite_master
+        WHERE type = 'table' AND name LIKE ? ESCAPE '\\' AND sql LIKE '%USING vec0%'
+    """, (f"{kind}\\_vec%",)).fetchall()
+    return [r[0] for r in rows]
+
+
+def table_quantization(db: sqlite3.Connection, table: str) -> str:
+    """Quantization mode of an existing vec table, from its CREATE statement."""
+    row = db.execute(
+        "SELECT sql FROM sqlite_master WHERE name = ?", (table,)
+    ).fetchone()
+    sql = (row[0] if row else "") or ""
+    if re.search(r"embedding\s+bit\[", sql, re.IGNORECASE):
+        return "binary"
+    if re.search(r"embedding\s+int8\[", sql, re.IGNORECASE):
+        return "int8"
+    return "none"
+
+
+def insert_sql(table: str, columns: list[str], quantization: str) -> str:
+    """INSERT for a vec table; `columns` are the non-embedding columns before it.
+
+    Parameters: rowid, *columns, float embedding (twice when quantized).
+    """
+    names = ["rowid"] + columns + ["embedding"]
+    values = ["?"] * (len(columns) + 1) + [_QUANTIZE_SQL[quantization]]
+    if quantization != "none":
+        names.append("full")
+        values.append("?")
+    return f"INSERT INTO {table}({', '.join(names)}) VALUES ({', '.join(values)})"
+
+
+def _write_vec(db: sqlite3.Connection, table: str, columns: list[str],
+               values: tuple, embedding: bytes) -> None:
+    mode = table_quantization(db, table)
+    params = values + ((embedding,) if mode == "none" else (embedding, embedding))
+    db.execute(f"DELETE FROM {table} WHERE rowid = ?", (values[0],))
+    db.execute(insert_sql(table, columns, mode), params)
+
+
+def write_fact_vec(db: sqlite3.Connection, rowid: int, embedding: bytes,
+                   project: str, fact_type: str, table: str = "facts_vec") -> None:
+    """Store (or replace) the embedding of a fact."""
+    _write_vec(db, table, ["project", "type"], (rowid, project, fact_type), embedding)
+
+
+def write_chunk_vec(db: sqlite3.Connection, rowid: int, embedding: bytes,
+                    project: str, table: str = "chunks_vec") -> None:
+    """Store (or replace) the embedding of a file chunk."""
+    _write_vec(db, table, ["project"], (rowid, project), embedding)
+
+
+def _delete_vecs(db: sqlite3.Connection, kind: str, rowids: list[int],
+                 keep: str | None = None) -> None:
+    for table in vec_tables(db, kind):
+        if table == keep:
+            continue
+        for rid in rowids:
+            try:
+                db.execute(f"DELETE FROM {table} WHERE rowid = ?", (rid,))
+            except sqlite3.OperationalError:
+                pass
+
+
+def delete_fact_vecs(db: sqlite3.Connection, rowids: list[int], keep: str | None = None) -> None:
+    """Remove fact embeddings from every model's table except `keep` (best-effort)."""
+    _delete_vecs(db, "facts", rowids, keep)
+
+
+def delete_chunk_vecs(db: sqlite3.Connection, rowids: list[int]) -> None:
+    """Remove chunk embeddings from every model's table (best-effort)."""
+    _delete_vecs(db, "chunks", rowids)
+
+
+def knn_cte(db: sqlite3.Connection, table: str, embedding: bytes, k: int,
+            filters: list[tuple[str, object]],
+            rowids: tuple[str, list] | None = None) -> tuple[str, list]:
+    """Body of a `knn` CTE yielding (rowid, distance) for the k nearest rows.
+
+    filters are (column, value) equality constraints applied inside vec0
+    (partition key / metadata columns). rowids is an optional (subquery, params)
+    selecting candidate rowids from another table (e.g. facts matching tags);
+    vec0 applies it inside the KNN as well. Distances are float L2 in every mode.
+    """
+    mode = table_quantization(db, table)
+    where = [f"embedding MATCH {_QUANTIZE_SQL[mode]}", "k = ?"]
+    params = [embedding, k * RESCORE_FACTORS.get(mode, 1)]
+    for column, value in filters:
+        where.append(f"{column} = ?")
+        params.append(value)
+    if rowids is not None:
+        where.append(f"rowid IN ({rowids[0]})")
+        params.extend(rowids[1])
+
+    if mode == "none":
+        return f"SELECT rowid, distance FROM {table} WHERE {' AND '.join(where)}", params
+    sql = f"""
+            SELECT rowid, vec_distance_l2(full, ?) AS distance FROM (
+                SELECT rowid, full FROM {table} WHERE {' AND '.join(where)}
+            )
+            ORDER BY distance LIMIT ?"""
+    return sql, [embedding] + params + [k]
+
+
+def is_partitioned(db: sqlite3.Connection, table: str) -> bool:
+    """Check whether a vec table already has the project partition column."""
+    try:
+        db.execute(f"SELECT project FROM {table} LIMIT 0")
+        return True
+    except sqlite3.OperationalError:
+        return False
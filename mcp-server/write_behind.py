@@ -0,0 +1,329 @@
+"""CogniLayer write-behind buffer — search side effects flushed off the request path.
+
+Every memory_search used to bump heat/retrieval_count per result and update
+knowledge_gaps inside the request, turning a read into a write transaction that
+could wait up to busy_timeout on another CLI's lock. Searches now only record
+what happened here:
+
+- heat boosts, coalesced per fact (n hits = +0.2 * n heat, retrieval_count + n)
+- retrieval_log rows (fact, project, query, search type)
+- knowledge-gap events (weak/no results, or good results resolving a gap)
+- query_embeddings rows and hit counters (search.query_cache)
+- tool_metrics rows of finished tool calls (metrics.measure)
+
+The MCP server flushes the buffer in one transaction every
+`search.write_behind_seconds` (start/stop) and at shutdown. The same thread
+prunes the embedding store (embedding_store.prune) once after start and then
+every PRUNE_INTERVAL. When no flusher
+is running (CLI scripts, tests) callers flush inline. A flush that hits a
+locked database puts its items back for the next round (bounded by MAX_PENDING).
+Flushes borrow the writer connection (db.borrow_db), so searches themselves can
+run on the MCP server's query_only readers.
+"""
+
+import atexit
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent))
+
+_log = logging.getLogger("cognilayer.write_behind")
+
+HEAT_BOOST = 0.2
+DEFAULT_INTERVAL = 5.0
+MAX_PENDING = 10000  # Retrieval rows / gap events kept while the DB stays locked
+PRUNE_INTERVAL = 24 * 3600.0  # Seconds between embedding store prunes
+
+_lock = threading.Lock()
+_boosts: dict[str, list] = {}  # fact_id -> [hits, last_access]
+_retrievals: list[tuple] = []  # (fact_id, project, query, search_type, timestamp)
+_gaps: list[tuple] = []  # (project, query, search_type, hit_count, best_score, timestamp)
+_embeddings: dict[tuple, list] = {}  # (query_hash, model) -> [embedding or None, hits, last_used]
+_metrics: list[tuple] = []  # tool_metrics rows (see metrics._record)
+
+_stop = threading.Event()
+_thread = None
+
+
+def record_search(project: str, query: str, search_type: str | None,
+                  results: list[dict], best_score: float) -> None:
+    """Queue the side effects of one search (boosts, retrieval log, gap event)."""
+    now = datetime.now().isoformat()
+    with _lock:
+        for r in results:
+            entry = _boosts.setdefault(r["id"], [0, now])
+            entry[0] += 1
+            entry[1] = now
+            if project and len(_retrievals) < MAX_PENDING:
+                _retrievals.append((r["id"], project, query, search_type, now))
+        if project and len(_gaps) < MAX_PENDING:
+            _gaps.append((project, query, search_type, len(results), best_score, now))
+
+
+def record_query_embedding(query_hash: str, model: str, embedding: bytes | None) -> None:
+    """Queue a new query_embeddings row (embedding) or a cache hit on one (None)."""
+    now = datetime.now().isoformat()
+    with _lock:
+        entry = _embeddings.get((query_hash, model))
+        if entry is None:
+            if len(_embeddings) >= MAX_PENDING:
+                return
+            entry = _embeddings[(query_hash, model)] = [None, 0, now]
+        if embedding is None:
+            entry[1] += 1
+        else:
+            entry[0] = embedding
+        entry[2] = now
+
+
+def record_tool_metric(row: tuple) -> None:
+    """Queue one tool_metrics row."""
+    with _lock:
+        if len(_metrics) < MAX_PENDING:
+            _metrics.append(row)
+
+
+def pending() -> int:
+    """Number of buffered items (boosted facts + retrieval rows + gap events + query embeddings + metrics)."""
+    with _lock:
+        return len(_boosts) + len(_retrievals) + len(_gaps) + len(_embeddings) + len(_metrics)
+
+
+def _take():
+    global _boosts, _retrievals, _gaps, _embeddings, _metrics
+    with _lock:
+        taken = (_boosts, _retrievals, _gaps, _embeddings, _metrics)
+        _boosts, _retrievals, _gaps, _embeddings, _metrics = {}, [], [], {}, []
+    return taken
+
+
+def _put_back(boosts: dict, retrievals: list, gaps: list, embeddings: dict, metrics: list) -> None:
+    """Re-queue items of a failed flush ahead of newer ones."""
+    global _retrievals, _gaps, _metrics
+    with _lock:
+        _metrics = (metrics + _metrics)[:MAX_PENDING]
+        for fact_id, (hits, last) in boosts.items():
+            entry = _boosts.setdefault(fact_id, [0, last])
+            entry[0] += hits
+        _retrievals = (retrievals + _retrievals)[:MAX_PENDING]
+        _gaps = (gaps + _gaps)[:MAX_PENDING]
+        for key, (embedding, hits, last) in embeddings.items():
+            entry = _embeddings.setdefault(key, [None, 0, last])
+            entry[0] = entry[0] or embedding
+            entry[1] += hits
+
+
+def _apply_boosts(db: sqlite3.Connection, boosts: dict) -> None:
+    rows = [(HEAT_BOOST * hits, last, hits, last, fact_id) for fact_id, (hits, last) in boosts.items()]
+    try:
+        db.executemany("""
+            UPDATE facts SET heat_score = MIN(1.0, heat_score + ?),
+                             last_accessed = ?,
+                             retrieval_count = COALESCE(retrieval_count, 0) + ?,
+                             last_retrieved = ?
+            WHERE id = ?
+        """, rows)
+    except sqlite3.OperationalError as e:
+        if "no such column" not in str(e):
+            raise
+        # Pre-V3 schema without retrieval columns
+        db.executemany("""
+            UPDATE facts SET heat_score = MIN(1.0, heat_score + ?), last_accessed = ?
+            WHERE id = ?
+        """, [(r[0], r[1], r[4]) for r in rows])
+
+
+def _apply_retrievals(db: sqlite3.Connection, retrievals: list) -> None:
+    # Facts deleted since the search are skipped (retrieval_log.fact_id is a foreign key)
+    db.executemany("""
+        INSERT INTO retrieval_log (fact_id, project, query, search_type, timestamp)
+        SELECT ?, ?, ?, ?, ? WHERE EXISTS (SELECT 1 FROM facts WHERE id = ?)
+    """, [r + (r[0],) for r in retrievals])
+
+
+def _apply_gap(db: sqlite3.Connection, project: str, query: str, search_type: str | None,
+               hit_count: int, best_score: float, now: str) -> None:
+    """Log query as knowledge gap if no/weak results. Auto-resolve if good results."""
+    if hit_count == 0 or best_score < 0.3:
+        existing = db.execute("""
+            SELECT id FROM knowledge_gaps
+            WHERE project = ? AND query = ? AND resolved = 0
+        """, (project, query)).fetchone()
+        if existing:
+            db.execute("""
+                UPDATE knowledge_gaps SET times_seen = times_seen + 1,
+                    last_seen = ?, hit_count = ?, best_score = ?
+                WHERE id = ?
+            """, (now, hit_count, best_score if hit_count else None, existing[0]))
+        else:
+            db.execute("""
+                INSERT INTO knowledge_gaps
+                    (project, query, search_type, hit_count, best_score, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (project, query, search_type, hit_count,
+                  best_score if hit_count else None, now, now))
+    else:
+        db.execute("""
+            UPDATE knowledge_gaps SET resolved = 1
+            WHERE project = ? AND query = ? AND resolved = 0
+        """, (project, query))
+
+
+def _apply_gaps(db: sqlite3.Connection, gaps: list) -> None:
+    for gap in gaps:
+        _apply_gap(db, *gap)
+
+
+def _apply_embeddings(db: sqlite3.Connection, embeddings: dict) -> None:
+    from search.query_cache import MAX_DISK_ROWS
+    db.executemany("""
+        INSERT OR REPLACE INTO query_embeddings
+            (query_hash, model, embedding, created, last_used, hits)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, [(h, m, emb, last, last, hits)
+          for (h, m), (emb, hits, last) in embeddings.items() if emb is not None])
+    db.executemany("""
+        UPDATE query_embeddings SET hits = hits + ?, last_used = ?
+        WHERE query_hash = ? AND model = ?
+    """, [(hits, last, h, m)
+          for (h, m), (emb, hits, last) in embeddings.items() if emb is None])
+    db.execute("""
+        DELETE FROM query_embeddings WHERE rowid IN (
+            SELECT rowid FROM query_embeddings
+            ORDER BY last_used DESC LIMIT -1 OFFSET ?
+        )
+    """, (MAX_DISK_ROWS,))
+
+
+def _apply_metrics(db: sqlite3.Connection, rows: list) -> None:
+    from metrics import keep_rows
+    db.executemany("""
+        INSERT INTO tool_metrics
+            (timestamp, tool, project, session_id, pid, duration_ms, sql_count,
+             embed_ms, lock_wait_ms, ok, db_mb)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+    # Ring buffer: ids only grow, so everything below MAX(id) - keep_rows is old
+    db.execute("DELETE FROM tool_metrics WHERE id <= (SELECT MAX(id) FROM tool_metrics) - ?",
+               (keep_rows(),))
+
+
+def flush(db: sqlite3.Connection | None = None) -> bool:
+    """Write all buffered items in one transaction. Returns False if it had to retry later."""
+    boosts, retrievals, gaps, embeddings, metrics = _take()
+    if not (boosts or retrievals or gaps or embeddings or metrics):
+        return True
+    own = db is None
+    if own:
+        from db import borrow_db
+        db = borrow_db(write=True)
+    try:
+        if boosts:
+            _apply_boosts(db, boosts)
+        # Tables added by later schema versions are optional
+        for apply, items in ((_apply_retrievals, retrievals), (_apply_gaps, gaps),
+                             (_apply_embeddings, embeddings), (_apply_metrics, metrics)):
+            if not items:
+                continue
+            db.execute("SAVEPOINT optional_table")
+            try:
+                apply(db, items)
+                db.execute("RELEASE optional_table")
+            except sqlite3.OperationalError as e:
+                db.execute("ROLLBACK TO optional_table")
+                db.execute("RELEASE optional_table")
+                if "no such table" not in str(e):
+                    raise
+        db.commit()
+        return True
+    except sqlite3.OperationalError as e:
+        _log.info("Write-behind flush deferred (%s): %d facts, %d retrievals, %d gaps, "
+                  "%d query embeddings, %d metrics",
+                  e, len(boosts), len(retrievals), len(gaps), len(embeddings), len(metrics))
+        try:
+            db.rollback()
+        except Exception:
+            pass
+        _put_back(boosts, retrievals, gaps, embeddings, metrics)
+        return False
+    finally:
+        if own:
+            from db import release_db
+            release_db(db)
+
+
+def is_running() -> bool:
+    """Whether a background flusher owns the buffer (else callers flush inline)."""
+    return _thread is not None and _thread.is_alive()
+
+
+def _interval() -> float:
+    try:
+        from utils import get_config_section
+        return max(float(get_config_section("search").get("write_behind_seconds", DEFAULT_INTERVAL)), 0.1)
+    except Exception:
+        return DEFAULT_INTERVAL
+
+
+def prune_embedding_store() -> int:
+    """Drop stale embedding_store rows on the writer connection. Returns rows deleted."""
+    from db import borrow_db, release_db
+    from embedding_store import prune
+    db = borrow_db(write=True)
+    try:
+        deleted = prune(db)
+        db.commit()
+        if deleted:
+            _log.info("Pruned %d stale embedding store entries", deleted)
+        return deleted
+    except sqlite3.OperationalError as e:
+        _log.info("Embedding store prune deferred: %s", e)
+        db.rollback()
+        return 0
+    finally:
+        release_db(db)
+
+
+def _run(interval: float) -> None:
+    next_prune = time.monotonic()
+    while not _stop.wait(interval):
+        try:
+            flush()
+        except Exception as e:
+            _log.warning("Write-behind flush failed: %s", e)
+        if time.monotonic() >= next_prune:
+            try:
+                prune_embedding_store()
+            except Exception as e:
+                _log.warning("Embedding store prune failed: %s", e)
+            next_prune = time.monotonic() + PRUNE_INTERVAL
+
+
+def start(interval: float | None = None) -> None:
+    """Start the background flusher (no-op if running)."""
+    global _thread
+    if is_running():
+        return
+    _stop.clear()
+    _thread = threading.Thread(target=_run, args=(interval or _interval(),),
+                               name="write-behind", daemon=True)
+    _thread.start()
+    atexit.register(stop)
+
+
+def stop(timeout: float = 5.0) -> None:
+    """Stop the flusher and write whatever is still buffered."""
+    global _thread
+    _stop.set()
+    if _thread is not None:
+        _thread.join(timeout)
+        _thread = None
+    try:
+        flush()
+    except Exception as e:
+        _log.warning("Final write-behind flush failed: %s", e)
@@ -38,6 +38,10 @@ def temp_db(tmp_path, monkeypatch):
         pass  # FTS5 not available in this Python build
     conn.close()
 
+    # Query embeddings cached in-process by an earlier test must not leak in
+    from search import query_cache
+    query_cache.clear_memory()
+
     return db_path
 
 
@@ -419,3 +419,30 @@ class TestRegistry:
         p1 = get_parser(".py")
         p2 = get_parser(".py")
         assert p1 is p2
+
+
+class TestIncrementalReparse:
+    def test_edit_reuses_unchanged_definitions(self, tmp_path, monkeypatch):
+        from code.parsers import base
+        from code.parsers.python_parser import PythonParser
+
+        funcs = [f"def func{i}(x):\n    return helper(x) + {i}\n" for i in range(20)]
+        f = tmp_path / "big.py"
+        f.write_text("\n".join(funcs), encoding="utf-8")
+        parser = PythonParser()
+        parser.parse_file(f)
+
+        funcs[5] = "def func5(x):\n    y = x * 2\n    return other(y)\n"
+        f.write_text("\n".join(funcs), encoding="utf-8")
+        calls = []
+        extract = parser._extract
+        monkeypatch.setattr(parser, "_extract", lambda *a: calls.append(1) or extract(*a))
+        result = parser.parse_file(f)
+
+        monkeypatch.setattr(base, "TREE_CACHE_FILES", 0)
+        fresh = PythonParser().parse_file(f)
+        assert result.symbols == fresh.symbols
+        assert result.references == fresh.references
+        assert len(calls) < 5  # The edited function and its neighbours, not all 20
+        func6 = next(s for s in result.symbols if s.name == "func6")
+        assert func6.line_start == 20
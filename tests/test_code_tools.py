@@ -122,6 +122,66 @@ class TestCodeIndex:
         result2 = code_index(project_path=str(project_with_code))
         assert "Code Index" in result2
 
+    def test_incremental_skips_touched_files_with_same_content(self, project_with_code, temp_db):
+        import os
+        from code.indexer import index_project
+        from db import open_db
+
+        db = open_db()
+        index_project(db, "test-project", str(project_with_code))
+        utils_py = project_with_code / "src" / "utils.py"
+        api_py = project_with_code / "src" / "api.py"
+        later = utils_py.stat().st_mtime + 100
+        os.utime(utils_py, (later, later))  # Same bytes, new mtime (e.g. git checkout)
+        api_py.write_text(api_py.read_text(encoding="utf-8").replace("Fetch all", "Load all"), encoding="utf-8")
+        os.utime(api_py, (later, later))  # Same size, different bytes
+
+        stats = index_project(db, "test-project", str(project_with_code))
+        assert stats["files_indexed"] == 1
+        row = db.execute("SELECT file_mtime FROM code_files WHERE file_path = 'src/utils.py'").fetchone()
+        assert row[0] == later  # Refreshed, so the next run skips it without hashing
+        assert index_project(db, "test-project", str(project_with_code))["files_indexed"] == 0
+        db.close()
+
+    def test_git_repo_indexes_only_changed_files_without_walking(self, project_with_code, temp_db, monkeypatch):
+        import subprocess
+        import code.indexer as indexer_mod
+        from code.indexer import index_project
+        from db import open_db
+
+        def git(*args):
+            subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+                           cwd=project_with_code, check=True, capture_output=True)
+
+        git("init", "-q")
+        (project_with_code / ".gitignore").write_text("generated/\n", encoding="utf-8")
+        git("add", "-A")
+        git("commit", "-q", "-m", "init")
+        db = open_db()
+        assert index_project(db, "test-project", str(project_with_code))["files_indexed"] == 4
+
+        def no_walk(*args, **kwargs):
+            raise AssertionError("walked the tree")
+        monkeypatch.setattr(indexer_mod.os, "walk", no_walk)
+        src = project_with_code / "src"
+        (src / "utils.py").write_text("def validate_email(email):\n    return True\n", encoding="utf-8")
+        (src / "extra.py").write_text("def extra():\n    pass\n", encoding="utf-8")  # Untracked
+        (src / "db.py").unlink()
+        (project_with_code / "generated").mkdir()
+        (project_with_code / "generated" / "gen.py").write_text("def gen():\n    pass\n", encoding="utf-8")
+
+        stats = index_project(db, "test-project", str(project_with_code))
+        paths = {r[0] for r in db.execute("SELECT file_path FROM code_files")}
+        assert stats["files_indexed"] == 2
+        assert stats["files_total"] == 4
+        assert paths == {"src/__init__.py", "src/api.py", "src/utils.py", "src/extra.py"}
+
+        # Reverting an edit takes it out of `git diff`; the recorded dirty paths still catch it
+        git("checkout", "--", "src/utils.py")
+        assert index_project(db, "test-project", str(project_with_code))["files_indexed"] == 1
+        assert db.execute("SELECT symbol_count FROM code_files WHERE file_path = 'src/utils.py'").fetchone()[0] == 2
+        db.close()
+
     def test_index_full(self, project_with_code):
         from tools.code_index import code_index
         result = code_index(
@@ -295,6 +355,79 @@ class TestIndexer:
         assert "large.py" not in paths
 
 
+    def test_parallel_parse_matches_inline_and_batches_commits(self, project_with_code, temp_db, monkeypatch):
+        import sqlite3
+        import code.indexer as indexer_mod
+        import code.parse_pool as parse_pool
+        from code.indexer import scan_files, index_project
+
+        files = scan_files(str(project_with_code))
+        monkeypatch.setattr(parse_pool, "PARALLEL_MIN_FILES", 2)
+
+        def snapshot(results):
+            return {f["rel_path"]: (err, r and [(s.qualified_name, s.kind, s.parent_name) for s in r.symbols],
+                                    r and [(x.from_symbol, x.to_name, x.kind) for x in r.references])
+                    for f, r, err in results}
+
+        inline = snapshot(parse_pool.parse_files(files, workers=1))
+        parallel = snapshot(parse_pool.parse_files(files, workers=2))
+        assert parallel == inline
+        assert any(symbols for _, symbols, _ in inline.values())
+
+        # Stored through the pool, committed in batches of 2 files
+        monkeypatch.setattr(parse_pool, "parse_workers", lambda: 2)
+        monkeypatch.setattr(indexer_mod, "STORE_BATCH_FILES", 2)
+        db = sqlite3.connect(str(temp_db))
+        db.row_factory = sqlite3.Row
+        stats = index_project(db, "test-project", str(project_with_code), incremental=False)
+        db.close()
+        assert not stats["partial"]
+        assert stats["files_indexed"] == len([v for v in inline.values() if v[0] is None])
+        check = sqlite3.connect(str(temp_db))
+        assert check.execute("SELECT COUNT(*) FROM code_symbols").fetchone()[0] == stats["symbols"]
+        check.close()
+
+    def test_bulk_store_resolves_ids_and_keeps_fts_in_sync(self, project_with_code, temp_db, monkeypatch):
+        import code.indexer as indexer_mod
+        from code.indexer import index_project
+        from db import open_db
+
+        def snapshot(db):
+            symbols = db.execute("""
+                SELECT s.qualified_name, p.qualified_name FROM code_symbols s
+                LEFT JOIN code_symbols p ON p.id = s.parent_id ORDER BY s.id
+            """).fetchall()
+            refs = db.execute("""
+                SELECT s.qualified_name, r.to_name, r.line FROM code_references r
+                LEFT JOIN code_symbols s ON s.id = r.from_symbol_id ORDER BY r.id
+            """).fetchall()
+            fts = db.execute("SELECT COUNT(*) FROM code_symbols_fts WHERE code_symbols_fts MATCH 'connect'").fetchone()[0]
+            return [tuple(r) for r in symbols], [tuple(r) for r in refs], fts
+
+        db = open_db()
+        monkeypatch.setattr(indexer_mod, "FTS_BULK_MIN_SYMBOLS", 10 ** 6)  # Per-row triggers
+        index_project(db, "test-project", str(project_with_code), incremental=False)
+        by_triggers = snapshot(db)
+
+        monkeypatch.setattr(indexer_mod, "FTS_BULK_MIN_SYMBOLS", 1)  # Bulk FTS sync, twice (replaces rows)
+        schema_version = db.execute("PRAGMA schema_version").fetchone()[0]
+        for _ in range(2):
+            index_project(db, "test-project", str(project_with_code), incremental=False)
+        bulk = snapshot(db)
+        # No DDL: other connections keep their prepared statements
+        assert db.execute("PRAGMA schema_version").fetchone()[0] == schema_version
+        assert db.execute("SELECT COUNT(*) FROM code_symbols_fts_bulk").fetchone()[0] == 0
+
+        assert bulk == by_triggers
+        assert ("UserAPI.get_by_id", "UserAPI") in bulk[0]
+        assert any(source == "get_users" for source, _, _ in bulk[1])
+        assert bulk[2] >= 1
+        triggers = {r[0] for r in db.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+        assert set(indexer_mod._FTS_TRIGGERS) <= triggers
+        db.execute("INSERT INTO code_symbols_fts(code_symbols_fts, rank) VALUES ('integrity-check', 1)")
+        db.close()
+
+
 class TestCodeHelpers:
     """Test shared code_helpers and consistency between tools."""
 
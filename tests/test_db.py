@@ -1,6 +1,10 @@
 """Tests for database creation and schema integrity."""
 
 import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
 
 
 def test_db_creates_file(temp_db):
@@ -37,6 +41,38 @@ def test_fts_tables_exist(temp_db):
     assert "chunks_fts" in tables
 
 
+def test_upgrade_gates_legacy_code_fts_triggers(temp_db):
+    """Pre-v10 triggers are recreated with the bulk-sync gate and still index symbols."""
+    from code.indexer import _begin_bulk_fts
+    from db import open_db
+    from init_db import upgrade_code_fts_triggers
+
+    db = open_db()
+    db.executescript("""
+        DROP TRIGGER code_symbols_ai;
+        CREATE TRIGGER code_symbols_ai AFTER INSERT ON code_symbols BEGIN
+            INSERT INTO code_symbols_fts(rowid, name, qualified_name, signature, docstring)
+            VALUES (new.rowid, new.name, new.qualified_name, new.signature, new.docstring);
+        END;
+    """)
+    assert not _begin_bulk_fts(db)  # Ungated trigger: the indexer keeps per-row sync
+
+    upgrade_code_fts_triggers(db)
+    sqls = [r[0] for r in db.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'code_symbols_a_'")]
+    assert len(sqls) == 3 and all("code_symbols_fts_bulk" in sql for sql in sqls)
+
+    db.execute("INSERT INTO projects (name, path, created) VALUES ('p', '/tmp/p', 'now')")
+    db.execute("""INSERT INTO code_files (project, file_path, language, file_mtime, file_size, indexed_at)
+                  VALUES ('p', 'a.py', 'python', 0, 0, 'now')""")
+    db.execute("""INSERT INTO code_symbols (project, file_id, name, qualified_name, kind, line_start, line_end)
+                  VALUES ('p', 1, 'frobnicate', 'frobnicate', 'function', 1, 2)""")
+    db.commit()
+    assert db.execute(
+        "SELECT COUNT(*) FROM code_symbols_fts WHERE code_symbols_fts MATCH 'frobnicate'").fetchone()[0] == 1
+    db.close()
+
+
 def test_wal_mode(temp_db):
     """Database should use WAL journal mode."""
     from db import open_db
@@ -53,3 +89,127 @@ def test_foreign_keys_enabled(temp_db):
     fk = db.execute("PRAGMA foreign_keys").fetchone()[0]
     db.close()
     assert fk == 1
+
+
+def test_connection_pool_reuses_connections(temp_db):
+    """Pooled borrows reuse one writer and query_only readers; per-call otherwise."""
+    import db as db_module
+    from db import borrow_db, release_db, enable_pool, close_pool, pool_enabled
+
+    unpooled = borrow_db(write=True)
+    release_db(unpooled)
+    with pytest.raises(sqlite3.ProgrammingError):
+        unpooled.execute("SELECT 1")  # Closed: no pool enabled
+
+    enable_pool(readers=2)
+    try:
+        assert pool_enabled()
+        writer = borrow_db(write=True)
+        assert borrow_db(write=True) is writer  # Nested borrow on the same thread
+        release_db(writer)
+        writer.execute("INSERT INTO projects (name, path, created) VALUES ('p', '/p', 'now')")
+        release_db(writer)
+        assert not writer.in_transaction  # Left-open transaction rolled back on return
+        assert borrow_db(write=True) is writer
+        release_db(writer)
+
+        reader = borrow_db()
+        assert reader.execute("PRAGMA query_only").fetchone()[0] == 1
+        with pytest.raises(sqlite3.OperationalError):
+            reader.execute("DELETE FROM projects")
+        release_db(reader)
+        first, second = borrow_db(), borrow_db()
+        assert {id(first), id(second)} == db_module._pool.reader_ids
+        release_db(first)
+        release_db(second)
+
+        reader.close()  # Broken connection is replaced by the health check
+        for _ in range(2):
+            conn = borrow_db()
+            assert conn.execute("SELECT 1").fetchone()[0] == 1
+            release_db(conn)
+    finally:
+        close_pool()
+    assert not pool_enabled()
+
+
+def test_tool_metrics_recorded_per_call_and_read_by_tui(temp_db, monkeypatch):
+    """measure() counts SQL, embed time and writer lock wait; rows reach the TUI data layer."""
+    import threading
+    import time
+    import metrics
+    import utils
+    import write_behind
+    from db import borrow_db, release_db, enable_pool, close_pool
+
+    monkeypatch.setattr(utils, "get_active_session", lambda: {"project": "p", "session_id": "s1"})
+    monkeypatch.setattr(metrics, "_enabled", True)
+    write_behind._take()
+
+    enable_pool(readers=1)
+    try:
+        with metrics.measure("memory_search"):
+            db = borrow_db()
+            db.execute("SELECT COUNT(*) FROM facts").fetchone()
+            db.execute("SELECT COUNT(*) FROM projects").fetchone()
+            release_db(db)
+            metrics.add("embed_ms", 5.0)
+
+        def write_call():
+            with metrics.measure("memory_write"):
+                release_db(borrow_db(write=True))
+
+        writer = borrow_db(write=True)
+        thread = threading.Thread(target=write_call)
+        thread.start()
+        time.sleep(0.05)
+        release_db(writer)
+        thread.join()
+        db = borrow_db()
+        db.execute("SELECT 1")  # Outside measure(): not counted anywhere
+        release_db(db)
+        assert write_behind.flush()
+    finally:
+        close_pool()
+
+    rows = {r[0]: r for r in sqlite3.connect(str(temp_db)).execute(
+        "SELECT tool, project, session_id, sql_count, embed_ms, lock_wait_ms, ok FROM tool_metrics")}
+    assert rows["memory_search"][1:3] == ("p", "s1")
+    assert rows["memory_search"][3] >= 2
+    assert rows["memory_search"][4] == 5.0
+    assert rows["memory_write"][5] >= 30
+
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from tui import data
+    monkeypatch.setattr(data, "DB_PATH", temp_db)
+    stats = data.get_tool_metrics("p")
+    assert {t["tool"] for t in stats["tools"]} == {"memory_search", "memory_write"}
+    assert [i["instance"] for i in stats["instances"]] == ["s1"]
+    assert stats["instances"][0]["calls"] == 2
+
+
+def test_startup_skips_current_schema_and_records_timings(temp_db, tmp_path, monkeypatch):
+    """Second start takes the schema fast path; every start appends its phase timings."""
+    import json
+    import startup
+    from db import open_db, close_pool
+    from init_db import schema_current, upgrade_schema
+
+    db = open_db()
+    assert not schema_current(db)  # Bare SCHEMA, never upgraded
+    db.close()
+
+    monkeypatch.setattr(startup, "TIMINGS_PATH", tmp_path / "startup.jsonl")
+    monkeypatch.setattr(startup, "_warm", lambda spec: None)  # No ONNX load in tests
+    calls = []
+    monkeypatch.setattr("init_db.upgrade_schema", lambda db: calls.append(1) or upgrade_schema(db))
+    try:
+        startup.prepare()
+        startup.prepare()
+    finally:
+        close_pool()
+
+    assert calls == [1]
+    runs = [json.loads(line) for line in (tmp_path / "startup.jsonl").read_text().splitlines()]
+    assert [r["notes"]["schema"] for r in runs] == ["migrated", "current"]
+    assert {"schema", "vec", "embedding", "pool", "warmups"} <= set(runs[-1]["phases"])
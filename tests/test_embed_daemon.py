@@ -0,0 +1,200 @@
+"""Tests for the shared embedding daemon (Unix socket, cross-client batching)."""
+
+import socket
+import socketserver
+import threading
+
+import numpy as np
+import pytest
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix sockets unavailable")
+
+
+class _FakeModel:
+    def __init__(self):
+        self.calls = []
+
+    def embed(self, texts, batch_size=None):
+        self.calls.append(list(texts))
+        for text in texts:
+            v = np.zeros(384, dtype=np.float32)
+            v[len(text) % 384] = 1.0
+            yield v
+
+
+@pytest.fixture
+def daemon(tmp_path, monkeypatch):
+    """Daemon socket server + inference thread on a temp socket, with a fake model."""
+    import embedder
+    import embed_daemon
+
+    model = _FakeModel()
+    monkeypatch.setattr(embedder, "_get_model", lambda name=None: model)
+    monkeypatch.setattr(embed_daemon, "SOCKET_PATH", tmp_path / "e.sock")
+    monkeypatch.setattr(embed_daemon, "BATCH_WINDOW", 0.2)
+    monkeypatch.setattr(embed_daemon, "_unavailable_until", 0.0)
+
+    server = socketserver.ThreadingUnixStreamServer(str(tmp_path / "e.sock"), embed_daemon._Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    threading.Thread(target=embed_daemon._inference_loop, daemon=True).start()
+    yield model
+    server.shutdown()
+    server.server_close()
+
+
+def test_daemon_batches_requests_from_several_clients(daemon):
+    """Concurrent clients share one inference call; truncation is applied per request."""
+    import embedder
+    from embed_daemon import request_embeddings
+
+    truncated = dict(embedder.DEFAULT_SPEC, truncate=8)
+    results = {}
+
+    def client(i):
+        spec = truncated if i == 0 else embedder.DEFAULT_SPEC
+        results[i] = request_embeddings(["x" * (i + 1), "y" * (i + 3)], spec)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(daemon.calls) == 1
+    assert len(daemon.calls[0]) == 8
+    assert results[2] == embedder.vectors_to_blobs(list(_FakeModel().embed(["xxx", "yyyyy"])))
+    assert [len(b) for b in results[0]] == [8 * 4, 8 * 4]
+
+
+def test_client_falls_back_when_daemon_cannot_start(tmp_path, monkeypatch):
+    """No daemon: request_embeddings returns None and embed_texts runs in-process."""
+    import embedder
+    import embed_daemon
+
+    monkeypatch.setattr(embed_daemon, "SOCKET_PATH", tmp_path / "missing.sock")
+    monkeypatch.setattr(embed_daemon, "START_TIMEOUT", 0.2)
+    monkeypatch.setattr(embed_daemon, "_spawn", lambda: None)
+    monkeypatch.setattr(embed_daemon, "_unavailable_until", 0.0)
+    monkeypatch.setattr(embed_daemon, "_starting_until", 0.0)
+    monkeypatch.setattr(embedder, "_embedding_config", lambda: {"daemon": True})
+    model = _FakeModel()
+    monkeypatch.setattr(embedder, "_get_model", lambda name=None: model)
+
+    assert embed_daemon.request_embeddings(["a"], embedder.DEFAULT_SPEC) is None
+    assert len(embedder.embed_texts(["abc"])) == 1
+    assert model.calls == [["abc"]]
+
+
+def test_client_does_not_wait_for_a_starting_daemon(tmp_path, monkeypatch):
+    """The first call spawns once and falls back at once; a daemon that never listens is retried later."""
+    import time
+    import embedder
+    import embed_daemon
+
+    spawned = []
+    monkeypatch.setattr(embed_daemon, "SOCKET_PATH", tmp_path / "missing.sock")
+    monkeypatch.setattr(embed_daemon, "_spawn", lambda: spawned.append(1))
+    monkeypatch.setattr(embed_daemon, "_unavailable_until", 0.0)
+    monkeypatch.setattr(embed_daemon, "_starting_until", 0.0)
+
+    start = time.perf_counter()
+    assert embed_daemon.request_embeddings(["a"], embedder.DEFAULT_SPEC) is None
+    assert embed_daemon.request_embeddings(["a"], embedder.DEFAULT_SPEC) is None
+    assert time.perf_counter() - start < 1.0
+    assert spawned == [1]
+    assert embed_daemon._unavailable_until == 0.0
+
+    monkeypatch.setattr(embed_daemon, "_starting_until", time.time() - 1)
+    assert embed_daemon.request_embeddings(["a"], embedder.DEFAULT_SPEC) is None
+    assert embed_daemon._unavailable_until > time.time()
+
+
+def test_serve_creates_private_socket_and_exits_when_idle(tmp_path, monkeypatch):
+    """The socket is 0600 from creation; an idle daemon removes it before exiting."""
+    import os
+    import stat
+    import time
+    import embedder
+    import embed_daemon
+
+    monkeypatch.setattr(embed_daemon, "COGNILAYER_HOME", tmp_path)
+    monkeypatch.setattr(embed_daemon, "SOCKET_PATH", tmp_path / "e.sock")
+    monkeypatch.setattr(embed_daemon, "LOCK_PATH", tmp_path / "e.lock")
+    monkeypatch.setattr(embed_daemon, "_idle_seconds", lambda: 1.0)
+    monkeypatch.setattr(embed_daemon, "_last_request", time.time())
+    monkeypatch.setattr(embed_daemon, "_unavailable_until", 0.0)
+    model, loaded = _FakeModel(), []
+    monkeypatch.setattr(embedder, "_get_model", lambda name=None: loaded.append(name) or model)
+
+    thread = threading.Thread(target=embed_daemon.serve, daemon=True)
+    thread.start()
+    deadline = time.time() + 5
+    while not (tmp_path / "e.sock").exists() and time.time() < deadline:
+        time.sleep(0.01)
+    assert stat.S_IMODE(os.stat(tmp_path / "e.sock").st_mode) == 0o600
+    assert loaded  # Model loaded before listening
+    assert len(embed_daemon.request_embeddings(["abc"], embedder.DEFAULT_SPEC)) == 1
+
+    thread.join(10)
+    assert not thread.is_alive()
+    assert not (tmp_path / "e.sock").exists()
+
+
+def test_startup_warmup_waits_for_the_daemon_instead_of_loading_locally(tmp_path, monkeypatch):
+    """warm() with the daemon on waits for a spawned daemon; no model stays in this process."""
+    import time
+    import embedder
+    import embed_daemon
+
+    model = _FakeModel()
+    monkeypatch.setattr(embedder, "_get_model", lambda name=None: model)
+    monkeypatch.setattr(embedder, "_embedding_config", lambda: {"daemon": True})
+    monkeypatch.setattr(embed_daemon, "SOCKET_PATH", tmp_path / "e.sock")
+    monkeypatch.setattr(embed_daemon, "_unavailable_until", 0.0)
+    monkeypatch.setattr(embed_daemon, "_starting_until", 0.0)
+    servers = []
+
+    def spawn_later():
+        def start():
+            time.sleep(0.3)  # Model load in the new daemon
+            server = socketserver.ThreadingUnixStreamServer(str(tmp_path / "e.sock"), embed_daemon._Handler)
+            server.daemon_threads = True
+            servers.append(server)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+        threading.Thread(target=start, daemon=True).start()
+
+    monkeypatch.setattr(embed_daemon, "_spawn", spawn_later)
+    threading.Thread(target=embed_daemon._inference_loop, daemon=True).start()
+    local = []
+    monkeypatch.setattr(embedder, "_models", {})
+    real_request = embed_daemon.request_embeddings
+
+    def request(texts, spec, wait=0.0):
+        result = real_request(texts, spec, wait)
+        local.append(result is None)
+        return result
+
+    monkeypatch.setattr(embed_daemon, "request_embeddings", request)
+    try:
+        embedder.warm(embedder.DEFAULT_SPEC)
+        assert local == [False]  # Served by the daemon after waiting for it
+
+        # A fallback model loaded while the daemon was away is released once it answers
+        embedder._models["fallback"] = model
+        assert embedder.embed_texts(["abc"]) is not None
+        assert embedder._models == {}
+    finally:
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+
+
+def test_daemon_is_unsupported_without_fcntl(monkeypatch):
+    """A Windows Python with AF_UNIX but no fcntl must not spawn daemons that crash on import."""
+    import sys
+    import embed_daemon
+
+    monkeypatch.setitem(sys.modules, "fcntl", None)
+    assert not embed_daemon.is_supported()
+    assert embed_daemon.request_embeddings(["a"], {"name": "x"}) is None
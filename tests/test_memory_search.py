@@ -2,6 +2,8 @@
 
 import sqlite3
 
+import pytest
+
 
 def test_search_finds_fact(temp_db, active_session):
     """Search should find a previously written fact."""
@@ -65,3 +67,241 @@ def test_search_cross_project(temp_db, active_session):
 
     result = memory_search(query="caddy reverse proxy", scope="all")
     assert "caddy" in result.lower()
+
+
+def test_rrf_fusion_prefers_hits_in_both_rankings():
+    """RRF puts a result found by FTS5 and vector search above single-side hits."""
+    from search.fusion import fuse
+
+    results = [
+        {"rowid": 1, "_fts_rank": 0, "_bm25": -9.0},
+        {"rowid": 2, "_fts_rank": 1, "_bm25": -4.0},
+        {"rowid": 3},
+    ]
+    fused = fuse(results, {3: 0.2, 2: 0.5}, "rrf")
+
+    assert [r["rowid"] for r in fused] == [2, 3, 1]
+    assert all(0.0 < r["_hybrid_score"] <= 1.0 for r in fused)
+
+
+def test_fusion_mode_falls_back_to_default():
+    """Unknown fusion modes resolve to the default."""
+    from search import fusion
+
+    assert fusion.resolve_mode("linear") == "linear"
+    assert fusion.resolve_mode("bogus") == fusion.DEFAULT_MODE
+
+
+def test_query_embedding_cache_skips_repeat_inference(temp_db, monkeypatch):
+    """Repeated (normalised) queries are embedded once; the disk level survives an LRU reset."""
+    import embedder
+    from db import open_db
+    from search import query_cache
+    from search.fts_search import _embed_query
+
+    calls = []
+    monkeypatch.setattr(embedder, "embed_text", lambda text, spec=None: calls.append(text) or b"\x00" * 16)
+    db = open_db()
+    try:
+        _embed_query(db, "Deploy  Caddy")
+        _embed_query(db, "deploy caddy")
+        query_cache.clear_memory()
+        _embed_query(db, "deploy caddy ")
+        assert calls == ["Deploy  Caddy"]
+        assert query_cache.stats()["disk_hits"] == 1
+        hits = db.execute("SELECT hits FROM query_embeddings").fetchone()[0]
+        assert hits == 1
+    finally:
+        db.close()
+
+
+def test_query_cache_folds_case_only_for_uncased_models(temp_db, monkeypatch):
+    """A cased model gets its own entry per spelling; the model id is part of the key."""
+    import embedder
+    from db import open_db
+    from search.fts_search import _embed_query
+
+    calls = []
+    monkeypatch.setattr(embedder, "embed_text", lambda text, spec=None: calls.append(text) or b"\x00" * 16)
+    monkeypatch.setattr(embedder, "_embedding_config", lambda: {
+        "models": {"cased": {"name": "fake/cased", "dim": 384},
+                   "lower": {"name": "fake/lower", "dim": 384, "uncased": True}},
+    })
+    cased, lower = embedder.model_spec("cased"), embedder.model_spec("lower")
+    db = open_db()
+    try:
+        for spec in (cased, lower):
+            _embed_query(db, "Deploy Caddy", spec)
+            _embed_query(db, "deploy caddy", spec)
+        assert calls == ["Deploy Caddy", "deploy caddy", "Deploy Caddy"]
+        # A spec read back from embedding_models has no flag: resolved via the registry
+        assert embedder.is_uncased({"name": "fake/lower", "dim": 384, "truncate": None})
+        assert not embedder.is_uncased({"name": "fake/unknown", "dim": 384, "truncate": None})
+    finally:
+        db.close()
+
+
+def test_query_cache_inline_writes_skip_a_locked_db(temp_db):
+    """Without the flusher, cache writes give up quickly instead of waiting busy_timeout."""
+    import time
+    from db import open_db
+    from search import query_cache
+
+    db, locker = open_db(), open_db()
+    try:
+        locker.execute("BEGIN IMMEDIATE")
+        start = time.perf_counter()
+        query_cache.put(db, "locked query", "m", b"\x00" * 16)
+        query_cache.clear_memory()
+        assert query_cache.get(db, "locked query", "m") is None
+        assert time.perf_counter() - start < 2
+        assert db.execute("PRAGMA busy_timeout").fetchone()[0] == 30000
+        assert not db.in_transaction
+        locker.rollback()
+
+        query_cache.put(db, "locked query", "m", b"\x00" * 16)
+        assert db.execute("SELECT COUNT(*) FROM query_embeddings").fetchone()[0] == 1
+    finally:
+        locker.close()
+        db.close()
+
+
+def test_heat_decay_is_set_based_and_off_the_search_path(temp_db, active_session):
+    """Search leaves heat alone; maybe_decay decays old facts once per interval."""
+    import uuid
+    from datetime import datetime, timedelta
+    from db import open_db
+    from heat import maybe_decay
+    from tools.memory_search import memory_search
+
+    from init_db import upgrade_schema
+
+    old = (datetime.now() - timedelta(days=14)).isoformat()
+    db = open_db()
+    upgrade_schema(db)  # projects.last_decay
+    db.execute("INSERT OR IGNORE INTO projects (name, path, created) VALUES (?, ?, ?)",
+               ("test-project", "/tmp/test", old))
+    for fact_type, stamp in (("task", old), ("decision", old), ("task", datetime.now().isoformat())):
+        db.execute("""
+            INSERT INTO facts (id, project, content, type, timestamp, heat_score)
+            VALUES (?, 'test-project', ?, ?, ?, 1.0)
+        """, (str(uuid.uuid4()), f"{fact_type} note {stamp}", fact_type, stamp))
+    db.commit()
+
+    memory_search(query="zzz-no-hit")
+    assert db.execute("SELECT MIN(heat_score) FROM facts").fetchone()[0] == 1.0
+
+    assert maybe_decay(db, "test-project")
+    heats = sorted(r[0] for r in db.execute("SELECT heat_score FROM facts"))
+    assert heats[0] == pytest.approx(0.5, abs=0.01)   # task: one 14-day half-life
+    assert heats[1] == pytest.approx(0.5 ** (14 / 180), abs=0.01)
+    assert heats[2] == 1.0  # Accessed within the last day
+    assert not maybe_decay(db, "test-project")  # Throttled
+    db.close()
+
+
+def test_search_side_effects_are_written_behind(temp_db, active_session):
+    """With the flusher running, searches don't write; one flush applies coalesced boosts."""
+    import write_behind
+    from db import open_db
+    from init_db import upgrade_schema
+    from tools.memory_write import memory_write
+    from tools.memory_search import memory_search
+
+    db = open_db()
+    upgrade_schema(db)  # retrieval_log
+    db.close()
+    memory_write(content="Redis is used as the session store", type="fact")
+
+    write_behind.start(interval=3600)
+    try:
+        memory_search(query="redis")
+        memory_search(query="redis")
+        memory_search(query="kubernetes xyz123")
+        db = open_db()
+        assert db.execute("SELECT retrieval_count, heat_score FROM facts").fetchone()[0] == 0
+        assert write_behind.pending() > 0
+    finally:
+        write_behind.stop()  # Final flush
+
+    count, heat = db.execute("SELECT retrieval_count, heat_score FROM facts").fetchone()
+    assert count == 2 and heat == 1.0
+    assert db.execute("SELECT COUNT(*) FROM retrieval_log").fetchone()[0] == 2
+    gaps = db.execute("SELECT query, times_seen FROM knowledge_gaps").fetchall()
+    assert [tuple(g) for g in gaps] == [("kubernetes xyz123", 1)]
+    assert write_behind.pending() == 0
+    db.close()
+
+
+def test_graph_expansion_batches_links_and_chains(temp_db, active_session):
+    """Top-3 links and top-2 chains for all results come from two queries."""
+    import uuid
+    from datetime import datetime, timedelta
+    from db import open_db
+    from search.graph import expand
+
+    db = open_db()
+    now = datetime.now()
+    ids = []
+    for i in range(7):
+        fid = str(uuid.uuid4())
+        ids.append(fid)
+        db.execute("""
+            INSERT INTO facts (id, project, content, type, timestamp, heat_score)
+            VALUES (?, 'test-project', ?, 'fact', ?, 1.0)
+        """, (fid, f"fact {i}", now.isoformat()))
+    a, b = ids[0], ids[1]
+    # a links to four facts (one incoming); the weakest must be dropped
+    for other, score in ((ids[2], 0.9), (ids[3], 0.5), (ids[4], 0.7), (ids[5], 0.2)):
+        src, dst = (other, a) if other == ids[3] else (a, other)
+        db.execute("INSERT INTO fact_links (source_id, target_id, score, link_type, created) "
+                   "VALUES (?, ?, ?, 'auto', ?)", (src, dst, score, now.isoformat()))
+    # b caused two facts and was caused by one: effects first, newest first
+    for cause, effect, age in ((b, ids[4], 2), (b, ids[5], 1), (ids[6], b, 0)):
+        db.execute("INSERT INTO causal_chains (project, cause_id, effect_id, relationship, created) "
+                   "VALUES ('test-project', ?, ?, 'caused', ?)",
+                   (cause, effect, (now - timedelta(days=age)).isoformat()))
+    db.commit()
+
+    statements = []
+    db.set_trace_callback(statements.append)
+    links, chains = expand(db, [a, b])
+    db.set_trace_callback(None)
+
+    assert len([s for s in statements if not s.startswith("--")]) == 2
+    assert [l["id"] for l in links[a]] == [ids[2], ids[4], ids[3]]
+    assert ids[2] not in links  # Only requested ids are expanded
+    assert [(c["id"], c["direction"]) for c in chains[b]] == [(ids[5], "cause"), (ids[4], "cause")]
+    assert [(c["id"], c["direction"]) for c in expand(db, [ids[4]])[1][ids[4]]] == [(b, "effect")]
+    db.close()
+
+
+def test_graph_expansion_stays_under_the_parameter_limit(temp_db, active_session):
+    """Cluster-sized id lists are batched (older SQLite builds allow 999 parameters)."""
+    import sqlite3
+    import uuid
+    from datetime import datetime
+    from db import open_db
+    from search.graph import expand
+
+    db = open_db()
+    now = datetime.now().isoformat()
+    a, b = str(uuid.uuid4()), str(uuid.uuid4())
+    for fid in (a, b):
+        db.execute("""
+            INSERT INTO facts (id, project, content, type, timestamp, heat_score)
+            VALUES (?, 'test-project', 'x', 'fact', ?, 1.0)
+        """, (fid, now))
+    db.execute("INSERT INTO fact_links (source_id, target_id, score, link_type, created) "
+               "VALUES (?, ?, 0.9, 'auto', ?)", (a, b, now))
+    db.execute("INSERT INTO causal_chains (project, cause_id, effect_id, relationship, created) "
+               "VALUES ('test-project', ?, ?, 'caused', ?)", (a, b, now))
+    db.commit()
+    if hasattr(db, "setlimit"):  # Python 3.11+
+        db.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+
+    ids = [f"missing-{i}" for i in range(1500)] + [b]
+    links, chains = expand(db, ids)
+    assert [l["id"] for l in links[b]] == [a]
+    assert [(c["id"], c["direction"]) for c in chains[b]] == [(a, "effect")]
+    db.close()
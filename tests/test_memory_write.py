@@ -2,6 +2,8 @@
 
 import sqlite3
 
+import pytest
+
 
 def test_write_fact(temp_db, active_session):
     """Writing a fact should insert into facts table."""
@@ -82,3 +84,77 @@ def test_write_with_tags_and_domain(temp_db, active_session):
 
     assert row[0] == "auth,security"
     assert row[1] == "backend"
+
+
+def test_embedding_store_reuses_identical_text(temp_db, monkeypatch):
+    """Text embedded once (any project/table) is served from the store afterwards."""
+    import embedder
+    from db import open_db
+    from embedding_store import embed_texts_cached
+
+    embedded = []
+
+    def fake_embed_texts(texts, spec=None):
+        embedded.extend(texts)
+        return [t.encode("utf-8").ljust(16, b"\0") for t in texts]
+
+    monkeypatch.setattr(embedder, "embed_texts", fake_embed_texts)
+    db = open_db()
+    try:
+        first = embed_texts_cached(db, ["intro: hello", "setup: install", "intro: hello"])
+        second = embed_texts_cached(db, ["setup: install", "usage: run it"])
+        db.commit()
+        rows = db.execute("SELECT COUNT(*) FROM embedding_store").fetchone()[0]
+    finally:
+        db.close()
+
+    assert embedded == ["intro: hello", "setup: install", "usage: run it"]
+    assert first[0] == first[2]
+    assert second[0] == first[1]
+    assert rows == 3
+
+
+def test_write_behind_thread_prunes_stale_embedding_store_rows(temp_db, monkeypatch):
+    """The flusher prunes the store soon after start, without a backfill run."""
+    import time
+    import embedder
+    import write_behind
+    from db import open_db
+
+    model = embedder.model_id(embedder.model_spec())
+    db = open_db()
+    try:
+        db.executemany("""
+            INSERT INTO embedding_store (content_hash, model, embedding, created, last_used)
+            VALUES (?, ?, x'00', '2020-01-01', ?)
+        """, [("old", model, "2020-01-01"), ("fresh", model, "2999-01-01"),
+              ("other-model", "gone/model", "2999-01-01")])
+        db.commit()
+
+        write_behind.start(interval=0.05)
+        try:
+            deadline = time.time() + 5
+            while time.time() < deadline:
+                left = {r[0] for r in db.execute("SELECT content_hash FROM embedding_store")}
+                if left == {"fresh"}:
+                    break
+                time.sleep(0.05)
+        finally:
+            write_behind.stop()
+    finally:
+        db.close()
+    assert left == {"fresh"}
+
+
+def test_vector_blobs_match_sqlite_vec_float32_layout():
+    """numpy serialisation produces the same little-endian float32 blob as struct.pack."""
+    import struct
+    np = pytest.importorskip("numpy")
+    from embedder import vector_to_blob, vectors_to_blobs
+
+    rows = np.arange(2 * 384, dtype=np.float32).reshape(2, 384) / 7.0
+    expected = [struct.pack("<384f", *row) for row in rows]
+
+    assert vector_to_blob(rows[0]) == expected[0]
+    assert vectors_to_blobs(list(rows)) == expected
+    assert vectors_to_blobs(rows.astype(np.float64)) == expected
@@ -804,14 +804,14 @@ class TestUtilsSessionScan:
 
 class TestServerMigrationRetry:
     def test_has_retry_loop(self):
-        """server.py should have retry loop for schema migration."""
-        source = (Path(__file__).parent.parent / "mcp-server" / "server.py").read_text(encoding="utf-8")
+        """Server startup (startup.py) should have retry loop for schema migration."""
+        source = (Path(__file__).parent.parent / "mcp-server" / "startup.py").read_text(encoding="utf-8")
         assert "for attempt in range(3)" in source, "Should have 3-attempt retry"
         assert "retrying" in source.lower(), "Should log retry"
 
     def test_has_backoff(self):
-        """server.py should have backoff between retries."""
-        source = (Path(__file__).parent.parent / "mcp-server" / "server.py").read_text(encoding="utf-8")
+        """Server startup (startup.py) should have backoff between retries."""
+        source = (Path(__file__).parent.parent / "mcp-server" / "startup.py").read_text(encoding="utf-8")
         assert "sleep" in source, "Should sleep between retries"
         assert "attempt + 1" in source or "attempt" in source, "Backoff should scale"
 
@@ -11,8 +11,8 @@ if _mcp_path not in sys.path:
     sys.path.insert(0, _mcp_path)
 
 
-def test_all_18_tools_registered():
-    """Server should register exactly 18 tools."""
+def test_all_19_tools_registered():
+    """Server should register exactly 19 tools."""
     from server import list_tools
 
     tools = asyncio.run(list_tools())
@@ -41,7 +41,7 @@ def test_tool_names():
 
     # Code intelligence tools (present when loaded from repo)
     code_tools = {"code_index", "code_search", "code_context", "code_impact"}
-    if len(tools) == 18:
+    if len(tools) >= 18:
         assert code_tools.issubset(names), f"Missing code tools: {code_tools - names}"
 
 
@@ -63,3 +63,146 @@ def test_tools_have_input_schema():
     for tool in tools:
         assert tool.inputSchema is not None, f"Tool {tool.name} has no input schema"
         assert "type" in tool.inputSchema, f"Tool {tool.name} schema missing 'type'"
+
+
+def test_dispatcher_parallel_reads_serial_writes_and_timeout(monkeypatch):
+    """Reads overlap on the pool, writes run one at a time, timeouts ask the tool to stop."""
+    import threading
+    import time
+    import dispatch
+
+    monkeypatch.setattr(dispatch, "_read_workers", lambda: 4)
+    dispatch.shutdown()
+    active = {"read": 0, "write": 0}
+    peak = {"read": 0, "write": 0}
+    lock = threading.Lock()
+
+    def tool(kind):
+        def fn():
+            with lock:
+                active[kind] += 1
+                peak[kind] = max(peak[kind], active[kind])
+            time.sleep(0.1)
+            with lock:
+                active[kind] -= 1
+            return kind
+        return fn
+
+    stopped = threading.Event()
+
+    def slow():
+        while not dispatch.cancel_requested():
+            time.sleep(0.01)
+        stopped.set()
+        return "stopped"
+
+    async def scenario():
+        reads = [dispatch.run("memory_search", {}, tool("read")) for _ in range(3)]
+        writes = [dispatch.run("memory_write", {}, tool("write")) for _ in range(3)]
+        results = await asyncio.gather(*reads, *writes)
+        assert results == ["read"] * 3 + ["write"] * 3
+
+        monkeypatch.setitem(dispatch.TOOL_TIMEOUTS, "memory_search", 0.05)
+        try:
+            await dispatch.run("memory_search", {}, slow)
+        except dispatch.ToolTimeout:
+            pass
+        else:
+            raise AssertionError("expected ToolTimeout")
+
+    try:
+        asyncio.run(scenario())
+        assert stopped.wait(2)
+    finally:
+        dispatch.shutdown()
+    assert peak["read"] == 3
+    assert peak["write"] == 1
+    assert dispatch.is_read("session_bridge", {"action": "load"})
+    assert not dispatch.is_read("session_bridge", {"action": "save"})
+    assert dispatch.tool_timeout("code_index", {"time_budget": 10}) == 10 + dispatch.BUDGET_MARGIN
+
+
+def test_registry_imports_tools_lazily_and_caches_schemas(monkeypatch):
+    """Importing the server loads no tool module; schemas are built once; defaults are mapped."""
+    import subprocess
+    import tool_registry
+
+    code = ("import sys, server; "
+            "loaded = [m for m in sys.modules if m.startswith('tools.') or m in ('i18n', 'yaml')]; "
+            "print(','.join(loaded))")
+    out = subprocess.run([sys.executable, "-c", code], cwd=_mcp_path,
+                         capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == ""
+
+    assert tool_registry.list_tools() is tool_registry.list_tools()
+
+    calls = []
+    monkeypatch.setitem(tool_registry._handlers, "code_search", lambda **kw: calls.append(kw) or "ok")
+    assert tool_registry.call("code_search", {"query": "open_db"}) == "ok"
+    assert calls == [{"query": "open_db", "kind": None, "limit": 20}]
+    assert "no_such_tool" in tool_registry.call("no_such_tool", {})
+
+
+def test_tracing_spans_nest_across_dispatch_and_flush(monkeypatch, tmp_path):
+    """Spans nest into dispatched tool threads, feed histograms and flush to JSONL."""
+    import json
+    import dispatch
+    import tracing
+
+    monkeypatch.setattr(tracing, "TRACE_PATH", tmp_path / "trace.jsonl")
+    assert tracing.span("off") is tracing._NOOP
+    tracing.reset()
+    monkeypatch.setattr(tracing, "_enabled", True)
+
+    def tool():
+        with tracing.span("fts.query", rows=3):
+            tracing.event("embed.daemon_unavailable")
+        return "ok"
+
+    async def scenario():
+        with tracing.span("tool.memory_search"):
+            return await dispatch.run("memory_search", {}, tool)
+
+    try:
+        assert asyncio.run(scenario()) == "ok"
+        for ms in range(1, 101):
+            tracing._record("synthetic", 0, None, 0.0, float(ms), {})
+    finally:
+        dispatch.shutdown()
+
+    hists = tracing.histograms()
+    assert hists["synthetic"]["count"] == 100
+    assert 45 <= hists["synthetic"]["p50_ms"] <= 57
+    assert 90 <= hists["synthetic"]["p95_ms"] <= 100
+    assert "embed.daemon_unavailable" not in hists  # Events have no duration
+
+    assert tracing.flush() == 103
+    spans = {s["name"]: s for s in map(json.loads, (tmp_path / "trace.jsonl").read_text().splitlines())}
+    assert spans["fts.query"]["parent"] == spans["tool.memory_search"]["id"]
+    assert spans["embed.daemon_unavailable"]["parent"] == spans["fts.query"]["id"]
+    assert spans["fts.query"]["thread"].startswith("tool-read")
+    assert spans["fts.query"]["attrs"] == {"rows": 3}
+    assert [s["name"] for s in tracing.dump("tool.")["slowest"]] == ["tool.memory_search"]
+    tracing.reset()
+
+
+def test_i18n_loads_only_active_catalog_without_yaml(tmp_path):
+    """The language comes from a config.yaml line scan; only its catalog is imported."""
+    import os
+    import subprocess
+
+    (tmp_path / ".cognilayer").mkdir()
+    (tmp_path / ".cognilayer" / "config.yaml").write_text(
+        '# comment\nversion: "4.2.0"\nlanguage: "cs"  # "en" or "cs"\n', encoding="utf-8")
+    code = ("import sys, i18n; "
+            "print(i18n.t('trace_dump.empty')); print(i18n.get_language()); "
+            "print(sorted(m for m in sys.modules if m.startswith('locales.') or m == 'yaml'))")
+    out = subprocess.run([sys.executable, "-c", code], cwd=_mcp_path, capture_output=True, text=True,
+                         check=True, env=dict(os.environ, HOME=str(tmp_path), USERPROFILE=str(tmp_path)))
+    text, language, loaded = out.stdout.strip().splitlines()
+    assert text == "Zatim nejsou zaznamenane zadne spany."
+    assert language == "cs"
+    assert loaded == "['locales.cs']"
+
+    from locales import cs, en
+    assert set(cs.MESSAGES) == set(en.MESSAGES)
@@ -109,7 +109,7 @@ def test_lock_timeout_returns_error(temp_db, active_session, monkeypatch):
     lock_conn = sqlite3.connect(str(temp_db))
     lock_conn.execute("BEGIN EXCLUSIVE")
 
-    # Patch open_db to use 1ms timeout (so test doesn't wait 30s)
+    # Patch open_db (used by borrow_db without a pool) to use 1ms timeout (so test doesn't wait 30s)
     original_open_db = db_module.open_db
 
     def short_timeout_open_db(**kwargs):
@@ -117,7 +117,7 @@ def test_lock_timeout_returns_error(temp_db, active_session, monkeypatch):
         conn.execute("PRAGMA busy_timeout=1")
         return conn
 
-    monkeypatch.setattr(mw_mod, "open_db", short_timeout_open_db)
+    monkeypatch.setattr(db_module, "open_db", short_timeout_open_db)
 
     try:
         result = mw_mod.memory_write(content="This should fail due to lock", type="fact")
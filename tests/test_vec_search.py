@@ -0,0 +1,460 @@
+"""Tests for project-partitioned vector search (requires sqlite-vec)."""
+
+import struct
+import uuid
+from datetime import datetime
+
+import pytest
+
+
+def _vec_loadable() -> bool:
+    import sqlite3
+    try:
+        import sqlite_vec
+        conn = sqlite3.connect(":memory:")
+        conn.enable_load_extension(True)
+        sqlite_vec.load(conn)
+        conn.close()
+        return True
+    except Exception:
+        return False
+
+
+pytestmark = pytest.mark.skipif(not _vec_loadable(), reason="sqlite-vec not loadable")
+
+
+def _vec(*head: float) -> bytes:
+    values = list(head) + [0.0] * (384 - len(head))
+    return struct.pack("<384f", *values)
+
+
+@pytest.fixture
+def vec_db(temp_db, active_session):
+    """Open the temp DB with sqlite-vec and partitioned vector tables."""
+    from db import open_db
+    from init_db import VEC_SCHEMA
+    conn = open_db(with_vec=True)
+    conn.executescript(VEC_SCHEMA)
+    conn.execute(
+        "INSERT OR IGNORE INTO projects (name, path, created) VALUES (?, ?, ?)",
+        ("other-project", "/tmp/other", datetime.now().isoformat()),
+    )
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def _add_fact(conn, project, content, embedding, fact_type="fact", tags=None):
+    from vec_store import write_fact_vec
+    fact_id = str(uuid.uuid4())
+    conn.execute("""
+        INSERT INTO facts (id, project, content, type, tags, timestamp, heat_score)
+        VALUES (?, ?, ?, ?, ?, ?, 1.0)
+    """, (fact_id, project, content, fact_type, tags, datetime.now().isoformat()))
+    rowid = conn.execute("SELECT rowid FROM facts WHERE id = ?", (fact_id,)).fetchone()[0]
+    write_fact_vec(conn, rowid, embedding, project, fact_type)
+    return rowid
+
+
+def test_vec_search_not_crowded_out_by_other_projects(vec_db):
+    """In-project neighbours must be found even when other projects dominate globally."""
+    from search.fts_search import _vec_search_facts
+
+    for i in range(40):
+        _add_fact(vec_db, "other-project", f"other {i}", _vec(1.0, 0.0))
+    mine = _add_fact(vec_db, "test-project", "mine", _vec(0.6, 0.8))
+
+    hits = _vec_search_facts(vec_db, _vec(1.0, 0.0), project="test-project", limit=5)
+    assert list(hits) == [mine]
+
+
+def test_vec_search_filters_type_and_tags(vec_db):
+    """Type and tags are both filtered inside the KNN."""
+    from search.fts_search import _vec_search_facts
+
+    gotcha = _add_fact(vec_db, "test-project", "a", _vec(1.0), "gotcha", "auth,api")
+    _add_fact(vec_db, "test-project", "b", _vec(1.0), "gotcha", "ui")
+    _add_fact(vec_db, "test-project", "c", _vec(1.0), "pattern", "auth")
+
+    hits = _vec_search_facts(vec_db, _vec(1.0), project="test-project",
+                             fact_type="gotcha", tags="auth")
+    assert list(hits) == [gotcha]
+
+
+def test_vec_search_tag_and_file_filters_not_crowded_out(vec_db):
+    """Closer untagged facts / other files must not use up k; file filters are literal substrings."""
+    from search.fts_search import _vec_search_facts, _vec_search_chunks
+    from vec_store import write_chunk_vec
+
+    for i in range(40):
+        _add_fact(vec_db, "test-project", f"near {i}", _vec(1.0, 0.0), tags="misc")
+    tagged = _add_fact(vec_db, "test-project", "far", _vec(0.0, 1.0), tags="deploy")
+    upper = _add_fact(vec_db, "test-project", "upper", _vec(0.0, 1.1), tags="Deploy")
+    hits = _vec_search_facts(vec_db, _vec(1.0, 0.0), project="test-project", limit=2, tags="deploy")
+    assert list(hits) == [tagged, upper]  # Same case-insensitive match as the FTS5 side
+
+    chunks = {}
+    for path in ["docs/a_b.md"] * 20 + ["docs/aXb.md"]:
+        cursor = vec_db.execute("""
+            INSERT INTO file_chunks (project, file_path, file_mtime, chunk_index, content)
+            VALUES ('test-project', ?, 0, 0, 'text')
+        """, (path,))
+        write_chunk_vec(vec_db, cursor.lastrowid, _vec(1.0, 0.0) if path == "docs/a_b.md" else _vec(0.0, 1.0),
+                        "test-project")
+        chunks[path] = cursor.lastrowid
+    hits = _vec_search_chunks(vec_db, _vec(1.0, 0.0), project="test-project",
+                              file_filter="aXb*", limit=2)
+    assert list(hits) == [chunks["docs/aXb.md"]]
+    hits = _vec_search_chunks(vec_db, _vec(0.0, 1.0), project="test-project",
+                              file_filter="a_b", limit=2)
+    assert chunks["docs/aXb.md"] not in hits
+
+
+def test_vec_search_scope_all(vec_db):
+    """scope=all searches every partition."""
+    from search.fts_search import _vec_search_facts
+
+    a = _add_fact(vec_db, "test-project", "a", _vec(1.0))
+    b = _add_fact(vec_db, "other-project", "b", _vec(1.0))
+
+    hits = _vec_search_facts(vec_db, _vec(1.0), project="test-project", scope="all")
+    assert set(hits) == {a, b}
+
+
+def test_upgrade_vec_schema_partitions_legacy_tables(vec_db):
+    """Legacy embedding-only tables are rebuilt with project/type and keep their vectors."""
+    from init_db import upgrade_vec_schema
+    from vec_store import is_partitioned
+
+    rowid = _add_fact(vec_db, "test-project", "legacy", _vec(1.0), "decision")
+    vec_db.execute("DROP TABLE facts_vec")
+    vec_db.execute("CREATE VIRTUAL TABLE facts_vec USING vec0(embedding float[384])")
+    vec_db.execute("INSERT INTO facts_vec(rowid, embedding) VALUES (?, ?)", (rowid, _vec(1.0)))
+    vec_db.commit()
+    assert not is_partitioned(vec_db, "facts_vec")
+
+    upgrade_vec_schema(vec_db)
+
+    assert is_partitioned(vec_db, "facts_vec")
+    row = vec_db.execute(
+        "SELECT project, type FROM facts_vec WHERE rowid = ?", (rowid,)
+    ).fetchone()
+    assert tuple(row) == ("test-project", "decision")
+
+
+def test_upgrade_vec_schema_failure_keeps_the_old_tables(vec_db, monkeypatch):
+    """The rebuild is one transaction: an error after the DROP loses no embeddings."""
+    import vec_store
+    from init_db import upgrade_vec_schema
+    from vec_store import is_partitioned
+
+    rowid = _add_fact(vec_db, "test-project", "legacy", _vec(1.0), "decision")
+    vec_db.execute("DROP TABLE facts_vec")
+    vec_db.execute("CREATE VIRTUAL TABLE facts_vec USING vec0(embedding float[384])")
+    vec_db.execute("INSERT INTO facts_vec(rowid, embedding) VALUES (?, ?)", (rowid, _vec(1.0)))
+    vec_db.commit()
+
+    def broken_insert_sql(*args):
+        raise RuntimeError("killed mid-rebuild")
+
+    monkeypatch.setattr(vec_store, "insert_sql", broken_insert_sql)
+    with pytest.raises(RuntimeError):
+        upgrade_vec_schema(vec_db)
+
+    assert not vec_db.in_transaction
+    assert not is_partitioned(vec_db, "facts_vec")
+    row = vec_db.execute("SELECT embedding FROM facts_vec WHERE rowid = ?", (rowid,)).fetchone()
+    assert row[0] == _vec(1.0)
+
+
+def _count_statements(conn, fn):
+    """Run fn and count top-level SQL statements (virtual-table internals start with '--')."""
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        result = fn()
+    finally:
+        conn.set_trace_callback(None)
+    return result, len([s for s in statements if not s.startswith("--")])
+
+
+def test_hybrid_search_round_trips_independent_of_candidates(vec_db, monkeypatch):
+    """Vec-only hits are hydrated in one query, however many come back."""
+    import embedder
+    from search.fts_search import fts_search_facts
+
+    monkeypatch.setattr(embedder, "embed_text", lambda text, spec=None: _vec(1.0))
+    _add_fact(vec_db, "test-project", "deploy uses caddy", _vec(0.0, 1.0))
+    for i in range(2):
+        _add_fact(vec_db, "test-project", f"unrelated note {i}", _vec(1.0, 0.1 * i))
+    vec_db.commit()
+    fts_search_facts(vec_db, "caddy", project="test-project", limit=10)  # warm the query cache
+
+    small, small_count = _count_statements(
+        vec_db, lambda: fts_search_facts(vec_db, "caddy", project="test-project", limit=10))
+
+    for i in range(2, 12):
+        _add_fact(vec_db, "test-project", f"unrelated note {i}", _vec(1.0, 0.1 * i))
+    vec_db.commit()
+
+    large, large_count = _count_statements(
+        vec_db, lambda: fts_search_facts(vec_db, "caddy", project="test-project", limit=10))
+
+    assert len(large) > len(small)
+    assert large_count == small_count
+
+
+def test_reindex_embeds_chunks_across_files_in_batches(vec_db, tmp_path, monkeypatch):
+    """Doc indexing embeds chunks of many small files together, one call per batch."""
+    import embedder
+    from indexer.file_indexer import reindex_project
+
+    calls = []
+
+    def fake_embed_texts(texts, batch_size=None, spec=None):
+        calls.append(len(texts))
+        return [_vec(1.0) for _ in texts]
+
+    monkeypatch.setattr(embedder, "embed_texts", fake_embed_texts)
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    for i in range(10):
+        (docs / f"note{i}.md").write_text(f"# Note {i}\n\nSmall file number {i}.\n", encoding="utf-8")
+
+    indexed = reindex_project(vec_db, "test-project", docs, time_budget=30, batch_size=4)
+
+    assert indexed == 10
+    assert calls == [4, 4, 2]
+    chunks = vec_db.execute("SELECT COUNT(*) FROM file_chunks WHERE project = 'test-project'").fetchone()[0]
+    vecs = vec_db.execute("SELECT COUNT(*) FROM chunks_vec WHERE project = 'test-project'").fetchone()[0]
+    assert chunks == vecs == 10
+
+
+def test_reindex_shrinks_batches_to_the_time_budget(vec_db, tmp_path, monkeypatch):
+    """A batch is not embedded past the budget; batches shrink to what the remaining time fits."""
+    import time
+    import embedder
+    from indexer.file_indexer import reindex_project
+
+    calls = []
+
+    def slow_embed_texts(texts, batch_size=None, spec=None):
+        calls.append(len(texts))
+        time.sleep(0.02 * len(texts))
+        return [_vec(1.0) for _ in texts]
+
+    monkeypatch.setattr(embedder, "embed_texts", slow_embed_texts)
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    for i in range(40):
+        (docs / f"note{i}.md").write_text(f"# Note {i}\n\nSmall file number {i}.\n", encoding="utf-8")
+
+    start = time.time()
+    indexed = reindex_project(vec_db, "test-project", docs, time_budget=0.5, batch_size=64)
+    elapsed = time.time() - start
+
+    assert 0 < indexed < 40
+    assert len(calls) > 1 and max(calls) < 40
+    assert elapsed < 0.5 + 0.2
+    rest = reindex_project(vec_db, "test-project", docs, time_budget=30, batch_size=64)
+    assert indexed + rest == 40
+
+
+def test_reindex_skips_docs_whose_content_is_unchanged(vec_db, tmp_path, monkeypatch):
+    """A new mtime alone (branch switch, copied tree) doesn't re-chunk or re-embed a doc."""
+    import os
+    import embedder
+    from indexer.file_indexer import reindex_project
+
+    monkeypatch.setattr(embedder, "embed_texts",
+                        lambda texts, batch_size=None, spec=None: [_vec(1.0) for _ in texts])
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    same, edited = docs / "same.md", docs / "edited.md"
+    same.write_text("# Same\n\nUntouched contents.\n", encoding="utf-8")
+    edited.write_text("# Edited\n\nOld contents.\n", encoding="utf-8")
+    assert reindex_project(vec_db, "test-project", docs, time_budget=30) == 2
+
+    edited.write_text("# Edited\n\nNew contents.\n", encoding="utf-8")
+    later = same.stat().st_mtime + 100
+    for path in (same, edited):
+        os.utime(path, (later, later))
+
+    assert reindex_project(vec_db, "test-project", docs, time_budget=30) == 1
+    assert reindex_project(vec_db, "test-project", docs, time_budget=30) == 0
+    row = vec_db.execute("SELECT file_mtime, content_hash FROM file_chunks WHERE file_path = 'same.md'").fetchone()
+    assert row[0] == later and row[1]
+
+
+def test_reindex_in_git_repo_reads_only_changed_docs(vec_db, tmp_path, monkeypatch):
+    """With a recorded git state, deleted and edited docs are found from `git diff`, not a walk."""
+    import subprocess
+    from pathlib import Path
+    import embedder
+    from indexer.file_indexer import reindex_project
+
+    monkeypatch.setattr(embedder, "embed_texts",
+                        lambda texts, batch_size=None, spec=None: [_vec(1.0) for _ in texts])
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    for i in range(3):
+        (docs / f"note{i}.md").write_text(f"# Note {i}\n\nText {i}.\n", encoding="utf-8")
+    (docs / ".gitignore").write_text("draft.md\n", encoding="utf-8")
+    (docs / "draft.md").write_text("# Draft\n\nIgnored.\n", encoding="utf-8")
+    git = ["git", "-c", "user.name=t", "-c", "user.email=t@t"]
+    for args in (["init", "-q"], ["add", "-A"], ["commit", "-q", "-m", "docs"]):
+        subprocess.run(git + args, cwd=docs, check=True, capture_output=True)
+    assert reindex_project(vec_db, "test-project", docs, time_budget=30) == 3
+
+    (docs / "note0.md").unlink()
+    (docs / "note1.md").write_text("# Note 1\n\nRewritten, longer text.\n", encoding="utf-8")
+
+    def no_walk(self):
+        raise AssertionError("walked the tree")
+    monkeypatch.setattr(Path, "iterdir", no_walk)
+
+    assert reindex_project(vec_db, "test-project", docs, time_budget=30) == 1
+    paths = {r[0] for r in vec_db.execute("SELECT DISTINCT file_path FROM file_chunks WHERE project = 'test-project'")}
+    assert paths == {"note1.md", "note2.md"}
+
+
+@pytest.mark.parametrize("mode", ["int8", "binary"])
+def test_quantized_tables_rescore_with_float_distances(vec_db, monkeypatch, mode):
+    """Switching quantization rebuilds the tables; KNN still returns float L2 distances."""
+    import init_db
+    from vec_store import table_quantization
+    from search.fts_search import _vec_search_facts
+
+    near = _add_fact(vec_db, "test-project", "near", _vec(1.0, 0.1))
+    far = _add_fact(vec_db, "test-project", "far", _vec(-1.0, 0.5))
+    vec_db.commit()
+
+    monkeypatch.setattr(init_db, "configured_quantization", lambda: mode)
+    init_db.upgrade_vec_schema(vec_db)
+    assert table_quantization(vec_db, "facts_vec") == mode
+
+    newer = _add_fact(vec_db, "test-project", "newer", _vec(1.0, 0.2))
+    hits = _vec_search_facts(vec_db, _vec(1.0, 0.1), project="test-project", limit=3)
+
+    assert list(hits)[:2] == [near, newer]
+    assert hits[near] == pytest.approx(0.0, abs=1e-6)
+    assert far in hits
+
+
+def test_model_switch_reembeds_in_background_then_flips(vec_db, monkeypatch):
+    """A new (truncated) model is built beside the serving one and takes over when complete."""
+    import embedder
+    from embedding_models import ensure_configured_model, migrate_model, serving_model, vec_table_names
+    from search.fts_search import _vec_search_facts
+
+    near = _add_fact(vec_db, "test-project", "near", _vec(1.0, 0.1))
+    far = _add_fact(vec_db, "test-project", "far", _vec(-1.0, 0.5))
+    vec_db.commit()
+
+    def fake_embed_texts(texts, batch_size=None, spec=None):
+        rows = [struct.unpack("<384f", _vec(1.0, 0.1) if "near" in t else _vec(-1.0, 0.5)) for t in texts]
+        return embedder.vectors_to_blobs(rows, spec.get("truncate"))
+
+    monkeypatch.setattr(embedder, "embed_texts", fake_embed_texts)
+    monkeypatch.setattr(embedder, "_embedding_config", lambda: {
+        "model": "tiny", "models": {"tiny": {"name": "fake/tiny", "dim": 384, "truncate": 64}},
+    })
+
+    target = ensure_configured_model(vec_db)
+    assert target["truncate"] == 64
+    assert embedder.model_id(serving_model(vec_db)) == embedder.EMBEDDING_MODEL  # old model keeps serving
+
+    assert migrate_model(target, batch_size=1)
+
+    facts_table, _ = vec_table_names(target)
+    assert embedder.model_id(serving_model(vec_db)) == "fake/tiny@64"
+    assert vec_db.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE name = 'facts_vec'"
+    ).fetchone()[0] == 0
+    hits = _vec_search_facts(vec_db, fake_embed_texts(["near"], spec=target)[0],
+                             project="test-project", limit=2, table=facts_table)
+    assert list(hits) == [near, far]
+
+
+def test_facts_edited_during_model_migration_are_reembedded(vec_db, monkeypatch):
+    """Edits keep the rowid, so the building table must not keep the old vector."""
+    import embedder
+    from backfill_embeddings import backfill_facts
+    from embedding_models import ensure_configured_model, migrate_model, vec_table_names
+    from tools.memory_write import _embed_fact
+
+    edited = _add_fact(vec_db, "test-project", "near one", _vec(1.0, 0.1))
+    raced = _add_fact(vec_db, "test-project", "near two", _vec(1.0, 0.1))
+    vec_db.commit()
+
+    def fake_embed_texts(texts, batch_size=None, spec=None):
+        if "near two" in texts:  # Edited while its batch is being embedded
+            vec_db.execute("UPDATE facts SET content = 'far two' WHERE rowid = ?", (raced,))
+            vec_db.commit()
+        rows = [struct.unpack("<384f", _vec(1.0, 0.1) if "near" in t else _vec(-1.0, 0.5)) for t in texts]
+        return embedder.vectors_to_blobs(rows, (spec or {}).get("truncate"))
+
+    monkeypatch.setattr(embedder, "embed_texts", fake_embed_texts)
+    monkeypatch.setattr(embedder, "_embedding_config", lambda: {
+        "model": "tiny", "models": {"tiny": {"name": "fake/tiny", "dim": 384, "truncate": 64}},
+    })
+    target = ensure_configured_model(vec_db)
+    facts_table, _ = vec_table_names(target)
+
+    backfill_facts(vec_db, 1, spec=target, table=facts_table, log=lambda msg: None)
+    in_table = {r[0] for r in vec_db.execute(f"SELECT rowid FROM {facts_table}")}
+    assert in_table == {edited}  # The raced vector was dropped before commit
+
+    vec_db.execute("UPDATE facts SET content = 'far one' WHERE rowid = ?", (edited,))
+    _embed_fact(vec_db, edited, "far one", project="test-project", fact_type="fact")
+    vec_db.commit()
+    assert vec_db.execute(f"SELECT COUNT(*) FROM {facts_table}").fetchone()[0] == 0
+
+    assert migrate_model(target, batch_size=1)
+    far = fake_embed_texts(["far"], spec=target)[0]
+    for rowid in (edited, raced):
+        row = vec_db.execute(f"SELECT embedding FROM {facts_table} WHERE rowid = ?", (rowid,)).fetchone()
+        assert row[0] == far
+
+
+def test_weak_vector_match_still_records_a_knowledge_gap_under_rrf(vec_db, monkeypatch):
+    """RRF's top hit always scores high; the gap check uses the calibrated relevance."""
+    import embedder
+    from tools.memory_search import memory_search
+
+    monkeypatch.setattr(embedder, "embed_text", lambda text, spec=None: _vec(0.0, 1.0))
+    _add_fact(vec_db, "test-project", "alpha beta", _vec(1.0, 0.0))
+    _add_fact(vec_db, "test-project", "gamma delta", _vec(1.0, 0.2))
+    vec_db.commit()
+
+    out = memory_search(query="kubernetes", fusion="rrf")
+    assert "alpha beta" in out  # Vec-only hits are still returned
+
+    gaps = vec_db.execute("SELECT query, hit_count FROM knowledge_gaps").fetchall()
+    assert [tuple(g) for g in gaps] == [("kubernetes", 2)]
+
+
+def test_only_content_and_domain_edits_are_reembedded(vec_db, monkeypatch):
+    """Tags filter search instead of being embedded, so tag edits reuse the store."""
+    import embedder
+    from tools.memory_write import memory_write
+
+    embedded = []
+
+    def fake_embed_texts(texts, batch_size=None, spec=None):
+        embedded.extend(texts)
+        return [_vec(1.0)] * len(texts)
+
+    monkeypatch.setattr(embedder, "embed_texts", fake_embed_texts)
+    write = lambda content, **kw: memory_write(content=content, type="fact",
+                                               source_file="notes.md", **kw)
+
+    write("Deploys run from CI", tags="deploy")
+    write("Deploys run by hand", tags="deploy")
+    write("Deploys run from CI", tags="deploy,ci")  # Only tags differ from the first
+    assert embedded == ["Deploys run from CI", "Deploys run by hand"]
+
+    assert vec_db.execute("SELECT tags FROM facts WHERE source_file = 'notes.md'").fetchone()[0] == "deploy,ci"
+
+    write("Deploys run by hand", tags="deploy", domain="ops")  # The domain is embedded
+    assert embedded[2:] == ["Deploys run by hand [ops]"]
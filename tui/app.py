@@ -17,6 +17,7 @@ from tui.screens.timeline import TimelineScreen
 from tui.screens.gaps import GapsScreen
 from tui.screens.contradictions import ContradictionsScreen
 from tui.screens.code_graph import CodeGraphScreen
+from tui.screens.performance import PerformanceScreen
 
 
 def _get_version() -> str:
@@ -44,6 +45,7 @@ class CogniLayerTUI(App):
         ("6", "tab_6", "Gaps"),
         ("7", "tab_7", "Contradictions"),
         ("8", "tab_8", "Code Graph"),
+        ("9", "tab_9", "Performance"),
     ]
 
     def __init__(self, project: str | None = None, **kwargs):
@@ -70,6 +72,8 @@ class CogniLayerTUI(App):
                 yield ContradictionsScreen(project=self.project)
             with TabPane("Code Graph", id="tab-code-graph"):
                 yield CodeGraphScreen(project=self.project)
+            with TabPane("Performance", id="tab-performance"):
+                yield PerformanceScreen(project=self.project)
         yield Footer()
 
     def action_tab_1(self) -> None:
@@ -96,6 +100,9 @@ class CogniLayerTUI(App):
     def action_tab_8(self) -> None:
         self.query_one("#tabs", TabbedContent).active = "tab-code-graph"
 
+    def action_tab_9(self) -> None:
+        self.query_one("#tabs", TabbedContent).active = "tab-performance"
+
     def action_refresh(self) -> None:
         """Refresh by remounting the active tab content."""
         self.notify("Refreshing...", severity="information")
@@ -5,6 +5,7 @@ from pathlib import Path
 from datetime import datetime
 
 DB_PATH = Path.home() / ".cognilayer" / "memory.db"
+_IN_BATCH = 500  # Bound ids per IN (...) list; older SQLite builds allow 999 parameters
 
 
 def _open() -> sqlite3.Connection:
@@ -220,18 +221,69 @@ def get_clusters(project: str | None = None) -> list[dict]:
             ORDER BY c.fact_count DESC
         """, params).fetchall()
 
-        result = []
-        for c in clusters:
-            members = db.execute("""
-                SELECT id, substr(content, 1, 80) as preview, type, heat_score
-                FROM facts WHERE cluster_id = ?
-                ORDER BY heat_score DESC LIMIT 20
-            """, (c["id"],)).fetchall()
-            result.append({
-                **dict(c),
-                "members": [dict(m) for m in members],
-            })
+        # Top 20 members of every listed cluster in one windowed query
+        members_by_cluster: dict[int, list[dict]] = {}
+        if clusters:
+            members = db.execute(f"""
+                SELECT id, preview, type, heat_score, cluster_id FROM (
+                    SELECT f.id, substr(f.content, 1, 80) as preview, f.type, f.heat_score,
+                           f.cluster_id,
+                           ROW_NUMBER() OVER (PARTITION BY f.cluster_id
+                                              ORDER BY f.heat_score DESC) AS rn
+                    FROM facts f
+                    JOIN fact_clusters c ON c.id = f.cluster_id
+                    {where}
+                )
+                WHERE rn <= 20
+                ORDER BY cluster_id, rn
+            """, params).fetchall()
+            for m in members:
+                members_by_cluster.setdefault(m["cluster_id"], []).append(dict(m))
+
+        return [
+            {**dict(c), "members": members_by_cluster.get(c["id"], [])}
+            for c in clusters
+        ]
+    finally:
+        db.close()
+
 
+def get_fact_graph(fact_ids: list[str]) -> dict:
+    """Linked facts and causal chains for facts: {"links": {...}, "chains": {...}}.
+
+    Same batched expansion as memory_search (search.graph), two queries total.
+    """
+    from search.graph import expand
+    db = _open()
+    try:
+        links, chains = expand(db, fact_ids)
+        return {"links": links, "chains": chains}
+    finally:
+        db.close()
+
+
+def get_session_facts(session_ids: list[str], per_session: int = 5) -> dict[str, list[dict]]:
+    """Most recent facts written in each session (one windowed query per _IN_BATCH sessions)."""
+    if not session_ids:
+        return {}
+    db = _open()
+    try:
+        session_ids = list(session_ids)
+        result: dict[str, list[dict]] = {}
+        for i in range(0, len(session_ids), _IN_BATCH):
+            batch = session_ids[i:i + _IN_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = db.execute(f"""
+                SELECT id, session_id, type, substr(content, 1, 80) as preview FROM (
+                    SELECT id, session_id, type, content,
+                           ROW_NUMBER() OVER (PARTITION BY session_id ORDER BY timestamp DESC) AS rn
+                    FROM facts WHERE session_id IN ({placeholders})
+                )
+                WHERE rn <= ?
+                ORDER BY session_id, rn
+            """, batch + [per_session]).fetchall()
+            for r in rows:
+                result.setdefault(r["session_id"], []).append(dict(r))
         return result
     finally:
         db.close()
@@ -303,6 +355,87 @@ def get_contradictions(project: str | None = None) -> list[dict]:
         db.close()
 
 
+def _percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    if not values:
+        return 0.0
+    return values[min(int(q * len(values)), len(values) - 1)]
+
+
+def get_tool_metrics(project: str | None = None) -> dict:
+    """Tool latency stats from tool_metrics: per (project, tool) and per CLI instance.
+
+    Returns {"tools": [...], "instances": [...]}; empty lists when the table
+    doesn't exist yet. p95_early / p95_recent compare the older and newer half
+    of each tool's calls, so tools slowing down as memory.db grows stand out.
+    """
+    db = _open()
+    try:
+        where = "WHERE project = ?" if project else ""
+        params = (project,) if project else ()
+        rows = db.execute(f"""
+            SELECT timestamp, tool, project, session_id, pid, duration_ms, sql_count,
+                   embed_ms, lock_wait_ms, ok, db_mb
+            FROM tool_metrics
+            {where}
+            ORDER BY id
+        """, params).fetchall()
+    except sqlite3.OperationalError:
+        return {"tools": [], "instances": []}
+    finally:
+        db.close()
+
+    by_tool: dict[tuple, list] = {}
+    by_instance: dict[tuple, list] = {}
+    for r in rows:
+        by_tool.setdefault((r["project"], r["tool"]), []).append(r)
+        instance = r["session_id"] or f"pid {r['pid']}"
+        by_instance.setdefault((r["project"], instance), []).append(r)
+
+    tools = []
+    for (proj, tool), calls in by_tool.items():
+        durations = sorted(c["duration_ms"] for c in calls)
+        half = len(calls) // 2
+        early = sorted(c["duration_ms"] for c in calls[:half])
+        recent = sorted(c["duration_ms"] for c in calls[half:])
+        n = len(calls)
+        sizes = [c["db_mb"] for c in calls if c["db_mb"] is not None]
+        tools.append({
+            "project": proj,
+            "tool": tool,
+            "calls": n,
+            "errors": sum(1 for c in calls if not c["ok"]),
+            "p50_ms": _percentile(durations, 0.50),
+            "p95_ms": _percentile(durations, 0.95),
+            "p99_ms": _percentile(durations, 0.99),
+            "avg_sql": sum(c["sql_count"] or 0 for c in calls) / n,
+            "avg_embed_ms": sum(c["embed_ms"] or 0 for c in calls) / n,
+            "avg_lock_ms": sum(c["lock_wait_ms"] or 0 for c in calls) / n,
+            "p95_early": _percentile(early, 0.95) if early else None,
+            "p95_recent": _percentile(recent, 0.95),
+            "db_mb_min": min(sizes) if sizes else None,
+            "db_mb_max": max(sizes) if sizes else None,
+        })
+    tools.sort(key=lambda t: t["p95_ms"], reverse=True)
+
+    instances = []
+    for (proj, instance), calls in by_instance.items():
+        durations = sorted(c["duration_ms"] for c in calls)
+        instances.append({
+            "project": proj,
+            "instance": instance,
+            "calls": len(calls),
+            "errors": sum(1 for c in calls if not c["ok"]),
+            "p50_ms": _percentile(durations, 0.50),
+            "p95_ms": _percentile(durations, 0.95),
+            "total_lock_ms": sum(c["lock_wait_ms"] or 0 for c in calls),
+            "first_seen": calls[0]["timestamp"],
+            "last_seen": calls[-1]["timestamp"],
+        })
+    instances.sort(key=lambda i: i["last_seen"], reverse=True)
+    return {"tools": tools, "instances": instances}
+
+
 def get_code_stats(project: str | None = None) -> dict | None:
     """Get code intelligence statistics. Returns None if tables don't exist."""
     db = _open()
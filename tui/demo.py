@@ -455,6 +455,45 @@ def create_demo_db() -> str:
             (proj, fid, from_id, to_id, to_qname, kind, line, confidence)
         )
 
+    # --- Tool metrics (Performance tab) ---
+    db.executescript("""
+        CREATE TABLE IF NOT EXISTS tool_metrics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT NOT NULL,
+            tool TEXT NOT NULL,
+            project TEXT,
+            session_id TEXT,
+            pid INTEGER,
+            duration_ms REAL NOT NULL,
+            sql_count INTEGER DEFAULT 0,
+            embed_ms REAL DEFAULT 0,
+            lock_wait_ms REAL DEFAULT 0,
+            ok INTEGER DEFAULT 1,
+            db_mb REAL
+        );
+    """)
+    # (tool, base ms, sql per call, embed ms, ms added per MB of memory.db)
+    tool_profiles = [
+        ("memory_search", 35, 9, 18, 0.6),
+        ("file_search", 28, 7, 16, 0.3),
+        ("memory_write", 22, 6, 15, 0.05),
+        ("code_search", 6, 2, 0, 0.02),
+        ("session_bridge", 4, 3, 0, 0.0),
+    ]
+    instances = [(str(uuid.uuid4()), 40000 + i, random.choice(projects[:3])[0]) for i in range(4)]
+    for i in range(600):
+        session_id, pid, proj = instances[i * len(instances) // 600]
+        tool, base, sql, embed, per_mb = random.choice(tool_profiles)
+        db_mb = 40 + i * 0.1
+        duration = (base + per_mb * db_mb) * random.lognormvariate(0, 0.35)
+        lock = random.choice([0, 0, 0, 0, random.uniform(1, 40)])
+        db.execute(
+            "INSERT INTO tool_metrics (timestamp, tool, project, session_id, pid, duration_ms, sql_count, embed_ms, lock_wait_ms, ok, db_mb) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            ((now - timedelta(minutes=600 - i)).isoformat(), tool, proj, session_id, pid,
+             duration + lock, sql + random.randint(0, 3), embed * random.uniform(0.8, 1.2) if embed else 0,
+             lock, int(random.random() > 0.01), db_mb)
+        )
+
     db.commit()
     db.close()
     return db_path
@@ -30,6 +30,7 @@ class ClustersScreen(Static):
     def __init__(self, project: str | None = None, **kwargs):
         self.project = project
         self._clusters = []
+        self._graph = {"links": {}, "chains": {}}
         super().__init__(**kwargs)
 
     def compose(self) -> ComposeResult:
@@ -45,6 +46,11 @@ class ClustersScreen(Static):
             tree.root.add_leaf("[dim]No clusters. Run /consolidate first.[/]")
             return
 
+        # Links/chains of every listed member, fetched in one batch for the detail pane
+        self._graph = data.get_fact_graph(
+            [m["id"] for c in self._clusters for m in c.get("members", [])]
+        )
+
         for cluster in self._clusters:
             label = cluster.get("label") or f"Cluster #{cluster['id']}"
             count = cluster.get("fact_count", 0)
@@ -54,7 +60,8 @@ class ClustersScreen(Static):
                 preview = member.get("preview", "?")
                 heat = member.get("heat_score", 0) or 0
                 color = heat_color(heat)
-                node.add_leaf(f"[{color}]●[/] [{member.get('type', '?')}] {preview}")
+                node.add_leaf(f"[{color}]●[/] [{member.get('type', '?')}] {preview}",
+                              data={"member": member})
 
         tree.root.expand_all()
 
@@ -65,6 +72,10 @@ class ClustersScreen(Static):
         if not node_data or not isinstance(node_data, dict):
             return
 
+        if "member" in node_data:
+            detail.update(self._member_detail(node_data["member"]))
+            return
+
         label = node_data.get("label") or f"Cluster #{node_data.get('id', '?')}"
         summary = node_data.get("summary") or "No summary"
         count = node_data.get("fact_count", 0)
@@ -77,3 +88,19 @@ class ClustersScreen(Static):
             f"Created: {node_data.get('created', '?')}\n\n"
             f"[dim]{summary}[/]"
         )
+
+    def _member_detail(self, member: dict) -> str:
+        lines = [f"[bold][{member.get('type', '?')}][/] {member.get('preview', '?')}", ""]
+        links = self._graph["links"].get(member["id"], [])
+        chains = self._graph["chains"].get(member["id"], [])
+        if links:
+            lines.append("[bold]Linked[/]")
+            lines += [f"  \u2194 {link['content'][:60]}" for link in links]
+        if chains:
+            lines.append("[bold]Causal chains[/]")
+            for chain in chains:
+                arrow = "\u2192" if chain["direction"] == "cause" else "\u2190"
+                lines.append(f"  {arrow} {chain['relationship']}: {chain['content'][:60]}")
+        if not links and not chains:
+            lines.append("[dim]No links or causal chains[/]")
+        return "\n".join(lines)
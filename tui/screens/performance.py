@@ -0,0 +1,81 @@
+"""Tab 9: Performance — Per-tool latency, SQL and lock-wait metrics."""
+
+from textual.app import ComposeResult
+from textual.widgets import DataTable, Static
+
+from tui import data
+
+
+def _trend(early: float | None, recent: float) -> str:
+    """p95 of the newer half of calls relative to the older half."""
+    if not early:
+        return "-"
+    ratio = recent / early
+    if ratio >= 1.5:
+        return f"[red]x{ratio:.1f}[/]"
+    if ratio <= 0.67:
+        return f"[green]x{ratio:.1f}[/]"
+    return f"x{ratio:.1f}"
+
+
+class PerformanceScreen(Static):
+    """Tool latency percentiles per project and per CLI instance."""
+
+    DEFAULT_CSS = """
+    PerformanceScreen {
+        height: 1fr;
+    }
+    #perf-tools {
+        height: 2fr;
+    }
+    #perf-instances {
+        height: 1fr;
+    }
+    .perf-title {
+        height: 1;
+        padding: 0 1;
+    }
+    """
+
+    def __init__(self, project: str | None = None, **kwargs):
+        self.project = project
+        super().__init__(**kwargs)
+
+    def compose(self) -> ComposeResult:
+        yield Static("[bold]Tools[/] [dim](p95 trend = newer half of calls vs older half)[/]",
+                     classes="perf-title")
+        yield DataTable(id="perf-tools")
+        yield Static("[bold]CLI instances[/]", classes="perf-title")
+        yield DataTable(id="perf-instances")
+
+    def on_mount(self) -> None:
+        metrics = data.get_tool_metrics(self.project)
+
+        tools = self.query_one("#perf-tools", DataTable)
+        tools.add_columns("Project", "Tool", "Calls", "Err", "p50 ms", "p95 ms", "p99 ms",
+                          "SQL/call", "Embed ms", "Lock ms", "p95 trend", "DB MB")
+        for t in metrics["tools"]:
+            if t["db_mb_min"] is None:
+                db_mb = "-"
+            elif round(t["db_mb_min"]) == round(t["db_mb_max"]):
+                db_mb = f"{t['db_mb_max']:.0f}"
+            else:
+                db_mb = f"{t['db_mb_min']:.0f}-{t['db_mb_max']:.0f}"
+            errors = f"[red]{t['errors']}[/]" if t["errors"] else "0"
+            tools.add_row(
+                (t["project"] or "-")[:20], t["tool"], str(t["calls"]), errors,
+                f"{t['p50_ms']:.1f}", f"{t['p95_ms']:.1f}", f"{t['p99_ms']:.1f}",
+                f"{t['avg_sql']:.1f}", f"{t['avg_embed_ms']:.1f}", f"{t['avg_lock_ms']:.1f}",
+                _trend(t["p95_early"], t["p95_recent"]), db_mb,
+            )
+
+        instances = self.query_one("#perf-instances", DataTable)
+        instances.add_columns("Project", "Instance", "Calls", "Err", "p50 ms", "p95 ms",
+                              "Lock wait ms", "First Seen", "Last Seen")
+        for i in metrics["instances"]:
+            instances.add_row(
+                (i["project"] or "-")[:20], i["instance"][:12], str(i["calls"]), str(i["errors"]),
+                f"{i['p50_ms']:.1f}", f"{i['p95_ms']:.1f}", f"{i['total_lock_ms']:.0f}",
+                (i["first_seen"] or "?")[:16].replace("T", " "),
+                (i["last_seen"] or "?")[:16].replace("T", " "),
+            )
@@ -1,6 +1,7 @@
 """Tab 5: Timeline — Session history."""
 
 from textual.app import ComposeResult
+from textual.containers import Horizontal
 from textual.widgets import DataTable, Static
 
 from tui.widgets.heat_cell import outcome_color
@@ -14,20 +15,39 @@ class TimelineScreen(Static):
     TimelineScreen {
         height: 1fr;
     }
+    #timeline-table {
+        width: 1fr;
+        height: 1fr;
+    }
+    #timeline-detail {
+        width: 40%;
+        height: 1fr;
+        border-left: solid $surface;
+        padding: 1;
+    }
     """
 
     def __init__(self, project: str | None = None, **kwargs):
         self.project = project
+        self._session_facts = {}
+        self._graph = {"links": {}, "chains": {}}
         super().__init__(**kwargs)
 
     def compose(self) -> ComposeResult:
-        yield DataTable(id="timeline-table")
+        with Horizontal():
+            yield DataTable(id="timeline-table", cursor_type="row")
+            yield Static("[dim]Select a session to see its facts[/]", id="timeline-detail")
 
     def on_mount(self) -> None:
         table = self.query_one("#timeline-table", DataTable)
         table.add_columns("Date", "Episode", "Outcome", "Facts", "Changes", "Bridge")
 
         sessions = data.get_sessions(self.project)
+        # Facts per session and their causal chains, batched for the detail pane
+        self._session_facts = data.get_session_facts([s["id"] for s in sessions])
+        self._graph = data.get_fact_graph(
+            [f["id"] for facts in self._session_facts.values() for f in facts]
+        )
 
         for s in sessions:
             date = (s.get("start_time") or "?")[:16]
@@ -46,4 +66,19 @@ class TimelineScreen(Static):
                 str(facts_c),
                 str(changes_c),
                 bridge or "-",
+                key=s["id"],
             )
+
+    def on_data_table_row_highlighted(self, event: DataTable.RowHighlighted) -> None:
+        detail = self.query_one("#timeline-detail", Static)
+        facts = self._session_facts.get(event.row_key.value, [])
+        if not facts:
+            detail.update("[dim]No facts recorded in this session[/]")
+            return
+        lines = []
+        for fact in facts:
+            lines.append(f"[bold][{fact['type']}][/] {fact['preview']}")
+            for chain in self._graph["chains"].get(fact["id"], []):
+                arrow = "\u2192" if chain["direction"] == "cause" else "\u2190"
+                lines.append(f"  {arrow} {chain['relationship']}: {chain['content'][:60]}")
+        detail.update("\n".join(lines))